@@ -9,3 +9,7 @@ class DashboardConfig(AppConfig):
     divider_title = "لوحة التحكم"  # Section divider title
     priority = 200  # Sidebar ordering (higher = top)
     hide = False  # Show in sidebar
+
+    def ready(self):
+        # Register order rollup signal handlers
+        from apps.dashboard import signals  # noqa
@@ -0,0 +1,326 @@
+"""
+Storefront load-test harness
+
+Drives a scripted shopper journey (home -> filtered list -> detail -> add to
+cart -> update quantity -> checkout -> payment page) through the Django test
+client against a dedicated benchmark database, with Stripe stubbed out, and
+reports throughput, latency percentiles and queries per request.
+"""
+import json
+import random
+import subprocess
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.dashboard.perf import percentile
+
+# Named dataset sizes accepted by --size
+BENCHMARK_SIZES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+DEFAULT_BENCHMARK_DB = Path(settings.BASE_DIR) / 'benchmark.sqlite3'
+DEFAULT_RESULTS_DIR = Path(settings.BASE_DIR) / 'perf-results'
+
+BENCHMARK_USERNAME = 'loadtest'
+
+# Journey steps, in request order
+SCENARIO_STEPS = (
+    'home',
+    'product_list',
+    'product_detail',
+    'add_to_cart',
+    'update_cart_item',
+    'checkout',
+    'checkout_submit',
+    'payment_page',
+)
+
+CHECKOUT_FORM = {
+    'full_name': 'Load Test',
+    'phone_number': '0500000000',
+    'city': 'الرياض',
+    'street': 'شارع الاختبار',
+}
+
+
+def parse_size(value):
+    """Product count for a named size (``10k``) or a plain integer"""
+    value = str(value).lower().replace('_', '')
+    if value in BENCHMARK_SIZES:
+        return BENCHMARK_SIZES[value]
+    return int(value)
+
+
+@contextmanager
+def benchmark_database(path):
+    """
+    Point the default connection at the SQLite file ``path`` (migrated on
+    entry) for the duration of the block
+
+    Refuses the configured database so a benchmark never writes to it.
+    """
+    path = Path(path).resolve()
+    configured = settings.DATABASES['default']
+    if path == Path(configured['NAME']).resolve():
+        raise ValueError('The benchmark database must not be the configured database')
+
+    old_name = configured['NAME']
+    connection.close()
+    configured['NAME'] = connection.settings_dict['NAME'] = str(path)
+    try:
+        call_command('migrate', verbosity=0, interactive=False)
+        yield path
+    finally:
+        connection.close()
+        configured['NAME'] = connection.settings_dict['NAME'] = old_name
+
+
+class StripeStub:
+    """
+    Replaces stripe.PaymentIntent.create with a local fake while active
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def create_payment_intent(self, amount, currency, **kwargs):
+        self.calls += 1
+        intent_id = f'pi_bench_{self.calls}'
+        return SimpleNamespace(
+            id=intent_id,
+            client_secret=f'{intent_id}_secret_bench',
+            amount=amount,
+            currency=currency,
+            status='requires_payment_method',
+        )
+
+    def __enter__(self):
+        import stripe
+
+        self._patch = mock.patch.object(stripe.PaymentIntent, 'create', self.create_payment_intent)
+        self._patch.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._patch.stop()
+
+
+class StepTimings:
+    """
+    Latency and query samples for one journey step
+    """
+
+    def __init__(self):
+        self.durations = []
+        self.queries = []
+        self.errors = 0
+
+    def add(self, duration_ms, query_count, ok):
+        self.durations.append(duration_ms)
+        self.queries.append(query_count)
+        if not ok:
+            self.errors += 1
+
+    def summary(self):
+        durations = sorted(self.durations)
+        count = len(durations)
+        return {
+            'requests': count,
+            'errors': self.errors,
+            'p50_ms': round(percentile(durations, 50), 2),
+            'p95_ms': round(percentile(durations, 95), 2),
+            'p99_ms': round(percentile(durations, 99), 2),
+            'mean_ms': round(sum(durations) / count, 2) if count else 0,
+            'max_ms': round(durations[-1], 2) if count else 0,
+            'queries_mean': round(sum(self.queries) / count, 1) if count else 0,
+            'queries_max': max(self.queries, default=0),
+        }
+
+
+def _scenario_inputs(rng):
+    """
+    Hot products, list filters and the benchmark shopper for the journey
+    """
+    from apps.store.models import Brand, CarModel, Category, Product
+    from apps.users.models import User
+
+    # The newest in-stock products: what the list pages show first
+    products = list(
+        Product.objects.filter(
+            is_active=True, stock_status='in_stock'
+        ).order_by('-created_at').values_list('id', 'slug')[:500]
+    )
+    if not products:
+        raise ValueError('The benchmark database has no in-stock products; seed it first')
+
+    filters = [{}, {'sort': 'price_asc'}, {'on_sale': 'true'}, {'rating': '3'}, {'search': 'SKU-00'}]
+    filters += [{'category': slug} for slug in Category.objects.filter(is_active=True).values_list('slug', flat=True)[:5]]
+    filters += [{'brand': slug} for slug in Brand.objects.filter(is_active=True).values_list('slug', flat=True)[:5]]
+    filters += [{'car_model': slug} for slug in CarModel.objects.filter(is_active=True).values_list('slug', flat=True)[:5]]
+    filters += [{'page': str(page)} for page in (2, 5)]
+    rng.shuffle(filters)
+
+    shopper, _ = User.objects.get_or_create(
+        username=BENCHMARK_USERNAME,
+        defaults={'email': f'{BENCHMARK_USERNAME}@example.com'},
+    )
+    return products, filters, shopper
+
+
+def _request(client, timings, step, method, url, data=None, expect=(200,), **extra):
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = getattr(client, method)(url, data, **extra)
+        elapsed = (time.perf_counter() - started) * 1000
+    timings[step].add(elapsed, len(queries), response.status_code in expect)
+    return response
+
+
+def _journey(client, timings, shopper, product, filters):
+    from apps.orders.models import CartItem
+
+    product_id, slug = product
+    _request(client, timings, 'home', 'get', reverse('store:home'))
+    _request(client, timings, 'product_list', 'get', reverse('store:product_list'), filters)
+    _request(client, timings, 'product_detail', 'get', reverse('store:product_detail', args=[slug]))
+    _request(
+        client, timings, 'add_to_cart', 'post',
+        reverse('orders:add_to_cart', args=[product_id]), HTTP_HX_REQUEST='true',
+    )
+
+    item_id = CartItem.objects.filter(
+        cart__user=shopper, product_id=product_id
+    ).values_list('id', flat=True).first()
+    if item_id is not None:
+        _request(
+            client, timings, 'update_cart_item', 'post',
+            reverse('orders:update_cart_item', args=[item_id]), {'action': 'increase'},
+            HTTP_HX_REQUEST='true',
+        )
+
+    _request(client, timings, 'checkout', 'get', reverse('orders:checkout'))
+    response = _request(
+        client, timings, 'checkout_submit', 'post', reverse('orders:checkout'), CHECKOUT_FORM,
+        expect=(302,),
+    )
+    if response.status_code == 302 and '/payments/' in response.url:
+        _request(client, timings, 'payment_page', 'get', response.url)
+
+
+def run_scenario(iterations=100, warmup=5, seed=2024):
+    """
+    Run the shopper journey ``iterations`` times and return the results dict
+
+    ``warmup`` journeys run first and are not measured. Orders, addresses
+    and cart rows created by the run are deleted afterwards so the dataset
+    stays comparable between runs. Must be called inside
+    ``benchmark_database()``; requests go through the full middleware stack
+    in-process, single-threaded, like one PythonAnywhere web worker.
+    """
+    from django.test import Client
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    from apps.orders.models import Cart, Order
+    from apps.store.models import Product
+    from apps.users.models import Address
+
+    rng = random.Random(seed)
+    products, filters, shopper = _scenario_inputs(rng)
+    started_at = timezone.now()
+
+    # Allows the 'testserver' host and keeps outgoing email in memory
+    setup_test_environment()
+    try:
+        with StripeStub():
+            client = Client()
+            client.force_login(shopper)
+
+            for _ in range(warmup):
+                _journey(client, defaultdict(StepTimings), shopper, rng.choice(products), rng.choice(filters))
+
+            timings = defaultdict(StepTimings)
+            started = time.perf_counter()
+            for iteration in range(iterations):
+                _journey(client, timings, shopper, rng.choice(products), filters[iteration % len(filters)])
+            wall = time.perf_counter() - started
+    finally:
+        teardown_test_environment()
+        Order.objects.filter(user=shopper, created_at__gte=started_at).delete()
+        Address.objects.filter(user=shopper, created_at__gte=started_at).delete()
+        Cart.objects.filter(user=shopper).delete()
+
+    requests = sum(len(step.durations) for step in timings.values())
+    errors = sum(step.errors for step in timings.values())
+    return {
+        'commit': _git_commit(),
+        'created_at': timezone.now().isoformat(),
+        'dataset': {'products': Product.objects.count()},
+        'iterations': iterations,
+        'warmup': warmup,
+        'duration_s': round(wall, 3),
+        'requests': requests,
+        'errors': errors,
+        'throughput_rps': round(requests / wall, 2) if wall else 0,
+        'journeys_per_s': round(iterations / wall, 2) if wall else 0,
+        'steps': {step: timings[step].summary() for step in SCENARIO_STEPS if step in timings},
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def save_results(results, path=None):
+    """
+    Write ``results`` as JSON (default: perf-results/<timestamp>-<commit>.json)
+    and return the path
+    """
+    if path is None:
+        stamp = timezone.now().strftime('%Y%m%d-%H%M%S')
+        suffix = f"-{results['commit']}" if results.get('commit') else ''
+        path = DEFAULT_RESULTS_DIR / f'{stamp}{suffix}.json'
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+    return path
+
+
+def compare_results(baseline, current):
+    """
+    Per-step p95 and query deltas between two results dicts, as rows
+    """
+    rows = []
+    for step, now in current['steps'].items():
+        before = baseline.get('steps', {}).get(step)
+        if before is None:
+            continue
+        change = (now['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0
+        rows.append({
+            'step': step,
+            'p95_before': before['p95_ms'],
+            'p95_after': now['p95_ms'],
+            'p95_change_pct': round(change, 1),
+            'queries_before': before['queries_mean'],
+            'queries_after': now['queries_mean'],
+        })
+    return rows
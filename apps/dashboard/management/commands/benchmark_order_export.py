@@ -0,0 +1,131 @@
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.dashboard.exports import EXPORT_CHUNK_SIZE, stream_orders_csv
+
+
+class Command(BaseCommand):
+    """
+    قياس أداء تصدير الطلبات
+    Seed a throwaway test database with N orders and measure CSV export throughput
+    """
+    help = 'Benchmark the streaming order CSV export on a freshly seeded test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=100_000, help='Number of orders to seed')
+        parser.add_argument('--items-per-order', type=int, default=2, help='Order items per order')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help='iterator() chunk size')
+        parser.add_argument(
+            '--trace-memory',
+            action='store_true',
+            help='Also run a tracemalloc pass to report peak Python memory (slower)',
+        )
+
+    def handle(self, *args, **options):
+        # Never touch the real database: run against a disposable test DB
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            started = time.perf_counter()
+            self._seed(options['orders'], options['items_per_order'])
+            self.stdout.write(
+                f"Seeded {options['orders']:,} orders in {time.perf_counter() - started:.1f}s"
+            )
+
+            self._run(options['chunk_size'], trace_memory=False)
+            if options['trace_memory']:
+                self._run(options['chunk_size'], trace_memory=True)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _seed(self, order_count, items_per_order, batch_size=5000):
+        from apps.orders.models import Order, OrderItem
+        from apps.payments.models import Payment
+        from apps.store.models import Brand, Category, Product
+        from apps.users.models import Address, User
+
+        category = Category.objects.create(name='Benchmark')
+        brand = Brand.objects.create(name='Benchmark')
+        products = Product.objects.bulk_create([
+            Product(
+                name=f'Part {i}', slug=f'part-{i}', sku=f'BENCH-{i:05d}', description='-',
+                category=category, brand=brand, price=Decimal('25.00'), main_image='products/x.jpg',
+            )
+            for i in range(100)
+        ])
+        users = User.objects.bulk_create([
+            User(username=f'bench{i}', email=f'bench{i}@example.com', first_name='Bench', last_name=str(i))
+            for i in range(1000)
+        ])
+        addresses = Address.objects.bulk_create([
+            Address(user=user, label='طلب', full_name=user.username, phone_number='0500000000',
+                    street='Street', city='Riyadh')
+            for user in users
+        ])
+
+        statuses = ['pending', 'confirmed', 'processing', 'shipped', 'delivered', 'cancelled']
+        for start in range(0, order_count, batch_size):
+            stop = min(start + batch_size, order_count)
+            orders = Order.objects.bulk_create([
+                Order(
+                    user=users[i % len(users)],
+                    address=addresses[i % len(addresses)],
+                    order_number=f'BENCH-{i:08d}',
+                    total_price=Decimal('25.000') * items_per_order,
+                    status=statuses[i % len(statuses)],
+                    payment_status='paid' if i % 3 else 'pending',
+                )
+                for i in range(start, stop)
+            ])
+            OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=order,
+                    product=products[(order.pk + n) % len(products)],
+                    product_name='Part',
+                    product_sku=products[(order.pk + n) % len(products)].sku,
+                    quantity=1,
+                    price=Decimal('25.000'),
+                )
+                for order in orders
+                for n in range(items_per_order)
+            ])
+            Payment.objects.bulk_create([
+                Payment(
+                    order=order,
+                    stripe_payment_intent_id=f'pi_bench_{order.pk}',
+                    amount=order.total_price,
+                    status='succeeded',
+                )
+                for order in orders
+            ])
+
+    def _run(self, chunk_size, trace_memory):
+        from apps.orders.models import Order
+
+        if trace_memory:
+            tracemalloc.start()
+
+        rows = 0
+        size = 0
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            for line in stream_orders_csv(Order.objects.all(), chunk_size=chunk_size):
+                rows += 1
+                size += len(line.encode('utf-8'))
+        elapsed = time.perf_counter() - started
+
+        label = 'tracemalloc pass' if trace_memory else 'throughput pass'
+        self.stdout.write(self.style.SUCCESS(
+            f'[{label}] {rows - 2:,} rows, {size / 1_048_576:.1f} MiB in {elapsed:.2f}s '
+            f'({(rows - 2) / elapsed:,.0f} rows/s), {len(queries)} queries'
+        ))
+
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.stdout.write(f'Peak traced Python memory: {peak / 1_048_576:.1f} MiB')
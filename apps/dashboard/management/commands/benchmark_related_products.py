@@ -0,0 +1,62 @@
+import time
+import tracemalloc
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from apps.store.recommendations import CO_PURCHASE_CANDIDATES, MAX_CHUNK_PAIRS, CoPurchaseMatrix
+
+
+class Command(BaseCommand):
+    """
+    قياس أداء حساب المنتجات المشتراة معاً
+    Measure the vectorised co-purchase computation on synthetic order lines
+    """
+    help = 'Benchmark the co-occurrence / cosine top-K job on N synthetic order lines (no database)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=1_000_000, help='Order lines to generate')
+        parser.add_argument('--products', type=int, default=100_000, help='Catalogue size')
+        parser.add_argument('--max-lines-per-order', type=int, default=6)
+        parser.add_argument(
+            '--max-pairs',
+            type=int,
+            action='append',
+            help=f'Chunk budget(s) to compare (default: {MAX_CHUNK_PAIRS:,})',
+        )
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        order_ids, product_ids = self._generate(
+            options['lines'], options['products'], options['max_lines_per_order'], options['seed']
+        )
+        self.stdout.write(
+            f'{len(order_ids):,} lines, {order_ids[-1] + 1:,} orders, '
+            f'{len(np.unique(product_ids)):,} distinct products bought'
+        )
+
+        for max_pairs in options['max_pairs'] or [MAX_CHUNK_PAIRS]:
+            tracemalloc.start()
+            started = time.perf_counter()
+            matrix = CoPurchaseMatrix(order_ids, product_ids)
+            built = time.perf_counter()
+            neighbours = matrix.top_neighbours(CO_PURCHASE_CANDIDATES, max_pairs=max_pairs)
+            finished = time.perf_counter()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            chunks = sum(1 for _ in matrix.chunks(max_pairs))
+            self.stdout.write(self.style.SUCCESS(
+                f'[max pairs {max_pairs:,}] matrix {built - started:.2f}s, top-{CO_PURCHASE_CANDIDATES} '
+                f'{finished - built:.2f}s in {chunks:,} chunks, {len(neighbours.others):,} neighbours kept, '
+                f'peak traced memory {peak / 1_048_576:.0f} MiB'
+            ))
+
+    def _generate(self, lines, products, max_lines_per_order, seed):
+        # Orders of 1..N lines; product popularity is Zipf-like, as in a real catalogue
+        rng = np.random.default_rng(seed)
+        sizes = rng.integers(1, max_lines_per_order + 1, lines)
+        sizes = sizes[:np.searchsorted(np.cumsum(sizes), lines) + 1]
+        order_ids = np.repeat(np.arange(len(sizes)), sizes)[:lines]
+        product_ids = (rng.zipf(1.2, len(order_ids)) - 1) % products + 1
+        return order_ids, product_ids
@@ -0,0 +1,115 @@
+import random
+import re
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from apps.dashboard.loadtest import benchmark_database
+from apps.dashboard.testing import seed_catalog
+
+WRITE_SQL = re.compile(r'^\s*(?:INSERT INTO|UPDATE|DELETE FROM)\s+"?(\w+)"?', re.IGNORECASE)
+
+# The Django default this project used before the hybrid session layer
+DB_SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+
+
+class Command(BaseCommand):
+    """
+    قياس كتابات الجلسات للزوار
+    Count database writes per 1,000 anonymous page views for each session engine
+    """
+    help = 'Replay anonymous browsing against a scratch database and count INSERT/UPDATE/DELETE per engine'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--views', type=int, default=1000, help='Anonymous page views per engine')
+        parser.add_argument('--pages-per-visitor', type=int, default=5, help='Page views per simulated visitor')
+        parser.add_argument(
+            '--cart-rate',
+            type=float,
+            default=0.1,
+            help='Fraction of visitors who add a product to the cart (one of their views)',
+        )
+        parser.add_argument(
+            '--engine',
+            action='append',
+            dest='engines',
+            help=f'Session engine to measure (repeatable; default: {DB_SESSION_ENGINE} and SESSION_ENGINE)',
+        )
+        parser.add_argument('--products', type=int, default=500, help='Products seeded in the scratch database')
+        parser.add_argument('--seed', type=int, default=2024)
+
+    def handle(self, *args, **options):
+        engines = options['engines'] or list(dict.fromkeys([DB_SESSION_ENGINE, settings.SESSION_ENGINE]))
+
+        results = {}
+        with tempfile.TemporaryDirectory() as scratch:
+            for index, engine in enumerate(engines):
+                with benchmark_database(Path(scratch) / f'sessions-{index}.sqlite3'):
+                    seed_catalog(products=options['products'], users=10, orders=20)
+                    results[engine] = self._run(engine, options)
+                self._report(engine, results[engine], options['views'])
+
+        if len(results) > 1:
+            baseline, *others = engines
+            for engine in others:
+                before, after = results[baseline]['total'], results[engine]['total']
+                self.stdout.write(self.style.SUCCESS(
+                    f'{engine}: {self._per_thousand(after, options["views"]):.0f} writes per 1,000 views '
+                    f'vs {self._per_thousand(before, options["views"]):.0f} with {baseline}'
+                ))
+
+    def _per_thousand(self, writes, views):
+        return writes * 1000 / views if views else 0
+
+    def _run(self, engine, options):
+        from django.test import Client
+        from django.test.utils import setup_test_environment, teardown_test_environment
+
+        from apps.store.models import Product
+
+        rng = random.Random(options['seed'])
+        products = list(
+            Product.objects.filter(is_active=True, stock_status='in_stock').values_list('id', 'slug')[:200]
+        )
+        pages = [reverse('store:home'), reverse('store:product_list'), f"{reverse('store:product_list')}?page=2"]
+
+        tables = Counter()
+        views = 0
+        setup_test_environment()
+        try:
+            with override_settings(SESSION_ENGINE=engine, PERF_METRICS_ENABLED=False):
+                while views < options['views']:
+                    client = Client()
+                    buys = rng.random() < options['cart_rate']
+                    for page in range(min(options['pages_per_visitor'], options['views'] - views)):
+                        product_id, slug = rng.choice(products)
+                        with CaptureQueriesContext(connection) as queries:
+                            if buys and page == 2:
+                                client.post(reverse('orders:add_to_cart', args=[product_id]), HTTP_HX_REQUEST='true')
+                            elif page % 2:
+                                client.get(reverse('store:product_detail', args=[slug]))
+                            else:
+                                client.get(rng.choice(pages))
+                        views += 1
+                        for query in queries.captured_queries:
+                            match = WRITE_SQL.match(query['sql'])
+                            if match:
+                                tables[match.group(1)] += 1
+                        reset_queries()
+        finally:
+            teardown_test_environment()
+
+        return {'total': sum(tables.values()), 'tables': tables}
+
+    def _report(self, engine, result, views):
+        breakdown = ', '.join(f'{table} {count}' for table, count in result['tables'].most_common()) or 'none'
+        self.stdout.write(
+            f"[{engine}] {result['total']:,} writes in {views:,} views "
+            f"({self._per_thousand(result['total'], views):.0f} per 1,000): {breakdown}"
+        )
@@ -0,0 +1,158 @@
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, transaction
+from django.db.models import F
+
+from apps.dashboard.loadtest import benchmark_database
+from apps.dashboard.perf import percentile
+from apps.dashboard.testing import seed_catalog
+
+# SQLite defaults before the tuning layer: rollback journal, 5 s timeout,
+# deferred transactions
+UNTUNED_OPTIONS = {
+    'init_command': 'PRAGMA journal_mode=DELETE;PRAGMA synchronous=FULL',
+    'timeout': 5,
+}
+
+
+class Command(BaseCommand):
+    """
+    قياس التزامن في SQLite
+    Compare mixed read/write throughput on SQLite with and without the tuning layer
+    """
+    help = 'Run concurrent readers and writers against scratch SQLite files, untuned vs tuned'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds per run')
+        parser.add_argument('--readers', type=int, default=4, help='Reader threads (product list queries)')
+        parser.add_argument('--writers', type=int, default=2, help='Writer threads (cart and session writes)')
+        parser.add_argument('--products', type=int, default=2000, help='Products seeded per scratch database')
+
+    def handle(self, *args, **options):
+        configured = settings.DATABASES['default']
+        tuned_options = dict(configured.get('OPTIONS', {}))
+        # Deployed files are switched to WAL once by optimize_sqlite
+        tuned_options['init_command'] = ';'.join(filter(None, [
+            f'PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}', tuned_options.get('init_command'),
+        ]))
+        runs = [('untuned', UNTUNED_OPTIONS), ('tuned', tuned_options)]
+
+        results = {}
+        old_options = configured.get('OPTIONS')
+        with tempfile.TemporaryDirectory() as scratch:
+            try:
+                for label, db_options in runs:
+                    configured['OPTIONS'] = dict(db_options)
+                    with benchmark_database(Path(scratch) / f'{label}.sqlite3'):
+                        seed_catalog(products=options['products'], users=50, orders=200)
+                        results[label] = self._run(options)
+                    self._report(label, results[label])
+            finally:
+                configured['OPTIONS'] = old_options
+
+        untuned, tuned = results['untuned'], results['tuned']
+        self.stdout.write(self.style.SUCCESS(
+            f"\nTuned vs untuned: reads x{self._ratio(tuned['reads'], untuned['reads'])}, "
+            f"writes x{self._ratio(tuned['writes'], untuned['writes'])}, "
+            f"lock errors {untuned['errors']} -> {tuned['errors']}"
+        ))
+
+    def _ratio(self, new, old):
+        return f'{new / old:.2f}' if old else 'inf'
+
+    def _run(self, options):
+        from apps.orders.models import Cart, CartItem
+        from apps.store.models import Category, Product
+
+        category_ids = list(Category.objects.values_list('id', flat=True))
+        product_ids = list(Product.objects.values_list('id', flat=True)[:500])
+        carts = [Cart.objects.create(session_id=f'bench-{n}') for n in range(options['writers'])]
+        connection.close()
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        totals = {'reads': 0, 'writes': 0, 'errors': 0, 'read_ms': [], 'write_ms': []}
+
+        def record(kind, elapsed_ms):
+            with lock:
+                totals[f'{kind}s'] += 1
+                totals[f'{kind}_ms'].append(elapsed_ms)
+
+        def reader(seed):
+            rng = random.Random(seed)
+            try:
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    try:
+                        products = Product.objects.filter(
+                            is_active=True, category_id=rng.choice(category_ids)
+                        ).with_review_stats().order_by('-created_at')
+                        list(products[:20])
+                        products.count()
+                    except OperationalError as exc:
+                        if 'locked' not in str(exc):
+                            raise
+                        with lock:
+                            totals['errors'] += 1
+                        continue
+                    record('read', (time.perf_counter() - started) * 1000)
+            finally:
+                connection.close()
+
+        def writer(seed, cart):
+            from django.contrib.sessions.backends.db import SessionStore
+
+            rng = random.Random(seed)
+            try:
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    try:
+                        with transaction.atomic():
+                            item, created = CartItem.objects.get_or_create(
+                                cart=cart, product_id=rng.choice(product_ids)
+                            )
+                            if not created:
+                                CartItem.objects.filter(pk=item.pk).update(quantity=F('quantity') + 1)
+                        session = SessionStore()
+                        session['cart_id'] = cart.pk
+                        session.save()
+                    except OperationalError as exc:
+                        if 'locked' not in str(exc):
+                            raise
+                        with lock:
+                            totals['errors'] += 1
+                        continue
+                    record('write', (time.perf_counter() - started) * 1000)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=reader, args=(n,)) for n in range(options['readers'])]
+        threads += [threading.Thread(target=writer, args=(100 + n, cart)) for n, cart in enumerate(carts)]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['duration'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        duration = options['duration']
+        return {
+            'reads': totals['reads'] / duration,
+            'writes': totals['writes'] / duration,
+            'errors': totals['errors'],
+            'read_p95': percentile(sorted(totals['read_ms']), 95),
+            'write_p95': percentile(sorted(totals['write_ms']), 95),
+        }
+
+    def _report(self, label, result):
+        self.stdout.write(
+            f"[{label}] {result['reads']:,.0f} reads/s (p95 {result['read_p95']:.1f} ms), "
+            f"{result['writes']:,.0f} writes/s (p95 {result['write_p95']:.1f} ms), "
+            f"{result['errors']} 'database is locked' errors"
+        )
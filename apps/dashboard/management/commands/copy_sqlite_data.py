@@ -0,0 +1,158 @@
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers import sort_dependencies
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+SOURCE_ALIAS = 'sqlite_source'
+
+# Rows created by ``migrate`` itself; replaced by the source's rows so
+# primary keys (and every foreign key pointing at them) match
+MIGRATE_SEEDED_MODELS = {'contenttypes.contenttype', 'auth.permission', 'sites.site'}
+
+
+@contextmanager
+def keep_timestamps(model):
+    """
+    Disable auto_now / auto_now_add while copying so timestamps are preserved
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    """
+    نقل البيانات من SQLite إلى قاعدة البيانات الحالية
+    Copy every table from a SQLite file into the configured (e.g. PostgreSQL) database in batches
+    """
+    help = 'Copy all rows from a SQLite file into a freshly migrated target database, preserving primary keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            default=str(Path(settings.BASE_DIR) / 'db.sqlite3'),
+            help='SQLite file to read (opened read-only)',
+        )
+        parser.add_argument('--target', default=DEFAULT_DB_ALIAS, help='Database alias to write to')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per read and per INSERT')
+
+    def handle(self, *args, **options):
+        source_path = Path(options['source']).resolve()
+        if not source_path.exists():
+            raise CommandError(f'{source_path} not found')
+        target = options['target']
+        if target not in settings.DATABASES:
+            raise CommandError(f'Unknown database alias: {target}')
+
+        # configure_settings fills in the defaults (and insists on 'default')
+        connections.settings[SOURCE_ALIAS] = connections.configure_settings({
+            DEFAULT_DB_ALIAS: settings.DATABASES[DEFAULT_DB_ALIAS],
+            SOURCE_ALIAS: {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': f'file:{source_path}?mode=ro',
+                'OPTIONS': {'uri': True},
+            }
+        })[SOURCE_ALIAS]
+
+        try:
+            models = self._models_in_order()
+            started = time.perf_counter()
+            # One transaction: foreign keys are checked (deferred) at commit,
+            # so table order does not matter and a failure leaves nothing behind
+            with transaction.atomic(using=target):
+                self._check_target(models, target)
+                for model in models:
+                    self._copy_model(model, target, options['batch_size'])
+                self._reset_sequences(models, target)
+        finally:
+            connections[SOURCE_ALIAS].close()
+            del connections.settings[SOURCE_ALIAS]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Copied {len(models)} tables in {time.perf_counter() - started:.1f}s'
+        ))
+
+    def _models_in_order(self):
+        """
+        Concrete models (natural-key dependencies first), then auto-created M2M tables
+        """
+        app_list = [(app_config, None) for app_config in apps.get_app_configs()]
+        models = [
+            model for model in sort_dependencies(app_list, allow_cycles=True)
+            if model._meta.managed and not model._meta.proxy
+        ]
+        through = [
+            field.remote_field.through
+            for model in models
+            for field in model._meta.local_many_to_many
+            if field.remote_field.through._meta.auto_created
+        ]
+        return models + through
+
+    def _check_target(self, models, target):
+        source_tables = set(connections[SOURCE_ALIAS].introspection.table_names())
+        missing = [model._meta.db_table for model in models if model._meta.db_table not in source_tables]
+        if missing:
+            raise CommandError(
+                f"The source is missing tables {', '.join(missing[:5])}...; "
+                'run migrate on the SQLite file first'
+            )
+
+        for model in reversed(models):
+            if not model._base_manager.using(target).exists():
+                continue
+            if model._meta.label_lower not in MIGRATE_SEEDED_MODELS:
+                raise CommandError(
+                    f'{model._meta.label} already has rows in {target}; '
+                    'copy into a freshly migrated, empty database'
+                )
+            model._base_manager.using(target).all().delete()
+
+    def _copy_model(self, model, target, batch_size):
+        source_rows = model._base_manager.using(SOURCE_ALIAS).order_by('pk')
+        total = 0
+        started = time.perf_counter()
+        batch = []
+        with keep_timestamps(model):
+            for row in source_rows.iterator(chunk_size=batch_size):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    model._base_manager.using(target).bulk_create(batch, batch_size=batch_size)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                model._base_manager.using(target).bulk_create(batch, batch_size=batch_size)
+                total += len(batch)
+
+        copied = model._base_manager.using(target).count()
+        if copied != total:
+            raise CommandError(f'{model._meta.label}: read {total} rows but {copied} are in {target}')
+        self.stdout.write(
+            f'  {model._meta.label:<45} {total:>10,} rows  {time.perf_counter() - started:6.1f}s'
+        )
+
+    def _reset_sequences(self, models, target):
+        """
+        Move PostgreSQL sequences past the copied primary keys (no-op on SQLite)
+        """
+        connection = connections[target]
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
@@ -0,0 +1,90 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+# PRAGMA auto_vacuum value for INCREMENTAL
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class Command(BaseCommand):
+    """
+    صيانة قاعدة بيانات SQLite
+    Periodic SQLite maintenance: WAL journal, PRAGMA optimize, incremental
+    vacuum and WAL checkpoint
+    """
+    help = (
+        'Switch the file to the WAL journal, refresh query planner statistics, '
+        'reclaim free pages and truncate the WAL (SQLite only)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--vacuum-pages',
+            type=int,
+            default=2000,
+            help='Free pages to release per run with incremental vacuum (0 = all)',
+        )
+        parser.add_argument(
+            '--enable-incremental-vacuum',
+            action='store_true',
+            help='Switch the file to auto_vacuum=INCREMENTAL (runs a full VACUUM once; do it off-peak)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError(f'optimize_sqlite only applies to SQLite (database is {connection.vendor})')
+
+        with connection.cursor() as cursor:
+            before = self._stats(cursor)
+            self.stdout.write(
+                f"{before['size_mb']:.1f} MiB, {before['freelist']:,} free pages, "
+                f"journal_mode={before['journal_mode']}, auto_vacuum={before['auto_vacuum']}"
+            )
+
+            journal_mode = settings.SQLITE_JOURNAL_MODE.lower()
+            if before['journal_mode'] != journal_mode:
+                # Stored in the file: every later connection uses it
+                cursor.execute(f'PRAGMA journal_mode={journal_mode}')
+                self.stdout.write(f'Switched the journal to {journal_mode}')
+
+            if options['enable_incremental_vacuum'] and before['auto_vacuum'] != AUTO_VACUUM_INCREMENTAL:
+                # auto_vacuum only changes on a freshly rebuilt file
+                cursor.execute('PRAGMA auto_vacuum=INCREMENTAL')
+                cursor.execute('VACUUM')
+                self.stdout.write('Rebuilt the file with auto_vacuum=INCREMENTAL')
+            elif self._pragma(cursor, 'auto_vacuum') == AUTO_VACUUM_INCREMENTAL:
+                # The sqlite3 module steps a PRAGMA once (one page); executescript
+                # runs incremental_vacuum to completion
+                connection.connection.executescript(
+                    f"PRAGMA incremental_vacuum({max(options['vacuum_pages'], 0)})"
+                )
+            elif before['freelist']:
+                self.stdout.write(self.style.WARNING(
+                    'auto_vacuum is off; run once with --enable-incremental-vacuum to reclaim free pages'
+                ))
+
+            # Bounded ANALYZE of the tables whose statistics are stale
+            cursor.execute('PRAGMA analysis_limit=400')
+            cursor.execute('PRAGMA optimize')
+            cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+            after = self._stats(cursor)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {after['size_mb']:.1f} MiB, {after['freelist']:,} free pages, "
+            f"journal_mode={after['journal_mode']} "
+            f"({before['freelist'] - after['freelist']:,} released)"
+        ))
+
+    def _pragma(self, cursor, name):
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+    def _stats(self, cursor):
+        page_size = self._pragma(cursor, 'page_size')
+        return {
+            'size_mb': self._pragma(cursor, 'page_count') * page_size / 1_048_576,
+            'freelist': self._pragma(cursor, 'freelist_count'),
+            'journal_mode': self._pragma(cursor, 'journal_mode'),
+            'auto_vacuum': self._pragma(cursor, 'auto_vacuum'),
+        }
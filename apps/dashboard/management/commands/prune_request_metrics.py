@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.dashboard.models import RequestMetric
+
+
+class Command(BaseCommand):
+    """
+    حذف قياسات الأداء القديمة
+    Delete RequestMetric rows older than the retention window
+    """
+    help = 'Delete request performance metrics older than N days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=14, help='Days of metrics to keep')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted, _ = RequestMetric.objects.filter(created_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} request metrics older than {cutoff:%Y-%m-%d}'))
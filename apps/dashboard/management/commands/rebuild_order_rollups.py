@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.dashboard.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    """
+    إعادة بناء الملخصات اليومية للطلبات
+    Backfill or rebuild OrderDailyRollup from the orders tables
+    """
+    help = 'Rebuild daily order/revenue rollups (all history, or the last N days with --days)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Only rebuild the last N days (default: rebuild everything)',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['days']:
+            since = timezone.localdate() - timedelta(days=options['days'] - 1)
+
+        rows = rebuild_rollups(since=since)
+
+        scope = f'since {since}' if since else 'for all history'
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} daily rollup rows {scope}'))
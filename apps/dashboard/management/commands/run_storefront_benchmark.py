@@ -0,0 +1,73 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.dashboard.loadtest import (
+    DEFAULT_BENCHMARK_DB,
+    benchmark_database,
+    compare_results,
+    run_scenario,
+    save_results,
+)
+
+
+class Command(BaseCommand):
+    """
+    قياس أداء رحلة التسوق
+    Run the storefront shopper journey against the benchmark database and save JSON results
+    """
+    help = 'Benchmark home -> list -> detail -> cart -> checkout with Stripe stubbed out'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--db', default=str(DEFAULT_BENCHMARK_DB), help='Seeded benchmark SQLite file')
+        parser.add_argument('--iterations', type=int, default=100, help='Measured journeys')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured journeys run first')
+        parser.add_argument('--seed', type=int, default=2024, help='Random seed for product/filter choice')
+        parser.add_argument('--label', default='', help='Free-form label stored with the results')
+        parser.add_argument('--output', help='Results file (default: perf-results/<timestamp>-<commit>.json)')
+        parser.add_argument('--compare', help='Earlier results file to diff p95 latency against')
+
+    def handle(self, *args, **options):
+        from pathlib import Path
+
+        if not Path(options['db']).exists():
+            raise CommandError(f"{options['db']} not found; run seed_benchmark_catalog first")
+
+        try:
+            with benchmark_database(options['db']):
+                results = run_scenario(
+                    iterations=options['iterations'],
+                    warmup=options['warmup'],
+                    seed=options['seed'],
+                )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        results['label'] = options['label']
+
+        self.stdout.write(
+            f"{results['dataset']['products']:,} products, {results['iterations']} journeys, "
+            f"{results['requests']} requests in {results['duration_s']:.1f}s"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Throughput: {results['throughput_rps']:.1f} req/s "
+            f"({results['journeys_per_s']:.2f} journeys/s), {results['errors']} errors"
+        ))
+        self.stdout.write(f"{'step':<18}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'errors':>8}")
+        for step, row in results['steps'].items():
+            self.stdout.write(
+                f"{step:<18}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+                f"{row['queries_mean']:>9.1f}{row['errors']:>8}"
+            )
+
+        path = save_results(results, options['output'])
+        self.stdout.write(f'Results saved to {path}')
+
+        if options['compare']:
+            baseline = json.loads(Path(options['compare']).read_text(encoding='utf-8'))
+            self.stdout.write(f"\nCompared with {options['compare']} ({baseline.get('commit') or '?'}):")
+            for row in compare_results(baseline, results):
+                style = self.style.ERROR if row['p95_change_pct'] > 10 else self.style.SUCCESS
+                self.stdout.write(style(
+                    f"{row['step']:<18} p95 {row['p95_before']:.1f} -> {row['p95_after']:.1f} ms "
+                    f"({row['p95_change_pct']:+.1f}%), queries {row['queries_before']} -> {row['queries_after']}"
+                ))
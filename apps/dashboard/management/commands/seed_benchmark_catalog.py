@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.dashboard.loadtest import DEFAULT_BENCHMARK_DB, benchmark_database, parse_size
+from apps.dashboard.testing import seed_catalog
+
+
+class Command(BaseCommand):
+    """
+    تجهيز قاعدة بيانات قياس الأداء
+    Seed a dedicated SQLite benchmark database with a scaled catalogue
+    """
+    help = 'Seed the load-test database with 10k/100k/1m products (never the configured database)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', default='10k', help='Product count: 10k, 100k, 1m or a number')
+        parser.add_argument('--db', default=str(DEFAULT_BENCHMARK_DB), help='Benchmark SQLite file')
+        parser.add_argument('--users', type=int, default=500, help='Customers to create')
+        parser.add_argument('--orders', type=int, default=5000, help='Historical orders to create')
+        parser.add_argument('--fresh', action='store_true', help='Delete the benchmark file first')
+
+    def handle(self, *args, **options):
+        from pathlib import Path
+
+        try:
+            products = parse_size(options['size'])
+        except ValueError:
+            raise CommandError(f"Unknown size: {options['size']}")
+
+        path = Path(options['db'])
+        if options['fresh'] and path.exists():
+            path.unlink()
+
+        try:
+            with benchmark_database(path):
+                from apps.store.models import Product
+
+                if Product.objects.exists():
+                    raise CommandError(f'{path} is already seeded; pass --fresh to rebuild it')
+
+                started = time.perf_counter()
+                seed_catalog(
+                    products=products,
+                    users=options['users'],
+                    orders=options['orders'],
+                    progress=lambda done: self.stdout.write(f'  {done:,}/{products:,} products'),
+                )
+                self.stdout.write(self.style.SUCCESS(
+                    f'Seeded {products:,} products into {path} in {time.perf_counter() - started:.1f}s'
+                ))
+        except ValueError as exc:
+            raise CommandError(str(exc))
@@ -0,0 +1,77 @@
+"""
+Per-request query, template and cache instrumentation
+"""
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from apps.dashboard.perf import (
+    QueryBudgetExceeded,
+    record_request,
+    server_timing,
+    start_request_stats,
+    stop_request_stats,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """
+    Measure every request per resolved URL name
+
+    Keep it first in MIDDLEWARE so session/auth queries and template
+    rendering are included. Streaming response bodies are produced after
+    the middleware returns and are not measured.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'PERF_METRICS_ENABLED', True)
+        self.skipped_prefixes = tuple(
+            '/' + prefix.lstrip('/')
+            for prefix in (settings.STATIC_URL, settings.MEDIA_URL)
+            if prefix
+        )
+
+    def __call__(self, request):
+        if not self.enabled or request.path.startswith(self.skipped_prefixes):
+            return self.get_response(request)
+
+        stats, token = start_request_stats()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            stop_request_stats(token)
+        total = stats.elapsed
+
+        match = request.resolver_match
+        view_name = match.view_name if match else ''
+        budget = getattr(match.func, 'query_budget', None) if match else None
+
+        if self._show_timing(request):
+            response['Server-Timing'] = server_timing(stats, total)
+
+        record_request(view_name, request.method, response.status_code, stats, total, budget)
+
+        if budget is not None and stats.query_count > budget:
+            message = (
+                f'{view_name} issued {stats.query_count} queries '
+                f'({stats.duplicate_queries} duplicates), budget is {budget}'
+            )
+            if getattr(settings, 'PERF_ENFORCE_QUERY_BUDGETS', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
+
+    def _show_timing(self, request):
+        if getattr(settings, 'PERF_SERVER_TIMING', False) or settings.DEBUG:
+            return True
+        user = getattr(request, 'user', None)
+        return bool(user is not None and user.is_staff)
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='التاريخ')),
+                ('orders_count', models.IntegerField(default=0, verbose_name='عدد الطلبات')),
+                ('paid_orders_count', models.IntegerField(default=0, verbose_name='عدد الطلبات المدفوعة')),
+                ('revenue', models.DecimalField(decimal_places=3, default=0, max_digits=14, verbose_name='الإيرادات')),
+                ('refunds', models.DecimalField(decimal_places=3, default=0, max_digits=14, verbose_name='المبالغ المستردة')),
+                ('items_sold', models.IntegerField(default=0, verbose_name='القطع المباعة')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')),
+            ],
+            options={
+                'verbose_name': 'ملخص يومي للطلبات',
+                'verbose_name_plural': 'الملخصات اليومية للطلبات',
+                'ordering': ['-date'],
+            },
+        ),
+    ]
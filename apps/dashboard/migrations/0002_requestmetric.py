@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view_name', models.CharField(max_length=150, verbose_name='اسم العرض')),
+                ('method', models.CharField(max_length=10, verbose_name='الطريقة')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='رمز الحالة')),
+                ('duration_ms', models.FloatField(verbose_name='المدة الإجمالية (مللي ثانية)')),
+                ('query_count', models.PositiveIntegerField(verbose_name='عدد الاستعلامات')),
+                ('duplicate_queries', models.PositiveIntegerField(default=0, verbose_name='استعلامات مكررة')),
+                ('query_ms', models.FloatField(verbose_name='وقت قاعدة البيانات (مللي ثانية)')),
+                ('template_ms', models.FloatField(verbose_name='وقت القوالب (مللي ثانية)')),
+                ('cache_hits', models.PositiveIntegerField(default=0, verbose_name='إصابات الذاكرة المؤقتة')),
+                ('cache_misses', models.PositiveIntegerField(default=0, verbose_name='إخفاقات الذاكرة المؤقتة')),
+                ('query_budget', models.PositiveIntegerField(blank=True, null=True, verbose_name='حد الاستعلامات')),
+                ('created_at', models.DateTimeField(verbose_name='التاريخ')),
+            ],
+            options={
+                'verbose_name': 'قياس أداء',
+                'verbose_name_plural': 'قياسات الأداء',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_at'], name='dashboard_r_created_65c1af_idx'), models.Index(fields=['view_name', 'created_at'], name='dashboard_r_view_na_b4a8ef_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,7 @@
+from .rollup import OrderDailyRollup
+from .metrics import RequestMetric
+
+__all__ = [
+    'OrderDailyRollup',
+    'RequestMetric',
+]
@@ -0,0 +1,75 @@
+from django.db import models
+
+
+class RequestMetric(models.Model):
+    """
+    قياس أداء الطلب
+    Per-request timings recorded by RequestMetricsMiddleware
+    """
+
+    view_name = models.CharField(
+        max_length=150,
+        verbose_name='اسم العرض'
+    )
+
+    method = models.CharField(
+        max_length=10,
+        verbose_name='الطريقة'
+    )
+
+    status_code = models.PositiveSmallIntegerField(
+        verbose_name='رمز الحالة'
+    )
+
+    duration_ms = models.FloatField(
+        verbose_name='المدة الإجمالية (مللي ثانية)'
+    )
+
+    query_count = models.PositiveIntegerField(
+        verbose_name='عدد الاستعلامات'
+    )
+
+    duplicate_queries = models.PositiveIntegerField(
+        default=0,
+        verbose_name='استعلامات مكررة'
+    )
+
+    query_ms = models.FloatField(
+        verbose_name='وقت قاعدة البيانات (مللي ثانية)'
+    )
+
+    template_ms = models.FloatField(
+        verbose_name='وقت القوالب (مللي ثانية)'
+    )
+
+    cache_hits = models.PositiveIntegerField(
+        default=0,
+        verbose_name='إصابات الذاكرة المؤقتة'
+    )
+
+    cache_misses = models.PositiveIntegerField(
+        default=0,
+        verbose_name='إخفاقات الذاكرة المؤقتة'
+    )
+
+    query_budget = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='حد الاستعلامات'
+    )
+
+    created_at = models.DateTimeField(
+        verbose_name='التاريخ'
+    )
+
+    class Meta:
+        verbose_name = 'قياس أداء'
+        verbose_name_plural = 'قياسات الأداء'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['view_name', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.view_name} {self.duration_ms:.0f}ms / {self.query_count}q"
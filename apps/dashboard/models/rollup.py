@@ -0,0 +1,59 @@
+from django.db import models
+
+
+class OrderDailyRollup(models.Model):
+    """
+    ملخص يومي للطلبات والإيرادات
+    Pre-aggregated daily order and revenue totals for the staff dashboard.
+
+    One row per calendar day (store timezone) of ``Order.created_at``.
+    Rows are maintained incrementally by ``apps.dashboard.signals`` and can
+    be rebuilt from scratch with ``manage.py rebuild_order_rollups``.
+    """
+
+    date = models.DateField(
+        unique=True,
+        verbose_name='التاريخ'
+    )
+
+    orders_count = models.IntegerField(
+        default=0,
+        verbose_name='عدد الطلبات'
+    )
+
+    paid_orders_count = models.IntegerField(
+        default=0,
+        verbose_name='عدد الطلبات المدفوعة'
+    )
+
+    revenue = models.DecimalField(
+        max_digits=14,
+        decimal_places=3,
+        default=0,
+        verbose_name='الإيرادات'
+    )
+
+    refunds = models.DecimalField(
+        max_digits=14,
+        decimal_places=3,
+        default=0,
+        verbose_name='المبالغ المستردة'
+    )
+
+    items_sold = models.IntegerField(
+        default=0,
+        verbose_name='القطع المباعة'
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='تاريخ التحديث'
+    )
+
+    class Meta:
+        verbose_name = 'ملخص يومي للطلبات'
+        verbose_name_plural = 'الملخصات اليومية للطلبات'
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.date}: {self.orders_count} orders, {self.revenue} SAR"
@@ -0,0 +1,286 @@
+"""
+Request instrumentation
+
+RequestStats collects query count/time, template render time and cache
+hits for the request being served (tracked in a context variable, so
+threads and async tasks never mix their numbers). The template and cache
+backends below report into it; RequestMetricsMiddleware creates it, emits
+the Server-Timing header, checks query budgets and hands the result to
+record_request(), which buffers rows and bulk-inserts them into
+RequestMetric.
+"""
+import contextvars
+import logging
+import math
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import DatabaseError
+from django.template.backends.django import DjangoTemplates, Template
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_current_stats = contextvars.ContextVar('request_stats', default=None)
+_MISSING = object()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view issued more SQL queries than its declared budget"""
+
+
+def query_budget(max_queries):
+    """
+    Declare the maximum number of SQL queries a view may issue per request
+
+    The whole request is counted (session and user lookups included). Over
+    budget requests are logged, and raise QueryBudgetExceeded when
+    PERF_ENFORCE_QUERY_BUDGETS is on (always during ``manage.py test``).
+    """
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+class RequestStats:
+    """
+    Counters for one request; also usable as a connection.execute_wrapper
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.query_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_time += time.perf_counter() - started
+            self.query_count += 1
+            self._statements[sql] += 1
+
+    @property
+    def duplicate_queries(self):
+        """Queries whose SQL (placeholders, not values) already ran - usually an N+1"""
+        return sum(count - 1 for count in self._statements.values() if count > 1)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def current_stats():
+    """RequestStats of the request being served, or None outside a request"""
+    return _current_stats.get()
+
+
+def start_request_stats():
+    """Begin collecting; returns (stats, token) for stop_request_stats()"""
+    stats = RequestStats()
+    return stats, _current_stats.set(stats)
+
+
+def stop_request_stats(token):
+    _current_stats.reset(token)
+
+
+class InstrumentedTemplate(Template):
+    """Django template that adds its render time to the current request"""
+
+    def render(self, context=None, request=None):
+        stats = _current_stats.get()
+        if stats is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_time += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """
+    DjangoTemplates backend returning InstrumentedTemplate objects
+
+    Only top-level renders are timed; includes and inheritance run inside
+    them, so nothing is counted twice.
+    """
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return InstrumentedTemplate(super().get_template(template_name).template, self)
+
+
+class InstrumentedCacheMixin:
+    """Count cache hits and misses against the current request"""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version=version)
+        stats = _current_stats.get()
+        if value is _MISSING:
+            if stats is not None:
+                stats.cache_misses += 1
+            return default
+        if stats is not None:
+            stats.cache_hits += 1
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version=version)
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.cache_hits += len(found)
+            stats.cache_misses += len(keys) - len(found)
+        return found
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
+
+
+class InstrumentedRedisCache(InstrumentedCacheMixin, RedisCache):
+    pass
+
+
+class InstrumentedDatabaseCache(InstrumentedCacheMixin, DatabaseCache):
+    pass
+
+
+def server_timing(stats, total):
+    """Server-Timing header value (durations in milliseconds)"""
+    return ', '.join([
+        f'db;dur={stats.query_time * 1000:.1f};desc="{stats.query_count} queries"',
+        f'tpl;dur={stats.template_time * 1000:.1f};desc="templates"',
+        f'cache;desc="{stats.cache_hits} hits, {stats.cache_misses} misses"',
+        f'total;dur={total * 1000:.1f}',
+    ])
+
+
+# Buffered persistence: rows are kept in memory and written in batches so
+# recording never costs a write per request
+_buffer = []
+_buffer_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def record_request(view_name, method, status_code, stats, total, budget=None):
+    """Queue one RequestMetric row (subject to PERF_METRICS_SAMPLE_RATE)"""
+    from apps.dashboard.models import RequestMetric
+
+    if random.random() >= getattr(settings, 'PERF_METRICS_SAMPLE_RATE', 1.0):
+        return
+
+    metric = RequestMetric(
+        view_name=view_name[:150],
+        method=method[:10],
+        status_code=status_code,
+        duration_ms=total * 1000,
+        query_count=stats.query_count,
+        duplicate_queries=stats.duplicate_queries,
+        query_ms=stats.query_time * 1000,
+        template_ms=stats.template_time * 1000,
+        cache_hits=stats.cache_hits,
+        cache_misses=stats.cache_misses,
+        query_budget=budget,
+        created_at=timezone.now(),
+    )
+    with _buffer_lock:
+        _buffer.append(metric)
+        due = (
+            len(_buffer) >= getattr(settings, 'PERF_METRICS_FLUSH_SIZE', 50)
+            or time.monotonic() - _last_flush >= getattr(settings, 'PERF_METRICS_FLUSH_SECONDS', 30)
+        )
+    if due:
+        flush_metrics()
+
+
+def flush_metrics():
+    """Write buffered rows; returns how many were written"""
+    from apps.dashboard.models import RequestMetric
+
+    global _buffer, _last_flush
+    with _buffer_lock:
+        pending, _buffer = _buffer, []
+        _last_flush = time.monotonic()
+    if not pending:
+        return 0
+    try:
+        RequestMetric.objects.bulk_create(pending, batch_size=500)
+    except DatabaseError as e:
+        logger.warning(f'Dropped {len(pending)} request metrics: {str(e)}')
+        return 0
+    return len(pending)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize_metrics(since):
+    """
+    Per-view percentiles for requests recorded since ``since``, slowest p95 first
+    """
+    from apps.dashboard.models import RequestMetric
+
+    flush_metrics()
+    grouped = defaultdict(lambda: defaultdict(list))
+    rows = RequestMetric.objects.filter(created_at__gte=since).order_by().values_list(
+        'view_name', 'duration_ms', 'query_count', 'duplicate_queries', 'query_ms',
+        'template_ms', 'cache_hits', 'cache_misses', 'query_budget',
+    )
+    for (view_name, duration, queries, duplicates, query_ms,
+         template_ms, hits, misses, budget) in rows.iterator(chunk_size=5000):
+        series = grouped[view_name]
+        series['duration'].append(duration)
+        series['queries'].append(queries)
+        series['duplicates'].append(duplicates)
+        series['query_ms'].append(query_ms)
+        series['template_ms'].append(template_ms)
+        series['hits'].append(hits)
+        series['misses'].append(misses)
+        series['budget'].append(budget)
+
+    summary = []
+    for view_name, series in grouped.items():
+        duration = sorted(series['duration'])
+        queries = sorted(series['queries'])
+        hits, misses = sum(series['hits']), sum(series['misses'])
+        budgets = [budget for budget in series['budget'] if budget is not None]
+        budget = budgets[-1] if budgets else None
+        summary.append({
+            'view_name': view_name or '(unresolved)',
+            'requests': len(duration),
+            'p50': percentile(duration, 50),
+            'p95': percentile(duration, 95),
+            'p99': percentile(duration, 99),
+            'queries_p50': percentile(queries, 50),
+            'queries_max': queries[-1],
+            'duplicates_max': max(series['duplicates']),
+            'query_ms_p95': percentile(sorted(series['query_ms']), 95),
+            'template_ms_p95': percentile(sorted(series['template_ms']), 95),
+            'cache_hit_ratio': hits / (hits + misses) if hits + misses else None,
+            'budget': budget,
+            'over_budget': budget is not None and queries[-1] > budget,
+        })
+    summary.sort(key=lambda row: row['p95'], reverse=True)
+    return summary
@@ -0,0 +1,184 @@
+"""
+Daily order rollups - incremental maintenance, rebuild and time-series reads
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.dashboard.models import OrderDailyRollup
+
+ROLLUP_FIELDS = (
+    'orders_count',
+    'paid_orders_count',
+    'revenue',
+    'refunds',
+    'items_sold',
+)
+
+
+def order_contribution(payment_status, total_price, items_sold=0):
+    """
+    Return the amounts a single order adds to its day's rollup row
+    """
+    is_paid = payment_status == 'paid'
+    return {
+        'orders_count': 1,
+        'paid_orders_count': 1 if is_paid else 0,
+        'revenue': total_price if is_paid else Decimal('0'),
+        'refunds': total_price if payment_status == 'refunded' else Decimal('0'),
+        'items_sold': items_sold if is_paid else 0,
+    }
+
+
+def apply_rollup_delta(day, delta):
+    """
+    Add ``delta`` to the rollup row for ``day`` using F() expressions
+
+    The row is created on first use; a concurrent creator is handled by
+    retrying the UPDATE once the unique ``date`` constraint fires.
+    """
+    delta = {field: value for field, value in delta.items() if value}
+    if not delta:
+        return
+
+    updates = {field: F(field) + value for field, value in delta.items()}
+    if OrderDailyRollup.objects.filter(date=day).update(**updates):
+        return
+
+    try:
+        with transaction.atomic():
+            OrderDailyRollup.objects.create(date=day, **delta)
+    except IntegrityError:
+        OrderDailyRollup.objects.filter(date=day).update(**updates)
+
+
+def record_order_change(previous, current, items_sold=0):
+    """
+    Move an order's contribution from its previous state to its current one
+
+    ``previous`` and ``current`` are dicts with ``payment_status``,
+    ``total_price`` and ``created_at`` (``None`` for a created or deleted
+    order). ``items_sold`` is the order's total quantity and only matters
+    when either state is paid.
+    """
+    deltas = {}
+
+    if previous is not None:
+        day = timezone.localdate(previous['created_at'])
+        old = order_contribution(previous['payment_status'], previous['total_price'], items_sold)
+        bucket = deltas.setdefault(day, dict.fromkeys(ROLLUP_FIELDS, 0))
+        for field in ROLLUP_FIELDS:
+            bucket[field] -= old[field]
+
+    if current is not None:
+        day = timezone.localdate(current['created_at'])
+        new = order_contribution(current['payment_status'], current['total_price'], items_sold)
+        bucket = deltas.setdefault(day, dict.fromkeys(ROLLUP_FIELDS, 0))
+        for field in ROLLUP_FIELDS:
+            bucket[field] += new[field]
+
+    for day, delta in deltas.items():
+        apply_rollup_delta(day, delta)
+
+
+def rebuild_rollups(since=None):
+    """
+    Recompute rollup rows from ``orders_order`` and ``orders_orderitem``
+
+    Rebuilds every day on or after ``since`` (all days when ``None``) inside
+    a single transaction and returns the number of rows written.
+    """
+    from apps.orders.models import Order, OrderItem
+
+    orders = Order.objects.all()
+    items = OrderItem.objects.filter(order__payment_status='paid')
+    if since is not None:
+        orders = orders.filter(created_at__date__gte=since)
+        items = items.filter(order__created_at__date__gte=since)
+
+    rows = {}
+    order_totals = orders.annotate(
+        day=TruncDate('created_at')
+    ).values('day').annotate(
+        orders_count=Count('id'),
+        paid_orders_count=Count('id', filter=Q(payment_status='paid')),
+        revenue=Sum('total_price', filter=Q(payment_status='paid')),
+        refunds=Sum('total_price', filter=Q(payment_status='refunded')),
+    ).order_by()
+    for row in order_totals:
+        rows[row['day']] = OrderDailyRollup(
+            date=row['day'],
+            orders_count=row['orders_count'],
+            paid_orders_count=row['paid_orders_count'],
+            revenue=row['revenue'] or 0,
+            refunds=row['refunds'] or 0,
+        )
+
+    item_totals = items.annotate(
+        day=TruncDate('order__created_at')
+    ).values('day').annotate(
+        items_sold=Sum('quantity'),
+    ).order_by()
+    for row in item_totals:
+        if row['day'] in rows:
+            rows[row['day']].items_sold = row['items_sold'] or 0
+
+    with transaction.atomic():
+        stale = OrderDailyRollup.objects.all()
+        if since is not None:
+            stale = stale.filter(date__gte=since)
+        stale.delete()
+        OrderDailyRollup.objects.bulk_create(rows.values(), batch_size=500)
+
+    return len(rows)
+
+
+def rollup_totals(since=None):
+    """
+    Sum rollup rows on or after ``since`` (all time when ``None``)
+    """
+    rollups = OrderDailyRollup.objects.all()
+    if since is not None:
+        rollups = rollups.filter(date__gte=since)
+    totals = rollups.aggregate(
+        orders_count=Sum('orders_count'),
+        paid_orders_count=Sum('paid_orders_count'),
+        revenue=Sum('revenue'),
+        refunds=Sum('refunds'),
+        items_sold=Sum('items_sold'),
+    )
+    return {field: value or 0 for field, value in totals.items()}
+
+
+def rollup_series(days):
+    """
+    Return one point per day for the last ``days`` days, oldest first
+
+    Days without orders are filled with zeros so the series is contiguous.
+    """
+    end = timezone.localdate()
+    start = end - timedelta(days=days - 1)
+    by_date = {
+        row['date']: row
+        for row in OrderDailyRollup.objects.filter(
+            date__gte=start, date__lte=end
+        ).values('date', *ROLLUP_FIELDS)
+    }
+
+    series = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        row = by_date.get(day, {})
+        series.append({
+            'date': day.isoformat(),
+            'orders': row.get('orders_count', 0),
+            'paid_orders': row.get('paid_orders_count', 0),
+            'revenue': float(row.get('revenue', 0)),
+            'refunds': float(row.get('refunds', 0)),
+            'items_sold': row.get('items_sold', 0),
+        })
+    return series
@@ -0,0 +1,57 @@
+"""
+Keep OrderDailyRollup in sync with order and payment transitions
+
+Queryset ``update()`` calls bypass these handlers; run
+``manage.py rebuild_order_rollups`` after bulk edits.
+"""
+from django.db.models import Sum
+from django.db.models.signals import post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from apps.orders.models import Order
+from apps.dashboard.rollups import record_order_change
+
+ROLLUP_STATE_FIELDS = ('payment_status', 'total_price', 'created_at')
+
+
+def _order_state(order):
+    return {field: getattr(order, field) for field in ROLLUP_STATE_FIELDS}
+
+
+def _items_sold(order):
+    return order.items.aggregate(total=Sum('quantity'))['total'] or 0
+
+
+@receiver(pre_save, sender=Order)
+def remember_order_state(sender, instance, raw=False, **kwargs):
+    """Snapshot the stored row so post_save can compute the delta"""
+    instance._rollup_previous = None
+    if raw or instance.pk is None:
+        return
+    instance._rollup_previous = Order.objects.filter(
+        pk=instance.pk
+    ).values(*ROLLUP_STATE_FIELDS).first()
+
+
+@receiver(post_save, sender=Order)
+def update_order_rollup(sender, instance, created, raw=False, **kwargs):
+    """Apply the order's state change to its day's rollup row"""
+    if raw:
+        return
+    previous = getattr(instance, '_rollup_previous', None)
+    current = _order_state(instance)
+    if previous == current:
+        return
+
+    items_sold = 0
+    if 'paid' in (current['payment_status'], previous and previous['payment_status']):
+        items_sold = _items_sold(instance)
+
+    record_order_change(previous, current, items_sold)
+
+
+@receiver(pre_delete, sender=Order)
+def remove_order_from_rollup(sender, instance, **kwargs):
+    """Subtract a deleted order (items are still present at pre_delete)"""
+    items_sold = _items_sold(instance) if instance.payment_status == 'paid' else 0
+    record_order_change(_order_state(instance), None, items_sold)
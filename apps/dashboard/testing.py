@@ -0,0 +1,253 @@
+"""
+Test support: budget-enforcing runner, a Faker-seeded catalogue and a
+TestCase that asserts per-view query budgets
+"""
+import random
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.utils import timezone
+from faker import Faker
+
+# Products written (and held in memory) per chunk while seeding
+SEED_BATCH_SIZE = 5000
+
+
+class PerfTestRunner(DiscoverRunner):
+    """
+    DiscoverRunner with PERF_ENFORCE_QUERY_BUDGETS switched on, so any test
+    request to a view over its @query_budget raises QueryBudgetExceeded
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.PERF_ENFORCE_QUERY_BUDGETS = True
+        # The shared cache outlives each test's database rollback; tests of
+        # the page cache switch it on and clear the cache themselves
+        settings.PAGE_CACHE_ENABLED = False
+        # Buffered request metrics are written when read (summarize_metrics),
+        # not by whichever request fills the buffer inside assertNumQueries
+        settings.PERF_METRICS_FLUSH_SIZE = float('inf')
+        settings.PERF_METRICS_FLUSH_SECONDS = float('inf')
+
+
+def seed_catalog(products=2000, users=60, orders=300, reviews_per_product=3, seed=2024, progress=None):
+    """
+    Bulk-create a realistic catalogue and return handles to the seeded rows
+
+    Categories (with children), brands, car models, products with stock,
+    specifications and vehicle fitment, customers with addresses, reviews,
+    orders with items, and one customer cart. Everything goes through
+    bulk_create, so a few thousand products seed in a couple of seconds.
+    ``progress`` is called with the number of products written after each
+    chunk of SEED_BATCH_SIZE. ``products`` in the returned namespace is
+    the newest chunk only.
+    """
+    from apps.dashboard.rollups import rebuild_rollups
+    from apps.inventory.models import InventoryItem
+    from apps.inventory.sync import sync_products
+    from apps.orders.models import Cart, CartItem, Order, OrderItem
+    from apps.orders.purchases import rebuild_purchases
+    from apps.store.models import Brand, CarModel, Category, Product, ProductSpecification, Review
+    from apps.store.reviews import rebuild_rating_summaries
+    from apps.users.models import Address, User
+
+    fake = Faker('ar_SA')
+    fake.seed_instance(seed)
+    rng = random.Random(seed)
+
+    parents = Category.objects.bulk_create([
+        Category(name=f'{fake.word()} {i}', slug=f'category-{i}', show_in_menu=i < 6, menu_order=i)
+        for i in range(10)
+    ])
+    children = Category.objects.bulk_create([
+        Category(name=f'{fake.word()} {i}', slug=f'subcategory-{i}', parent=parents[i % len(parents)])
+        for i in range(30)
+    ])
+    categories = parents + children
+
+    brands = Brand.objects.bulk_create([
+        Brand(name=f'{fake.company()} {i}', slug=f'brand-{i}', logo=f'brands/brand-{i}.png', show_in_navbar=i < 8)
+        for i in range(25)
+    ])
+    car_models = CarModel.objects.bulk_create([
+        CarModel(
+            brand=brands[i % len(brands)], name=f'Model {i}', slug=f'model-{i}',
+            year_from=2005 + i % 15, year_to=2015 + i % 10, show_in_navbar=i < 10,
+        )
+        for i in range(150)
+    ])
+
+    # Faker is slow per call; cycle through small pools of generated text
+    names = [fake.catch_phrase() for _ in range(256)]
+    descriptions = [fake.paragraph(nb_sentences=4) for _ in range(64)]
+    sentences = [fake.sentence() for _ in range(128)]
+    words = [fake.word() for _ in range(128)]
+
+    # Products are written chunk by chunk so large catalogues never sit in
+    # memory; only the newest chunk is kept for reviews, orders and the cart
+    catalogue = []
+    for chunk_start in range(0, products, SEED_BATCH_SIZE):
+        chunk_stop = min(chunk_start + SEED_BATCH_SIZE, products)
+        catalogue = [
+            Product(
+                name=f'{names[i % len(names)]} {i}',
+                slug=f'product-{i}',
+                sku=f'SKU-{i:06d}',
+                description=descriptions[i % len(descriptions)],
+                short_description=sentences[i % len(sentences)],
+                category=categories[i % len(categories)],
+                brand=brands[i % len(brands)],
+                price=Decimal(rng.randint(20, 2000)),
+                sale_price=Decimal(15) if i % 7 == 0 else None,
+                main_image=f'products/product-{i}.jpg',
+                is_featured=i % 11 == 0,
+                is_new_arrival=i % 13 == 0,
+                is_coming_soon=i % 97 == 0,
+            )
+            for i in range(chunk_start, chunk_stop)
+        ]
+        for product in catalogue:
+            product.refresh_pricing(promotions=())
+        Product.objects.bulk_create(catalogue, batch_size=500)
+
+        InventoryItem.objects.bulk_create([
+            InventoryItem(product=product, quantity=rng.choice([0, 3, 25, 120]))
+            for product in catalogue
+        ], batch_size=500)
+        ProductSpecification.objects.bulk_create([
+            ProductSpecification(
+                product=product, name=f'{words[(i + n) % len(words)]} {n}',
+                value=words[(i * 7 + n) % len(words)], order=n,
+            )
+            for i, product in enumerate(catalogue, start=chunk_start)
+            if i < 500
+            for n in range(3)
+        ], batch_size=1000)
+        Product.compatible_brands.through.objects.bulk_create([
+            Product.compatible_brands.through(product_id=product.pk, brand_id=brands[(i + n) % len(brands)].pk)
+            for i, product in enumerate(catalogue, start=chunk_start)
+            for n in range(2)
+        ], batch_size=1000)
+        Product.compatible_car_models.through.objects.bulk_create([
+            Product.compatible_car_models.through(
+                product_id=product.pk, carmodel_id=car_models[(i * 3 + n) % len(car_models)].pk
+            )
+            for i, product in enumerate(catalogue, start=chunk_start)
+            for n in range(3)
+        ], batch_size=1000)
+        if progress is not None:
+            progress(chunk_stop)
+    sync_products()
+
+    customers = User.objects.bulk_create([
+        User(
+            username=f'customer{i}', email=f'customer{i}@example.com',
+            first_name=fake.first_name(), last_name=fake.last_name(),
+        )
+        for i in range(users)
+    ])
+    addresses = Address.objects.bulk_create([
+        Address(
+            user=user, label='المنزل', full_name=f'{user.first_name} {user.last_name}',
+            phone_number='0500000000', street=fake.street_address(), city=fake.city(), is_default=True,
+        )
+        for user in customers
+    ])
+
+    # Reviews concentrate on the newest products, which the list pages show first
+    Review.objects.bulk_create([
+        Review(
+            product=product, user=customers[(i + n) % len(customers)],
+            rating=rng.randint(1, 5), comment=sentences[(i + n) % len(sentences)], is_verified_purchase=n % 2 == 0,
+        )
+        for i, product in enumerate(catalogue[-500:])
+        for n in range(reviews_per_product)
+    ], batch_size=1000)
+    rebuild_rating_summaries()
+
+    now = timezone.now()
+    statuses = ['pending', 'confirmed', 'processing', 'shipped', 'delivered', 'cancelled']
+    seeded_orders = Order.objects.bulk_create([
+        Order(
+            user=customers[i % len(customers)], address=addresses[i % len(addresses)],
+            order_number=f'ORD-SEED-{i:06d}', total_price=Decimal('150.000'),
+            status=statuses[i % len(statuses)], payment_status='paid' if i % 3 else 'pending',
+        )
+        for i in range(orders)
+    ], batch_size=500)
+    # auto_now_add ignores explicit values; spread orders over 60 days afterwards
+    for i, order in enumerate(seeded_orders):
+        order.created_at = now - timedelta(days=i % 60, hours=i % 24)
+    Order.objects.bulk_update(seeded_orders, ['created_at'], batch_size=500)
+    OrderItem.objects.bulk_create([
+        OrderItem(
+            order=order, product=catalogue[(i * 5 + n) % len(catalogue)],
+            product_name='-', product_sku=catalogue[(i * 5 + n) % len(catalogue)].sku,
+            quantity=1 + n, price=Decimal('50.000'),
+        )
+        for i, order in enumerate(seeded_orders)
+        for n in range(3)
+    ], batch_size=1000)
+    rebuild_rollups()
+    rebuild_purchases()
+
+    shopper = customers[0]
+    cart = Cart.objects.create(user=shopper)
+    in_stock = Product.objects.filter(stock_status='in_stock').order_by('pk')[:5]
+    CartItem.objects.bulk_create([CartItem(cart=cart, product=product, quantity=1) for product in in_stock])
+
+    staff = User.objects.create_superuser('staff', 'staff@example.com', 'password')
+
+    reviewed = catalogue[-1]
+    return SimpleNamespace(
+        products=catalogue,
+        categories=categories,
+        brands=brands,
+        car_models=car_models,
+        shopper=shopper,
+        cart=cart,
+        staff=staff,
+        reviewed_product=reviewed,
+        in_stock_product=in_stock[len(in_stock) - 1],
+    )
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    TestCase with a shared seeded catalogue and assertions against the
+    @query_budget declared on each view
+    """
+
+    catalog_size = 2000
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = seed_catalog(products=cls.catalog_size)
+
+    def assertWithinBudget(self, method, url, data=None, **extra):
+        """
+        Request ``url`` and assert the view stayed within its declared budget
+
+        Fails if the view has no budget, so new views cannot silently opt out.
+        Returns the response.
+        """
+        budget = getattr(resolve(url.split('?')[0]).func, 'query_budget', None)
+        self.assertIsNotNone(budget, f'{url} has no @query_budget')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, **extra)
+        self.assertLess(response.status_code, 400, f'{url} returned {response.status_code}')
+        self.assertLessEqual(
+            len(queries), budget,
+            f'{url} ran {len(queries)} queries (budget {budget}):\n'
+            + '\n'.join(query['sql'] for query in queries.captured_queries),
+        )
+        return response
@@ -0,0 +1,341 @@
+﻿import csv
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, connections
+from django.http import HttpResponse, HttpResponseServerError
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import ResolverMatch, resolve, reverse
+from django.utils import timezone
+
+from apps.dashboard import perf
+from apps.dashboard.middleware import RequestMetricsMiddleware
+from apps.dashboard.models import OrderDailyRollup, RequestMetric
+from apps.dashboard.perf import QueryBudgetExceeded, current_stats, query_budget
+from apps.dashboard.rollups import ROLLUP_FIELDS, rebuild_rollups
+from apps.dashboard.testing import QueryBudgetTestCase
+from apps.orders.models import Order, OrderItem
+from apps.store.models import Brand, Category, Product
+
+
+def create_catalog(products=2):
+    """A few products in one category and brand, a customer and a staff user"""
+    User = get_user_model()
+    category = Category.objects.create(name='فلاتر', slug='filters')
+    brand = Brand.objects.create(name='تويوتا', slug='toyota')
+    return SimpleNamespace(
+        products=[
+            Product.objects.create(
+                name=f'فلتر {i}', slug=f'filter-{i}', sku=f'FLT-{i}', description='-',
+                category=category, brand=brand, price=Decimal('50.00'), main_image=f'products/filter-{i}.jpg',
+            )
+            for i in range(products)
+        ],
+        shopper=User.objects.create_user('shopper', 'shopper@example.com', 'password'),
+        staff=User.objects.create_superuser('staff', 'staff@example.com', 'password'),
+    )
+
+
+class DashboardQueryBudgetTests(QueryBudgetTestCase):
+    """
+    حدود الاستعلامات للوحة التحكم
+    Query budgets for the staff dashboard
+    """
+
+    def setUp(self):
+        self.client.force_login(self.catalog.staff)
+
+    def test_dashboard_home(self):
+        self.assertWithinBudget('get', reverse('dashboard:home'))
+
+    def test_dashboard_order_list(self):
+        url = reverse('dashboard:order_list')
+        for params in [
+            {},
+            {'status': 'pending'},
+            {'payment_status': 'paid'},
+            {'search': 'ORD-SEED'},
+            {'page': '2'},
+        ]:
+            with self.subTest(params=params):
+                self.assertWithinBudget('get', url, params)
+
+    def test_budget_is_enforced(self):
+        from apps.store.views import product_views
+
+        original = product_views.product_detail.query_budget
+        product_views.product_detail.query_budget = 1
+        try:
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(
+                    reverse('store:product_detail', args=[self.catalog.reviewed_product.slug])
+                )
+        finally:
+            product_views.product_detail.query_budget = original
+
+
+@override_settings(PERF_METRICS_ENABLED=True, PERF_METRICS_SAMPLE_RATE=1.0, PERF_SERVER_TIMING=True)
+class RequestMetricsMiddlewareTests(TestCase):
+    """
+    قياس الطلبات وترويسة Server-Timing
+    Request measurement and the Server-Timing header
+    """
+
+    def setUp(self):
+        # Rows other tests left in the buffer are not this test's
+        perf.flush_metrics()
+        self.seen = RequestMetric.objects.count()
+        self.url = reverse('dashboard:home')
+
+    def request(self):
+        request = RequestFactory().get(self.url)
+        request.resolver_match = resolve(self.url)
+        return request
+
+    def recorded(self):
+        perf.flush_metrics()
+        return list(RequestMetric.objects.order_by('pk')[self.seen:])
+
+    def test_counts_queries_and_duplicates(self):
+        def view(request):
+            Product.objects.count()
+            Product.objects.count()
+            Product.objects.exists()
+            return HttpResponse('ok')
+
+        RequestMetricsMiddleware(view)(self.request())
+
+        [metric] = self.recorded()
+        self.assertEqual(metric.view_name, 'dashboard:home')
+        self.assertEqual(metric.status_code, 200)
+        self.assertEqual(metric.query_count, 3)
+        self.assertEqual(metric.duplicate_queries, 1)
+        self.assertGreater(metric.query_ms, 0)
+        self.assertGreaterEqual(metric.duration_ms, metric.query_ms)
+
+    def test_server_timing_header(self):
+        def view(request):
+            Product.objects.count()
+            return HttpResponse('ok')
+
+        response = RequestMetricsMiddleware(view)(self.request())
+
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;dur=\d+\.\d;desc="1 queries", '
+            r'tpl;dur=\d+\.\d;desc="templates", '
+            r'cache;desc="\d+ hits, \d+ misses", '
+            r'total;dur=\d+\.\d$',
+        )
+        with override_settings(PERF_SERVER_TIMING=False, DEBUG=False):
+            response = RequestMetricsMiddleware(view)(self.request())
+        self.assertNotIn('Server-Timing', response)
+
+    def test_error_responses_are_recorded(self):
+        def view(request):
+            Product.objects.count()
+            return HttpResponseServerError('boom')
+
+        RequestMetricsMiddleware(view)(self.request())
+
+        [metric] = self.recorded()
+        self.assertEqual((metric.status_code, metric.query_count), (500, 1))
+
+    def test_exceptions_propagate_without_a_metric(self):
+        def view(request):
+            Product.objects.count()
+            raise RuntimeError('boom')
+
+        with self.assertRaises(RuntimeError):
+            RequestMetricsMiddleware(view)(self.request())
+
+        self.assertIsNone(current_stats())
+        self.assertEqual(self.recorded(), [])
+        # The execute_wrapper is gone with the request
+        with self.assertNumQueries(1):
+            Product.objects.count()
+        self.assertEqual(connection.execute_wrappers, [])
+
+    @override_settings(PERF_ENFORCE_QUERY_BUDGETS=True)
+    def test_over_budget_requests_are_recorded_before_raising(self):
+        @query_budget(1)
+        def view(request):
+            Product.objects.count()
+            Product.objects.count()
+            return HttpResponse('ok')
+
+        request = self.request()
+        request.resolver_match = ResolverMatch(view, (), {}, url_name='budgeted')
+        with self.assertRaises(QueryBudgetExceeded):
+            RequestMetricsMiddleware(view)(request)
+
+        [metric] = self.recorded()
+        self.assertEqual((metric.view_name, metric.query_count, metric.query_budget), ('budgeted', 2, 1))
+
+
+class OrderRollupTests(TestCase):
+    """
+    التحديث التدريجي لملخص الطلبات اليومي
+    Incremental maintenance of the daily order rollups matches a rebuild
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = create_catalog()
+        cls.product = cls.catalog.products[0]
+
+    def setUp(self):
+        rebuild_rollups()
+
+    def rows(self):
+        return {
+            row['date']: row
+            for row in OrderDailyRollup.objects.filter(orders_count__gt=0).values('date', *ROLLUP_FIELDS)
+        }
+
+    def assertMatchesRebuild(self):
+        incremental = self.rows()
+        rebuild_rollups()
+        self.assertEqual(incremental, self.rows())
+
+    def place_order(self, quantity=2, **state):
+        order = Order.objects.create(user=self.catalog.shopper, total_price=Decimal('100.000'), **state)
+        OrderItem.objects.create(order=order, product=self.product, quantity=quantity, price=Decimal('50.000'))
+        return order
+
+    def test_create_pay_refund_move_and_delete(self):
+        today = timezone.localdate()
+        before = self.rows().get(today, dict.fromkeys(ROLLUP_FIELDS, 0))
+
+        order = self.place_order()
+        row = self.rows()[today]
+        self.assertEqual(row['orders_count'], before['orders_count'] + 1)
+        self.assertEqual(row['revenue'], before['revenue'])
+        self.assertMatchesRebuild()
+
+        order.payment_status = 'paid'
+        order.save()
+        row = self.rows()[today]
+        self.assertEqual(row['paid_orders_count'], before['paid_orders_count'] + 1)
+        self.assertEqual(row['revenue'], before['revenue'] + Decimal('100'))
+        self.assertEqual(row['items_sold'], before['items_sold'] + 2)
+        self.assertMatchesRebuild()
+
+        order.payment_status = 'refunded'
+        order.save()
+        row = self.rows()[today]
+        self.assertEqual(row['revenue'], before['revenue'])
+        self.assertEqual(row['refunds'], before['refunds'] + Decimal('100'))
+        self.assertEqual(row['items_sold'], before['items_sold'])
+        self.assertMatchesRebuild()
+
+        order.payment_status = 'paid'
+        order.created_at -= timedelta(days=3)
+        order.save()
+        moved = self.rows()[today - timedelta(days=3)]
+        self.assertEqual((moved['paid_orders_count'], moved['items_sold']), (1, 2))
+        self.assertEqual(
+            self.rows().get(today, dict.fromkeys(ROLLUP_FIELDS, 0))['orders_count'], before['orders_count']
+        )
+        self.assertMatchesRebuild()
+
+        order.delete()
+        self.assertNotIn(today - timedelta(days=3), self.rows())
+        self.assertMatchesRebuild()
+
+
+class OrderExportTests(TestCase):
+    """
+    تصدير الطلبات بصيغة CSV مع عوامل التصفية
+    The CSV export applies the order list filters
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = create_catalog()
+        cls.paid, cls.pending, cls.old = [
+            Order.objects.create(user=cls.catalog.shopper, total_price=Decimal('30.000'), payment_status=status)
+            for status in ('paid', 'pending', 'paid')
+        ]
+        for order in (cls.paid, cls.pending, cls.old):
+            for product in cls.catalog.products:
+                OrderItem.objects.create(order=order, product=product, quantity=1, price=Decimal('15.000'))
+        Order.objects.filter(pk=cls.old.pk).update(created_at=timezone.now() - timedelta(days=40))
+
+    def setUp(self):
+        self.client.force_login(self.catalog.staff)
+
+    def export(self, **params):
+        response = self.client.get(reverse('dashboard:order_export'), params)
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.reader(b''.join(response.streaming_content).decode('utf-8-sig').splitlines()))
+        return rows[0], rows[1:]
+
+    def test_one_row_per_item_with_filters(self):
+        header, rows = self.export()
+        self.assertEqual(len(header), 22)
+        self.assertEqual(len(rows), 6)
+
+        _, rows = self.export(payment_status='paid')
+        self.assertEqual({row[0] for row in rows}, {self.paid.order_number, self.old.order_number})
+
+        since = (timezone.localdate() - timedelta(days=7)).isoformat()
+        _, rows = self.export(payment_status='paid', date_from=since)
+        self.assertEqual({row[0] for row in rows}, {self.paid.order_number})
+
+    def test_impossible_dates_are_ignored(self):
+        for params in ({'date_from': '2024-02-30'}, {'date_to': '2024-13-01'}, {'date_from': 'yesterday'}):
+            with self.subTest(params=params):
+                _, rows = self.export(**params)
+                self.assertEqual(len(rows), 6)
+                response = self.client.get(reverse('dashboard:order_list'), params)
+                self.assertEqual(response.status_code, 200)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite tuning')
+class SQLiteTuningTests(TestCase):
+    """
+    ضبط اتصالات SQLite
+    Per-connection PRAGMAs, and WAL set on the file by optimize_sqlite only
+    """
+
+    def pragma(self, cursor, name):
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+    def scratch_connection(self):
+        root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, root)
+        wrapper = type(connections['default'])
+        scratch = wrapper({**connection.settings_dict, 'NAME': str(root / 'scratch.sqlite3')}, 'scratch')
+        self.addCleanup(scratch.close)
+        return scratch
+
+    def test_every_connection_gets_the_pragmas(self):
+        with connection.cursor() as cursor:
+            self.assertEqual(self.pragma(cursor, 'busy_timeout'), settings.SQLITE_BUSY_TIMEOUT_MS)
+            # NORMAL, MEMORY
+            self.assertEqual(self.pragma(cursor, 'synchronous'), 1)
+            self.assertEqual(self.pragma(cursor, 'temp_store'), 2)
+            self.assertEqual(self.pragma(cursor, 'cache_size'), settings.SQLITE_PRAGMAS['cache_size'])
+
+    def test_only_optimize_sqlite_switches_the_file_to_wal(self):
+        scratch = self.scratch_connection()
+        with scratch.cursor() as cursor:
+            self.assertEqual(self.pragma(cursor, 'busy_timeout'), settings.SQLITE_BUSY_TIMEOUT_MS)
+            self.assertEqual(self.pragma(cursor, 'journal_mode'), 'delete')
+
+        with mock.patch('apps.dashboard.management.commands.optimize_sqlite.connection', scratch):
+            call_command('optimize_sqlite', stdout=StringIO())
+        scratch.close()
+        with scratch.cursor() as cursor:
+            self.assertEqual(self.pragma(cursor, 'journal_mode'), 'wal')
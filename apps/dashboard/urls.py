@@ -1,13 +1,21 @@
 ﻿from django.urls import path
-from .views import main_views, order_views
+from .views import main_views, order_views, perf_views, review_views
 
 app_name = 'dashboard'
 
 urlpatterns = [
     # Dashboard Home
     path('', main_views.dashboard_home, name='home'),
+    path('charts/revenue/', main_views.dashboard_revenue_chart, name='revenue_chart'),
     
     # Order Management
     path('orders/', order_views.dashboard_order_list, name='order_list'),
+    path('orders/export/', order_views.dashboard_order_export, name='order_export'),
     path('orders/<int:order_id>/', order_views.dashboard_order_detail, name='order_detail'),
+    
+    # Review Moderation
+    path('reviews/', review_views.dashboard_review_queue, name='review_queue'),
+    
+    # Performance
+    path('perf/', perf_views.dashboard_perf, name='perf'),
 ]
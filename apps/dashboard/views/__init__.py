@@ -1,8 +1,14 @@
-﻿from .main_views import dashboard_home
-from .order_views import dashboard_order_list, dashboard_order_detail
+﻿from .main_views import dashboard_home, dashboard_revenue_chart
+from .order_views import dashboard_order_list, dashboard_order_detail, dashboard_order_export
+from .perf_views import dashboard_perf
+from .review_views import dashboard_review_queue
 
 __all__ = [
     'dashboard_home',
+    'dashboard_revenue_chart',
     'dashboard_order_list',
     'dashboard_order_detail',
+    'dashboard_order_export',
+    'dashboard_perf',
+    'dashboard_review_queue',
 ]
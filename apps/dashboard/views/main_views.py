@@ -1,14 +1,21 @@
 ﻿from django.shortcuts import render
 from django.contrib.admin.views.decorators import staff_member_required
 from django.db.models import Count, Sum, Q
+from django.http import JsonResponse
 from django.utils import timezone
 from datetime import timedelta
 
 from apps.orders.models import Order
 from apps.users.models import User
 from apps.store.models import Product
+from apps.dashboard.rollups import rollup_series, rollup_totals
+from apps.dashboard.perf import query_budget
 
+# Allowed ranges (in days) for the revenue time-series chart
+CHART_RANGES = (90, 365)
 
+
+@query_budget(23)  # measured: 21
 @staff_member_required
 def dashboard_home(request):
     """
@@ -28,31 +35,12 @@ def dashboard_home(request):
     shipped_orders = Order.objects.filter(status='shipped').count()
     delivered_orders = Order.objects.filter(status='delivered').count()
     
-    # Recent orders (this week)
-    recent_orders = Order.objects.filter(
-        created_at__gte=week_ago
-    ).count()
-    
-    # Revenue statistics
-    total_revenue = Order.objects.filter(
-        payment_status='paid'
-    ).aggregate(
-        total=Sum('total_price')
-    )['total'] or 0
-    
-    weekly_revenue = Order.objects.filter(
-        payment_status='paid',
-        created_at__gte=week_ago
-    ).aggregate(
-        total=Sum('total_price')
-    )['total'] or 0
-    
-    monthly_revenue = Order.objects.filter(
-        payment_status='paid',
-        created_at__gte=month_ago
-    ).aggregate(
-        total=Sum('total_price')
-    )['total'] or 0
+    # Revenue statistics (read from the daily rollup, O(days) not O(orders))
+    weekly_totals = rollup_totals(since=week_ago)
+    recent_orders = weekly_totals['orders_count']
+    total_revenue = rollup_totals()['revenue']
+    weekly_revenue = weekly_totals['revenue']
+    monthly_revenue = rollup_totals(since=month_ago)['revenue']
     
     # Customer statistics
     total_customers = User.objects.filter(is_staff=False).count()
@@ -64,11 +52,14 @@ def dashboard_home(request):
     # Product statistics
     total_products = Product.objects.count()
     active_products = Product.objects.filter(is_active=True).count()
-    low_stock_products = Product.objects.filter(
-        stock_quantity__lte=10,
-        stock_quantity__gt=0
-    ).count()
-    out_of_stock = Product.objects.filter(stock_quantity=0).count()
+    # One scan of the (stock_status, is_active) index for both alert counts
+    stock_counts = dict(
+        Product.objects.filter(
+            stock_status__in=['low_stock', 'out_of_stock']
+        ).values_list('stock_status').annotate(total=Count('pk')).order_by()
+    )
+    low_stock_products = stock_counts.get('low_stock', 0)
+    out_of_stock = stock_counts.get('out_of_stock', 0)
     
     # Recent orders for display
     latest_orders = Order.objects.select_related(
@@ -102,6 +93,28 @@ def dashboard_home(request):
         
         # Latest orders
         'latest_orders': latest_orders,
+        
+        # Revenue chart
+        'chart_ranges': CHART_RANGES,
     }
     
     return render(request, 'dashboard/home.html', context)
+
+
+@staff_member_required
+def dashboard_revenue_chart(request):
+    """
+    Daily orders/revenue time series for the dashboard chart (JSON)
+    Served entirely from OrderDailyRollup: one row per day in range
+    """
+    try:
+        days = int(request.GET.get('days', CHART_RANGES[0]))
+    except (ValueError, TypeError):
+        days = CHART_RANGES[0]
+    if days not in CHART_RANGES:
+        days = CHART_RANGES[0]
+    
+    return JsonResponse({
+        'days': days,
+        'series': rollup_series(days),
+    })
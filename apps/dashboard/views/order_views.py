@@ -1,35 +1,44 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.admin.views.decorators import staff_member_required
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db.models import Count, Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.utils.translation import gettext as _
 
 from apps.orders.models import Order
+from apps.dashboard.exports import stream_orders_csv
+from apps.dashboard.perf import query_budget
 
 
-@staff_member_required
-def dashboard_order_list(request):
+def _date_param(params, name):
+    """A YYYY-MM-DD query parameter, or None when missing or not a real date"""
+    try:
+        return parse_date(params.get(name) or '')
+    except ValueError:
+        # Well-formed but impossible, e.g. 2024-02-30
+        return None
+
+
+def filter_orders(orders, params):
     """
-    Display list of all orders with filtering and search
+    Apply the order list filters (status, payment status, search, date range)
+    Shared by the order list page and the CSV export so both see the same rows
     """
     
-    # Get all orders
-    orders = Order.objects.select_related(
-        'user', 'address'
-    ).prefetch_related('items').order_by('-created_at')
-    
     # Filter by status
-    status_filter = request.GET.get('status')
+    status_filter = params.get('status')
     if status_filter:
         orders = orders.filter(status=status_filter)
     
     # Filter by payment status
-    payment_filter = request.GET.get('payment_status')
+    payment_filter = params.get('payment_status')
     if payment_filter:
         orders = orders.filter(payment_status=payment_filter)
     
     # Search by order number or customer email
-    search_query = request.GET.get('search')
+    search_query = params.get('search')
     if search_query:
         orders = orders.filter(
             Q(order_number__icontains=search_query) |
@@ -38,21 +47,47 @@ def dashboard_order_list(request):
             Q(user__last_name__icontains=search_query)
         )
     
+    # Filter by creation date range (YYYY-MM-DD, inclusive)
+    date_from = _date_param(params, 'date_from')
+    if date_from:
+        orders = orders.filter(created_at__date__gte=date_from)
+    date_to = _date_param(params, 'date_to')
+    if date_to:
+        orders = orders.filter(created_at__date__lte=date_to)
+    
+    return orders
+
+
+@query_budget(16)
+@staff_member_required
+def dashboard_order_list(request):
+    """
+    Display list of all orders with filtering and search
+    """
+    
+    # Get all orders
+    orders = Order.objects.select_related(
+        'user', 'address'
+    ).prefetch_related('items').order_by('-created_at')
+    
+    orders = filter_orders(orders, request.GET)
+    status_filter = request.GET.get('status')
+    payment_filter = request.GET.get('payment_status')
+    search_query = request.GET.get('search')
+    
     # Pagination
     paginator = Paginator(orders, 20)  # 20 orders per page
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
     # Get status counts for filter badges
-    status_counts = {
-        'all': Order.objects.count(),
-        'pending': Order.objects.filter(status='pending').count(),
-        'confirmed': Order.objects.filter(status='confirmed').count(),
-        'processing': Order.objects.filter(status='processing').count(),
-        'shipped': Order.objects.filter(status='shipped').count(),
-        'delivered': Order.objects.filter(status='delivered').count(),
-        'cancelled': Order.objects.filter(status='cancelled').count(),
-    }
+    # (one grouped query instead of a COUNT per status)
+    by_status = dict(
+        Order.objects.order_by().values_list('status').annotate(total=Count('id'))
+    )
+    status_counts = {'all': sum(by_status.values())}
+    for status in ('pending', 'confirmed', 'processing', 'shipped', 'delivered', 'cancelled'):
+        status_counts[status] = by_status.get(status, 0)
     
     context = {
         'page_obj': page_obj,
@@ -60,11 +95,32 @@ def dashboard_order_list(request):
         'current_status': status_filter,
         'current_payment': payment_filter,
         'search_query': search_query,
+        'date_from': request.GET.get('date_from', ''),
+        'date_to': request.GET.get('date_to', ''),
     }
     
     return render(request, 'dashboard/order_list.html', context)
 
 
+@staff_member_required
+def dashboard_order_export(request):
+    """
+    Stream orders (one row per item) as CSV using the order list filters
+    Memory stays constant: rows are fetched with iterator(chunk_size=...)
+    and written to the response as they are produced
+    """
+    
+    orders = filter_orders(Order.objects.all(), request.GET)
+    
+    filename = f"orders-{timezone.localdate():%Y%m%d}.csv"
+    response = StreamingHttpResponse(
+        stream_orders_csv(orders),
+        content_type='text/csv; charset=utf-8',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
 @staff_member_required
 def dashboard_order_detail(request, order_id):
     """
@@ -0,0 +1,37 @@
+﻿from django.shortcuts import render
+from django.contrib.admin.views.decorators import staff_member_required
+from django.utils import timezone
+from datetime import timedelta
+
+from apps.dashboard.perf import summarize_metrics
+from apps.store.page_cache import page_cache_stats
+
+# Allowed look-back windows (in hours) for the performance page
+PERF_WINDOWS = (1, 24, 168)
+
+
+@staff_member_required
+def dashboard_perf(request):
+    """
+    Per-view latency percentiles, query counts and cache hit ratios,
+    plus the anonymous page cache's hit ratio
+    """
+    try:
+        hours = int(request.GET.get('hours', PERF_WINDOWS[1]))
+    except (ValueError, TypeError):
+        hours = PERF_WINDOWS[1]
+    if hours not in PERF_WINDOWS:
+        hours = PERF_WINDOWS[1]
+    
+    summary = summarize_metrics(timezone.now() - timedelta(hours=hours))
+    
+    context = {
+        'summary': summary,
+        'hours': hours,
+        'windows': PERF_WINDOWS,
+        'total_requests': sum(row['requests'] for row in summary),
+        'over_budget_count': sum(1 for row in summary if row['over_budget']),
+        'page_cache': page_cache_stats(),
+    }
+    
+    return render(request, 'dashboard/perf.html', context)
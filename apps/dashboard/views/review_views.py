@@ -0,0 +1,50 @@
+from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Count
+from django.shortcuts import redirect, render
+from django.urls import reverse
+
+from apps.dashboard.perf import query_budget
+from apps.store.models import Review
+from apps.store.moderation import MODERATION_DECISIONS, SPAM_HIDE_SCORE, moderate_reviews, moderation_queue
+
+
+@query_budget(10)
+@staff_member_required
+def dashboard_review_queue(request):
+    """
+    طابور الإشراف على المراجعات
+    Reviews awaiting moderation, most suspicious first, with bulk approve/reject
+
+    GET pages with a cursor (?status=&cursor=); POST applies one decision to
+    the ticked reviews with a single UPDATE (see store.moderation).
+    """
+    statuses = [choice[0] for choice in Review.MODERATION_CHOICES]
+    status = request.GET.get('status')
+    if status not in statuses:
+        status = 'pending'
+
+    if request.method == 'POST':
+        decision = request.POST.get('decision')
+        review_ids = [pk for pk in request.POST.getlist('review_ids') if pk.isdigit()]
+        if decision in MODERATION_DECISIONS and review_ids:
+            changed = moderate_reviews(review_ids, decision)
+            messages.success(request, f'تم تحديث {changed} مراجعة')
+        return redirect(f"{reverse('dashboard:review_queue')}?status={status}")
+
+    reviews, next_cursor = moderation_queue(status, request.GET.get('cursor'))
+
+    # One grouped query for the status tabs
+    by_status = dict(
+        Review.objects.order_by().values_list('moderation_status').annotate(total=Count('id'))
+    )
+
+    context = {
+        'reviews': reviews,
+        'next_cursor': next_cursor,
+        'current_status': status,
+        'status_tabs': [(value, label, by_status.get(value, 0)) for value, label in Review.MODERATION_CHOICES],
+        'spam_hide_score': SPAM_HIDE_SCORE,
+    }
+
+    return render(request, 'dashboard/review_queue.html', context)
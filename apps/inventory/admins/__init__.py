@@ -1,5 +1,11 @@
 ﻿from .inventory_admin import InventoryItemAdmin
+from .adjustment_admin import StockAdjustmentAdmin
+from .movement_admin import StockMovementAdmin
+from .alert_admin import LowStockAlertAdmin
 
 __all__ = [
     'InventoryItemAdmin',
+    'StockAdjustmentAdmin',
+    'StockMovementAdmin',
+    'LowStockAlertAdmin',
 ]
@@ -0,0 +1,66 @@
+from django.contrib import admin
+from apps.inventory.models import StockAdjustment, StockAdjustmentLine
+
+
+class StockAdjustmentLineInline(admin.TabularInline):
+    """
+    Read-only journal lines for a stock adjustment
+    """
+    model = StockAdjustmentLine
+    extra = 0
+    can_delete = False
+    fields = ['sku', 'quantity_before', 'delta', 'quantity_after']
+    readonly_fields = ['sku', 'quantity_before', 'delta', 'quantity_after']
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(StockAdjustment)
+class StockAdjustmentAdmin(admin.ModelAdmin):
+    """
+    سجل تعديلات المخزون
+    Stock adjustment journal (read-only)
+    """
+    list_display = [
+        'reference',
+        'mode',
+        'source',
+        'rows_applied',
+        'rows_rejected',
+        'created_by',
+        'created_at',
+    ]
+    list_filter = [
+        'mode',
+        'source',
+        'created_at',
+    ]
+    search_fields = [
+        'reference',
+        'note',
+        'lines__sku',
+    ]
+    readonly_fields = [
+        'reference',
+        'mode',
+        'source',
+        'note',
+        'created_by',
+        'rows_total',
+        'rows_applied',
+        'rows_rejected',
+        'created_at',
+    ]
+    inlines = [StockAdjustmentLineInline]
+    ordering = ['-created_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_queryset(self, request):
+        """
+        Optimize queryset with select_related
+        """
+        qs = super().get_queryset(request)
+        return qs.select_related('created_by')
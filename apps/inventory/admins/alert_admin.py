@@ -0,0 +1,48 @@
+from django.contrib import admin
+from apps.inventory.models import LowStockAlert
+
+
+@admin.register(LowStockAlert)
+class LowStockAlertAdmin(admin.ModelAdmin):
+    """
+    تنبيهات المخزون المنخفض
+    Open low-stock alerts (maintained by scan_low_stock)
+    """
+    list_display = [
+        'inventory',
+        'state',
+        'quantity',
+        'threshold',
+        'detected_at',
+        'notified_at',
+    ]
+    list_filter = [
+        'state',
+        'notified_at',
+    ]
+    search_fields = [
+        'inventory__product__sku',
+        'inventory__product__name',
+    ]
+    readonly_fields = [
+        'inventory',
+        'state',
+        'quantity',
+        'threshold',
+        'detected_at',
+        'notified_at',
+    ]
+    ordering = ['state', 'quantity']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        """
+        Optimize queryset with select_related
+        """
+        qs = super().get_queryset(request)
+        return qs.select_related('inventory__product')
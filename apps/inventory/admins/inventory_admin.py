@@ -1,4 +1,9 @@
-﻿from django.contrib import admin
+﻿from django.contrib import admin, messages
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from apps.inventory.bulk import apply_stock_adjustments, read_stock_csv
+from apps.inventory.forms import StockImportForm
 from apps.inventory.models import InventoryItem
 
 
@@ -44,6 +49,65 @@ class InventoryItemAdmin(admin.ModelAdmin):
     
     ordering = ['product__name']
     
+    change_list_template = 'admin/inventory/inventoryitem/change_list.html'
+    
+    def get_urls(self):
+        """Add the bulk CSV import view"""
+        urls = [
+            path(
+                'import/',
+                self.admin_site.admin_view(self.import_stock_view),
+                name='inventory_inventoryitem_import',
+            ),
+        ]
+        return urls + super().get_urls()
+    
+    def import_stock_view(self, request):
+        """
+        Upload a CSV of SKU quantities and apply it as one bulk adjustment
+        """
+        if not self.has_change_permission(request):
+            return redirect('admin:inventory_inventoryitem_changelist')
+        
+        report = None
+        if request.method == 'POST':
+            form = StockImportForm(request.POST, request.FILES)
+            if form.is_valid():
+                try:
+                    report = apply_stock_adjustments(
+                        read_stock_csv(form.cleaned_data['file']),
+                        mode=form.cleaned_data['mode'],
+                        user=request.user,
+                        source='csv',
+                        note=form.cleaned_data['note'],
+                        dry_run=form.cleaned_data['dry_run'],
+                    )
+                except ValueError as e:
+                    form.add_error('file', str(e))
+                else:
+                    if report.adjustment:
+                        messages.success(
+                            request,
+                            f'تم تطبيق {report.applied_count} تعديل ({report.adjustment.reference})'
+                        )
+        else:
+            form = StockImportForm()
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'استيراد المخزون من ملف CSV',
+            'form': form,
+            'report': report,
+        }
+        return TemplateResponse(request, 'admin/inventory/stock_import.html', context)
+    
+    def save_model(self, request, obj, form, change):
+        """Attribute quantity edits in the stock ledger"""
+        obj._movement_reason = 'admin'
+        obj._movement_user = request.user
+        super().save_model(request, obj, form, change)
+    
     def get_queryset(self, request):
         """
         Optimize queryset with select_related
@@ -0,0 +1,59 @@
+from django.contrib import admin
+from apps.inventory.models import StockMovement
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    """
+    سجل حركات المخزون
+    Stock movement ledger (append-only, read-only)
+    """
+    list_display = [
+        'inventory',
+        'reason',
+        'delta',
+        'balance_after',
+        'order',
+        'adjustment',
+        'created_by',
+        'created_at',
+    ]
+    list_filter = [
+        'reason',
+        'created_at',
+    ]
+    search_fields = [
+        'inventory__product__sku',
+        'inventory__product__name',
+        'order__order_number',
+        'adjustment__reference',
+    ]
+    readonly_fields = [
+        'inventory',
+        'reason',
+        'delta',
+        'balance_after',
+        'order',
+        'adjustment',
+        'note',
+        'created_by',
+        'created_at',
+    ]
+    date_hierarchy = 'created_at'
+    ordering = ['-created_at', '-id']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        """
+        Optimize queryset with select_related
+        """
+        qs = super().get_queryset(request)
+        return qs.select_related('inventory__product', 'order', 'adjustment', 'created_by')
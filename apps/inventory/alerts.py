@@ -0,0 +1,134 @@
+"""
+Low-stock scanner
+
+Each run reads only the inventory items whose ``updated_at`` moved since
+the previous run (every stock write path bumps it), compares them with the
+open LowStockAlert rows and opens, escalates or resolves alerts. Alerts
+that have not been delivered yet are then sent as one digest.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.inventory.models import InventoryItem, LowStockAlert, LowStockScan
+
+SCAN_BATCH_SIZE = 2000
+
+# Re-read a little before the watermark so rows committed by transactions
+# that were still open during the previous run are not missed; re-checking
+# an unchanged item is a no-op
+SCAN_OVERLAP = timedelta(minutes=5)
+
+
+def alert_state(quantity, threshold):
+    """Alert state for a quantity, or None when stock is healthy"""
+    if quantity <= 0:
+        return 'out_of_stock'
+    if quantity <= threshold:
+        return 'low_stock'
+    return None
+
+
+def _candidates(since):
+    """
+    Items to examine: changed since the watermark, or on a full scan every
+    item under its threshold (partial index) plus items with an open alert
+    """
+    items = InventoryItem.objects.order_by().values_list('pk', 'quantity', 'low_stock_threshold')
+    if since is not None:
+        return items.filter(updated_at__gte=since)
+    return items.filter(quantity__lte=F('low_stock_threshold')).union(
+        items.filter(low_stock_alert__isnull=False)
+    )
+
+
+def scan_low_stock(full=False):
+    """
+    Run one scan and return its LowStockScan row (not yet notified)
+    """
+    started_at = timezone.now()
+    previous = LowStockScan.objects.filter(finished_at__isnull=False).order_by('-started_at').first()
+    since = None if full or previous is None else previous.started_at - SCAN_OVERLAP
+    scan = LowStockScan(started_at=started_at, full_scan=since is None)
+
+    batch = []
+    for row in _candidates(since).iterator(chunk_size=SCAN_BATCH_SIZE):
+        batch.append(row)
+        if len(batch) >= SCAN_BATCH_SIZE:
+            _apply_batch(batch, scan)
+            batch = []
+    if batch:
+        _apply_batch(batch, scan)
+
+    scan.finished_at = timezone.now()
+    scan.save()
+    return scan
+
+
+def _apply_batch(rows, scan):
+    """Open, escalate or resolve alerts for one batch of (pk, quantity, threshold)"""
+    now = timezone.now()
+    open_alerts = {
+        alert.inventory_id: alert
+        for alert in LowStockAlert.objects.filter(inventory_id__in=[row[0] for row in rows])
+    }
+
+    created, changed, resolved = [], [], []
+    for pk, quantity, threshold in rows:
+        state = alert_state(quantity, threshold)
+        alert = open_alerts.get(pk)
+        if state is None:
+            if alert is not None:
+                resolved.append(alert.pk)
+        elif alert is None:
+            created.append(LowStockAlert(
+                inventory_id=pk, state=state, quantity=quantity,
+                threshold=threshold, detected_at=now,
+            ))
+        elif alert.state != state:
+            # Escalation (low -> out) or partial recovery is news again
+            alert.state, alert.quantity, alert.threshold = state, quantity, threshold
+            alert.detected_at, alert.notified_at = now, None
+            changed.append(alert)
+
+    with transaction.atomic():
+        LowStockAlert.objects.bulk_create(created)
+        LowStockAlert.objects.bulk_update(
+            changed, ['state', 'quantity', 'threshold', 'detected_at', 'notified_at']
+        )
+        LowStockAlert.objects.filter(pk__in=resolved).delete()
+
+    scan.items_checked += len(rows)
+    scan.alerts_opened += len(created) + len(changed)
+    scan.alerts_resolved += len(resolved)
+
+
+def pending_alerts():
+    """Open alerts that no digest has reported yet"""
+    return LowStockAlert.objects.filter(
+        notified_at__isnull=True
+    ).select_related('inventory__product').order_by('state', 'quantity')
+
+
+def notify_pending_alerts(scan=None):
+    """
+    Send every pending alert in one digest and mark them notified
+
+    Alerts stay pending when no channel succeeds, so the next run retries.
+    Returns the number of alerts reported.
+    """
+    from apps.inventory.emails import send_low_stock_digest
+
+    alerts = list(pending_alerts())
+    if not alerts or not send_low_stock_digest(alerts):
+        return 0
+
+    LowStockAlert.objects.filter(
+        pk__in=[alert.pk for alert in alerts]
+    ).update(notified_at=timezone.now())
+    if scan is not None:
+        scan.alerts_notified = len(alerts)
+        scan.save(update_fields=['alerts_notified'])
+    return len(alerts)
@@ -9,3 +9,7 @@ class InventoryConfig(AppConfig):
     divider_title = "إدارة المتجر"  # Section divider title
     priority = 80  # Sidebar ordering (higher = top)
     hide = False  # Show in sidebar
+
+    def ready(self):
+        # Register stock ledger signal handlers
+        from apps.inventory import signals  # noqa
@@ -0,0 +1,248 @@
+"""
+Bulk stock adjustment engine
+
+Applies thousands of SKU quantity changes in one transaction: SKUs are
+resolved with a single query, quantities are written with F() expressions
+through bulk_update, and every applied change is journaled as a
+StockAdjustmentLine plus a StockMovement in the ledger. Used by the admin CSV
+upload and callable directly.
+"""
+import csv
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.inventory.models import InventoryItem, StockAdjustment, StockAdjustmentLine, StockMovement
+from apps.inventory.sync import sync_products
+
+# A requested change: ``value`` is a delta or an absolute count depending on mode
+StockRow = namedtuple('StockRow', ['sku', 'value', 'line'], defaults=[None])
+
+BULK_BATCH_SIZE = 1000
+
+
+class StockAdjustmentReport:
+    """
+    Diff report returned by apply_stock_adjustments()
+    """
+
+    def __init__(self, mode, dry_run=False):
+        self.mode = mode
+        self.dry_run = dry_run
+        self.adjustment = None
+        self.rows_total = 0
+        self.changes = []
+        self.unchanged = []
+        self.errors = []
+
+    def add_error(self, line, sku, message):
+        self.errors.append({'line': line, 'sku': sku, 'message': message})
+
+    @property
+    def applied_count(self):
+        return len(self.changes)
+
+    @property
+    def rejected_count(self):
+        return len(self.errors)
+
+
+def _decode_lines(file):
+    """Lines of an uploaded file, decoded one at a time so a bad byte names its line"""
+    for line, raw in enumerate(file, start=1):
+        try:
+            yield raw.decode('utf-8-sig' if line == 1 else 'utf-8')
+        except UnicodeDecodeError:
+            raise ValueError(f'السطر {line}: الملف ليس بترميز UTF-8') from None
+
+
+def read_stock_csv(file):
+    """
+    Yield StockRow objects from an uploaded CSV with ``sku`` and ``quantity`` columns
+
+    Raises ValueError when the header row does not contain both columns,
+    or with the line number when the file is not UTF-8 or not valid CSV.
+    """
+    if isinstance(file.read(0), bytes):
+        file = _decode_lines(file)
+
+    reader = csv.DictReader(file)
+    try:
+        columns = {name.strip().lower(): name for name in (reader.fieldnames or [])}
+        if 'sku' not in columns or 'quantity' not in columns:
+            raise ValueError('يجب أن يحتوي الملف على العمودين sku و quantity')
+
+        # Line 1 is the header
+        for line, record in enumerate(reader, start=2):
+            yield StockRow(record.get(columns['sku']), record.get(columns['quantity']), line)
+    except csv.Error as e:
+        # line_num only counts lines parsed without error
+        raise ValueError(f'السطر {reader.line_num + 1}: ملف CSV غير صالح ({e})') from None
+
+
+def _collect_rows(rows, mode, report):
+    """
+    Validate rows and merge duplicate SKUs (deltas add up, the last set wins)
+    """
+    requested = {}
+    for row in rows:
+        row = StockRow(*row)
+        report.rows_total += 1
+        sku = (row.sku or '').strip()
+        if not sku:
+            report.add_error(row.line, '', 'رمز المنتج مفقود')
+            continue
+        try:
+            value = int(str(row.value).strip())
+        except (TypeError, ValueError):
+            report.add_error(row.line, sku, f'كمية غير صالحة: {row.value}')
+            continue
+        if mode == 'set' and value < 0:
+            report.add_error(row.line, sku, 'لا يمكن تعيين كمية سالبة')
+            continue
+
+        if mode == 'delta' and sku in requested:
+            value += requested[sku][0]
+        requested[sku] = (value, row.line)
+    return requested
+
+
+def _resolve_inventory(skus):
+    """
+    Map SKU -> (inventory id, current quantity, product id) with one query
+
+    Rows are locked for the rest of the transaction where the backend
+    supports SELECT ... FOR UPDATE. Products that have no InventoryItem yet
+    get one created at quantity 0.
+    """
+    from apps.store.models import Product
+
+    found = {
+        sku: (pk, quantity, product_id)
+        for pk, sku, quantity, product_id in InventoryItem.objects.select_for_update(
+            of=('self',)
+        ).filter(
+            product__sku__in=skus
+        ).values_list('id', 'product__sku', 'quantity', 'product_id')
+    }
+
+    missing = set(skus) - found.keys()
+    if missing:
+        products = dict(
+            Product.objects.filter(
+                sku__in=missing, inventory__isnull=True
+            ).values_list('sku', 'id')
+        )
+        created = InventoryItem.objects.bulk_create(
+            [InventoryItem(product_id=product_id, quantity=0) for product_id in products.values()],
+            batch_size=BULK_BATCH_SIZE,
+        )
+        skus_by_product = {product_id: sku for sku, product_id in products.items()}
+        for item in created:
+            found[skus_by_product[item.product_id]] = (item.pk, 0, item.product_id)
+
+    return found
+
+
+def apply_stock_adjustments(rows, mode='delta', user=None, source='api', note='', dry_run=False):
+    """
+    Apply a batch of stock changes and return a StockAdjustmentReport
+
+    ``rows`` is an iterable of ``(sku, value)`` or ``(sku, value, line)``.
+    In ``delta`` mode the value is added to (or, when negative, removed from)
+    the current quantity; in ``set`` mode it replaces it. Rows that would
+    drive stock below zero or reference unknown SKUs are rejected and
+    reported; the rest are applied atomically. With ``dry_run`` the report
+    is computed and everything is rolled back.
+    """
+    report = StockAdjustmentReport(mode, dry_run=dry_run)
+    requested = _collect_rows(rows, mode, report)
+    if not requested:
+        return report
+
+    with transaction.atomic():
+        inventory = _resolve_inventory(list(requested))
+        now = timezone.now()
+        updates = []
+
+        for sku, (value, line) in requested.items():
+            if sku not in inventory:
+                report.add_error(line, sku, 'رمز المنتج غير موجود')
+                continue
+
+            pk, before, product_id = inventory[sku]
+            delta = value if mode == 'delta' else value - before
+            after = before + delta
+            if after < 0:
+                report.add_error(line, sku, f'المخزون غير كافٍ (المتوفر {before})')
+                continue
+            if delta == 0:
+                report.unchanged.append(sku)
+                continue
+
+            # F() keeps concurrent webhook deductions intact
+            updates.append(InventoryItem(pk=pk, quantity=F('quantity') + delta))
+            report.changes.append({
+                'inventory_id': pk,
+                'product_id': product_id,
+                'sku': sku,
+                'before': before,
+                'delta': delta,
+                'after': after,
+            })
+
+        InventoryItem.objects.bulk_update(updates, ['quantity'], batch_size=BULK_BATCH_SIZE)
+        # bulk_update skips auto_now; one timestamp for the whole batch
+        changed_ids = [change['inventory_id'] for change in report.changes]
+        for start in range(0, len(changed_ids), BULK_BATCH_SIZE):
+            InventoryItem.objects.filter(
+                pk__in=changed_ids[start:start + BULK_BATCH_SIZE]
+            ).update(updated_at=now)
+        sync_products(change['product_id'] for change in report.changes)
+
+        adjustment = StockAdjustment.objects.create(
+            mode=mode,
+            source=source,
+            note=note,
+            created_by=user,
+            rows_total=report.rows_total,
+            rows_applied=report.applied_count,
+            rows_rejected=report.rejected_count,
+        )
+        StockAdjustmentLine.objects.bulk_create(
+            [
+                StockAdjustmentLine(
+                    adjustment=adjustment,
+                    inventory_id=change['inventory_id'],
+                    sku=change['sku'],
+                    quantity_before=change['before'],
+                    delta=change['delta'],
+                    quantity_after=change['after'],
+                )
+                for change in report.changes
+            ],
+            batch_size=BULK_BATCH_SIZE,
+        )
+        StockMovement.objects.bulk_create(
+            [
+                StockMovement(
+                    inventory_id=change['inventory_id'],
+                    reason='bulk_import',
+                    adjustment=adjustment,
+                    delta=change['delta'],
+                    balance_after=change['after'],
+                    created_by=user,
+                )
+                for change in report.changes
+            ],
+            batch_size=BULK_BATCH_SIZE,
+        )
+
+        if dry_run:
+            transaction.set_rollback(True)
+        else:
+            report.adjustment = adjustment
+
+    return report
@@ -0,0 +1,90 @@
+"""
+Low-stock digest notifications for purchasing
+"""
+import json
+import logging
+import urllib.request
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def _digest_rows(alerts):
+    return [
+        {
+            'sku': alert.inventory.product.sku,
+            'name': alert.inventory.product.name,
+            'state': alert.state,
+            'quantity': alert.quantity,
+            'threshold': alert.threshold,
+            'detected_at': alert.detected_at.isoformat(),
+        }
+        for alert in alerts
+    ]
+
+
+def send_low_stock_digest(alerts):
+    """
+    Deliver one digest for ``alerts`` by email and/or webhook
+
+    Channels come from LOW_STOCK_ALERT_EMAILS and LOW_STOCK_ALERT_WEBHOOK_URL.
+    Returns True when at least one configured channel succeeded.
+    """
+    recipients = getattr(settings, 'LOW_STOCK_ALERT_EMAILS', [])
+    webhook_url = getattr(settings, 'LOW_STOCK_ALERT_WEBHOOK_URL', '')
+    if not recipients and not webhook_url:
+        logger.warning('Low stock digest skipped: no LOW_STOCK_ALERT_EMAILS or webhook configured')
+        return False
+
+    rows = _digest_rows(alerts)
+    out_of_stock = sum(1 for row in rows if row['state'] == 'out_of_stock')
+    delivered = False
+
+    if recipients:
+        try:
+            subject = f'تنبيه المخزون: {out_of_stock} نفد و {len(rows) - out_of_stock} منخفض'
+            context = {'alerts': alerts, 'generated_at': timezone.now()}
+            html_message = render_to_string('inventory/emails/low_stock_digest.html', context)
+            plain_message = '\n'.join(
+                f"{row['sku']}\t{row['name']}\t{row['quantity']}/{row['threshold']}"
+                for row in rows
+            )
+            send_mail(
+                subject=subject,
+                message=plain_message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=recipients,
+                html_message=html_message,
+                fail_silently=False,
+            )
+            logger.info(f'Low stock digest emailed to {len(recipients)} recipients ({len(rows)} items)')
+            delivered = True
+        except Exception as e:
+            logger.error(f'Failed to email low stock digest: {str(e)}')
+
+    if webhook_url:
+        try:
+            payload = json.dumps({
+                'event': 'inventory.low_stock_digest',
+                'out_of_stock': out_of_stock,
+                'low_stock': len(rows) - out_of_stock,
+                'items': rows,
+            }).encode('utf-8')
+            request = urllib.request.Request(
+                webhook_url,
+                data=payload,
+                headers={'Content-Type': 'application/json'},
+                method='POST',
+            )
+            with urllib.request.urlopen(request, timeout=10) as response:
+                response.read()
+            logger.info(f'Low stock digest posted to webhook ({len(rows)} items)')
+            delivered = True
+        except Exception as e:
+            logger.error(f'Failed to post low stock digest webhook: {str(e)}')
+
+    return delivered
@@ -0,0 +1,39 @@
+"""
+Inventory admin forms
+"""
+from django import forms
+
+from apps.inventory.models import StockAdjustment
+
+
+class StockImportForm(forms.Form):
+    """
+    نموذج استيراد المخزون
+    CSV upload for bulk stock adjustments (columns: sku, quantity)
+    """
+
+    file = forms.FileField(
+        label='ملف CSV',
+        help_text='عمودان: sku و quantity (ترميز UTF-8)'
+    )
+
+    mode = forms.ChoiceField(
+        choices=StockAdjustment.MODE_CHOICES,
+        initial='delta',
+        label='نوع التعديل',
+        help_text='إضافة/خصم: تضاف الكمية إلى المخزون الحالي (سالبة للخصم). تعيين: تستبدل الكمية الحالية.'
+    )
+
+    note = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={'rows': 2}),
+        label='ملاحظات',
+        help_text='مثال: شحنة المورد رقم 1234'
+    )
+
+    dry_run = forms.BooleanField(
+        required=False,
+        initial=True,
+        label='معاينة فقط',
+        help_text='عرض تقرير الفروقات دون حفظ أي تغيير'
+    )
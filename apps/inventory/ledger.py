@@ -0,0 +1,141 @@
+"""
+Stock movement ledger
+
+Every change to InventoryItem.quantity goes through move_stock() (single
+items) or is journaled in bulk by the bulk adjustment engine, so the sum of
+an item's movements always equals its quantity. Direct ``save()`` calls are
+picked up by the handlers in ``apps.inventory.signals``. Both paths also
+refresh the Product stock mirror (``apps.inventory.sync``).
+"""
+from django.db import transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from apps.inventory.models import InventoryItem, StockMovement, StockSnapshot
+from apps.inventory.sync import sync_product
+
+SNAPSHOT_BATCH_SIZE = 2000
+
+
+def move_stock(item, delta, reason, order=None, adjustment=None, user=None, note=''):
+    """
+    Add ``delta`` (negative to remove) to ``item`` and record the movement
+
+    The row is re-read under a lock so the balance is computed from the
+    stored quantity, not from a possibly stale instance. Returns False,
+    without writing anything, when the result would be negative.
+    ``item.quantity`` is refreshed either way.
+    """
+    with transaction.atomic():
+        current, product_id, threshold = InventoryItem.objects.select_for_update().filter(
+            pk=item.pk
+        ).values_list('quantity', 'product_id', 'low_stock_threshold').get()
+        after = current + delta
+        if after < 0:
+            item.quantity = current
+            return False
+
+        # update() bypasses the save() signals, so the movement is not recorded twice
+        InventoryItem.objects.filter(pk=item.pk).update(quantity=after, updated_at=timezone.now())
+        sync_product(product_id, after, threshold)
+        StockMovement.objects.create(
+            inventory_id=item.pk,
+            reason=reason,
+            order=order,
+            adjustment=adjustment,
+            delta=delta,
+            balance_after=after,
+            note=note,
+            created_by=user,
+        )
+
+    item.quantity = after
+    return True
+
+
+def movement_history(inventory, since=None, until=None):
+    """
+    Movements for one inventory item, newest first (index range scan on
+    (inventory, created_at))
+    """
+    movements = StockMovement.objects.filter(inventory=inventory)
+    if since is not None:
+        movements = movements.filter(created_at__gte=since)
+    if until is not None:
+        movements = movements.filter(created_at__lte=until)
+    return movements.order_by('-created_at', '-id')
+
+
+def stock_at(inventory, when):
+    """
+    Quantity of one inventory item at ``when``
+
+    The last movement at or before ``when`` carries the balance; without
+    one, the balance before the first later movement is used, and an item
+    with no movements at all has never changed.
+    """
+    movements = StockMovement.objects.filter(inventory=inventory)
+
+    balance = movements.filter(
+        created_at__lte=when
+    ).order_by('-created_at', '-id').values_list('balance_after', flat=True).first()
+    if balance is not None:
+        return balance
+
+    following = movements.filter(
+        created_at__gt=when
+    ).order_by('created_at', 'id').values_list('balance_after', 'delta').first()
+    if following is not None:
+        return following[0] - following[1]
+
+    return InventoryItem.objects.filter(pk=getattr(inventory, 'pk', inventory)).values_list(
+        'quantity', flat=True
+    ).first() or 0
+
+
+def stock_levels_at(when):
+    """
+    Map inventory id -> quantity for the whole catalogue at ``when``
+
+    Starts from the latest snapshot taken at or before ``when`` and adds the
+    movements recorded after it, so only the tail of the ledger is read.
+    Items without stock at ``when`` may be missing or 0.
+    """
+    taken_at = StockSnapshot.objects.filter(
+        taken_at__lte=when
+    ).aggregate(latest=Max('taken_at'))['latest']
+
+    levels = {}
+    movements = StockMovement.objects.filter(created_at__lte=when)
+    if taken_at is not None:
+        levels = dict(
+            StockSnapshot.objects.filter(taken_at=taken_at).values_list('inventory_id', 'quantity')
+        )
+        movements = movements.filter(created_at__gt=taken_at)
+
+    totals = movements.values('inventory_id').annotate(total=Sum('delta')).order_by()
+    for row in totals:
+        levels[row['inventory_id']] = levels.get(row['inventory_id'], 0) + row['total']
+    return levels
+
+
+def take_snapshot(taken_at=None):
+    """
+    Copy every InventoryItem.quantity into StockSnapshot and return the row count
+    """
+    taken_at = taken_at or timezone.now()
+    count = 0
+    with transaction.atomic():
+        batch = []
+        for pk, quantity in InventoryItem.objects.order_by('pk').values_list(
+            'pk', 'quantity'
+        ).iterator(chunk_size=SNAPSHOT_BATCH_SIZE):
+            batch.append(StockSnapshot(inventory_id=pk, quantity=quantity, taken_at=taken_at))
+            if len(batch) >= SNAPSHOT_BATCH_SIZE:
+                StockSnapshot.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            StockSnapshot.objects.bulk_create(batch)
+            count += len(batch)
+    return count
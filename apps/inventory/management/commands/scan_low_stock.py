@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from apps.inventory.alerts import notify_pending_alerts, scan_low_stock
+
+
+class Command(BaseCommand):
+    """
+    فحص المخزون المنخفض
+    Incremental low-stock scan followed by a single digest notification
+    """
+    help = 'Scan inventory changed since the last run for low stock and send one digest'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Re-check every item at or below its threshold instead of only changed items',
+        )
+        parser.add_argument(
+            '--no-notify',
+            action='store_true',
+            help='Update alert state without sending the digest',
+        )
+
+    def handle(self, *args, **options):
+        scan = scan_low_stock(full=options['full'])
+        self.stdout.write(
+            f"{'Full' if scan.full_scan else 'Incremental'} scan: {scan.items_checked} items checked, "
+            f'{scan.alerts_opened} alerts opened, {scan.alerts_resolved} resolved'
+        )
+
+        if options['no_notify']:
+            return
+
+        notified = notify_pending_alerts(scan)
+        self.stdout.write(self.style.SUCCESS(f'Digest sent for {notified} alerts'))
@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.inventory.ledger import take_snapshot
+from apps.inventory.models import StockSnapshot
+
+
+class Command(BaseCommand):
+    """
+    لقطة دورية للمخزون
+    Copy current stock levels into StockSnapshot for point-in-time queries
+    """
+    help = 'Snapshot every inventory quantity (run daily); optionally prune old snapshots'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-days',
+            type=int,
+            default=None,
+            help='Delete snapshots older than N days after taking the new one',
+        )
+
+    def handle(self, *args, **options):
+        rows = take_snapshot()
+        self.stdout.write(self.style.SUCCESS(f'Snapshotted {rows} inventory items'))
+
+        if options['keep_days']:
+            cutoff = timezone.now() - timedelta(days=options['keep_days'])
+            deleted, _ = StockSnapshot.objects.filter(taken_at__lt=cutoff).delete()
+            self.stdout.write(f'Pruned {deleted} snapshot rows older than {cutoff:%Y-%m-%d}')
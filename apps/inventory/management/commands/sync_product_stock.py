@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from apps.inventory.sync import out_of_sync_products, sync_products
+
+
+class Command(BaseCommand):
+    """
+    مزامنة حالة مخزون المنتجات
+    Rebuild the Product stock mirror from InventoryItem
+    """
+    help = 'Resync Product.stock_quantity/stock_status from inventory (use --check to only report drift)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only count products whose mirror disagrees with inventory',
+        )
+
+    def handle(self, *args, **options):
+        drift = out_of_sync_products().count()
+        if options['check']:
+            self.stdout.write(f'{drift} products out of sync')
+            return
+
+        updated = sync_products()
+        self.stdout.write(self.style.SUCCESS(
+            f'Resynced {updated} products ({drift} were out of sync)'
+        ))
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_alter_inventoryitem_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockAdjustment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reference', models.CharField(max_length=50, unique=True, verbose_name='المرجع')),
+                ('mode', models.CharField(choices=[('delta', 'إضافة/خصم كمية'), ('set', 'تعيين الكمية')], default='delta', max_length=10, verbose_name='نوع التعديل')),
+                ('source', models.CharField(choices=[('csv', 'ملف CSV'), ('api', 'واجهة برمجية')], default='api', max_length=10, verbose_name='المصدر')),
+                ('note', models.TextField(blank=True, verbose_name='ملاحظات')),
+                ('rows_total', models.PositiveIntegerField(default=0, verbose_name='عدد الصفوف')),
+                ('rows_applied', models.PositiveIntegerField(default=0, verbose_name='الصفوف المطبقة')),
+                ('rows_rejected', models.PositiveIntegerField(default=0, verbose_name='الصفوف المرفوضة')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الإنشاء')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_adjustments', to=settings.AUTH_USER_MODEL, verbose_name='بواسطة')),
+            ],
+            options={
+                'verbose_name': 'تعديل مخزون',
+                'verbose_name_plural': 'تعديلات المخزون',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockAdjustmentLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sku', models.CharField(max_length=100, verbose_name='رمز المنتج')),
+                ('quantity_before', models.PositiveIntegerField(verbose_name='الكمية قبل')),
+                ('delta', models.IntegerField(verbose_name='التغيير')),
+                ('quantity_after', models.PositiveIntegerField(verbose_name='الكمية بعد')),
+                ('adjustment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='inventory.stockadjustment', verbose_name='التعديل')),
+                ('inventory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='adjustment_lines', to='inventory.inventoryitem', verbose_name='عنصر المخزون')),
+            ],
+            options={
+                'verbose_name': 'سطر تعديل مخزون',
+                'verbose_name_plural': 'أسطر تعديل المخزون',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['inventory', '-id'], name='inventory_s_invento_b73a80_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_opening_balances(apps, schema_editor):
+    """Seed the ledger with one 'initial' movement per stocked item"""
+    InventoryItem = apps.get_model('inventory', 'InventoryItem')
+    StockMovement = apps.get_model('inventory', 'StockMovement')
+    StockMovement.objects.bulk_create(
+        [
+            StockMovement(
+                inventory_id=pk,
+                reason='initial',
+                delta=quantity,
+                balance_after=quantity,
+                note='رصيد افتتاحي عند إنشاء السجل',
+            )
+            for pk, quantity in InventoryItem.objects.filter(
+                quantity__gt=0
+            ).values_list('pk', 'quantity')
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_stockadjustment_stockadjustmentline'),
+        ('orders', '0005_merge_20251104_1845'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.CharField(choices=[('initial', 'رصيد افتتاحي'), ('sale', 'بيع'), ('refund', 'استرداد'), ('admin', 'تعديل يدوي'), ('bulk_import', 'استيراد جماعي'), ('adjustment', 'تعديل')], max_length=20, verbose_name='السبب')),
+                ('delta', models.IntegerField(verbose_name='التغيير')),
+                ('balance_after', models.PositiveIntegerField(verbose_name='الرصيد بعد')),
+                ('note', models.CharField(blank=True, max_length=255, verbose_name='ملاحظة')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الحركة')),
+                ('adjustment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movements', to='inventory.stockadjustment', verbose_name='التعديل الجماعي')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to=settings.AUTH_USER_MODEL, verbose_name='بواسطة')),
+                ('inventory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movements', to='inventory.inventoryitem', verbose_name='عنصر المخزون')),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to='orders.order', verbose_name='الطلب')),
+            ],
+            options={
+                'verbose_name': 'حركة مخزون',
+                'verbose_name_plural': 'حركات المخزون',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['inventory', 'created_at'], name='inventory_s_invento_7edcad_idx'), models.Index(fields=['created_at'], name='inventory_s_created_05ebf5_idx'), models.Index(fields=['order'], name='inventory_s_order_i_e9e6e3_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(verbose_name='الكمية')),
+                ('taken_at', models.DateTimeField(verbose_name='وقت اللقطة')),
+                ('inventory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='inventory.inventoryitem', verbose_name='عنصر المخزون')),
+            ],
+            options={
+                'verbose_name': 'لقطة مخزون',
+                'verbose_name_plural': 'لقطات المخزون',
+                'ordering': ['-taken_at'],
+                'indexes': [models.Index(fields=['taken_at'], name='inventory_s_taken_a_f1ea29_idx')],
+                'constraints': [models.UniqueConstraint(fields=('inventory', 'taken_at'), name='unique_inventory_snapshot')],
+            },
+        ),
+        migrations.RunPython(create_opening_balances, migrations.RunPython.noop),
+    ]
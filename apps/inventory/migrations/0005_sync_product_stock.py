@@ -0,0 +1,62 @@
+from django.db import migrations
+from django.db.models import Case, F, OuterRef, Subquery, Value, When
+
+
+def sync_product_stock(apps, schema_editor):
+    """
+    Make InventoryItem the single source of stock and mirror it onto Product
+
+    Products that never got an InventoryItem keep their legacy
+    stock_quantity as the opening balance; everywhere else the inventory
+    quantity wins over the stale product column.
+    """
+    Product = apps.get_model('store', 'Product')
+    InventoryItem = apps.get_model('inventory', 'InventoryItem')
+    StockMovement = apps.get_model('inventory', 'StockMovement')
+
+    created = InventoryItem.objects.bulk_create(
+        [
+            InventoryItem(product_id=pk, quantity=quantity)
+            for pk, quantity in Product.objects.filter(
+                inventory__isnull=True
+            ).values_list('pk', 'stock_quantity')
+        ],
+        batch_size=1000,
+    )
+    StockMovement.objects.bulk_create(
+        [
+            StockMovement(
+                inventory_id=item.pk,
+                reason='initial',
+                delta=item.quantity,
+                balance_after=item.quantity,
+                note='رصيد افتتاحي من كمية المنتج',
+            )
+            for item in created
+            if item.quantity > 0
+        ],
+        batch_size=1000,
+    )
+
+    inventory = InventoryItem.objects.filter(product=OuterRef('pk'))
+    Product.objects.update(
+        stock_quantity=Subquery(inventory.values('quantity')[:1]),
+        low_stock_threshold=Subquery(inventory.values('low_stock_threshold')[:1]),
+    )
+    Product.objects.update(stock_status=Case(
+        When(stock_quantity=0, then=Value('out_of_stock')),
+        When(stock_quantity__lte=F('low_stock_threshold'), then=Value('low_stock')),
+        default=Value('in_stock'),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_stockmovement_stocksnapshot'),
+        ('store', '0009_product_stock_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(sync_product_stock, migrations.RunPython.noop),
+    ]
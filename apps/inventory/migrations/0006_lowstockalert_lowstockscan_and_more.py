@@ -0,0 +1,70 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_sync_product_stock'),
+        ('store', '0009_product_stock_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LowStockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.CharField(choices=[('low_stock', 'مخزون منخفض'), ('out_of_stock', 'نفد المخزون')], max_length=20, verbose_name='الحالة')),
+                ('quantity', models.PositiveIntegerField(verbose_name='الكمية عند التنبيه')),
+                ('threshold', models.PositiveIntegerField(verbose_name='حد التنبيه')),
+                ('detected_at', models.DateTimeField(verbose_name='تاريخ الاكتشاف')),
+                ('notified_at', models.DateTimeField(blank=True, null=True, verbose_name='تاريخ الإشعار')),
+            ],
+            options={
+                'verbose_name': 'تنبيه مخزون منخفض',
+                'verbose_name_plural': 'تنبيهات المخزون المنخفض',
+                'ordering': ['-detected_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LowStockScan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(verbose_name='وقت البدء')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='وقت الانتهاء')),
+                ('full_scan', models.BooleanField(default=False, verbose_name='فحص كامل')),
+                ('items_checked', models.PositiveIntegerField(default=0, verbose_name='العناصر المفحوصة')),
+                ('alerts_opened', models.PositiveIntegerField(default=0, verbose_name='تنبيهات جديدة')),
+                ('alerts_resolved', models.PositiveIntegerField(default=0, verbose_name='تنبيهات محلولة')),
+                ('alerts_notified', models.PositiveIntegerField(default=0, verbose_name='تنبيهات مُرسلة')),
+            ],
+            options={
+                'verbose_name': 'فحص مخزون منخفض',
+                'verbose_name_plural': 'عمليات فحص المخزون المنخفض',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['updated_at'], name='inventory_i_updated_056069_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(condition=models.Q(('quantity__lte', models.F('low_stock_threshold'))), fields=['quantity'], name='inventory_low_stock_idx'),
+        ),
+        migrations.AddField(
+            model_name='lowstockalert',
+            name='inventory',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='low_stock_alert', to='inventory.inventoryitem', verbose_name='عنصر المخزون'),
+        ),
+        migrations.AddIndex(
+            model_name='lowstockscan',
+            index=models.Index(fields=['started_at'], name='inventory_l_started_0570ef_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lowstockalert',
+            index=models.Index(fields=['notified_at'], name='inventory_l_notifie_edfde6_idx'),
+        ),
+    ]
@@ -1,5 +1,14 @@
 ﻿from .stock import InventoryItem
+from .adjustment import StockAdjustment, StockAdjustmentLine
+from .movement import StockMovement, StockSnapshot
+from .alert import LowStockAlert, LowStockScan
 
 __all__ = [
     'InventoryItem',
+    'StockAdjustment',
+    'StockAdjustmentLine',
+    'StockMovement',
+    'StockSnapshot',
+    'LowStockAlert',
+    'LowStockScan',
 ]
\ No newline at end of file
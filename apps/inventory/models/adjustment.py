@@ -0,0 +1,141 @@
+from django.db import models
+from django.conf import settings
+from .stock import InventoryItem
+
+
+class StockAdjustment(models.Model):
+    """
+    دفعة تعديل مخزون
+    Journal header for one bulk stock adjustment (CSV upload or API call)
+    """
+
+    MODE_CHOICES = [
+        ('delta', 'إضافة/خصم كمية'),
+        ('set', 'تعيين الكمية'),
+    ]
+
+    SOURCE_CHOICES = [
+        ('csv', 'ملف CSV'),
+        ('api', 'واجهة برمجية'),
+    ]
+
+    reference = models.CharField(
+        max_length=50,
+        unique=True,
+        verbose_name='المرجع'
+    )
+
+    mode = models.CharField(
+        max_length=10,
+        choices=MODE_CHOICES,
+        default='delta',
+        verbose_name='نوع التعديل'
+    )
+
+    source = models.CharField(
+        max_length=10,
+        choices=SOURCE_CHOICES,
+        default='api',
+        verbose_name='المصدر'
+    )
+
+    note = models.TextField(
+        blank=True,
+        verbose_name='ملاحظات'
+    )
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='stock_adjustments',
+        verbose_name='بواسطة'
+    )
+
+    rows_total = models.PositiveIntegerField(
+        default=0,
+        verbose_name='عدد الصفوف'
+    )
+
+    rows_applied = models.PositiveIntegerField(
+        default=0,
+        verbose_name='الصفوف المطبقة'
+    )
+
+    rows_rejected = models.PositiveIntegerField(
+        default=0,
+        verbose_name='الصفوف المرفوضة'
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='تاريخ الإنشاء'
+    )
+
+    class Meta:
+        verbose_name = 'تعديل مخزون'
+        verbose_name_plural = 'تعديلات المخزون'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Adjustment {self.reference} ({self.rows_applied} rows)"
+
+    def save(self, *args, **kwargs):
+        """Generate reference if not set"""
+        if not self.reference:
+            import uuid
+            from datetime import datetime
+            timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
+            unique_id = str(uuid.uuid4())[:8].upper()
+            self.reference = f"ADJ-{timestamp}-{unique_id}"
+        super().save(*args, **kwargs)
+
+
+class StockAdjustmentLine(models.Model):
+    """
+    سطر تعديل مخزون
+    One applied SKU change inside a StockAdjustment
+    """
+
+    adjustment = models.ForeignKey(
+        StockAdjustment,
+        on_delete=models.CASCADE,
+        related_name='lines',
+        verbose_name='التعديل'
+    )
+
+    inventory = models.ForeignKey(
+        InventoryItem,
+        on_delete=models.CASCADE,
+        related_name='adjustment_lines',
+        verbose_name='عنصر المخزون'
+    )
+
+    sku = models.CharField(
+        max_length=100,
+        verbose_name='رمز المنتج'
+    )
+
+    quantity_before = models.PositiveIntegerField(
+        verbose_name='الكمية قبل'
+    )
+
+    delta = models.IntegerField(
+        verbose_name='التغيير'
+    )
+
+    quantity_after = models.PositiveIntegerField(
+        verbose_name='الكمية بعد'
+    )
+
+    class Meta:
+        verbose_name = 'سطر تعديل مخزون'
+        verbose_name_plural = 'أسطر تعديل المخزون'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['inventory', '-id']),
+        ]
+
+    def __str__(self):
+        return f"{self.sku}: {self.quantity_before} → {self.quantity_after}"
@@ -0,0 +1,114 @@
+from django.db import models
+from .stock import InventoryItem
+
+
+class LowStockAlert(models.Model):
+    """
+    تنبيه مخزون منخفض
+    Open low/out-of-stock alert for one inventory item
+
+    A row exists while the item is at or below its threshold and is deleted
+    once it recovers, so an item is only reported again after it changes
+    state. ``notified_at`` stays empty until a digest has been delivered.
+    """
+
+    STATE_CHOICES = [
+        ('low_stock', 'مخزون منخفض'),
+        ('out_of_stock', 'نفد المخزون'),
+    ]
+
+    inventory = models.OneToOneField(
+        InventoryItem,
+        on_delete=models.CASCADE,
+        related_name='low_stock_alert',
+        verbose_name='عنصر المخزون'
+    )
+
+    state = models.CharField(
+        max_length=20,
+        choices=STATE_CHOICES,
+        verbose_name='الحالة'
+    )
+
+    quantity = models.PositiveIntegerField(
+        verbose_name='الكمية عند التنبيه'
+    )
+
+    threshold = models.PositiveIntegerField(
+        verbose_name='حد التنبيه'
+    )
+
+    detected_at = models.DateTimeField(
+        verbose_name='تاريخ الاكتشاف'
+    )
+
+    notified_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='تاريخ الإشعار'
+    )
+
+    class Meta:
+        verbose_name = 'تنبيه مخزون منخفض'
+        verbose_name_plural = 'تنبيهات المخزون المنخفض'
+        ordering = ['-detected_at']
+        indexes = [
+            models.Index(fields=['notified_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.inventory_id}: {self.get_state_display()} ({self.quantity})"
+
+
+class LowStockScan(models.Model):
+    """
+    سجل فحص المخزون المنخفض
+    One run of ``manage.py scan_low_stock``; the last run is the watermark
+    for the next incremental scan
+    """
+
+    started_at = models.DateTimeField(
+        verbose_name='وقت البدء'
+    )
+
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='وقت الانتهاء'
+    )
+
+    full_scan = models.BooleanField(
+        default=False,
+        verbose_name='فحص كامل'
+    )
+
+    items_checked = models.PositiveIntegerField(
+        default=0,
+        verbose_name='العناصر المفحوصة'
+    )
+
+    alerts_opened = models.PositiveIntegerField(
+        default=0,
+        verbose_name='تنبيهات جديدة'
+    )
+
+    alerts_resolved = models.PositiveIntegerField(
+        default=0,
+        verbose_name='تنبيهات محلولة'
+    )
+
+    alerts_notified = models.PositiveIntegerField(
+        default=0,
+        verbose_name='تنبيهات مُرسلة'
+    )
+
+    class Meta:
+        verbose_name = 'فحص مخزون منخفض'
+        verbose_name_plural = 'عمليات فحص المخزون المنخفض'
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['started_at']),
+        ]
+
+    def __str__(self):
+        return f"Low stock scan {self.started_at:%Y-%m-%d %H:%M}"
@@ -0,0 +1,134 @@
+from django.db import models
+from django.conf import settings
+from .stock import InventoryItem
+from .adjustment import StockAdjustment
+
+
+class StockMovement(models.Model):
+    """
+    حركة مخزون
+    Append-only ledger entry: one row per change to InventoryItem.quantity
+
+    ``balance_after`` makes "stock at time T" for a SKU a single index seek
+    on (inventory, created_at) instead of a replay of earlier movements.
+    """
+
+    REASON_CHOICES = [
+        ('initial', 'رصيد افتتاحي'),
+        ('sale', 'بيع'),
+        ('refund', 'استرداد'),
+        ('admin', 'تعديل يدوي'),
+        ('bulk_import', 'استيراد جماعي'),
+        ('adjustment', 'تعديل'),
+    ]
+
+    inventory = models.ForeignKey(
+        InventoryItem,
+        on_delete=models.CASCADE,
+        related_name='movements',
+        verbose_name='عنصر المخزون'
+    )
+
+    reason = models.CharField(
+        max_length=20,
+        choices=REASON_CHOICES,
+        verbose_name='السبب'
+    )
+
+    order = models.ForeignKey(
+        'orders.Order',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='stock_movements',
+        verbose_name='الطلب'
+    )
+
+    adjustment = models.ForeignKey(
+        StockAdjustment,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='movements',
+        verbose_name='التعديل الجماعي'
+    )
+
+    delta = models.IntegerField(
+        verbose_name='التغيير'
+    )
+
+    balance_after = models.PositiveIntegerField(
+        verbose_name='الرصيد بعد'
+    )
+
+    note = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name='ملاحظة'
+    )
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='stock_movements',
+        verbose_name='بواسطة'
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='تاريخ الحركة'
+    )
+
+    class Meta:
+        verbose_name = 'حركة مخزون'
+        verbose_name_plural = 'حركات المخزون'
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['inventory', 'created_at']),
+            models.Index(fields=['created_at']),
+            models.Index(fields=['order']),
+        ]
+
+    def __str__(self):
+        sign = '+' if self.delta > 0 else ''
+        return f"{self.inventory_id}: {sign}{self.delta} → {self.balance_after} ({self.reason})"
+
+
+class StockSnapshot(models.Model):
+    """
+    لقطة مخزون
+    Periodic copy of every InventoryItem.quantity, written by
+    ``manage.py snapshot_stock``. Catalogue-wide "stock at time T" starts
+    from the latest snapshot before T and only adds the movements after it.
+    """
+
+    inventory = models.ForeignKey(
+        InventoryItem,
+        on_delete=models.CASCADE,
+        related_name='snapshots',
+        verbose_name='عنصر المخزون'
+    )
+
+    quantity = models.PositiveIntegerField(
+        verbose_name='الكمية'
+    )
+
+    taken_at = models.DateTimeField(
+        verbose_name='وقت اللقطة'
+    )
+
+    class Meta:
+        verbose_name = 'لقطة مخزون'
+        verbose_name_plural = 'لقطات المخزون'
+        ordering = ['-taken_at']
+        indexes = [
+            models.Index(fields=['taken_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['inventory', 'taken_at'], name='unique_inventory_snapshot'),
+        ]
+
+    def __str__(self):
+        return f"{self.inventory_id} @ {self.taken_at:%Y-%m-%d %H:%M}: {self.quantity}"
@@ -47,6 +47,14 @@ class InventoryItem(models.Model):
         indexes = [
             models.Index(fields=['product']),
             models.Index(fields=['quantity']),
+            # Incremental low-stock scans read rows changed since the last run
+            models.Index(fields=['updated_at']),
+            # Partial index covering only items at or below their threshold
+            models.Index(
+                fields=['quantity'],
+                condition=models.Q(quantity__lte=models.F('low_stock_threshold')),
+                name='inventory_low_stock_idx',
+            ),
         ]
     
     def __str__(self):
@@ -75,22 +83,20 @@ class InventoryItem(models.Model):
         else:
             return 'متوفر'
     
-    def add_stock(self, quantity):
+    def add_stock(self, quantity, reason='adjustment', order=None, user=None, note=''):
         """
-        Add stock quantity
+        Add stock quantity and record it in the movement ledger
         """
         if quantity > 0:
-            self.quantity += quantity
-            self.save()
-            return True
+            from apps.inventory.ledger import move_stock
+            return move_stock(self, quantity, reason, order=order, user=user, note=note)
         return False
     
-    def remove_stock(self, quantity):
+    def remove_stock(self, quantity, reason='adjustment', order=None, user=None, note=''):
         """
-        Remove stock quantity
+        Remove stock quantity and record it in the movement ledger
         """
-        if quantity > 0 and self.quantity >= quantity:
-            self.quantity -= quantity
-            self.save()
-            return True
+        if quantity > 0:
+            from apps.inventory.ledger import move_stock
+            return move_stock(self, -quantity, reason, order=order, user=user, note=note)
         return False
@@ -0,0 +1,53 @@
+"""
+Record ledger movements for quantity changes made through ``save()``
+
+Admin edits and any other direct save land here. Callers can set
+``_movement_reason`` and ``_movement_user`` on the instance before saving
+to attribute the change. move_stock() and the bulk engine write with
+queryset updates and record their own movements.
+
+Every save or delete also refreshes the product's stock mirror.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.inventory.models import InventoryItem, StockMovement
+from apps.inventory.sync import sync_product
+
+
+@receiver(pre_save, sender=InventoryItem)
+def remember_quantity(sender, instance, raw=False, **kwargs):
+    """Keep the stored quantity so post_save can compute the delta"""
+    instance._quantity_before = None
+    if raw or instance.pk is None:
+        return
+    instance._quantity_before = InventoryItem.objects.filter(
+        pk=instance.pk
+    ).values_list('quantity', flat=True).first()
+
+
+@receiver(post_save, sender=InventoryItem)
+def record_quantity_change(sender, instance, created, raw=False, **kwargs):
+    """Append a movement when the saved quantity differs from the stored one"""
+    if raw:
+        return
+    sync_product(instance.product_id, instance.quantity, instance.low_stock_threshold)
+
+    before = 0 if created else getattr(instance, '_quantity_before', None)
+    if before is None or before == instance.quantity:
+        return
+
+    reason = 'initial' if created else getattr(instance, '_movement_reason', 'adjustment')
+    StockMovement.objects.create(
+        inventory=instance,
+        reason=reason,
+        delta=instance.quantity - before,
+        balance_after=instance.quantity,
+        created_by=getattr(instance, '_movement_user', None),
+    )
+
+
+@receiver(post_delete, sender=InventoryItem)
+def clear_product_stock(sender, instance, **kwargs):
+    """A product without an inventory item cannot be sold"""
+    sync_product(instance.product_id, 0, instance.low_stock_threshold)
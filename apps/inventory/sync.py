@@ -0,0 +1,81 @@
+"""
+Keep the Product stock read model in step with InventoryItem
+
+InventoryItem is the only place stock is written (ledger, webhooks, admin,
+bulk import). Product carries a mirror of ``quantity`` and
+``low_stock_threshold`` plus an indexed ``stock_status`` flag, so
+storefront and dashboard reads never need the inventory join.
+
+The mirror is written with queryset updates, so ``updated_at`` (the
+storefront's HTTP validator) is bumped and the anonymous page cache is
+purged here for the products whose stock changed.
+"""
+from django.db.models import Case, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Now
+
+from apps.inventory.models import InventoryItem
+from apps.store.models import Product
+from apps.store.page_cache import ALL_PAGES_TAG, invalidate_products, invalidate_tags
+
+SYNC_BATCH_SIZE = 1000
+
+STOCK_STATUS_CASE = Case(
+    When(stock_quantity=0, then=Value('out_of_stock')),
+    When(stock_quantity__lte=F('low_stock_threshold'), then=Value('low_stock')),
+    default=Value('in_stock'),
+)
+
+
+def sync_product(product_id, quantity, threshold):
+    """Write one product's mirror from values the caller already holds"""
+    Product.objects.filter(pk=product_id).update(
+        stock_quantity=quantity,
+        low_stock_threshold=threshold,
+        stock_status=Product.stock_status_for(quantity, threshold),
+        updated_at=Now(),
+    )
+    invalidate_products([product_id])
+
+
+def sync_products(product_ids=None):
+    """
+    Refresh the mirror for ``product_ids`` (every product when ``None``)
+
+    Two set-based UPDATEs per batch: copy quantity/threshold with correlated
+    subqueries, then derive stock_status from the copied columns. Products
+    without an InventoryItem read as out of stock.
+    """
+    inventory = InventoryItem.objects.filter(product=OuterRef('pk'))
+    copy = {
+        'stock_quantity': Coalesce(Subquery(inventory.values('quantity')[:1]), Value(0)),
+        'low_stock_threshold': Coalesce(
+            Subquery(inventory.values('low_stock_threshold')[:1]), F('low_stock_threshold')
+        ),
+    }
+
+    if product_ids is None:
+        Product.objects.update(**copy)
+        updated = Product.objects.update(stock_status=STOCK_STATUS_CASE, updated_at=Now())
+        invalidate_tags(ALL_PAGES_TAG)
+        return updated
+
+    product_ids = list(product_ids)
+    updated = 0
+    for start in range(0, len(product_ids), SYNC_BATCH_SIZE):
+        batch = Product.objects.filter(pk__in=product_ids[start:start + SYNC_BATCH_SIZE])
+        batch.update(**copy)
+        updated += batch.update(stock_status=STOCK_STATUS_CASE, updated_at=Now())
+    if len(product_ids) > SYNC_BATCH_SIZE:
+        invalidate_tags(ALL_PAGES_TAG)
+    else:
+        invalidate_products(product_ids)
+    return updated
+
+
+def out_of_sync_products():
+    """Products whose mirror disagrees with their InventoryItem"""
+    return Product.objects.filter(
+        ~Q(stock_quantity=Coalesce(F('inventory__quantity'), Value(0)))
+        | ~Q(stock_status=STOCK_STATUS_CASE)
+        | Q(inventory__isnull=False) & ~Q(low_stock_threshold=F('inventory__low_stock_threshold'))
+    )
@@ -1,3 +1,258 @@
-﻿from django.test import TestCase
+﻿from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.inventory.alerts import notify_pending_alerts, pending_alerts, scan_low_stock
+from apps.inventory.bulk import apply_stock_adjustments, read_stock_csv
+from apps.inventory.ledger import move_stock, stock_at, stock_levels_at, take_snapshot
+from apps.inventory.models import (
+    InventoryItem, LowStockAlert, LowStockScan, StockAdjustment, StockMovement, StockSnapshot,
+)
+from apps.inventory.sync import out_of_sync_products, sync_products
+from apps.store.models import Brand, Category, Product
+
+
+class InventoryTestCase(TestCase):
+    """Four stocked products (20, 5, 0 and 50 units, threshold 10) and a staff user"""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='فلاتر', slug='filters')
+        brand = Brand.objects.create(name='تويوتا', slug='toyota')
+        cls.staff = get_user_model().objects.create_superuser('staff', 'staff@example.com', 'password')
+        cls.items = [
+            InventoryItem.objects.create(
+                product=Product.objects.create(
+                    name=f'فلتر {i}', slug=f'filter-{i}', sku=f'FLT-{i}', description='-',
+                    category=category, brand=brand, price=Decimal('50.00'), main_image=f'products/filter-{i}.jpg',
+                ),
+                quantity=quantity,
+                low_stock_threshold=10,
+            )
+            for i, quantity in enumerate((20, 5, 0, 50))
+        ]
+
+    def quantity(self, item):
+        return InventoryItem.objects.values_list('quantity', flat=True).get(pk=item.pk)
+
+
+class BulkStockAdjustmentTests(InventoryTestCase):
+    """
+    محرك تعديل المخزون الجماعي واستيراد CSV
+    Bulk stock engine: deltas, sets, rejected rows and the CSV upload
+    """
+
+    def test_deltas_and_sets_are_applied_and_journaled(self):
+        first, second, empty, _ = self.items
+        report = apply_stock_adjustments([
+            (first.product.sku, '5', 2),
+            (first.product.sku, '-2', 3),
+            (second.product.sku, '-9', 4),
+            ('NO-SUCH-SKU', '1', 5),
+            (empty.product.sku, 'many', 6),
+            ('', '1', 7),
+        ])
+        self.assertEqual(self.quantity(first), 23)
+        self.assertEqual(self.quantity(second), 5)
+        self.assertEqual(report.applied_count, 1)
+        self.assertEqual(
+            sorted(error['line'] for error in report.errors), [4, 5, 6, 7],
+        )
+        self.assertEqual(report.adjustment.lines.get().quantity_after, 23)
+        movement = StockMovement.objects.filter(inventory=first).latest('id')
+        self.assertEqual((movement.reason, movement.delta, movement.balance_after), ('bulk_import', 3, 23))
+
+        report = apply_stock_adjustments([(second.product.sku, 5), (empty.product.sku, 7)], mode='set')
+        self.assertEqual(report.unchanged, [second.product.sku])
+        self.assertEqual(self.quantity(empty), 7)
+        self.assertEqual(Product.objects.get(pk=empty.product_id).stock_status, 'low_stock')
+
+    def test_dry_run_writes_nothing(self):
+        first = self.items[0]
+        adjustments = StockAdjustment.objects.count()
+        report = apply_stock_adjustments([(first.product.sku, 100)], mode='set', dry_run=True)
+        self.assertEqual(report.changes[0]['after'], 100)
+        self.assertIsNone(report.adjustment)
+        self.assertEqual(self.quantity(first), 20)
+        self.assertEqual(StockAdjustment.objects.count(), adjustments)
+
+    def test_csv_upload(self):
+        first, second = self.items[:2]
+        with self.assertRaises(ValueError):
+            list(read_stock_csv(SimpleUploadedFile('stock.csv', b'code,qty\nA,1\n')))
+        with self.assertRaisesMessage(ValueError, 'السطر 3'):
+            list(read_stock_csv(SimpleUploadedFile('stock.csv', b'sku,quantity\nA,1\n' + b'B' * 200000 + b',1\n')))
+
+        self.client.force_login(self.staff)
+        content = f'\ufeffSKU,Quantity\n{first.product.sku},4\n{second.product.sku},-6\n'.encode()
+        response = self.client.post(reverse('admin:inventory_inventoryitem_import'), {
+            'file': SimpleUploadedFile('stock.csv', content, content_type='text/csv'),
+            'mode': 'delta',
+            'note': 'شحنة',
+        })
+        self.assertEqual(response.status_code, 200)
+        report = response.context['report']
+        self.assertEqual(report.applied_count, 1)
+        self.assertEqual(report.errors[0]['line'], 3)
+        self.assertEqual(self.quantity(first), 24)
+        self.assertEqual(self.quantity(second), 5)
+
+        response = self.client.post(reverse('admin:inventory_inventoryitem_import'), {
+            'file': SimpleUploadedFile('stock.csv', 'SKU,Quantity\nقطعة,1\n'.encode('cp1256')),
+            'mode': 'delta',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('السطر 2', response.context['form'].errors['file'][0])
+
+
+class StockLedgerTests(InventoryTestCase):
+    """
+    سجل حركات المخزون واللقطات
+    Ledger movements, point-in-time stock and snapshots
+    """
+
+    def test_moves_are_journaled_with_balances(self):
+        item = InventoryItem.objects.get(pk=self.items[0].pk)
+        self.assertTrue(item.add_stock(10, reason='refund'))
+        self.assertTrue(move_stock(item, -4, 'sale'))
+        self.assertFalse(item.remove_stock(100))
+        self.assertEqual(item.quantity, 26)
+
+        item.quantity = 30
+        item._movement_reason = 'admin'
+        item.save()
+        movements = list(item.movements.order_by('id').values_list('reason', 'delta', 'balance_after'))
+        self.assertEqual(movements[-3:], [('refund', 10, 30), ('sale', -4, 26), ('admin', 4, 30)])
+        self.assertEqual(Product.objects.get(pk=item.product_id).stock_quantity, 30)
+
+    def test_stock_at_a_point_in_time(self):
+        item = InventoryItem.objects.get(pk=self.items[0].pk)
+        item.movements.all().delete()
+        now = timezone.now()
+        item.add_stock(10)
+        item.remove_stock(4)
+        first, second = item.movements.order_by('id')
+        StockMovement.objects.filter(pk=first.pk).update(created_at=now - timedelta(hours=2))
+        StockMovement.objects.filter(pk=second.pk).update(created_at=now - timedelta(hours=1))
+
+        self.assertEqual(stock_at(item, now - timedelta(hours=3)), 20)
+        self.assertEqual(stock_at(item, now - timedelta(minutes=90)), 30)
+        self.assertEqual(stock_at(item, now), 26)
+
+    def test_levels_from_the_latest_snapshot_and_the_tail(self):
+        snapshot_at = timezone.now()
+        items = InventoryItem.objects.count()
+        self.assertEqual(take_snapshot(snapshot_at), items)
+        self.assertEqual(StockSnapshot.objects.filter(taken_at=snapshot_at).count(), items)
+
+        first, second = self.items[:2]
+        first.add_stock(3)
+        second.remove_stock(2)
+        current = dict(InventoryItem.objects.values_list('pk', 'quantity'))
+        with self.assertNumQueries(3):
+            levels = stock_levels_at(timezone.now())
+        self.assertEqual(levels, current)
+        self.assertEqual(stock_levels_at(snapshot_at)[first.pk], 20)
+
+
+class StockMirrorTests(InventoryTestCase):
+    """
+    نسخة المخزون على المنتج
+    Product's stock mirror follows InventoryItem and can be repaired
+    """
+
+    def mirror(self, item):
+        return Product.objects.values_list(
+            'stock_quantity', 'low_stock_threshold', 'stock_status',
+        ).get(pk=item.product_id)
+
+    def test_saves_and_deletes_update_the_mirror(self):
+        full, low, empty, _ = self.items
+        self.assertEqual(self.mirror(full), (20, 10, 'in_stock'))
+        self.assertEqual(self.mirror(low), (5, 10, 'low_stock'))
+        self.assertEqual(self.mirror(empty), (0, 10, 'out_of_stock'))
+
+        low.low_stock_threshold = 3
+        low.save()
+        self.assertEqual(self.mirror(low), (5, 3, 'in_stock'))
+
+        InventoryItem.objects.filter(pk=full.pk).delete()
+        self.assertEqual(self.mirror(full)[::2], (0, 'out_of_stock'))
+
+    def test_stale_product_save_keeps_the_mirror(self):
+        item = self.items[0]
+        product = Product.objects.get(pk=item.product_id)
+        item.remove_stock(20)
+        product.name = 'اسم جديد'
+        product.save()
+        self.assertEqual(self.mirror(item), (0, 10, 'out_of_stock'))
+
+    def test_drift_is_found_and_repaired(self):
+        full, low = self.items[:2]
+        # Queryset updates bypass the signals
+        InventoryItem.objects.filter(pk__in=[full.pk, low.pk]).update(quantity=0)
+        self.assertEqual(
+            set(out_of_sync_products().values_list('pk', flat=True)), {full.product_id, low.product_id},
+        )
+
+        self.assertEqual(sync_products([full.product_id]), 1)
+        self.assertEqual(self.mirror(full), (0, 10, 'out_of_stock'))
+
+        out = StringIO()
+        call_command('sync_product_stock', stdout=out)
+        self.assertIn('(1 were out of sync)', out.getvalue())
+        self.assertFalse(out_of_sync_products().exists())
+
+
+@override_settings(LOW_STOCK_ALERT_EMAILS=['buyer@example.com'], LOW_STOCK_ALERT_WEBHOOK_URL='')
+class LowStockScanTests(InventoryTestCase):
+    """
+    فحص المخزون المنخفض وملخص التنبيهات
+    Incremental low-stock scans and the single digest
+    """
+
+    def alert(self, item):
+        return LowStockAlert.objects.filter(inventory=item).values_list('state', flat=True).first()
+
+    def test_scan_opens_escalates_and_resolves_alerts(self):
+        full, low, empty, _ = self.items
+        scan = scan_low_stock()
+        self.assertTrue(scan.full_scan)
+        self.assertEqual((self.alert(full), self.alert(low), self.alert(empty)), (None, 'low_stock', 'out_of_stock'))
+
+        # Only items changed since the last run are read again
+        InventoryItem.objects.update(updated_at=timezone.now() - timedelta(days=1))
+        LowStockScan.objects.update(started_at=timezone.now() - timedelta(hours=1))
+        low.remove_stock(5)
+        empty.add_stock(30)
+        scan = scan_low_stock()
+        self.assertFalse(scan.full_scan)
+        self.assertEqual((scan.items_checked, scan.alerts_opened, scan.alerts_resolved), (2, 1, 1))
+        self.assertEqual((self.alert(low), self.alert(empty)), ('out_of_stock', None))
+
+    def test_one_digest_for_pending_alerts(self):
+        scan = scan_low_stock()
+        pending = pending_alerts().count()
+        self.assertGreater(pending, 0)
+
+        with override_settings(LOW_STOCK_ALERT_EMAILS=[]):
+            self.assertEqual(notify_pending_alerts(scan), 0)
+        self.assertEqual(pending_alerts().count(), pending)
+
+        self.assertEqual(notify_pending_alerts(scan), pending)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(self.items[2].product.sku, mail.outbox[0].body)
+        self.assertEqual(notify_pending_alerts(scan), 0)
+
+        # An escalation is news again
+        self.items[1].remove_stock(5)
+        scan_low_stock()
+        self.assertEqual(list(pending_alerts().values_list('inventory_id', flat=True)), [self.items[1].pk])
@@ -9,3 +9,7 @@ class OrdersConfig(AppConfig):
     divider_title = "إدارة المتجر"  # Section divider title
     priority = 90  # Sidebar ordering (higher = top)
     hide = False  # Show in sidebar
+
+    def ready(self):
+        # Register the guest cart merge on login
+        from apps.orders import signals  # noqa
@@ -4,8 +4,16 @@
 def cart_context(request):
     """
     Add cart information to all templates
+
+    Never creates a cart: visitors who have not added anything get None.
+    Pages rendered for the page cache get None too (the mini-cart is
+    loaded separately, see apps.store.page_cache).
     """
-    cart = get_cart(request)
+    if getattr(request, 'page_cache_holes', False):
+        return {'cart': None}
+    cart = get_cart(request, create=False)
+    if cart:
+        cart.prefetch_items()
     return {
         'cart': cart,
     }
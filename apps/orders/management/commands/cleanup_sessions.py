@@ -0,0 +1,41 @@
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.orders.models import Cart
+
+
+class Command(BaseCommand):
+    """
+    تنظيف الجلسات وسلال الضيوف المنتهية
+    Delete expired session rows and abandoned guest carts
+    """
+    help = 'Clear expired sessions (database-backed engines) and guest carts untouched for N days'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cart-days',
+            type=int,
+            default=settings.GUEST_CART_MAX_AGE_DAYS,
+            help='Delete guest carts with no cart or item change in this many days',
+        )
+
+    def handle(self, *args, **options):
+        # Signed-cookie sessions expire on the client; only rows need clearing
+        engine = import_module(settings.SESSION_ENGINE)
+        engine.SessionStore.clear_expired()
+
+        # Guest carts are keyed from the visitor's cookie, so nothing tells
+        # the database when that cookie is gone; age is the only signal
+        cutoff = timezone.now() - timedelta(days=options['cart_days'])
+        stale = Cart.objects.filter(
+            user=None, updated_at__lt=cutoff
+        ).exclude(items__updated_at__gte=cutoff)
+        _, by_model = stale.delete()
+        carts = by_model.get(Cart._meta.label, 0)
+        self.stdout.write(self.style.SUCCESS(
+            f'Cleared expired sessions; deleted {carts} guest carts untouched since {cutoff:%Y-%m-%d}'
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.orders.purchases import rebuild_purchases
+
+
+class Command(BaseCommand):
+    """
+    إعادة بناء فهرس المشتريات
+    Rebuild the Purchase index from paid and delivered orders
+    """
+    help = 'Recompute the (user, product) purchase index used for verified-purchase reviews'
+
+    def handle(self, *args, **options):
+        rows = rebuild_purchases()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} purchase rows'))
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def build_purchases(apps, schema_editor):
+    """One row per (user, product) in a paid or delivered, not cancelled order"""
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    Purchase = apps.get_model('orders', 'Purchase')
+    rows = OrderItem.objects.filter(
+        Q(order__payment_status='paid') | Q(order__status='delivered'),
+    ).exclude(
+        Q(order__status='cancelled') | Q(order__payment_status='refunded'),
+    ).values('order__user_id', 'product_id').annotate(order_lines=Count('id')).order_by()
+    Purchase.objects.bulk_create(
+        [
+            Purchase(user_id=row['order__user_id'], product_id=row['product_id'], order_lines=row['order_lines'])
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_merge_20251104_1845'),
+        ('store', '0012_review_feed_indexes_rating_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Purchase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_lines', models.PositiveIntegerField(default=0, verbose_name='عدد بنود الطلبات')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='purchases', to='store.product', verbose_name='المنتج')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='purchases', to=settings.AUTH_USER_MODEL, verbose_name='المستخدم')),
+            ],
+            options={
+                'verbose_name': 'عملية شراء',
+                'verbose_name_plural': 'المشتريات',
+                'constraints': [models.UniqueConstraint(fields=('user', 'product'), name='orders_purchase_user_product')],
+            },
+        ),
+        migrations.RunPython(build_purchases, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,11 @@
 ﻿from .cart import Cart, CartItem
 from .order import Order, OrderItem
+from .purchase import Purchase
 
 __all__ = [
     'Cart',
     'CartItem',
     'Order',
     'OrderItem',
+    'Purchase',
 ]
@@ -1,4 +1,5 @@
 ﻿from django.db import models
+from django.db.models import prefetch_related_objects
 from django.conf import settings
 from apps.store.models import Product
 
@@ -63,6 +64,19 @@ class Cart(models.Model):
         # In future, add shipping and tax calculations
         return self.subtotal
 
+    def prefetch_items(self):
+        """
+        Load items with their products in one query
+
+        Totals and templates iterating ``cart.items.all`` then read the
+        prefetched rows instead of querying per access and per product.
+        """
+        prefetch_related_objects(
+            [self],
+            models.Prefetch('items', queryset=CartItem.objects.select_related('product')),
+        )
+        return self
+
     def clear(self):
         """Remove all items from cart"""
         self.items.all().delete()
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.db import models
+from apps.store.models import Product
+
+
+class Purchase(models.Model):
+    """
+    مشتريات العميل
+    One row per (user, product) the user has bought in a paid or delivered order
+
+    Maintained from order status transitions by orders.signals (see
+    orders.purchases); ``manage.py rebuild_purchases`` recomputes it.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='purchases',
+        verbose_name='المستخدم'
+    )
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='purchases',
+        verbose_name='المنتج'
+    )
+
+    # Qualifying order lines; the row is removed when it drops to zero
+    order_lines = models.PositiveIntegerField(
+        default=0,
+        verbose_name='عدد بنود الطلبات'
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='تاريخ التحديث'
+    )
+
+    class Meta:
+        verbose_name = 'عملية شراء'
+        verbose_name_plural = 'المشتريات'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'product'], name='orders_purchase_user_product'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} → {self.product_id} ({self.order_lines})"
@@ -0,0 +1,93 @@
+"""
+Purchase index - which products each user has bought
+
+A review is a verified purchase when the reviewer has a Purchase row for
+the product: one lookup on the unique ``(user, product)`` index instead
+of scanning the user's orders and their items. orders.signals keeps the
+rows in step with order status transitions and order item changes;
+queryset ``update()`` / ``bulk_create()`` bypass it, so run ``manage.py
+rebuild_purchases`` after bulk edits.
+"""
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+
+from apps.orders.models import OrderItem, Purchase
+
+
+def counts_as_purchase(status, payment_status):
+    """
+    Whether an order in this state counts as bought (paid online, or
+    delivered and paid on delivery) and has not been cancelled or refunded
+    """
+    if status == 'cancelled' or payment_status == 'refunded':
+        return False
+    return payment_status == 'paid' or status == 'delivered'
+
+
+def has_purchased(user, product):
+    """One indexed existence check on Purchase"""
+    if not user.is_authenticated:
+        return False
+    return Purchase.objects.filter(user=user, product=product).exists()
+
+
+def apply_purchase_delta(user_id, product_id, lines):
+    """
+    Add ``lines`` qualifying order lines to the (user, product) row
+
+    The row is created on first use (a concurrent creator is handled by
+    retrying the UPDATE once the unique constraint fires) and deleted
+    once no qualifying line is left.
+    """
+    rows = Purchase.objects.filter(user_id=user_id, product_id=product_id)
+    if lines > 0:
+        if rows.update(order_lines=F('order_lines') + lines):
+            return
+        try:
+            with transaction.atomic():
+                Purchase.objects.create(user_id=user_id, product_id=product_id, order_lines=lines)
+        except IntegrityError:
+            rows.update(order_lines=F('order_lines') + lines)
+    elif lines < 0:
+        rows.filter(order_lines__lte=-lines).delete()
+        rows.update(order_lines=F('order_lines') + lines)
+
+
+def record_purchase_change(user_id, product_ids, was_purchase, is_purchase):
+    """
+    Apply an order's qualification change to the lines for ``product_ids``
+
+    ``product_ids`` lists one product id per order line, so a product on
+    two lines of the same order counts twice and is removed twice.
+    """
+    if was_purchase == is_purchase:
+        return
+    sign = 1 if is_purchase else -1
+    for product_id, lines in Counter(product_ids).items():
+        apply_purchase_delta(user_id, product_id, sign * lines)
+
+
+def rebuild_purchases():
+    """
+    Recompute every Purchase row from the orders tables
+
+    Returns the number of (user, product) rows written.
+    """
+    rows = OrderItem.objects.filter(
+        Q(order__payment_status='paid') | Q(order__status='delivered'),
+    ).exclude(
+        Q(order__status='cancelled') | Q(order__payment_status='refunded'),
+    ).values('order__user_id', 'product_id').annotate(order_lines=Count('id')).order_by()
+
+    with transaction.atomic():
+        Purchase.objects.all().delete()
+        purchases = Purchase.objects.bulk_create(
+            [
+                Purchase(user_id=row['order__user_id'], product_id=row['product_id'], order_lines=row['order_lines'])
+                for row in rows
+            ],
+            batch_size=1000,
+        )
+    return len(purchases)
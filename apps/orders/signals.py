@@ -0,0 +1,76 @@
+"""
+Carry a guest's cart over to their account when they log in
+
+Guest carts are keyed by a value in the (signed-cookie) session rather than
+by a session row. auth.login() keeps the session data while cycling the
+key, so the guest cart key is still there when user_logged_in fires.
+
+Order status transitions and order item changes also keep the Purchase
+index in step (see orders.purchases).
+"""
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.orders.models import Order, OrderItem
+from apps.orders.purchases import counts_as_purchase, record_purchase_change
+from apps.orders.utils import merge_guest_cart
+
+
+@receiver(user_logged_in)
+def merge_cart_on_login(sender, request, user, **kwargs):
+    """Merge the guest cart into the user's cart"""
+    if request is not None and hasattr(request, 'session'):
+        merge_guest_cart(request, user)
+
+
+@receiver(pre_save, sender=Order)
+def remember_purchase_state(sender, instance, raw=False, **kwargs):
+    """Snapshot whether the stored order counted as a purchase"""
+    instance._was_purchase = False
+    if raw or instance.pk is None:
+        return
+    stored = Order.objects.filter(pk=instance.pk).values_list('status', 'payment_status').first()
+    instance._was_purchase = bool(stored) and counts_as_purchase(*stored)
+
+
+@receiver(post_save, sender=Order)
+def update_purchases(sender, instance, raw=False, **kwargs):
+    """Add or remove the order's lines when it starts or stops counting"""
+    if raw:
+        return
+    was_purchase = getattr(instance, '_was_purchase', False)
+    is_purchase = counts_as_purchase(instance.status, instance.payment_status)
+    if was_purchase != is_purchase:
+        record_purchase_change(
+            instance.user_id,
+            list(instance.items.values_list('product_id', flat=True)),
+            was_purchase,
+            is_purchase,
+        )
+
+
+def _purchasing_user(order_id):
+    """The order's user id if the order counts as a purchase, else None"""
+    order = Order.objects.filter(pk=order_id).values_list('user_id', 'status', 'payment_status').first()
+    if order and counts_as_purchase(order[1], order[2]):
+        return order[0]
+    return None
+
+
+@receiver(post_save, sender=OrderItem)
+def add_item_purchase(sender, instance, created, raw=False, **kwargs):
+    """A line added to an order that already counts"""
+    if raw or not created:
+        return
+    user_id = _purchasing_user(instance.order_id)
+    if user_id:
+        record_purchase_change(user_id, [instance.product_id], False, True)
+
+
+@receiver(post_delete, sender=OrderItem)
+def remove_item_purchase(sender, instance, **kwargs):
+    """A line removed from an order that still counts (or being deleted with it)"""
+    user_id = _purchasing_user(instance.order_id)
+    if user_id:
+        record_purchase_change(user_id, [instance.product_id], True, False)
@@ -1,3 +1,211 @@
-﻿from django.test import TestCase
+﻿from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.dashboard.loadtest import CHECKOUT_FORM, StripeStub
+from apps.dashboard.testing import QueryBudgetTestCase, seed_catalog
+from apps.orders.models import Cart, CartItem, Order, OrderItem, Purchase
+from apps.orders.purchases import rebuild_purchases
+from apps.orders.utils import GUEST_CART_SESSION_KEY
+from apps.store.models import Product, Review
+
+
+class CartQueryBudgetTests(QueryBudgetTestCase):
+    """
+    حدود الاستعلامات للسلة والدفع
+    Query budgets for the cart and checkout views
+    """
+
+    def setUp(self):
+        self.client.force_login(self.catalog.shopper)
+
+    def test_view_cart(self):
+        self.assertWithinBudget('get', reverse('orders:cart'))
+
+    def test_view_cart_guest(self):
+        self.client.logout()
+        self.assertWithinBudget('get', reverse('orders:cart'))
+
+    def test_add_to_cart(self):
+        new_product = Product.objects.filter(
+            stock_status='in_stock'
+        ).exclude(cartitem__cart=self.catalog.cart).first()
+        for product in (new_product, self.catalog.in_stock_product):
+            with self.subTest(product=product.sku):
+                self.assertWithinBudget(
+                    'post', reverse('orders:add_to_cart', args=[product.pk]),
+                    HTTP_HX_REQUEST='true',
+                )
+
+    def test_add_out_of_stock_to_cart(self):
+        product = Product.objects.filter(stock_status='out_of_stock').first()
+        self.assertWithinBudget(
+            'post', reverse('orders:add_to_cart', args=[product.pk]), HTTP_HX_REQUEST='true'
+        )
+
+    def test_update_cart_item(self):
+        items = list(self.catalog.cart.items.all())
+        for item, data in zip(items, [
+            {'action': 'increase'},
+            {'action': 'decrease'},
+            {'action': 'set', 'quantity': '2'},
+            {'action': 'set', 'quantity': '0'},
+        ]):
+            with self.subTest(data=data):
+                self.assertWithinBudget(
+                    'post', reverse('orders:update_cart_item', args=[item.pk]), data,
+                    HTTP_HX_REQUEST='true',
+                )
+
+    def test_checkout_get(self):
+        response = self.assertWithinBudget('get', reverse('orders:checkout'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_checkout_submit(self):
+        with StripeStub() as stripe_stub:
+            response = self.assertWithinBudget('post', reverse('orders:checkout'), CHECKOUT_FORM)
+        self.assertEqual(stripe_stub.calls, 1)
+        self.assertRedirects(response, reverse('payments:payment_process', args=[
+            self.catalog.shopper.orders.latest('created_at').pk
+        ]), fetch_redirect_response=False)
+        self.assertEqual(self.catalog.shopper.orders.latest('created_at').items.count(), 5)
+
+
+@override_settings(SESSION_ENGINE='config.sessions')
+class GuestSessionTests(TestCase):
+    """
+    جلسات الزوار وسلال الضيوف
+    Anonymous browsing stays in the signed cookie; login moves to the database
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = seed_catalog(products=40, users=5, orders=5, reviews_per_product=1)
+        cls.product = Product.objects.filter(stock_status='in_stock').first()
+
+    def add_to_cart(self):
+        return self.client.post(
+            reverse('orders:add_to_cart', args=[self.product.pk]), HTTP_HX_REQUEST='true'
+        )
+
+    def test_browsing_writes_no_session_or_cart(self):
+        carts = Cart.objects.count()
+        for url in (reverse('store:home'), reverse('store:product_list'), reverse('orders:cart')):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertFalse(Session.objects.exists())
+        self.assertEqual(Cart.objects.count(), carts)
+
+    def test_guest_cart_is_keyed_from_the_cookie(self):
+        self.add_to_cart()
+        self.add_to_cart()
+
+        cart_key = self.client.session[GUEST_CART_SESSION_KEY]
+        cart = Cart.objects.get(user=None, session_id=cart_key)
+        self.assertEqual(cart.items.get().quantity, 2)
+        self.assertFalse(Session.objects.exists())
+
+        response = self.client.get(reverse('orders:cart'))
+        self.assertEqual(response.context['cart'], cart)
+
+    def test_login_moves_session_to_database_and_merges_cart(self):
+        shopper = self.catalog.shopper
+        user_items = CartItem.objects.filter(cart=self.catalog.cart).count()
+        self.add_to_cart()
+        guest_cart = Cart.objects.get(user=None)
+
+        self.client.force_login(shopper)
+
+        self.assertEqual(Session.objects.count(), 1)
+        self.assertFalse(Cart.objects.filter(pk=guest_cart.pk).exists())
+        self.assertTrue(self.catalog.cart.items.filter(product=self.product).exists())
+        self.assertGreaterEqual(self.catalog.cart.items.count(), user_items)
+        self.assertNotIn(GUEST_CART_SESSION_KEY, self.client.session)
+
+        self.client.logout()
+        self.assertFalse(Session.objects.exists())
+
+    def test_tampered_cookie_starts_a_fresh_session(self):
+        self.add_to_cart()
+        cookie = self.client.cookies['sessionid']
+        cookie.set(cookie.key, cookie.value[:-2] + 'xx', cookie.value[:-2] + 'xx')
+
+        response = self.client.get(reverse('orders:cart'))
+        self.assertIsNone(response.context['cart'])
+
+    def test_cleanup_sessions_deletes_stale_guest_carts(self):
+        stale = Cart.objects.create(session_id='stale-guest')
+        fresh = Cart.objects.create(session_id='fresh-guest')
+        active = Cart.objects.create(session_id='active-guest')
+        CartItem.objects.create(cart=active, product=self.product)
+        old = timezone.now() - timedelta(days=60)
+        Cart.objects.filter(pk__in=[stale.pk, active.pk]).update(updated_at=old)
+        Cart.objects.filter(pk=self.catalog.cart.pk).update(updated_at=old)
+
+        call_command('cleanup_sessions', cart_days=30, stdout=StringIO())
+
+        self.assertFalse(Cart.objects.filter(pk=stale.pk).exists())
+        self.assertEqual(Cart.objects.filter(pk__in=[fresh.pk, active.pk, self.catalog.cart.pk]).count(), 3)
+
+
+class PurchaseIndexTests(TestCase):
+    """
+    فهرس المشتريات والمراجعات الموثقة
+    Order transitions maintain (user, product) purchases; reviews read them
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = seed_catalog(products=10, users=3, orders=0, reviews_per_product=0)
+        cls.user = cls.catalog.shopper
+        cls.first, cls.second, cls.third = Product.objects.filter(is_active=True)[:3]
+
+    def place_order(self, *products, **state):
+        order = Order.objects.create(user=self.user, total_price=Decimal('10.000'), **state)
+        for product in products:
+            OrderItem.objects.create(order=order, product=product, quantity=1, price=Decimal('5.000'))
+        return order
+
+    def purchases(self):
+        return dict(Purchase.objects.filter(user=self.user).values_list('product_id', 'order_lines'))
+
+    def test_status_transitions_add_and_remove_purchases(self):
+        online = self.place_order(self.first, self.second)
+        self.assertEqual(self.purchases(), {})
+
+        online.payment_status = 'paid'
+        online.save()
+        cash = self.place_order(self.first, status='shipped')
+        cash.status = 'delivered'
+        cash.save()
+        self.assertEqual(self.purchases(), {self.first.pk: 2, self.second.pk: 1})
+
+        online.payment_status = 'refunded'
+        online.status = 'cancelled'
+        online.save()
+        self.assertEqual(self.purchases(), {self.first.pk: 1})
+
+        OrderItem.objects.create(order=cash, product=self.third, quantity=1, price=Decimal('5.000'))
+        expected = self.purchases()
+        self.assertEqual(expected, {self.first.pk: 1, self.third.pk: 1})
+        rebuild_purchases()
+        self.assertEqual(self.purchases(), expected)
+
+        cash.delete()
+        self.assertEqual(self.purchases(), {})
+
+    def test_review_is_verified_from_one_index_lookup(self):
+        self.place_order(self.first, payment_status='paid')
+        self.client.force_login(self.user)
+
+        for product, verified in ((self.first, True), (self.second, False)):
+            self.client.post(
+                reverse('store:add_review', args=[product.pk]), {'rating': 5, 'comment': 'جيد'},
+            )
+            review = Review.objects.get(user=self.user, product=product)
+            self.assertIs(review.is_verified_purchase, verified)
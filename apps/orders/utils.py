@@ -1,71 +1,86 @@
-﻿from apps.orders.models import Cart
+﻿import secrets
 
+from apps.orders.models import Cart
 
-def get_cart(request):
+# Session entry holding a guest's cart key (Cart.session_id)
+GUEST_CART_SESSION_KEY = 'guest_cart_key'
+
+
+def get_cart(request, create=True):
     """
     الحصول على سلة التسوق أو إنشاؤها
     Get or create shopping cart for authenticated users or guest users
     
     For authenticated users: Uses request.user
-    For guest users: Uses request.session
+    For guest users: Uses a random cart key kept in the session. With the
+    signed-cookie session engine that key lives in the visitor's cookie,
+    so a guest cart needs no django_session row.
     
     Args:
         request: Django HttpRequest object
+        create: Create the cart if it does not exist yet. Pass False on
+            read-only pages so browsing never writes a cart row.
         
     Returns:
         Cart: The user's cart or a newly created cart
+        (None when create=False and there is no cart yet)
     """
     if request.user.is_authenticated:
+        if not create:
+            return Cart.objects.filter(user=request.user, session_id=None).first()
         # Get or create cart for authenticated user
         cart, created = Cart.objects.get_or_create(
             user=request.user,
             session_id=None  # Authenticated users don't need session_id
         )
-        
-        # If user just logged in and had a guest cart, merge it
-        if created:
-            session_key = request.session.session_key
-            if session_key:
-                # Look for existing guest cart with this session
-                try:
-                    guest_cart = Cart.objects.get(
-                        user=None,
-                        session_id=session_key
-                    )
-                    # Merge guest cart items into user cart
-                    for guest_item in guest_cart.items.all():
-                        # Check if product already exists in user cart
-                        existing_item = cart.items.filter(product=guest_item.product).first()
-                        if existing_item:
-                            # Increase quantity if product already in cart
-                            existing_item.quantity += guest_item.quantity
-                            existing_item.save()
-                        else:
-                            # Move item to user cart
-                            guest_item.cart = cart
-                            guest_item.save()
-                    
-                    # Delete the guest cart
-                    guest_cart.delete()
-                except Cart.DoesNotExist:
-                    pass
-        
         return cart
     
-    else:
-        # Get or create cart for guest user using session
-        if not request.session.session_key:
-            # Create session if it doesn't exist
-            request.session.create()
-        
-        session_key = request.session.session_key
-        
-        cart, created = Cart.objects.get_or_create(
-            user=None,
-            session_id=session_key
-        )
-        
-        return cart
+    cart_key = request.session.get(GUEST_CART_SESSION_KEY)
+    if cart_key:
+        cart = Cart.objects.filter(user=None, session_id=cart_key).first()
+        if cart or not create:
+            return cart
+    elif not create:
+        return None
+    
+    # First item for this guest: new cart under a fresh random key
+    cart_key = secrets.token_urlsafe(24)
+    request.session[GUEST_CART_SESSION_KEY] = cart_key
+    return Cart.objects.create(user=None, session_id=cart_key)
+
+
+def merge_guest_cart(request, user):
+    """
+    دمج سلة الضيف مع سلة المستخدم عند تسجيل الدخول
+    Move the guest cart's items into the user's cart after login
+    
+    Args:
+        request: Django HttpRequest object (its session holds the guest cart key)
+        user: The user who just logged in
+    """
+    cart_key = request.session.pop(GUEST_CART_SESSION_KEY, None)
+    if not cart_key:
+        return
+    
+    guest_cart = Cart.objects.filter(user=None, session_id=cart_key).first()
+    if guest_cart is None:
+        return
+    
+    cart, created = Cart.objects.get_or_create(user=user, session_id=None)
+    for guest_item in guest_cart.items.all():
+        # Check if product already exists in user cart
+        existing_item = cart.items.filter(product=guest_item.product_id).first()
+        if existing_item:
+            # Increase quantity if product already in cart
+            existing_item.quantity += guest_item.quantity
+            existing_item.save()
+        else:
+            # Move item to user cart
+            guest_item.cart = cart
+            guest_item.save()
+    
+    # Delete the guest cart
+    guest_cart.delete()
 
 
 def get_cart_item_count(request):
@@ -79,8 +94,8 @@ def get_cart_item_count(request):
     Returns:
         int: Total number of items in cart
     """
-    cart = get_cart(request)
-    return cart.total_items
+    cart = get_cart(request, create=False)
+    return cart.total_items if cart else 0
 
 
 def clear_cart(request):
@@ -91,5 +106,6 @@ def clear_cart(request):
     Args:
         request: Django HttpRequest object
     """
-    cart = get_cart(request)
-    cart.clear()
+    cart = get_cart(request, create=False)
+    if cart:
+        cart.clear()
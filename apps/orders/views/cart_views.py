@@ -4,8 +4,10 @@ from django.http import HttpResponse
 from apps.store.models import Product
 from apps.orders.models import CartItem
 from apps.orders.utils import get_cart
+from apps.dashboard.perf import query_budget
 
 
+@query_budget(10)
 @require_POST
 def add_to_cart(request, product_id):
     """
@@ -25,7 +27,8 @@ def add_to_cart(request, product_id):
     # Check if product is in stock
     if not product.has_stock:
         # Return error message via HTMX OOB swap AND keep cart icon
-        cart = get_cart(request)
+        cart = get_cart(request, create=False)
+        total_items = cart.total_items if cart else 0
         from django.urls import reverse
         cart_url = reverse('orders:cart')
         error_html = f'''
@@ -41,7 +44,7 @@ def add_to_cart(request, product_id):
                     <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M3 3h2l.4 2M7 13h10l4-8H5.4M7 13L5.4 5M7 13l-2.293 2.293c-.63.63-.184 1.707.707 1.707H17m0 0a2 2 0 100 4 2 2 0 000-4zm-8 2a2 2 0 11-4 0 2 2 0 014 0z"></path>
                 </svg>
                 <span class="absolute -top-2 -right-2 bg-red-500 text-white text-xs rounded-full h-5 w-5 flex items-center justify-center">
-                    {cart.total_items}
+                    {total_items}
                 </span>
             </a>
         </div>
@@ -134,6 +137,7 @@ def add_to_cart(request, product_id):
     return HttpResponse(response_html)
 
 
+@query_budget(15)
 @require_POST
 def update_cart_item(request, item_id):
     """
@@ -147,7 +151,7 @@ def update_cart_item(request, item_id):
     Returns:
         Rendered cart partial
     """
-    cart = get_cart(request)
+    cart = get_cart(request, create=False)
     cart_item = get_object_or_404(CartItem, id=item_id, cart=cart)
     
     # Get action (increase, decrease, or set)
@@ -181,6 +185,7 @@ def update_cart_item(request, item_id):
             '''
             # Still need to return cart totals even when limit reached
             from django.template.loader import render_to_string
+            cart.prefetch_items()
             cart_totals_html = render_to_string('orders/partials/cart_totals.html', {'cart': cart}, request=request)
             return HttpResponse(cart_totals_html + error_html)
     
@@ -204,6 +209,7 @@ def update_cart_item(request, item_id):
     
     # Refresh cart to get updated values
     cart.refresh_from_db()
+    cart.prefetch_items()
     
     # Build response with cart totals and OOB swaps
     from django.template.loader import render_to_string
@@ -272,13 +278,14 @@ def remove_from_cart(request, item_id):
     Returns:
         Empty response for row removal + OOB swap for cart totals
     """
-    cart = get_cart(request)
+    cart = get_cart(request, create=False)
     cart_item = get_object_or_404(CartItem, id=item_id, cart=cart)
     
     cart_item.delete()
     
     # Refresh cart to get updated values
     cart.refresh_from_db()
+    cart.prefetch_items()
     
     # Return empty response for the deleted row + OOB swap for cart totals
     from django.template.loader import render_to_string
@@ -307,6 +314,7 @@ def remove_from_cart(request, item_id):
     return HttpResponse(cart_totals_with_oob + oob_mini_cart)
 
 
+@query_budget(12)  # measured: 10
 def view_cart(request):
     """
     عرض سلة التسوق
@@ -318,7 +326,9 @@ def view_cart(request):
     Returns:
         Rendered cart page
     """
-    cart = get_cart(request)
+    cart = get_cart(request, create=False)
+    if cart:
+        cart.prefetch_items()
     
     context = {
         'cart': cart,
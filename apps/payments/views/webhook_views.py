@@ -121,7 +121,7 @@ def handle_payment_succeeded(payment_intent):
         for order_item in order.items.all():
             try:
                 inventory = order_item.product.inventory
-                success = inventory.remove_stock(order_item.quantity)
+                success = inventory.remove_stock(order_item.quantity, reason='sale', order=order)
                 if not success:
                     # Critical error - insufficient inventory after payment!
                     logger.critical(
@@ -247,7 +247,7 @@ def handle_charge_refunded(charge):
         for order_item in order.items.all():
             try:
                 inventory = order_item.product.inventory
-                success = inventory.add_stock(order_item.quantity)
+                success = inventory.add_stock(order_item.quantity, reason='refund', order=order)
                 if success:
                     logger.info(
                         f'Restored {order_item.quantity} units of {order_item.product.sku}. '
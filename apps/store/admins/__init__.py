@@ -12,6 +12,7 @@ so registration happens automatically when they are imported.
 from .taxonomy_admin import CategoryAdmin, BrandAdmin
 from .product_admin import ProductAdmin, ProductSpecificationInline
 from .review_admin import ReviewAdmin
+from .promotion_admin import PromotionAdmin
 from .media_admin import AdvertisementAdmin, GalleryAdmin
 from .vehicle_admin import CarModelAdmin
 
@@ -22,6 +23,7 @@ __all__ = [
     'ProductAdmin',
     'ProductSpecificationInline',
     'ReviewAdmin',
+    'PromotionAdmin',
     'AdvertisementAdmin',
     'GalleryAdmin',
     'CarModelAdmin',
@@ -1,4 +1,10 @@
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from apps.store.catalog_import import import_catalog, read_catalog_rows
+from apps.store.forms import CatalogImportForm
 from apps.store.models import Product, ProductSpecification
 from apps.inventory.models import InventoryItem
 
@@ -41,6 +47,9 @@ class ProductAdmin(admin.ModelAdmin):
         'brand',
         'price',
         'sale_price',
+        'effective_price',
+        'stock_quantity',
+        'stock_status',
         'is_active',
         'is_featured',
         'is_new_arrival',
@@ -48,6 +57,7 @@ class ProductAdmin(admin.ModelAdmin):
         'created_at',
     ]
     list_filter = [
+        'stock_status',
         'is_active',
         'is_featured',
         'is_new_arrival',
@@ -71,6 +81,9 @@ class ProductAdmin(admin.ModelAdmin):
         'is_featured',
     ]
     readonly_fields = [
+        'effective_price',
+        'discount_percent',
+        'promotion',
         'created_at',
         'updated_at',
     ]
@@ -99,6 +112,9 @@ class ProductAdmin(admin.ModelAdmin):
                 'price',
                 'sale_price',
                 'cost_price',
+                'effective_price',
+                'discount_percent',
+                'promotion',
             )
         }),
         ('تفاصيل المنتج', {
@@ -149,6 +165,68 @@ class ProductAdmin(admin.ModelAdmin):
     )
     ordering = ['-created_at']
 
+    change_list_template = 'admin/store/product/change_list.html'
+
+    def get_urls(self):
+        """Add the bulk catalogue import view"""
+        urls = [
+            path(
+                'import/',
+                self.admin_site.admin_view(self.import_catalog_view),
+                name='store_product_import',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def import_catalog_view(self, request):
+        """
+        Upload a CSV / JSONL supplier catalogue and import it in batches
+        (large files are better run with ``manage.py import_catalog``)
+        """
+        if not (self.has_add_permission(request) and self.has_change_permission(request)):
+            return redirect('admin:store_product_changelist')
+
+        report = None
+        if request.method == 'POST':
+            form = CatalogImportForm(request.POST, request.FILES)
+            if form.is_valid():
+                try:
+                    report = import_catalog(
+                        read_catalog_rows(form.cleaned_data['file']),
+                        user=request.user,
+                        dry_run=form.cleaned_data['dry_run'],
+                        image_root=settings.CATALOG_IMPORT_IMAGE_ROOT,
+                        workers=settings.CATALOG_IMPORT_IMAGE_WORKERS,
+                    )
+                except ValueError as e:
+                    form.add_error('file', str(e))
+                else:
+                    if not report.dry_run and report.imported_count:
+                        messages.success(
+                            request,
+                            f'تم استيراد {report.imported_count} منتج '
+                            f'({report.created} جديد، {report.updated} محدث)'
+                        )
+        else:
+            form = CatalogImportForm()
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'استيراد الكتالوج',
+            'form': form,
+            'report': report,
+        }
+        return TemplateResponse(request, 'admin/store/catalog_import.html', context)
+
+    def save_formset(self, request, form, formset, change):
+        """Attribute inline inventory edits in the stock ledger"""
+        if formset.model is InventoryItem:
+            for inline_form in formset.forms:
+                inline_form.instance._movement_reason = 'admin'
+                inline_form.instance._movement_user = request.user
+        super().save_formset(request, form, formset, change)
+
     def get_queryset(self, request):
         """
         Optimize queryset with select_related
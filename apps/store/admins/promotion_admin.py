@@ -0,0 +1,57 @@
+from django.contrib import admin
+from apps.store.models import Promotion
+
+
+@admin.register(Promotion)
+class PromotionAdmin(admin.ModelAdmin):
+    """
+    إدارة العروض المجدولة
+    Scheduled promotion administration
+    """
+    list_display = [
+        'name',
+        'discount_type',
+        'value',
+        'scope',
+        'starts_at',
+        'ends_at',
+        'is_active',
+        'is_applied',
+    ]
+    list_filter = [
+        'discount_type',
+        'scope',
+        'is_active',
+        'is_applied',
+        'starts_at',
+    ]
+    search_fields = [
+        'name',
+    ]
+    autocomplete_fields = [
+        'category',
+        'brand',
+        'products',
+    ]
+    readonly_fields = [
+        'is_applied',
+        'created_at',
+        'updated_at',
+    ]
+    fieldsets = (
+        ('العرض', {
+            'fields': ('name', 'discount_type', 'value')
+        }),
+        ('النطاق', {
+            'fields': ('scope', 'category', 'brand', 'products'),
+            'description': 'حدد الفئة أو العلامة التجارية أو المنتجات حسب نطاق العرض'
+        }),
+        ('الجدولة', {
+            'fields': ('starts_at', 'ends_at', 'is_active', 'is_applied'),
+            'description': 'تُحدَّث أسعار المنتجات خلال دقيقة من بدء العرض أو انتهائه أو تعديله'
+        }),
+        ('التواريخ', {
+            'fields': ('created_at', 'updated_at'),
+            'classes': ('collapse',),
+        }),
+    )
@@ -14,12 +14,15 @@ class ReviewAdmin(admin.ModelAdmin):
         'rating',
         'is_verified_purchase',
         'is_approved',
+        'moderation_status',
+        'spam_score',
         'created_at',
     ]
     list_filter = [
         'rating',
         'is_verified_purchase',
         'is_approved',
+        'moderation_status',
         'created_at',
     ]
     search_fields = [
@@ -32,6 +35,9 @@ class ReviewAdmin(admin.ModelAdmin):
         'is_verified_purchase',
     ]
     readonly_fields = [
+        'spam_score',
+        'spam_checked_at',
+        'moderated_at',
         'created_at',
         'updated_at',
     ]
@@ -42,6 +48,9 @@ class ReviewAdmin(admin.ModelAdmin):
         ('الحالة', {
             'fields': ('is_approved', 'is_verified_purchase')
         }),
+        ('الإشراف', {
+            'fields': ('moderation_status', 'moderated_at', 'spam_score', 'spam_checked_at')
+        }),
         ('التواريخ', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',),
@@ -9,3 +9,7 @@ class StoreConfig(AppConfig):
     divider_title = "إدارة المتجر"  # Section divider title
     priority = 100  # Sidebar ordering (higher = top)
     hide = False  # Show in sidebar
+
+    def ready(self):
+        # Register page cache invalidation signal handlers
+        from apps.store import signals  # noqa
@@ -0,0 +1,576 @@
+"""
+Bulk catalogue import: products, specifications, images and vehicle fitment
+
+Rows come from a CSV or JSON Lines file keyed by ``sku``: unknown SKUs are
+created, known ones updated (blank cells leave a field unchanged). The file
+is streamed and handled in batches of IMPORT_BATCH_SIZE rows. Per batch,
+categories, brands and car models are resolved by slug with one query per
+kind (cached for the rest of the file), new products get free slugs from
+store.slugs, products are upserted on ``sku`` with one bulk INSERT ... ON
+CONFLICT, and specifications and fitment through-rows are replaced in
+bulk. Every batch commits on its own and rejected rows are reported with
+their line number, so one bad row never loses the rest of a supplier file.
+Stock quantities go through the inventory bulk engine so they are
+journaled like any other adjustment.
+
+Images (http/https URLs, or paths under an image root) are fetched or
+copied by a thread pool and stored once under a content hash before the
+batch's transaction opens, so no transaction waits on the network. Used
+by ``manage.py import_catalog`` and the product admin's import page.
+"""
+import csv
+import hashlib
+import io
+import json
+import urllib.request
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from urllib.parse import urlparse
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.validators import validate_unicode_slug
+from django.db import transaction
+from PIL import Image
+
+from apps.store.models import Brand, CarModel, Category, Product, ProductSpecification
+from apps.store.page_cache import ALL_PAGES_TAG, invalidate_tags
+from apps.store.promotions import PromotionIndex
+from apps.store.slugs import allocate_slugs
+
+IMPORT_BATCH_SIZE = 1000
+IMAGE_WORKERS = 8
+IMAGE_TIMEOUT = 15
+IMAGE_MAX_BYTES = 10 * 1024 * 1024
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp', '.gif'}
+IMAGE_UPLOAD_TO = 'products/'
+
+# Product columns a file may set, validated with the model field's clean()
+PRODUCT_COLUMNS = (
+    'name', 'description', 'short_description', 'price', 'sale_price', 'cost_price',
+    'weight', 'dimensions', 'year_from', 'year_to', 'meta_title', 'meta_description',
+)
+BOOLEAN_COLUMNS = ('is_active', 'is_featured', 'is_new_arrival', 'is_coming_soon')
+IMAGE_COLUMNS = ('main_image', 'image_2', 'image_3', 'image_4')
+REQUIRED_FOR_CREATE = ('name', 'category_id', 'brand_id', 'price')
+
+# Separator for list cells in CSV: fitment slugs and "name: value" specs
+LIST_SEPARATOR = '|'
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 't', 'نعم'}
+FALSE_VALUES = {'0', 'false', 'no', 'n', 'f', 'لا'}
+
+# One input row; ``error`` is set when the line could not even be parsed
+CatalogRow = namedtuple('CatalogRow', ['line', 'data', 'error'], defaults=[None])
+
+
+class RowError(ValueError):
+    """A row that cannot be imported; the message is shown in the report"""
+
+
+class CatalogImportReport:
+    """
+    Outcome of import_catalog(), with one error entry per rejected row or failed image
+    """
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.rows_total = 0
+        self.created = 0
+        self.updated = 0
+        self.rejected = 0
+        self.images_attached = 0
+        self.errors = []
+
+    def add_error(self, line, sku, message):
+        self.errors.append({'line': line, 'sku': sku, 'message': message})
+
+    def reject(self, line, sku, message):
+        self.rejected += 1
+        self.add_error(line, sku, message)
+
+    @property
+    def imported_count(self):
+        return self.created + self.updated
+
+    def write_errors_csv(self, file):
+        """Errors in file order (they are collected per validation phase)"""
+        writer = csv.writer(file)
+        writer.writerow(['line', 'sku', 'message'])
+        for error in sorted(self.errors, key=lambda error: error['line'] or 0):
+            writer.writerow([error['line'] or '', error['sku'], error['message']])
+
+
+@dataclass
+class _ImportRow:
+    line: int
+    sku: str
+    values: dict = field(default_factory=dict)
+    category: str = None
+    brand: str = None
+    compatible_brands: list = None
+    compatible_car_models: list = None
+    specifications: list = None
+    images: dict = field(default_factory=dict)
+    quantity: int = None
+
+
+def read_catalog_rows(file, file_format=None):
+    """
+    Yield CatalogRow objects from an uploaded or opened CSV / JSONL file
+
+    ``file_format`` ('csv' or 'jsonl') defaults to the file name's
+    extension. Raises ValueError for an unknown format or a CSV without a
+    ``sku`` column.
+    """
+    file_format = (file_format or Path(getattr(file, 'name', '') or '').suffix.lstrip('.') or 'csv').lower()
+    if file_format == 'ndjson':
+        file_format = 'jsonl'
+    if file_format not in ('csv', 'jsonl'):
+        raise ValueError('صيغة الملف غير مدعومة (CSV أو JSONL)')
+    if isinstance(file.read(0), bytes):
+        file = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+
+    if file_format == 'jsonl':
+        for line, text in enumerate(file, start=1):
+            if not text.strip():
+                continue
+            try:
+                data = json.loads(text)
+            except ValueError:
+                yield CatalogRow(line, {}, 'سطر JSON غير صالح')
+                continue
+            if not isinstance(data, dict):
+                yield CatalogRow(line, {}, 'يجب أن يكون كل سطر كائن JSON')
+                continue
+            yield CatalogRow(line, data)
+        return
+
+    reader = csv.DictReader(file)
+    if 'sku' not in {name.strip().lower() for name in (reader.fieldnames or [])}:
+        raise ValueError('يجب أن يحتوي الملف على العمود sku')
+    # Line 1 is the header
+    for line, data in enumerate(reader, start=2):
+        yield CatalogRow(line, data)
+
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and not value.strip()) or value == []
+
+
+def _as_list(value):
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in str(value).split(LIST_SEPARATOR) if item.strip()]
+
+
+def _parse_bool(column, value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise RowError(f'{column}: قيمة منطقية غير صالحة ({value})')
+
+
+def _parse_specifications(value):
+    """
+    ``[(name, value), ...]`` from a JSON object, a JSON list of
+    ``{"name", "value"}`` / pairs, or a CSV cell ``name: value | name: value``
+    """
+    if isinstance(value, dict):
+        pairs = list(value.items())
+    elif isinstance(value, list):
+        pairs = [
+            (item.get('name'), item.get('value')) if isinstance(item, dict)
+            else tuple(item) if isinstance(item, (list, tuple)) else (item,)
+            for item in value
+        ]
+    else:
+        pairs = []
+        for item in _as_list(value):
+            name, separator, spec_value = item.partition(':')
+            if not separator:
+                raise RowError(f'specifications: "{item}" يجب أن يكون بالشكل name: value')
+            pairs.append((name, spec_value))
+
+    specifications = []
+    for pair in pairs:
+        if len(pair) != 2:
+            raise RowError('specifications: صيغة غير صالحة')
+        name, spec_value = (str(part or '').strip() for part in pair)
+        if not name or not spec_value:
+            raise RowError('specifications: اسم أو قيمة فارغة')
+        if len(name) > 200 or len(spec_value) > 500:
+            raise RowError(f'specifications: "{name}" أطول من المسموح')
+        specifications.append((name, spec_value))
+    return specifications
+
+
+def _clean_row(row):
+    """Validate one CatalogRow into an _ImportRow (taxonomy still as slugs)"""
+    data = {str(key).strip().lower(): value for key, value in row.data.items() if key is not None}
+    sku = str(data.get('sku') or '').strip()
+    if not sku:
+        raise RowError('رمز المنتج (sku) مفقود')
+    if len(sku) > 100:
+        raise RowError('رمز المنتج أطول من 100 حرف')
+    item = _ImportRow(line=row.line, sku=sku)
+
+    for column in PRODUCT_COLUMNS:
+        value = data.get(column)
+        if _blank(value):
+            continue
+        try:
+            item.values[column] = Product._meta.get_field(column).clean(
+                value.strip() if isinstance(value, str) else value, None
+            )
+        except ValidationError as e:
+            raise RowError(f"{column}: {' '.join(e.messages)}")
+    for column in BOOLEAN_COLUMNS:
+        if not _blank(data.get(column)):
+            item.values[column] = _parse_bool(column, data[column])
+
+    if not _blank(data.get('slug')):
+        slug = str(data['slug']).strip()
+        try:
+            validate_unicode_slug(slug)
+        except ValidationError:
+            raise RowError(f'slug: "{slug}" غير صالح')
+        if len(slug) > 300:
+            raise RowError('slug: أطول من 300 حرف')
+        item.values['slug'] = slug
+
+    if not _blank(data.get('category')):
+        item.category = str(data['category']).strip()
+    if not _blank(data.get('brand')):
+        item.brand = str(data['brand']).strip()
+    if not _blank(data.get('compatible_brands')):
+        item.compatible_brands = _as_list(data['compatible_brands'])
+    if not _blank(data.get('compatible_car_models')):
+        item.compatible_car_models = _as_list(data['compatible_car_models'])
+    if not _blank(data.get('specifications')):
+        item.specifications = _parse_specifications(data['specifications'])
+    for column in IMAGE_COLUMNS:
+        if not _blank(data.get(column)):
+            item.images[column] = str(data[column]).strip()
+
+    if not _blank(data.get('quantity')):
+        try:
+            item.quantity = int(str(data['quantity']).strip())
+        except ValueError:
+            raise RowError(f"quantity: كمية غير صالحة ({data['quantity']})")
+        if item.quantity < 0:
+            raise RowError('quantity: لا يمكن تعيين كمية سالبة')
+    return item
+
+
+class _SlugResolver:
+    """slug -> id for one model, cached for the whole import (misses included)"""
+
+    def __init__(self, model, label):
+        self.model = model
+        self.label = label
+        self.ids = {}
+
+    def load(self, slugs):
+        missing = set(slugs) - self.ids.keys()
+        if missing:
+            found = dict(self.model.objects.filter(slug__in=missing).values_list('slug', 'id'))
+            self.ids.update({slug: found.get(slug) for slug in missing})
+
+    def get(self, slug):
+        pk = self.ids.get(slug)
+        if pk is None:
+            raise RowError(f'{self.label} غير موجود: {slug}')
+        return pk
+
+
+def _fetch_image(source, image_root):
+    """Bytes of an image URL, or of a file under ``image_root``"""
+    parsed = urlparse(source)
+    if parsed.scheme in ('http', 'https'):
+        request = urllib.request.Request(source, headers={'User-Agent': 'gulf-empire-catalog-import'})
+        with urllib.request.urlopen(request, timeout=IMAGE_TIMEOUT) as response:
+            data = response.read(IMAGE_MAX_BYTES + 1)
+        return data, Path(parsed.path).suffix
+    if parsed.scheme:
+        raise RowError(f'نوع رابط غير مدعوم: {parsed.scheme}')
+    if image_root is None:
+        raise RowError('مسارات الصور المحلية تتطلب مجلد صور (--image-root)')
+
+    root = Path(image_root).resolve()
+    path = (root / source).resolve()
+    if root not in path.parents:
+        raise RowError('مسار الصورة خارج مجلد الصور')
+    with open(path, 'rb') as image_file:
+        return image_file.read(IMAGE_MAX_BYTES + 1), path.suffix
+
+
+def _store_image(source, image_root):
+    """
+    Fetch or copy one image, check it is a real image and save it once
+    (the name is a content hash); returns the storage name
+    """
+    data, suffix = _fetch_image(source, image_root)
+    if len(data) > IMAGE_MAX_BYTES:
+        raise RowError('الصورة أكبر من 10 ميغابايت')
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image_format = image.format
+            image.verify()
+    except Exception:
+        raise RowError('الملف ليس صورة صالحة')
+
+    suffix = suffix.lower()
+    if suffix not in IMAGE_SUFFIXES:
+        suffix = f'.{image_format.lower()}'
+    name = f'{IMAGE_UPLOAD_TO}{hashlib.sha256(data).hexdigest()[:24]}{suffix}'
+    if default_storage.exists(name):
+        return name
+    return default_storage.save(name, ContentFile(data))
+
+
+def _batches(rows, batch_size):
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+def import_catalog(rows, user=None, dry_run=False, image_root=None,
+                   workers=IMAGE_WORKERS, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Import catalogue rows and return a CatalogImportReport
+
+    ``rows`` is an iterable of CatalogRow (see read_catalog_rows) or plain
+    dicts. ``image_root`` allows image cells to name files under that
+    directory; otherwise only http(s) URLs are accepted. With ``dry_run``
+    every batch is validated and written, then rolled back, and no images
+    are fetched.
+    """
+    report = CatalogImportReport(dry_run=dry_run)
+    resolvers = {
+        'category': _SlugResolver(Category, 'الفئة'),
+        'brand': _SlugResolver(Brand, 'العلامة التجارية'),
+        'car_model': _SlugResolver(CarModel, 'موديل السيارة'),
+    }
+    # source -> future of its storage name, shared across batches
+    images = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for batch in _batches(rows, batch_size):
+            _import_batch(batch, report, resolvers, images, pool, user, dry_run, image_root)
+
+    if report.imported_count and not dry_run:
+        # bulk writes bypass the per-product signal handlers
+        invalidate_tags(ALL_PAGES_TAG)
+    return report
+
+
+def _import_batch(batch, report, resolvers, images, pool, user, dry_run, image_root):
+    items = _validate_batch(batch, report, resolvers)
+    if not items:
+        return
+    if not dry_run:
+        _fetch_images(items, images, pool, image_root, report)
+
+    with transaction.atomic():
+        product_ids = _write_products(items, report)
+        _replace_specifications(items, product_ids)
+        _replace_fitment(items, product_ids)
+        _set_stock(items, report, user)
+        if dry_run:
+            transaction.set_rollback(True)
+
+
+def _validate_batch(batch, report, resolvers):
+    """Clean rows, drop duplicates within the batch and resolve slugs in bulk"""
+    items = []
+    seen = set()
+    for row in batch:
+        if isinstance(row, dict):
+            row = CatalogRow(None, row)
+        report.rows_total += 1
+        if row.error:
+            report.reject(row.line, '', row.error)
+            continue
+        try:
+            item = _clean_row(row)
+        except RowError as e:
+            report.reject(row.line, str(row.data.get('sku') or '').strip(), str(e))
+            continue
+        if item.sku in seen:
+            report.reject(item.line, item.sku, 'رمز المنتج مكرر في الملف')
+            continue
+        seen.add(item.sku)
+        items.append(item)
+
+    resolvers['category'].load(item.category for item in items if item.category)
+    resolvers['brand'].load(
+        slug for item in items
+        for slug in [item.brand, *(item.compatible_brands or [])] if slug
+    )
+    resolvers['car_model'].load(slug for item in items for slug in item.compatible_car_models or [])
+
+    valid = []
+    for item in items:
+        try:
+            if item.category:
+                item.values['category_id'] = resolvers['category'].get(item.category)
+            if item.brand:
+                item.values['brand_id'] = resolvers['brand'].get(item.brand)
+            if item.compatible_brands is not None:
+                item.compatible_brands = [resolvers['brand'].get(slug) for slug in item.compatible_brands]
+            if item.compatible_car_models is not None:
+                item.compatible_car_models = [
+                    resolvers['car_model'].get(slug) for slug in item.compatible_car_models
+                ]
+        except RowError as e:
+            report.reject(item.line, item.sku, str(e))
+            continue
+        valid.append(item)
+    return valid
+
+
+def _write_products(items, report):
+    """
+    Upsert the batch's products on ``sku``; drops rejected rows from
+    ``items`` in place and returns ``{sku: product id}``
+
+    One INSERT ... ON CONFLICT (sku) DO UPDATE writes new and existing
+    products alike. Existing rows are loaded first so columns a row leaves
+    blank are written back unchanged.
+    """
+    existing = {product.sku: product for product in Product.objects.filter(sku__in=[item.sku for item in items])}
+
+    claimed = {}
+    for item in items:
+        if 'slug' in item.values:
+            claimed.setdefault(item.values['slug'], []).append(item)
+    owners = dict(Product.objects.filter(slug__in=claimed).values_list('slug', 'sku'))
+
+    # New products without a slug get a free one derived from the name
+    derived = [
+        item for item in items
+        if item.sku not in existing and 'slug' not in item.values and 'name' in item.values
+    ]
+    names = [item.values['name'] for item in derived]
+    for item, slug in zip(derived, allocate_slugs(Product, names, reserved=claimed)):
+        item.values['slug'] = slug
+        claimed[slug] = [item]
+
+    # Prices are written with the live promotions applied, like a single save
+    promotions = PromotionIndex()
+    products, update_fields, accepted = [], {'updated_at', *Product.PRICING_FIELDS}, []
+    for item in items:
+        slug = item.values.get('slug')
+        if slug is not None and (
+            owners.get(slug, item.sku) != item.sku or claimed[slug][0] is not item
+        ):
+            report.reject(item.line, item.sku, f'slug: "{slug}" مستخدم لمنتج آخر')
+            continue
+
+        values = {**item.values, **item.images}
+        product = existing.get(item.sku)
+        if product is None:
+            missing = [column for column in REQUIRED_FOR_CREATE if column not in values]
+            if missing or not values.get('slug'):
+                fields = ', '.join(column.removesuffix('_id') for column in missing) or 'slug'
+                report.reject(item.line, item.sku, f'حقول مطلوبة لمنتج جديد: {fields}')
+                continue
+            product = Product(sku=item.sku, **values)
+            product.refresh_pricing(promotions=promotions.covering(product))
+            report.created += 1
+        else:
+            for column, value in values.items():
+                setattr(product, column, value)
+            product.refresh_pricing(promotions=promotions.covering(product))
+            # The conflicting INSERT resolves to an update of the existing row
+            product.pk = None
+            report.updated += 1
+        update_fields.update(values)
+        report.images_attached += len(item.images)
+        products.append(product)
+        accepted.append(item)
+
+    Product.objects.bulk_create(
+        products,
+        batch_size=IMPORT_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['sku'],
+        update_fields=sorted(update_fields),
+    )
+    items[:] = accepted
+    return dict(Product.objects.filter(sku__in=[item.sku for item in items]).values_list('sku', 'id'))
+
+
+def _replace_specifications(items, product_ids):
+    replaced = [item for item in items if item.specifications is not None]
+    if not replaced:
+        return
+    ProductSpecification.objects.filter(product_id__in=[product_ids[item.sku] for item in replaced]).delete()
+    ProductSpecification.objects.bulk_create(
+        [
+            ProductSpecification(product_id=product_ids[item.sku], name=name, value=value, order=order)
+            for item in replaced
+            for order, (name, value) in enumerate(item.specifications)
+        ],
+        batch_size=IMPORT_BATCH_SIZE,
+    )
+
+
+def _replace_fitment(items, product_ids):
+    for attribute, related_column in (
+        ('compatible_brands', 'brand_id'),
+        ('compatible_car_models', 'carmodel_id'),
+    ):
+        through = getattr(Product, attribute).through
+        replaced = [item for item in items if getattr(item, attribute) is not None]
+        if not replaced:
+            continue
+        through.objects.filter(product_id__in=[product_ids[item.sku] for item in replaced]).delete()
+        through.objects.bulk_create(
+            [
+                through(product_id=product_ids[item.sku], **{related_column: related_id})
+                for item in replaced
+                for related_id in set(getattr(item, attribute))
+            ],
+            batch_size=IMPORT_BATCH_SIZE,
+        )
+
+
+def _set_stock(items, report, user):
+    """Quantities become one journaled 'set' adjustment per batch"""
+    from apps.inventory.bulk import apply_stock_adjustments
+
+    rows = [(item.sku, item.quantity, item.line) for item in items if item.quantity is not None]
+    if rows:
+        adjustment = apply_stock_adjustments(rows, mode='set', user=user, source='csv', note='استيراد الكتالوج')
+        for error in adjustment.errors:
+            report.add_error(error['line'], error['sku'], f"quantity: {error['message']}")
+
+
+def _fetch_images(items, images, pool, image_root, report):
+    """
+    Store the batch's images on the pool and replace each item's image
+    sources with storage names (failed images are reported and dropped);
+    runs before the batch's transaction opens
+    """
+    for item in items:
+        for source in item.images.values():
+            if source not in images:
+                images[source] = pool.submit(_store_image, source, image_root)
+
+    for item in items:
+        stored = {}
+        for column, source in item.images.items():
+            try:
+                stored[column] = images[source].result()
+            except Exception as e:
+                report.add_error(item.line, item.sku, f'{column}: {e}')
+        item.images = stored
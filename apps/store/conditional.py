@@ -0,0 +1,91 @@
+"""
+HTTP conditional GET (ETag / Last-Modified) for catalogue pages
+
+A page's validator is the newest ``updated_at`` among the rows it shows,
+read in one query: each source becomes an ``ORDER BY updated_at DESC
+LIMIT 1`` scalar subquery, answered from an updated_at index (or a small
+taxonomy table). A matching If-None-Match / If-Modified-Since gets a 304
+before the view runs, so no template is rendered.
+
+Only requests the anonymous page cache would serve are conditional: those
+pages carry no per-visitor content (see page_cache), so one validator fits
+every visitor, while signed-in pages are always rendered. Hard deletes do
+not move the newest ``updated_at``; the next change to any involved row
+(or a PAGE_VERSION bump) refreshes the validator.
+"""
+import datetime
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import condition
+
+from apps.store.page_cache import is_cacheable_request
+
+
+def _as_datetime(value):
+    # Scalar subqueries come back untyped (a string) on SQLite
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if value is not None and timezone.is_naive(value):
+        value = timezone.make_aware(value, datetime.timezone.utc)
+    return value
+
+
+def latest_updated_at(*querysets):
+    """
+    Newest ``updated_at`` across ``querysets`` in a single query (None if all are empty)
+    """
+    parts, params = [], []
+    for queryset in querysets:
+        sql, query_params = queryset.order_by('-updated_at').values('updated_at')[:1].query.sql_with_params()
+        parts.append(f'({sql})')
+        params.extend(query_params)
+
+    with connections[querysets[0].db].cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(parts)}", params)
+        row = cursor.fetchone()
+    return max((_as_datetime(value) for value in row if value is not None), default=None)
+
+
+def conditional_page(latest_func, *, skip_params=()):
+    """
+    Answer conditional GETs for anonymous pages from ``latest_func``
+
+    ``latest_func(request, *args, **kwargs)`` returns the newest change
+    behind the page (see latest_updated_at). Responses are marked
+    ``Cache-Control: no-cache`` so browsers revalidate instead of guessing
+    a freshness lifetime from Last-Modified.
+    """
+    def decorator(view_func):
+        def last_modified(request, *args, **kwargs):
+            # condition() asks for both validators; query once
+            if not hasattr(request, '_page_last_modified'):
+                request._page_last_modified = latest_func(request, *args, **kwargs)
+            return request._page_last_modified
+
+        def etag(request, *args, **kwargs):
+            latest = last_modified(request, *args, **kwargs)
+            if latest is None:
+                return None
+            # HTMX partials and full pages share URLs
+            variant = 'htmx' if request.headers.get('HX-Request') else 'page'
+            key = f'{settings.PAGE_VERSION}|{view_func.__name__}|{variant}|{latest.isoformat()}'
+            return hashlib.md5(key.encode()).hexdigest()
+
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view_func)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not is_cacheable_request(request, skip_params):
+                return view_func(request, *args, **kwargs)
+            response = conditional_view(request, *args, **kwargs)
+            patch_cache_control(response, no_cache=True)
+            patch_vary_headers(response, ['HX-Request'])
+            return response
+        return wrapper
+    return decorator
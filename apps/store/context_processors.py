@@ -1,7 +1,10 @@
 """
 Context processors for the store app
 """
+from django.db.models import Count, Prefetch
+
 from apps.store.models.taxonomy import Category
+from apps.store.page_cache import CSRF_TOKEN_HOLE
 
 
 def menu_categories(request):
@@ -11,8 +14,24 @@ def menu_categories(request):
     categories = Category.objects.filter(
         is_active=True,
         show_in_menu=True
-    ).order_by('menu_order', 'name').prefetch_related('children')
+    ).annotate(
+        product_total=Count('products')
+    ).order_by('menu_order', 'name').prefetch_related(
+        Prefetch('children', queryset=Category.objects.annotate(product_total=Count('products')))
+    )
     
     return {
         'menu_categories': categories
     }
+
+
+def page_cache_holes(request):
+    """
+    Blank the per-visitor parts of a page rendered for the anonymous page
+    cache; base.html loads them from the page_holes fragment instead
+    """
+    if not getattr(request, 'page_cache_holes', False):
+        return {}
+    # Forms keep their hidden csrfmiddlewaretoken input, with a value that is
+    # the same for everyone; page_holes.html fills in the visitor's token
+    return {'page_cache_holes': True, 'csrf_token': CSRF_TOKEN_HOLE}
@@ -0,0 +1,348 @@
+"""
+Sitemaps and the Google Merchant product feed, written to FEEDS_ROOT
+
+The catalogue is streamed in primary-key order with ``.iterator()`` and
+``only()`` the columns the XML needs, so memory stays flat however large
+the catalogue is. Active products are split by id range into chunks of at
+most SITEMAP_MAX_URLS (the sitemap protocol's limit); each chunk is one
+gzipped sitemap plus one gzipped feed fragment. Every file is written under
+a temporary name and renamed into place, so crawlers never read a
+half-written file.
+
+manifest.json records each chunk's first id and URL count and when the run
+started. The next run re-renders only the chunks holding a product whose
+``updated_at`` moved since then or whose active count changed (deletes,
+queryset updates). The feed is reassembled by concatenating the fragments
+as gzip members, which needs no recompression.
+"""
+import gzip
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+from bisect import bisect_right
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.store.models import Category, Product
+
+SITEMAP_MAX_URLS = 50_000
+ITERATOR_CHUNK_SIZE = 2000
+
+# Re-read a little before the previous run so rows committed by
+# transactions still open at the time are not missed (see
+# inventory.alerts.SCAN_OVERLAP); re-rendering a chunk is harmless
+CHANGE_OVERLAP = timedelta(minutes=5)
+
+INDEX_NAME = 'sitemap.xml.gz'
+PAGES_SITEMAP_NAME = 'sitemap-pages.xml.gz'
+FEED_NAME = 'products.xml.gz'
+MANIFEST_NAME = 'manifest.json'
+PARTS_DIR = 'parts'
+
+FEED_TITLE = 'إمبراطور الخليج'
+FEED_CURRENCY = 'SAR'
+FEED_TITLE_MAX = 150
+FEED_DESCRIPTION_MAX = 5000
+
+# Everything the sitemap <url> and the feed <item> read
+PRODUCT_FIELDS = (
+    'id', 'slug', 'sku', 'name', 'short_description', 'description',
+    'price', 'sale_price', 'effective_price', 'stock_status', 'is_coming_soon', 'main_image',
+    'updated_at', 'brand__name', 'category__name',
+)
+
+SITEMAP_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+SITEMAP_FOOTER = '</urlset>\n'
+
+# Characters XML 1.0 does not allow even escaped
+INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+@dataclass
+class FeedRun:
+    """Outcome of one generate_feeds() call"""
+    full: bool
+    chunks: int = 0
+    rewritten: int = 0
+    urls: int = 0
+
+
+def generate_feeds(root=None, full=False, max_urls=SITEMAP_MAX_URLS):
+    """
+    Write (or bring up to date) the sitemaps and product feed under ``root``
+
+    ``full`` ignores the manifest and re-renders every chunk.
+    """
+    root = Path(root or settings.FEEDS_ROOT)
+    (root / PARTS_DIR).mkdir(parents=True, exist_ok=True)
+    started_at = timezone.now()
+
+    manifest = None if full else _read_manifest(root)
+    if manifest is not None and manifest.get('max_urls') != max_urls:
+        manifest = None
+    run = FeedRun(full=manifest is None)
+
+    if manifest is None:
+        chunks = _write_range(root, 0, None, max_urls)
+        run.rewritten = len(chunks)
+    else:
+        old_chunks = manifest['chunks']
+        since = datetime.fromisoformat(manifest['generated_at']) - CHANGE_OVERLAP
+        dirty = _dirty_chunks(old_chunks, since)
+        chunks = []
+        for index, chunk in enumerate(old_chunks):
+            if index not in dirty:
+                chunks.append(chunk)
+                continue
+            written = _write_range(root, *_chunk_bounds(old_chunks, index), max_urls)
+            chunks.extend(written)
+            run.rewritten += len(written)
+
+    _write_pages_sitemap(root, started_at)
+    if run.rewritten or not (root / FEED_NAME).exists():
+        _write_feed(root, chunks)
+    _write_index(root, chunks, started_at)
+    with _atomic_file(root / MANIFEST_NAME) as out:
+        out.write(json.dumps({
+            'generated_at': started_at.isoformat(),
+            'max_urls': max_urls,
+            'chunks': chunks,
+        }, indent=1).encode())
+    _remove_stale_files(root, chunks)
+
+    run.chunks = len(chunks)
+    run.urls = sum(chunk['count'] for chunk in chunks)
+    return run
+
+
+def _sitemap_name(first_id):
+    return f'sitemap-products-{first_id}.xml.gz'
+
+
+def _part_name(first_id):
+    return f'feed-{first_id}.xml.gz'
+
+
+def _read_manifest(root):
+    try:
+        with open(root / MANIFEST_NAME, encoding='utf-8') as manifest:
+            return json.load(manifest)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _chunk_bounds(chunks, index):
+    """(first id, last id or None) of a chunk; ranges are contiguous, the last is open"""
+    upper = chunks[index + 1]['first_id'] - 1 if index + 1 < len(chunks) else None
+    return chunks[index]['first_id'], upper
+
+
+def _dirty_chunks(chunks, since):
+    """
+    Indexes of chunks to re-render: a product in range changed since
+    ``since``, or the number of active products in range moved
+    """
+    first_ids = [chunk['first_id'] for chunk in chunks]
+    changed = Product.objects.filter(updated_at__gte=since).order_by().values_list('pk', flat=True)
+    dirty = {
+        max(bisect_right(first_ids, product_id) - 1, 0)
+        for product_id in changed.iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    }
+
+    in_range = {}
+    for index in range(len(chunks)):
+        lower, upper = _chunk_bounds(chunks, index)
+        condition = Q(pk__gte=lower) if upper is None else Q(pk__range=(lower, upper))
+        in_range[f'chunk_{index}'] = Count('pk', filter=condition)
+    counts = Product.objects.filter(is_active=True).aggregate(**in_range)
+    dirty.update(
+        index for index, chunk in enumerate(chunks)
+        if counts[f'chunk_{index}'] != chunk['count']
+    )
+    return dirty
+
+
+def _write_range(root, lower, upper, max_urls):
+    """
+    Render active products with ``lower <= id <= upper`` (no upper bound
+    when None) into one or more chunks of at most ``max_urls``
+
+    The first chunk keeps ``lower`` as its first id so ranges stay
+    contiguous; an empty range still yields one (empty) chunk.
+    """
+    products = Product.objects.filter(is_active=True, pk__gte=lower)
+    if upper is not None:
+        products = products.filter(pk__lte=upper)
+    products = iter(
+        products.select_related('brand', 'category')
+        .only(*PRODUCT_FIELDS)
+        .order_by('pk')
+        .iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    )
+    # Every product URL differs only by slug: reverse() once
+    url_template = settings.SITE_URL + reverse('store:product_detail', args=['__slug__'])
+
+    chunks = []
+    first_id = lower
+    product = next(products, None)
+    while True:
+        chunk = {'first_id': first_id, 'count': 0, 'lastmod': None}
+        with _atomic_gzip(root / _sitemap_name(first_id)) as sitemap, \
+                _atomic_gzip(root / PARTS_DIR / _part_name(first_id)) as feed:
+            sitemap.write(SITEMAP_HEADER)
+            while product is not None and chunk['count'] < max_urls:
+                link = url_template.replace('__slug__', quote(product.slug))
+                lastmod = product.updated_at.isoformat(timespec='seconds')
+                sitemap.write(f'<url><loc>{escape(link)}</loc><lastmod>{lastmod}</lastmod></url>\n')
+                feed.write(_feed_item(product, link))
+                chunk['count'] += 1
+                chunk['lastmod'] = max(chunk['lastmod'] or lastmod, lastmod)
+                product = next(products, None)
+            sitemap.write(SITEMAP_FOOTER)
+        chunks.append(chunk)
+        if product is None:
+            return chunks
+        first_id = product.pk
+
+
+def _text(value, limit=None):
+    value = INVALID_XML_CHARS.sub('', value or '')
+    return escape(value[:limit] if limit else value)
+
+
+def _feed_item(product, link):
+    """One <item> in Google Merchant Center's RSS 2.0 format"""
+    available = product.stock_status != 'out_of_stock' and not product.is_coming_soon
+    lines = [
+        '<item>',
+        f'<g:id>{_text(product.sku)}</g:id>',
+        f'<g:title>{_text(product.name, FEED_TITLE_MAX)}</g:title>',
+        f'<g:description>{_text(product.short_description or product.description, FEED_DESCRIPTION_MAX)}</g:description>',
+        f'<g:link>{escape(link)}</g:link>',
+        f'<g:availability>{"in_stock" if available else "out_of_stock"}</g:availability>',
+        f'<g:price>{product.price} {FEED_CURRENCY}</g:price>',
+        f'<g:brand>{_text(product.brand.name)}</g:brand>',
+        f'<g:product_type>{_text(product.category.name)}</g:product_type>',
+        '<g:condition>new</g:condition>',
+    ]
+    if product.main_image:
+        image_url = product.main_image.url
+        if image_url.startswith('/'):
+            image_url = settings.SITE_URL + image_url
+        lines.append(f'<g:image_link>{escape(image_url)}</g:image_link>')
+    # Sale price or live promotion, whichever is lower (see Product.pricing_for)
+    if product.final_price < product.price:
+        lines.append(f'<g:sale_price>{product.final_price} {FEED_CURRENCY}</g:sale_price>')
+    lines.append('</item>\n')
+    return '\n'.join(lines)
+
+
+def _write_pages_sitemap(root, generated_at):
+    """Static pages plus one listing URL per active category (small: always rewritten)"""
+    lastmod = generated_at.isoformat(timespec='seconds')
+    urls = [
+        (reverse(name), lastmod)
+        for name in ('store:home', 'store:product_list', 'store:about', 'store:contact', 'store:gallery')
+    ]
+    product_list = reverse('store:product_list')
+    categories = Category.objects.filter(is_active=True).only('slug', 'updated_at').order_by('pk')
+    for category in categories.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+        urls.append((
+            f'{product_list}?category={quote(category.slug)}',
+            category.updated_at.isoformat(timespec='seconds'),
+        ))
+
+    with _atomic_gzip(root / PAGES_SITEMAP_NAME) as sitemap:
+        sitemap.write(SITEMAP_HEADER)
+        for path, modified in urls:
+            sitemap.write(
+                f'<url><loc>{escape(settings.SITE_URL + path)}</loc><lastmod>{modified}</lastmod></url>\n'
+            )
+        sitemap.write(SITEMAP_FOOTER)
+
+
+def _write_feed(root, chunks):
+    header = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rss version="2.0" xmlns:g="http://base.google.com/ns/1.0">\n<channel>\n'
+        f'<title>{escape(FEED_TITLE)}</title>\n'
+        f'<link>{escape(settings.SITE_URL)}/</link>\n'
+        f'<description>{escape(FEED_TITLE)}</description>\n'
+    )
+    with _atomic_file(root / FEED_NAME) as out:
+        out.write(gzip.compress(header.encode(), mtime=0))
+        for chunk in chunks:
+            with open(root / PARTS_DIR / _part_name(chunk['first_id']), 'rb') as part:
+                shutil.copyfileobj(part, out)
+        out.write(gzip.compress(b'</channel>\n</rss>\n', mtime=0))
+
+
+def _write_index(root, chunks, generated_at):
+    def entry(name, lastmod):
+        loc = settings.SITE_URL + reverse('store:feed_file', args=[name])
+        return f'<sitemap><loc>{escape(loc)}</loc><lastmod>{lastmod}</lastmod></sitemap>\n'
+
+    with _atomic_gzip(root / INDEX_NAME) as index:
+        index.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        )
+        index.write(entry(PAGES_SITEMAP_NAME, generated_at.isoformat(timespec='seconds')))
+        for chunk in chunks:
+            if chunk['count']:
+                index.write(entry(_sitemap_name(chunk['first_id']), chunk['lastmod']))
+        index.write('</sitemapindex>\n')
+
+
+def _remove_stale_files(root, chunks):
+    """Chunk files a full rebuild no longer produces"""
+    keep = {_sitemap_name(chunk['first_id']) for chunk in chunks}
+    keep_parts = {_part_name(chunk['first_id']) for chunk in chunks}
+    for path in root.glob(_sitemap_name('*')):
+        if path.name not in keep:
+            path.unlink(missing_ok=True)
+    for path in (root / PARTS_DIR).glob(_part_name('*')):
+        if path.name not in keep_parts:
+            path.unlink(missing_ok=True)
+
+
+@contextmanager
+def _atomic_file(path):
+    """Binary file that replaces ``path`` only if the block completes"""
+    handle, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as out:
+            yield out
+            out.flush()
+            os.fsync(out.fileno())
+        # mkstemp creates 0600; the web server must be able to read the file
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(temp_path)
+        raise
+
+
+@contextmanager
+def _atomic_gzip(path):
+    """UTF-8 text written gzip-compressed through _atomic_file"""
+    with _atomic_file(path) as raw, \
+            gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as compressed, \
+            io.TextIOWrapper(compressed, encoding='utf-8') as text:
+        yield text
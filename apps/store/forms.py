@@ -0,0 +1,26 @@
+"""
+Store admin forms
+"""
+from django import forms
+
+
+class CatalogImportForm(forms.Form):
+    """
+    نموذج استيراد الكتالوج
+    CSV / JSONL upload for the bulk catalogue import (keyed by sku)
+    """
+
+    file = forms.FileField(
+        label='ملف CSV أو JSONL',
+        help_text=(
+            'الأعمدة: sku, name, category, brand, price ... (ترميز UTF-8). '
+            'القوائم في CSV تُفصل بالرمز | والمواصفات بالشكل name: value'
+        )
+    )
+
+    dry_run = forms.BooleanField(
+        required=False,
+        initial=True,
+        label='معاينة فقط',
+        help_text='التحقق من جميع الصفوف دون حفظ أي تغيير أو تنزيل الصور'
+    )
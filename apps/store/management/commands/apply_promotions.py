@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from apps.store.promotions import REPRICE_BATCH_SIZE, apply_due_promotions, reprice_products
+
+
+class Command(BaseCommand):
+    """
+    تطبيق العروض المجدولة على أسعار المنتجات
+    Write the prices of promotions that started, ended or changed into Product.effective_price
+    """
+    help = 'Apply due promotions to the stored product prices (run every minute)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=REPRICE_BATCH_SIZE)
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Reprice every product (after bulk price edits or restoring data)',
+        )
+
+    def handle(self, *args, **options):
+        if options['all']:
+            repriced = reprice_products(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Repriced {repriced} products'))
+            return
+
+        run = apply_due_promotions(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Applied {run.promotions} promotions, repriced {run.repriced} products'
+        ))
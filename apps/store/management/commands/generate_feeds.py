@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from apps.store.feeds import generate_feeds
+
+
+class Command(BaseCommand):
+    """
+    إنشاء خريطة الموقع وخلاصة المنتجات
+    Write the gzipped sitemaps and Merchant Center product feed to FEEDS_ROOT
+    """
+    help = 'Regenerate sitemaps and the product feed (only chunks changed since the last run unless --full)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Re-render every chunk instead of only those with changed products',
+        )
+        parser.add_argument('--root', help='Output directory (default: FEEDS_ROOT)')
+
+    def handle(self, *args, **options):
+        run = generate_feeds(root=options['root'], full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Full' if run.full else 'Incremental'} run: {run.urls:,} product URLs in "
+            f'{run.chunks} sitemap files, {run.rewritten} rewritten'
+        ))
@@ -0,0 +1,66 @@
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.store.catalog_import import IMPORT_BATCH_SIZE, import_catalog, read_catalog_rows
+
+
+class Command(BaseCommand):
+    """
+    استيراد كتالوج المنتجات
+    Stream a supplier CSV / JSONL catalogue into products, specs, images and fitment
+    """
+    help = 'Create or update products by SKU from a CSV or JSONL file, in batches, with a per-row error report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Default: from the file extension')
+        parser.add_argument(
+            '--image-root',
+            help="Directory local image paths are relative to (default: the file's directory)",
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.CATALOG_IMPORT_IMAGE_WORKERS,
+            help='Threads fetching / copying images',
+        )
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Validate and roll back every batch')
+        parser.add_argument('--errors', help='Write the per-row error report to this CSV file')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.is_file():
+            raise CommandError(f'{path} not found')
+
+        started = time.perf_counter()
+        with open(path, 'rb') as file:
+            try:
+                report = import_catalog(
+                    read_catalog_rows(file, options['format']),
+                    dry_run=options['dry_run'],
+                    image_root=options['image_root'] or path.resolve().parent,
+                    workers=options['workers'],
+                    batch_size=options['batch_size'],
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+
+        if options['errors']:
+            with open(options['errors'], 'w', newline='', encoding='utf-8-sig') as errors_file:
+                report.write_errors_csv(errors_file)
+        for error in report.errors[:20]:
+            self.stderr.write(f"  line {error['line'] or '-'} {error['sku']}: {error['message']}")
+        if len(report.errors) > 20:
+            self.stderr.write(f'  ... {len(report.errors) - 20} more (use --errors for the full report)')
+
+        rate = report.rows_total * 60 / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Dry run: ' if report.dry_run else ''}{report.rows_total:,} rows in {elapsed:.1f}s "
+            f'({rate:,.0f}/min): {report.created:,} created, {report.updated:,} updated, '
+            f'{report.rejected:,} rejected, {report.images_attached:,} images'
+        ))
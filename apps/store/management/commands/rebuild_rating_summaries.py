@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from apps.store.page_cache import invalidate_tags, product_tag
+from apps.store.models import ProductRatingSummary
+from apps.store.reviews import rebuild_rating_summaries
+
+
+class Command(BaseCommand):
+    """
+    إعادة بناء ملخصات تقييمات المنتجات
+    Rebuild ProductRatingSummary from the approved reviews
+    """
+    help = 'Recompute every product rating summary (run after bulk review edits or imports)'
+
+    def handle(self, *args, **options):
+        before = set(ProductRatingSummary.objects.values_list('product_id', flat=True))
+        rows = rebuild_rating_summaries()
+        after = set(ProductRatingSummary.objects.values_list('product_id', flat=True))
+
+        invalidate_tags(*(product_tag(product_id) for product_id in before | after))
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rating summaries for {rows} products'))
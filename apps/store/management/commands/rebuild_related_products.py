@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from apps.store.recommendations import CHUNK_SIZE, MAX_CHUNK_PAIRS, rebuild_related
+
+
+class Command(BaseCommand):
+    """
+    إعادة حساب المنتجات المرتبطة
+    Recompute the precomputed related-products lists (RelatedProduct)
+    """
+    help = 'Rescore related products from co-purchases, shared fitment and category/brand'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Products scored per batch',
+        )
+        parser.add_argument(
+            '--max-pairs',
+            type=int,
+            default=MAX_CHUNK_PAIRS,
+            help='Memory budget of one co-occurrence chunk, in expanded order lines',
+        )
+
+    def handle(self, *args, **options):
+        run = rebuild_related(chunk_size=options['chunk_size'], max_pairs=options['max_pairs'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{run.products:,} active products: {run.changed:,} lists rewritten ({run.rows:,} rows)'
+        ))
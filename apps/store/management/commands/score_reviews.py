@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from apps.store.moderation import SCORE_BATCH_SIZE, SPAM_HIDE_SCORE, score_reviews
+
+
+class Command(BaseCommand):
+    """
+    فحص المراجعات الجديدة بحثاً عن الإزعاج
+    Spam-score unscored reviews in batches and hide the suspicious ones
+    """
+    help = f'Score new reviews for spam; pending reviews scoring {SPAM_HIDE_SCORE}+ are hidden for moderation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=SCORE_BATCH_SIZE)
+        parser.add_argument('--limit', type=int, default=None, help='Stop after this many reviews')
+
+    def handle(self, *args, **options):
+        run = score_reviews(batch_size=options['batch_size'], limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Scored {run.scored} reviews, hid {run.hidden} for moderation'
+        ))
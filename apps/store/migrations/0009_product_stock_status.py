@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0008_brand_show_in_navbar_carmodel_show_in_navbar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='stock_status',
+            field=models.CharField(choices=[('in_stock', 'متوفر'), ('low_stock', 'مخزون منخفض'), ('out_of_stock', 'نفد المخزون')], default='out_of_stock', editable=False, max_length=20, verbose_name='حالة المخزون'),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='low_stock_threshold',
+            field=models.PositiveIntegerField(default=10, editable=False, help_text='نسخة من حد عنصر المخزون، تُحدَّث تلقائياً', verbose_name='حد المخزون المنخفض'),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='stock_quantity',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='نسخة من كمية عنصر المخزون، تُحدَّث تلقائياً', verbose_name='الكمية المتوفرة'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['stock_status', 'is_active'], name='store_produ_stock_s_35df4f_idx'),
+        ),
+    ]
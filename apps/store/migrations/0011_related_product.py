@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0010_product_review_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='الترتيب')),
+                ('score', models.FloatField(default=0, verbose_name='الدرجة')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_entries', to='store.product', verbose_name='المنتج')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_to', to='store.product', verbose_name='المنتج المرتبط')),
+            ],
+            options={
+                'verbose_name': 'منتج مرتبط',
+                'verbose_name_plural': 'المنتجات المرتبطة',
+                'ordering': ['product', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('product', 'rank'), name='store_related_product_rank'), models.UniqueConstraint(fields=('product', 'related'), name='store_related_product_pair')],
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def build_rating_summaries(apps, schema_editor):
+    """One summary row per product with approved reviews"""
+    Review = apps.get_model('store', 'Review')
+    ProductRatingSummary = apps.get_model('store', 'ProductRatingSummary')
+    rows = Review.objects.filter(is_approved=True).values('product_id').annotate(
+        review_total=Count('id'),
+        rating_sum=Sum('rating'),
+        verified_total=Count('id', filter=Q(is_verified_purchase=True)),
+        **{f'stars_{stars}': Count('id', filter=Q(rating=stars)) for stars in range(1, 6)},
+    ).order_by()
+    ProductRatingSummary.objects.bulk_create(
+        [ProductRatingSummary(**row) for row in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0011_related_product'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductRatingSummary',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to='store.product', verbose_name='المنتج')),
+                ('review_total', models.PositiveIntegerField(default=0, verbose_name='عدد المراجعات')),
+                ('rating_sum', models.PositiveIntegerField(default=0, verbose_name='مجموع التقييمات')),
+                ('verified_total', models.PositiveIntegerField(default=0, verbose_name='مراجعات المشترين الموثقين')),
+                ('stars_1', models.PositiveIntegerField(default=0, verbose_name='نجمة واحدة')),
+                ('stars_2', models.PositiveIntegerField(default=0, verbose_name='نجمتان')),
+                ('stars_3', models.PositiveIntegerField(default=0, verbose_name='3 نجوم')),
+                ('stars_4', models.PositiveIntegerField(default=0, verbose_name='4 نجوم')),
+                ('stars_5', models.PositiveIntegerField(default=0, verbose_name='5 نجوم')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')),
+            ],
+            options={
+                'verbose_name': 'ملخص التقييمات',
+                'verbose_name_plural': 'ملخصات التقييمات',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='review',
+            name='store_revie_product_d181c6_idx',
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['product', 'created_at', 'id'], name='store_review_feed_newest'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['product', 'rating', 'created_at', 'id'], name='store_review_feed_highest'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['product', 'is_verified_purchase', 'created_at', 'id'], name='store_review_feed_verified'),
+        ),
+        migrations.RunPython(build_rating_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_existing_reviews_moderated(apps, schema_editor):
+    """Reviews written before moderation keep their current visibility"""
+    Review = apps.get_model('store', 'Review')
+    Review.objects.filter(is_approved=True).update(moderation_status='approved')
+    Review.objects.filter(is_approved=False).update(moderation_status='rejected')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0012_review_feed_indexes_rating_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='review',
+            name='store_revie_user_id_d296a8_idx',
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='comment_fingerprint',
+            field=models.CharField(blank=True, max_length=32, verbose_name='بصمة التعليق'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='moderated_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='تاريخ الإشراف'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='moderation_status',
+            field=models.CharField(choices=[('pending', 'بانتظار المراجعة'), ('approved', 'مقبولة'), ('rejected', 'مرفوضة')], default='pending', max_length=10, verbose_name='حالة الإشراف'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='spam_checked_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='تاريخ فحص الإزعاج'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='spam_score',
+            field=models.PositiveSmallIntegerField(default=0, help_text='من 0 إلى 100، تحسب دورياً', verbose_name='درجة الإزعاج'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['moderation_status', 'spam_score', 'id'], name='store_review_moderation'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('spam_checked_at__isnull', True)), fields=['id'], name='store_review_unscored'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['user', 'created_at'], name='store_revie_user_id_d9d65a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['comment_fingerprint'], name='store_revie_comment_7e2c42_idx'),
+        ),
+        migrations.RunPython(mark_existing_reviews_moderated, migrations.RunPython.noop),
+    ]
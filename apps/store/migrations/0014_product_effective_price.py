@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:25
+
+from django.db import migrations, models
+
+
+def fill_effective_prices(apps, schema_editor):
+    """Same rule as Product.pricing_for, in batches"""
+    Product = apps.get_model('store', 'Product')
+    batch = []
+    for product in Product.objects.only('price', 'sale_price').iterator(chunk_size=1000):
+        price, sale_price = product.price, product.sale_price
+        product.effective_price = sale_price if sale_price else price
+        product.discount_percent = (
+            max(int(((price - sale_price) / price) * 100), 1) if sale_price and price > sale_price else 0
+        )
+        batch.append(product)
+        if len(batch) == 1000:
+            Product.objects.bulk_update(batch, ['effective_price', 'discount_percent'])
+            batch = []
+    Product.objects.bulk_update(batch, ['effective_price', 'discount_percent'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0013_review_moderation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='discount_percent',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='نسبة الخصم'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='effective_price',
+            field=models.DecimalField(decimal_places=2, editable=False, help_text='سعر التخفيض إن وجد وإلا السعر، يُحدَّث تلقائياً', max_digits=10, null=True, verbose_name='السعر الفعلي'),
+        ),
+        migrations.RunPython(fill_effective_prices, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['effective_price', 'id'], name='store_product_active_price'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['discount_percent', 'id'], name='store_product_active_discount'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:30
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0014_product_effective_price'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='effective_price',
+            field=models.DecimalField(decimal_places=2, editable=False, help_text='أقل سعر بين سعر التخفيض والعروض النشطة، يُحدَّث تلقائياً', max_digits=10, null=True, verbose_name='السعر الفعلي'),
+        ),
+        migrations.CreateModel(
+            name='Promotion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='اسم العرض')),
+                ('discount_type', models.CharField(choices=[('percent', 'نسبة مئوية'), ('fixed', 'مبلغ ثابت')], default='percent', max_length=10, verbose_name='نوع الخصم')),
+                ('value', models.DecimalField(decimal_places=2, help_text='نسبة مئوية (1-100) أو مبلغ يُخصم من السعر', max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))], verbose_name='قيمة الخصم')),
+                ('scope', models.CharField(choices=[('category', 'فئة'), ('brand', 'علامة تجارية'), ('products', 'منتجات محددة')], default='category', max_length=10, verbose_name='نطاق العرض')),
+                ('starts_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='تاريخ البدء')),
+                ('ends_at', models.DateTimeField(blank=True, help_text='اتركه فارغاً لعرض مفتوح', null=True, verbose_name='تاريخ الانتهاء')),
+                ('is_active', models.BooleanField(default=True, verbose_name='نشط')),
+                ('is_applied', models.BooleanField(default=False, editable=False, help_text='يُحدَّث تلقائياً عند تطبيق العروض المجدولة', verbose_name='مطبّق على الأسعار')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الإنشاء')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')),
+                ('brand', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='promotions', to='store.brand', verbose_name='العلامة التجارية')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='promotions', to='store.category', verbose_name='الفئة')),
+                ('products', models.ManyToManyField(blank=True, related_name='promotions', to='store.product', verbose_name='المنتجات')),
+            ],
+            options={
+                'verbose_name': 'عرض',
+                'verbose_name_plural': 'العروض',
+                'ordering': ['-starts_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='promotion',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='priced_products', to='store.promotion', verbose_name='العرض المطبّق'),
+        ),
+        migrations.AddIndex(
+            model_name='promotion',
+            index=models.Index(fields=['starts_at'], name='store_promo_starts__f3f3cf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promotion',
+            index=models.Index(fields=['ends_at'], name='store_promo_ends_at_6a796e_idx'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from .taxonomy import Category, Brand
 from .product import Product, ProductSpecification
-from .review import Review
+from .review import Review, ProductRatingSummary
+from .related import RelatedProduct
+from .promotion import Promotion
 from .media import Advertisement, Gallery
 from .vehicle import CarModel
 
@@ -10,6 +12,9 @@ __all__ = [
     'Product',
     'ProductSpecification',
     'Review',
+    'ProductRatingSummary',
+    'RelatedProduct',
+    'Promotion',
     'Advertisement',
     'Gallery',
     'CarModel',
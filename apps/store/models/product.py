@@ -1,10 +1,38 @@
 from django.db import models
-from django.utils.text import slugify
+from django.db.models import Avg, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.core.validators import MinValueValidator
 from decimal import Decimal
+from apps.store.slugs import allocate_slug
 from .taxonomy import Category, Brand
 
 
+class ProductQuerySet(models.QuerySet):
+    """
+    Product queries used by the storefront listings
+    """
+
+    def with_review_stats(self):
+        """
+        Annotate ``review_avg`` and ``review_total`` over approved reviews
+
+        Both are correlated subqueries, so product cards read their rating
+        without one aggregate query per product and the annotation does not
+        multiply rows when combined with other joins.
+        """
+        from .review import Review
+
+        approved = Review.objects.filter(
+            product=OuterRef('pk'), is_approved=True
+        ).order_by().values('product')
+        return self.annotate(
+            review_avg=Subquery(approved.annotate(value=Avg('rating')).values('value')),
+            review_total=Coalesce(
+                Subquery(approved.annotate(value=Count('pk')).values('value')), 0
+            ),
+        )
+
+
 class Product(models.Model):
     """
     المنتج الرئيسي (قطع غيار السيارات)
@@ -73,15 +101,61 @@ class Product(models.Model):
         verbose_name="سعر التكلفة",
         help_text="للاستخدام الداخلي فقط"
     )
+    # Price the customer pays and its discount off ``price``, stored so the
+    # listings, cart and checkout read one indexed column (see pricing_for;
+    # scheduled promotions are written in by store.promotions)
+    effective_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        editable=False,
+        verbose_name="السعر الفعلي",
+        help_text="أقل سعر بين سعر التخفيض والعروض النشطة، يُحدَّث تلقائياً"
+    )
+    discount_percent = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="نسبة الخصم"
+    )
+    promotion = models.ForeignKey(
+        'Promotion',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='priced_products',
+        verbose_name="العرض المطبّق"
+    )
+
+    # Inventory (read model mirrored from InventoryItem, see apps.inventory.sync)
+    STOCK_STATUS_CHOICES = [
+        ('in_stock', 'متوفر'),
+        ('low_stock', 'مخزون منخفض'),
+        ('out_of_stock', 'نفد المخزون'),
+    ]
+    STOCK_MIRROR_FIELDS = ('stock_quantity', 'low_stock_threshold', 'stock_status')
+    PRICING_FIELDS = ('effective_price', 'discount_percent', 'promotion')
+    # Fields the stored pricing is worked out from
+    PRICING_INPUTS = ('price', 'sale_price', 'category', 'brand')
 
-    # Inventory
     stock_quantity = models.PositiveIntegerField(
         default=0,
-        verbose_name="الكمية المتوفرة"
+        editable=False,
+        verbose_name="الكمية المتوفرة",
+        help_text="نسخة من كمية عنصر المخزون، تُحدَّث تلقائياً"
     )
     low_stock_threshold = models.PositiveIntegerField(
-        default=5,
-        verbose_name="حد المخزون المنخفض"
+        default=10,
+        editable=False,
+        verbose_name="حد المخزون المنخفض",
+        help_text="نسخة من حد عنصر المخزون، تُحدَّث تلقائياً"
+    )
+    stock_status = models.CharField(
+        max_length=20,
+        choices=STOCK_STATUS_CHOICES,
+        default='out_of_stock',
+        editable=False,
+        verbose_name="حالة المخزون"
     )
 
     # Product Details
@@ -189,6 +263,8 @@ class Product(models.Model):
         verbose_name="تاريخ التحديث"
     )
 
+    objects = ProductQuerySet.as_manager()
+
     class Meta:
         verbose_name = "منتج"
         verbose_name_plural = "المنتجات"
@@ -198,6 +274,22 @@ class Product(models.Model):
             models.Index(fields=['sku']),
             models.Index(fields=['category', 'is_active']),
             models.Index(fields=['brand', 'is_active']),
+            models.Index(fields=['stock_status', 'is_active']),
+            # Newest-change lookups for HTTP validators (store.conditional)
+            models.Index(fields=['updated_at']),
+            models.Index(fields=['category', 'updated_at']),
+            # Price and discount sorts / ranges over the active catalogue; partial
+            # because SQLite cannot seek on a leading boolean column
+            models.Index(
+                fields=['effective_price', 'id'],
+                condition=models.Q(is_active=True),
+                name='store_product_active_price',
+            ),
+            models.Index(
+                fields=['discount_percent', 'id'],
+                condition=models.Q(is_active=True),
+                name='store_product_active_discount',
+            ),
         ]
 
     def __str__(self):
@@ -205,64 +297,125 @@ class Product(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.name, allow_unicode=True)
+            self.slug = allocate_slug(self, self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(self.PRICING_INPUTS) & set(update_fields):
+            self.refresh_pricing()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *self.PRICING_FIELDS}
+        # Stock mirror fields are owned by the inventory sync layer; a stale
+        # instance must not overwrite them on a regular update
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.STOCK_MIRROR_FIELDS
+            ]
         super().save(*args, **kwargs)
 
+    @staticmethod
+    def pricing_for(price, sale_price, promotions=()):
+        """
+        ``(effective_price, discount_percent, promotion)`` for a list price,
+        sale price and the live promotions covering the product
+
+        The lowest price wins; ``promotion`` is the one that set it, or None.
+        """
+        effective, applied = sale_price if sale_price else price, None
+        for promotion in promotions:
+            offer = promotion.price_for(price)
+            if offer < effective:
+                effective, applied = offer, promotion
+        if price > effective:
+            # At least 1: a discount_percent above zero is what marks a
+            # product on sale (filter, sort, badge), however small the cut
+            return effective, max(int(((price - effective) / price) * 100), 1), applied
+        return effective, 0, applied
+
+    def refresh_pricing(self, promotions=None):
+        """
+        Recompute the stored pricing fields
+
+        ``promotions`` are the live promotions covering this product; they
+        are looked up (one query) when not given.
+        """
+        if promotions is None:
+            from .promotion import Promotion
+
+            promotions = Promotion.objects.live().covering(self)
+        self.effective_price, self.discount_percent, self.promotion = self.pricing_for(
+            self.price, self.sale_price, promotions
+        )
+
+    @staticmethod
+    def stock_status_for(quantity, threshold):
+        """Stock status for a quantity and low-stock threshold"""
+        if quantity <= 0:
+            return 'out_of_stock'
+        if quantity <= threshold:
+            return 'low_stock'
+        return 'in_stock'
+
     @property
     def stock(self):
         """
-        Get inventory quantity from InventoryItem
-        Falls back to stock_quantity if no inventory item exists
+        Available quantity (mirrors InventoryItem.quantity, no join needed)
         """
-        try:
-            return self.inventory.quantity
-        except:
-            return 0
+        return self.stock_quantity
     
     @property
     def has_stock(self):
         """
         Check if product has stock available
         """
-        return self.stock > 0
+        return self.stock_status != 'out_of_stock'
     
     @property
     def is_in_stock(self):
         """Check if product is in stock"""
-        return self.stock_quantity > 0
+        return self.has_stock
 
     @property
     def is_low_stock(self):
         """Check if product is low in stock"""
-        return 0 < self.stock_quantity <= self.low_stock_threshold
+        return self.stock_status == 'low_stock'
 
     @property
     def final_price(self):
         """Return the sale price if available, otherwise regular price"""
-        return self.sale_price if self.sale_price else self.price
+        if self.effective_price is not None:
+            return self.effective_price
+        return self.pricing_for(self.price, self.sale_price)[0]
 
     @property
     def discount_percentage(self):
-        """Calculate discount percentage if sale price is set"""
-        if self.sale_price and self.price > self.sale_price:
-            return int(((self.price - self.sale_price) / self.price) * 100)
-        return 0
+        """Discount percentage if sale price is set"""
+        if self.effective_price is not None:
+            return self.discount_percent
+        return self.pricing_for(self.price, self.sale_price)[1]
     
     @property
     def savings_amount(self):
-        """Calculate savings amount if sale price is set"""
-        if self.sale_price and self.price > self.sale_price:
-            return self.price - self.sale_price
+        """Amount saved on the list price (sale price or promotion)"""
+        if self.discount_percentage > 0:
+            return self.price - self.final_price
         return 0
     
     @property
     def average_rating(self):
         """Calculate average rating from approved reviews"""
-        from django.db.models import Avg
-        approved_reviews = self.reviews.filter(is_approved=True)
-        avg = approved_reviews.aggregate(Avg('rating'))['rating__avg']
+        if hasattr(self, 'review_avg'):
+            avg = self.review_avg
+        else:
+            avg = self.reviews.filter(is_approved=True).aggregate(Avg('rating'))['rating__avg']
         return round(avg, 1) if avg else 0
 
+    @property
+    def review_count(self):
+        """Number of approved reviews"""
+        if hasattr(self, 'review_total'):
+            return self.review_total
+        return self.reviews.filter(is_approved=True).count()
+
 
 class ProductSpecification(models.Model):
     """
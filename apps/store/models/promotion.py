@@ -0,0 +1,191 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+from .taxonomy import Category, Brand
+
+
+class PromotionQuerySet(models.QuerySet):
+    """
+    Promotion queries used by the price scheduler (store.promotions)
+    """
+
+    def live(self, now=None):
+        """Promotions whose discount applies at ``now``"""
+        now = now or timezone.now()
+        return self.filter(
+            Q(ends_at__isnull=True) | Q(ends_at__gt=now),
+            is_active=True,
+            starts_at__lte=now,
+        )
+
+    def due(self, now=None):
+        """Promotions whose stored prices no longer match whether they are live"""
+        live = self.live(now).values('pk')
+        return self.filter(
+            Q(is_applied=False, pk__in=live) | Q(is_applied=True) & ~Q(pk__in=live)
+        )
+
+    def covering(self, product):
+        """Promotions whose scope includes ``product``"""
+        scope = (
+            Q(scope='category', category_id=product.category_id)
+            | Q(scope='brand', brand_id=product.brand_id)
+        )
+        if product.pk is not None:
+            scope |= Q(scope='products', products=product.pk)
+        return self.filter(scope)
+
+
+class Promotion(models.Model):
+    """
+    العروض والتخفيضات المجدولة
+    Scheduled percentage or fixed discount on a category, brand or list of products
+
+    The discounted price is not worked out per request: ``manage.py
+    apply_promotions`` writes it into Product.effective_price when a
+    promotion starts, ends or is edited (see store.promotions).
+    """
+    DISCOUNT_TYPE_CHOICES = [
+        ('percent', 'نسبة مئوية'),
+        ('fixed', 'مبلغ ثابت'),
+    ]
+    SCOPE_CHOICES = [
+        ('category', 'فئة'),
+        ('brand', 'علامة تجارية'),
+        ('products', 'منتجات محددة'),
+    ]
+
+    name = models.CharField(
+        max_length=200,
+        verbose_name="اسم العرض"
+    )
+    discount_type = models.CharField(
+        max_length=10,
+        choices=DISCOUNT_TYPE_CHOICES,
+        default='percent',
+        verbose_name="نوع الخصم"
+    )
+    value = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        validators=[MinValueValidator(Decimal('0.01'))],
+        verbose_name="قيمة الخصم",
+        help_text="نسبة مئوية (1-100) أو مبلغ يُخصم من السعر"
+    )
+
+    # Scope
+    scope = models.CharField(
+        max_length=10,
+        choices=SCOPE_CHOICES,
+        default='category',
+        verbose_name="نطاق العرض"
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='promotions',
+        verbose_name="الفئة"
+    )
+    brand = models.ForeignKey(
+        Brand,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='promotions',
+        verbose_name="العلامة التجارية"
+    )
+    products = models.ManyToManyField(
+        'Product',
+        blank=True,
+        related_name='promotions',
+        verbose_name="المنتجات"
+    )
+
+    # Schedule
+    starts_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="تاريخ البدء"
+    )
+    ends_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="تاريخ الانتهاء",
+        help_text="اتركه فارغاً لعرض مفتوح"
+    )
+
+    # Status
+    is_active = models.BooleanField(
+        default=True,
+        verbose_name="نشط"
+    )
+    is_applied = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name="مطبّق على الأسعار",
+        help_text="يُحدَّث تلقائياً عند تطبيق العروض المجدولة"
+    )
+
+    # Timestamps
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="تاريخ الإنشاء"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="تاريخ التحديث"
+    )
+
+    objects = PromotionQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "عرض"
+        verbose_name_plural = "العروض"
+        ordering = ['-starts_at']
+        indexes = [
+            models.Index(fields=['starts_at']),
+            models.Index(fields=['ends_at']),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    def clean(self):
+        errors = {}
+        if self.discount_type == 'percent' and self.value is not None and self.value > 100:
+            errors['value'] = 'النسبة المئوية لا تتجاوز 100'
+        if self.scope == 'category' and not self.category_id:
+            errors['category'] = 'اختر الفئة'
+        if self.scope == 'brand' and not self.brand_id:
+            errors['brand'] = 'اختر العلامة التجارية'
+        if self.ends_at and self.starts_at and self.ends_at <= self.starts_at:
+            errors['ends_at'] = 'تاريخ الانتهاء يجب أن يكون بعد تاريخ البدء'
+        if errors:
+            raise ValidationError(errors)
+
+    def save(self, *args, **kwargs):
+        # Any edit may change the discount or its scope, so the scheduler
+        # re-applies the promotion on its next run
+        self.is_applied = False
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'is_applied'}
+        super().save(*args, **kwargs)
+
+    def is_live(self, now=None):
+        now = now or timezone.now()
+        return self.is_active and self.starts_at <= now and (self.ends_at is None or self.ends_at > now)
+
+    def price_for(self, price):
+        """``price`` after this promotion's discount (never below zero)"""
+        if self.discount_type == 'percent':
+            discounted = price * (100 - self.value) / 100
+        else:
+            discounted = price - self.value
+        return max(discounted, Decimal('0')).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
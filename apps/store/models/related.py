@@ -0,0 +1,47 @@
+from django.db import models
+from .product import Product
+
+
+class RelatedProduct(models.Model):
+    """
+    منتج مرتبط
+    Precomputed "related products" entry, one row per (product, rank)
+
+    Written by ``manage.py rebuild_related_products`` (store.recommendations);
+    the product page reads a product's rows in rank order.
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='related_entries',
+        verbose_name="المنتج"
+    )
+    related = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='related_to',
+        verbose_name="المنتج المرتبط"
+    )
+    rank = models.PositiveSmallIntegerField(
+        verbose_name="الترتيب"
+    )
+    score = models.FloatField(
+        default=0,
+        verbose_name="الدرجة"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="تاريخ التحديث"
+    )
+
+    class Meta:
+        verbose_name = "منتج مرتبط"
+        verbose_name_plural = "المنتجات المرتبطة"
+        ordering = ['product', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'rank'], name='store_related_product_rank'),
+            models.UniqueConstraint(fields=['product', 'related'], name='store_related_product_pair'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} → {self.related_id} (#{self.rank})"
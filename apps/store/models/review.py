@@ -9,6 +9,12 @@ class Review(models.Model):
     مراجعة المنتج
     Product Review
     """
+    MODERATION_CHOICES = [
+        ('pending', 'بانتظار المراجعة'),
+        ('approved', 'مقبولة'),
+        ('rejected', 'مرفوضة'),
+    ]
+
     product = models.ForeignKey(
         Product,
         on_delete=models.CASCADE,
@@ -39,6 +45,33 @@ class Review(models.Model):
         verbose_name="موافق عليه",
         help_text="يجب الموافقة على المراجعة قبل عرضها"
     )
+    # Moderation (store.moderation): is_approved is what shoppers see
+    moderation_status = models.CharField(
+        max_length=10,
+        choices=MODERATION_CHOICES,
+        default='pending',
+        verbose_name="حالة الإشراف"
+    )
+    moderated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="تاريخ الإشراف"
+    )
+    spam_score = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="درجة الإزعاج",
+        help_text="من 0 إلى 100، تحسب دورياً"
+    )
+    spam_checked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="تاريخ فحص الإزعاج"
+    )
+    comment_fingerprint = models.CharField(
+        max_length=32,
+        blank=True,
+        verbose_name="بصمة التعليق"
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name="تاريخ الإنشاء"
@@ -54,8 +87,33 @@ class Review(models.Model):
         ordering = ['-created_at']
         unique_together = ['product', 'user']  # One review per user per product
         indexes = [
-            models.Index(fields=['product', 'is_approved']),
-            models.Index(fields=['user']),
+            # Review feed sorts (store.reviews.REVIEW_SORTS), approved rows only
+            models.Index(
+                fields=['product', 'created_at', 'id'],
+                condition=models.Q(is_approved=True),
+                name='store_review_feed_newest',
+            ),
+            models.Index(
+                fields=['product', 'rating', 'created_at', 'id'],
+                condition=models.Q(is_approved=True),
+                name='store_review_feed_highest',
+            ),
+            models.Index(
+                fields=['product', 'is_verified_purchase', 'created_at', 'id'],
+                condition=models.Q(is_approved=True),
+                name='store_review_feed_verified',
+            ),
+            # Moderation queue, most suspicious first
+            models.Index(fields=['moderation_status', 'spam_score', 'id'], name='store_review_moderation'),
+            # Spam scoring batch: unscored rows, burst rate, repeated text
+            models.Index(
+                fields=['id'],
+                condition=models.Q(spam_checked_at__isnull=True),
+                name='store_review_unscored',
+            ),
+            models.Index(fields=['user', 'created_at']),
+            models.Index(fields=['comment_fingerprint']),
+            models.Index(fields=['updated_at']),
         ]
 
     def __str__(self):
@@ -70,3 +128,62 @@ class Review(models.Model):
     def stars_empty(self):
         """Return range for empty stars"""
         return range(5 - self.rating)
+
+
+class ProductRatingSummary(models.Model):
+    """
+    ملخص تقييمات المنتج
+    Approved-review totals and star histogram of one product
+
+    Kept in step with Review saves and deletes by store.signals (see
+    store.reviews); ``manage.py rebuild_rating_summaries`` recomputes it.
+    """
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='rating_summary',
+        verbose_name="المنتج"
+    )
+    review_total = models.PositiveIntegerField(
+        default=0,
+        verbose_name="عدد المراجعات"
+    )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name="مجموع التقييمات"
+    )
+    verified_total = models.PositiveIntegerField(
+        default=0,
+        verbose_name="مراجعات المشترين الموثقين"
+    )
+    stars_1 = models.PositiveIntegerField(default=0, verbose_name="نجمة واحدة")
+    stars_2 = models.PositiveIntegerField(default=0, verbose_name="نجمتان")
+    stars_3 = models.PositiveIntegerField(default=0, verbose_name="3 نجوم")
+    stars_4 = models.PositiveIntegerField(default=0, verbose_name="4 نجوم")
+    stars_5 = models.PositiveIntegerField(default=0, verbose_name="5 نجوم")
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="تاريخ التحديث"
+    )
+
+    class Meta:
+        verbose_name = "ملخص التقييمات"
+        verbose_name_plural = "ملخصات التقييمات"
+
+    def __str__(self):
+        return f"{self.product_id}: {self.average_rating}★ ({self.review_total})"
+
+    @property
+    def average_rating(self):
+        """Average of the approved ratings, one decimal"""
+        return round(self.rating_sum / self.review_total, 1) if self.review_total else 0
+
+    @property
+    def histogram(self):
+        """[(stars, count, percent of reviews)] from 5 stars down"""
+        return [
+            (stars, count, round(count * 100 / self.review_total) if self.review_total else 0)
+            for stars in range(5, 0, -1)
+            for count in [getattr(self, f'stars_{stars}')]
+        ]
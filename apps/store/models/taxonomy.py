@@ -1,5 +1,5 @@
 from django.db import models
-from django.utils.text import slugify
+from apps.store.slugs import allocate_slug
 
 
 class Category(models.Model):
@@ -69,7 +69,7 @@ class Category(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.name, allow_unicode=True)
+            self.slug = allocate_slug(self, self.name)
         super().save(*args, **kwargs)
 
 
@@ -127,5 +127,5 @@ class Brand(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.name, allow_unicode=True)
+            self.slug = allocate_slug(self, self.name)
         super().save(*args, **kwargs)
@@ -1,7 +1,7 @@
 from django.db import models
-from django.utils.text import slugify
 from django.core.validators import MinValueValidator, MaxValueValidator
 from datetime import datetime
+from apps.store.slugs import allocate_slug
 from .taxonomy import Brand
 
 
@@ -113,7 +113,7 @@ class CarModel(models.Model):
             if self.year_to:
                 year_range += f"-{self.year_to}"
             slug_text = f"{self.brand.name}-{self.name}-{year_range}"
-            self.slug = slugify(slug_text, allow_unicode=True)
+            self.slug = allocate_slug(self, slug_text)
         super().save(*args, **kwargs)
 
     @property
@@ -0,0 +1,206 @@
+"""
+Review moderation - background spam scoring and bulk moderator decisions
+
+New reviews are visible at once (``is_approved``) and wait in the
+moderation queue as ``pending``. ``manage.py score_reviews`` scores the
+unscored ones in batches, away from the add_review request, with a few
+cheap rules:
+
+* repeated text - the same normalised comment posted earlier (the first
+  post of a text is not penalised), and comments that are mostly one
+  repeated word or letter;
+* link density - links in the comment, more so in a short one;
+* burst rate - many reviews from one user within BURST_WINDOW.
+
+Pending reviews that reach SPAM_HIDE_SCORE are hidden until a moderator
+decides. Decisions and hiding are applied with one queryset UPDATE, which
+the per-review signals never see, so the affected products' rating
+summaries are recomputed in bulk and their pages purged afterwards.
+"""
+import hashlib
+import re
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict, namedtuple
+from datetime import timedelta
+
+from django.db.models import Count
+from django.utils import timezone
+
+from apps.store.models import Review
+from apps.store.page_cache import PRODUCT_LIST_TAG, invalidate_tags, product_tag
+from apps.store.reviews import decode_cursor, encode_cursor, refresh_rating_summaries, rows_after
+
+SCORE_BATCH_SIZE = 500
+SPAM_HIDE_SCORE = 60
+BURST_WINDOW = timedelta(minutes=10)
+# Reviews by one user inside BURST_WINDOW (counting the one scored) that start to look automated
+BURST_LIMIT = 3
+QUEUE_PAGE_SIZE = 50
+QUEUE_SORT = ('spam_score', 'id')
+
+# Decision -> (moderation_status, is_approved)
+MODERATION_DECISIONS = {
+    'approve': ('approved', True),
+    'reject': ('rejected', False),
+}
+
+LINK_RE = re.compile(r'(?:https?://|www\.)\S+', re.IGNORECASE)
+REPEATED_CHAR_RE = re.compile(r'(.)\1{5,}')
+WORD_RE = re.compile(r'\w+')
+
+ScoreRun = namedtuple('ScoreRun', ['scored', 'hidden'])
+
+
+def comment_fingerprint(comment):
+    """Hash of the comment with case, punctuation and spacing removed"""
+    normalised = ' '.join(WORD_RE.findall(comment.lower()))
+    return hashlib.md5(normalised.encode()).hexdigest()
+
+
+def spam_score(comment, duplicates=0, burst=1):
+    """
+    0-100 score for one review from its text, how many earlier reviews
+    share its fingerprint and how many reviews its author wrote around it
+    """
+    words = WORD_RE.findall(comment.lower())
+    links = len(LINK_RE.findall(comment))
+    score = 0
+
+    if duplicates:
+        score += 40 + min(duplicates - 1, 4) * 5
+    if REPEATED_CHAR_RE.search(comment) or (len(words) >= 6 and len(set(words)) / len(words) < 0.3):
+        score += 20
+
+    if links:
+        score += min(links * 25, 50)
+        if links / max(len(words), 1) > 0.2:
+            score += 20
+
+    if burst >= BURST_LIMIT:
+        score += min((burst - BURST_LIMIT + 1) * 15, 45)
+
+    return min(score, 100)
+
+
+def _burst_counts(batch):
+    """Reviews by each batch review's author within BURST_WINDOW of it"""
+    if not batch:
+        return {}
+    created = [review.created_at for review in batch]
+    times = defaultdict(list)
+    for user_id, created_at in Review.objects.filter(
+        user_id__in={review.user_id for review in batch},
+        created_at__range=(min(created) - BURST_WINDOW, max(created) + BURST_WINDOW),
+    ).values_list('user_id', 'created_at'):
+        times[user_id].append(created_at)
+    for user_times in times.values():
+        user_times.sort()
+
+    return {
+        review.pk: (
+            bisect_right(times[review.user_id], review.created_at + BURST_WINDOW)
+            - bisect_left(times[review.user_id], review.created_at - BURST_WINDOW)
+        )
+        for review in batch
+    }
+
+
+def _hide(review_ids):
+    """Take reviews off the product pages while they wait for a moderator"""
+    reviews = Review.objects.filter(pk__in=review_ids, moderation_status='pending', is_approved=True)
+    product_ids = set(reviews.values_list('product_id', flat=True))
+    hidden = reviews.update(is_approved=False, updated_at=timezone.now())
+    _refresh_products(product_ids)
+    return hidden
+
+
+def _refresh_products(product_ids):
+    refresh_rating_summaries(product_ids)
+    if product_ids:
+        invalidate_tags(PRODUCT_LIST_TAG, *(product_tag(product_id) for product_id in product_ids))
+
+
+def score_reviews(batch_size=SCORE_BATCH_SIZE, limit=None):
+    """
+    Score every review that has not been scored yet, oldest first
+
+    Each batch costs a handful of queries whatever its size: the batch,
+    the fingerprint counts, the authors' nearby reviews, one bulk_update
+    and (if any review crosses SPAM_HIDE_SCORE) one UPDATE plus the
+    summary refresh. Returns ScoreRun(scored, hidden).
+    """
+    scored = hidden = 0
+    while limit is None or scored < limit:
+        size = batch_size if limit is None else min(batch_size, limit - scored)
+        batch = list(
+            Review.objects.filter(spam_checked_at__isnull=True).order_by('id').only(
+                'id', 'user_id', 'product_id', 'comment', 'created_at', 'moderation_status', 'is_approved',
+            )[:size]
+        )
+        if not batch:
+            break
+
+        for review in batch:
+            review.comment_fingerprint = comment_fingerprint(review.comment)
+        # Earlier posts of the same text: scored ones, then earlier in the batch
+        earlier = Counter(dict(
+            Review.objects.filter(
+                comment_fingerprint__in={review.comment_fingerprint for review in batch},
+            ).values_list('comment_fingerprint').annotate(total=Count('id')).order_by()
+        ))
+        bursts = _burst_counts(batch)
+
+        now = timezone.now()
+        to_hide = []
+        for review in batch:
+            fingerprint = review.comment_fingerprint
+            duplicates = earlier[fingerprint]
+            earlier[fingerprint] += 1
+            review.spam_score = spam_score(review.comment, duplicates, bursts[review.pk])
+            review.spam_checked_at = now
+            if review.spam_score >= SPAM_HIDE_SCORE and review.moderation_status == 'pending':
+                to_hide.append(review.pk)
+
+        Review.objects.bulk_update(batch, ['comment_fingerprint', 'spam_score', 'spam_checked_at'])
+        if to_hide:
+            hidden += _hide(to_hide)
+        scored += len(batch)
+
+    return ScoreRun(scored, hidden)
+
+
+def moderate_reviews(review_ids, decision):
+    """
+    Apply a moderator's ``decision`` ('approve' / 'reject') to many reviews
+    with one UPDATE, then refresh the affected products in bulk
+
+    Returns the number of reviews changed.
+    """
+    status, visible = MODERATION_DECISIONS[decision]
+    reviews = Review.objects.filter(pk__in=review_ids)
+    product_ids = set(reviews.values_list('product_id', flat=True))
+    now = timezone.now()
+    changed = reviews.update(moderation_status=status, is_approved=visible, moderated_at=now, updated_at=now)
+    _refresh_products(product_ids)
+    return changed
+
+
+def moderation_queue(status='pending', cursor=None, limit=QUEUE_PAGE_SIZE):
+    """
+    One page of reviews in ``status``, highest spam score first
+
+    Returns ``(reviews, next_cursor)`` like store.reviews.review_feed().
+    """
+    reviews = Review.objects.filter(moderation_status=status).select_related(
+        'product', 'user',
+    ).order_by(*(f'-{field}' for field in QUEUE_SORT))
+
+    position = decode_cursor(cursor, QUEUE_SORT)
+    if position is not None:
+        reviews = reviews.filter(rows_after(QUEUE_SORT, position))
+
+    reviews = list(reviews[:limit + 1])
+    if len(reviews) <= limit:
+        return reviews, None
+    last = reviews[limit - 1]
+    return reviews[:limit], encode_cursor([getattr(last, field) for field in QUEUE_SORT])
@@ -0,0 +1,204 @@
+"""
+Anonymous full-page cache for catalogue pages
+
+Views decorated with @cache_anonymous_page render once per URL (path plus
+sorted query string; HTMX partials are cached separately) and are then
+served from the 'pages' cache to every anonymous visitor. The per-visitor
+parts of the page are punched out of the cached HTML: while rendering for
+the cache CSRF inputs carry a placeholder and the mini-cart has no badge
+(see context_processors.page_cache_holes), and base.html fetches both
+from the uncached page_holes fragment over HTMX.
+
+Invalidation is tag based. Each page stores the tags of what it shows
+(``product:<id>``, ``product-list``, ``taxonomy`` ...) with every tag's
+version at render time. invalidate_tags() gives a tag a new version, so
+every page carrying it becomes a miss without the cache having to know
+which pages those are; store/signals.py calls it when catalogue rows
+change. PAGE_CACHE_TIMEOUT bounds how stale anything the tags miss can be.
+Purges only reach pages in the same cache, so the 'pages' alias must be
+shared by every process (Redis or database, see settings); without one
+PAGE_CACHE_ENABLED stays off.
+
+Parts of a page that are the same for everyone (a product's spec table,
+its reviews, the related strip) can also be cached on their own with
+cached_fragment(), under the same tags. Signed-in visitors, who never get
+whole cached pages, then only pay for the per-visitor parts.
+"""
+import hashlib
+import uuid
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.connection import ConnectionProxy
+from django.utils.safestring import mark_safe
+
+KEY_PREFIX = 'page_cache:page:'
+FRAGMENT_KEY_PREFIX = 'page_cache:fragment:'
+TAG_KEY_PREFIX = 'page_cache:tag:'
+STATS_KEY_PREFIX = 'page_cache:stats:'
+# Value of every CSRF input in a cached page, replaced by page_holes.html
+CSRF_TOKEN_HOLE = 'page-cache-hole'
+
+# Pages, fragments, tag versions and the hit counters
+cache = ConnectionProxy(caches, 'pages')
+
+# Carried by every cached page: purge everything / menus and filters
+ALL_PAGES_TAG = 'pages'
+TAXONOMY_TAG = 'taxonomy'
+# Product list pages, whose membership and order change when products do
+PRODUCT_LIST_TAG = 'product-list'
+GALLERY_TAG = 'gallery'
+
+
+def product_tag(product_id):
+    return f'product:{product_id}'
+
+
+def tag_page(request, *tags):
+    """Add tags to the page being rendered for the cache (no-op otherwise)"""
+    page_tags = getattr(request, '_page_cache_tags', None)
+    if page_tags is not None:
+        page_tags.update(tags)
+
+
+def invalidate_tags(*tags):
+    """Expire every cached page carrying any of ``tags``"""
+    if tags:
+        cache.set_many({TAG_KEY_PREFIX + tag: uuid.uuid4().hex for tag in tags}, None)
+
+
+def invalidate_products(product_ids):
+    invalidate_tags(*(product_tag(product_id) for product_id in product_ids))
+
+
+def page_cache_stats():
+    """
+    Hits, misses and hit ratio since the counters were last reset
+
+    The counters live in the shared 'pages' cache, so they cover every
+    worker.
+    """
+    counts = cache.get_many([STATS_KEY_PREFIX + 'hits', STATS_KEY_PREFIX + 'misses'])
+    hits = counts.get(STATS_KEY_PREFIX + 'hits', 0)
+    misses = counts.get(STATS_KEY_PREFIX + 'misses', 0)
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / (hits + misses) if hits + misses else None,
+    }
+
+
+def reset_page_cache_stats():
+    cache.delete_many([STATS_KEY_PREFIX + 'hits', STATS_KEY_PREFIX + 'misses'])
+
+
+def _count(name):
+    key = STATS_KEY_PREFIX + name
+    if not cache.add(key, 1, None):
+        cache.incr(key)
+
+
+def _page_key(request):
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    variant = 'htmx' if request.headers.get('HX-Request') else 'page'
+    digest = hashlib.md5(f'{variant}|{request.path}?{query}'.encode()).hexdigest()
+    return KEY_PREFIX + digest
+
+
+def _tag_versions(tags):
+    keys = {TAG_KEY_PREFIX + tag: tag for tag in tags}
+    found = cache.get_many(keys)
+    # First pages with these tags: give them a version in one write. Another
+    # worker doing the same overwrites it, which only costs those pages a miss
+    missing = {key: uuid.uuid4().hex for key in keys.keys() - found.keys()}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def _is_fresh(entry):
+    return _tag_versions(entry['tags']) == entry['tags']
+
+
+def is_cacheable_request(request, skip_params=()):
+    """Anonymous GET/HEAD with the page cache on and none of ``skip_params`` set"""
+    if not getattr(settings, 'PAGE_CACHE_ENABLED', True):
+        return False
+    if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+        return False
+    return not any(request.GET.get(param) for param in skip_params)
+
+
+def cached_fragment(request, name, key, render, tags=()):
+    """
+    HTML of a page fragment shared by every visitor, rendered on a miss
+
+    ``render()`` returns ``(html, extra_tags)``; the extra tags are those
+    only known after rendering (e.g. the products a strip shows). The
+    fragment is stored with the versions of all its tags, so the
+    invalidate_tags() calls that purge pages expire it too, and a page
+    rendered for the page cache inherits them. ``name`` and ``key`` (plus
+    PAGE_VERSION, since templates change on deploy) identify the fragment.
+    """
+    if not getattr(settings, 'PAGE_CACHE_ENABLED', True):
+        html, extra_tags = render()
+        tag_page(request, *tags, *extra_tags)
+        return mark_safe(html)
+
+    digest = hashlib.md5(f'{settings.PAGE_VERSION}|{name}|{key}'.encode()).hexdigest()
+    cache_key = FRAGMENT_KEY_PREFIX + digest
+    entry = cache.get(cache_key)
+    if entry is None or not _is_fresh(entry):
+        html, extra_tags = render()
+        entry = {'content': html, 'tags': _tag_versions({ALL_PAGES_TAG, *tags, *extra_tags})}
+        cache.set(cache_key, entry, settings.PAGE_CACHE_TIMEOUT)
+    tag_page(request, *entry['tags'])
+    return mark_safe(entry['content'])
+
+
+def cache_anonymous_page(view_func=None, *, skip_params=()):
+    """
+    Serve the view's output from the page cache to anonymous visitors
+
+    Requests with any of ``skip_params`` set (e.g. a free-text search) are
+    never cached. Responses carry ``X-Page-Cache: HIT`` or ``MISS``.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not is_cacheable_request(request, skip_params):
+                return view_func(request, *args, **kwargs)
+
+            key = _page_key(request)
+            entry = cache.get(key)
+            if entry is not None and _is_fresh(entry):
+                _count('hits')
+                response = HttpResponse(entry['content'], content_type=entry['content_type'])
+                response['X-Page-Cache'] = 'HIT'
+                return response
+
+            _count('misses')
+            request.page_cache_holes = True
+            request._page_cache_tags = {ALL_PAGES_TAG, TAXONOMY_TAG}
+            response = view_func(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response.render()
+
+            # Anything that sets a cookie is per-visitor and must not be shared
+            if response.status_code == 200 and not response.streaming and not response.cookies:
+                cache.set(key, {
+                    'content': response.content,
+                    'content_type': response['Content-Type'],
+                    'tags': _tag_versions(request._page_cache_tags),
+                }, settings.PAGE_CACHE_TIMEOUT)
+            response['X-Page-Cache'] = 'MISS'
+            return response
+        return wrapper
+
+    if view_func is not None:
+        return decorator(view_func)
+    return decorator
@@ -0,0 +1,137 @@
+"""
+Scheduled promotions - materialising the active price into Product.effective_price
+
+Cart, checkout and the listings read ``Product.effective_price`` (one
+indexed column) and never evaluate promotion rules per request. Instead
+``manage.py apply_promotions``, run every minute, picks up the "due"
+promotions: ones that started, ended, were switched off or were edited
+since the last run (``Promotion.is_applied`` records what the stored
+prices reflect). Only the products in their scope, plus the products
+currently priced by them, are repriced against every live promotion, in
+batches of REPRICE_BATCH_SIZE with one bulk UPDATE each, and only the
+product pages whose price changed are purged.
+
+A product saved on its own (admin, import) picks up the live promotions
+covering it in Product.refresh_pricing(), so edits between runs keep the
+promoted price.
+"""
+from collections import defaultdict, namedtuple
+from itertools import islice
+
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.store.models import Product, Promotion
+from apps.store.page_cache import PRODUCT_LIST_TAG, invalidate_tags, product_tag
+
+REPRICE_BATCH_SIZE = 1000
+# Product columns repricing reads
+REPRICE_COLUMNS = (
+    'id', 'price', 'sale_price', 'category_id', 'brand_id',
+    'effective_price', 'discount_percent', 'promotion_id',
+)
+
+PromotionRun = namedtuple('PromotionRun', ['promotions', 'repriced'])
+
+
+class PromotionIndex:
+    """
+    Live promotions keyed by what they cover, so a batch of products is
+    matched in memory after two queries
+    """
+
+    def __init__(self, now=None):
+        promotions = list(Promotion.objects.live(now))
+        self.by_category = defaultdict(list)
+        self.by_brand = defaultdict(list)
+        self.by_product = defaultdict(list)
+
+        listed = {promotion.pk: promotion for promotion in promotions if promotion.scope == 'products'}
+        for promotion in promotions:
+            if promotion.scope == 'category':
+                self.by_category[promotion.category_id].append(promotion)
+            elif promotion.scope == 'brand':
+                self.by_brand[promotion.brand_id].append(promotion)
+        if listed:
+            for promotion_id, product_id in Promotion.products.through.objects.filter(
+                promotion_id__in=listed,
+            ).values_list('promotion_id', 'product_id'):
+                self.by_product[product_id].append(listed[promotion_id])
+
+    def covering(self, product):
+        """Live promotions whose scope includes ``product``"""
+        return [
+            *self.by_category.get(product.category_id, ()),
+            *self.by_brand.get(product.brand_id, ()),
+            *(self.by_product.get(product.pk, ()) if product.pk is not None else ()),
+        ]
+
+
+def reprice_products(product_ids=None, now=None, batch_size=REPRICE_BATCH_SIZE):
+    """
+    Recompute the stored pricing of ``product_ids`` (every product when
+    None) and write the rows that changed
+
+    Returns the number of products whose price changed.
+    """
+    now = now or timezone.now()
+    index = PromotionIndex(now)
+    if product_ids is None:
+        product_ids = Product.objects.order_by('pk').values_list('pk', flat=True)
+    # Ids are read up front: the batches below write to the table being listed
+    product_ids = iter(list(product_ids))
+
+    repriced = 0
+    while batch_ids := list(islice(product_ids, batch_size)):
+        changed = []
+        for product in Product.objects.filter(pk__in=batch_ids).only(*REPRICE_COLUMNS):
+            before = (product.effective_price, product.discount_percent, product.promotion_id)
+            product.refresh_pricing(promotions=index.covering(product))
+            if (product.effective_price, product.discount_percent, product.promotion_id) != before:
+                product.updated_at = now
+                changed.append(product)
+        if changed:
+            Product.objects.bulk_update(changed, [*Product.PRICING_FIELDS, 'updated_at'])
+            invalidate_tags(PRODUCT_LIST_TAG, *(product_tag(product.pk) for product in changed))
+            repriced += len(changed)
+    return repriced
+
+
+def _scope_product_ids(promotions):
+    """Products covered by ``promotions`` or currently priced by one of them"""
+    scope = Q(promotion_id__in=[promotion.pk for promotion in promotions])
+    category_ids = {promotion.category_id for promotion in promotions if promotion.scope == 'category'}
+    brand_ids = {promotion.brand_id for promotion in promotions if promotion.scope == 'brand'}
+    listed = [promotion.pk for promotion in promotions if promotion.scope == 'products']
+    if category_ids:
+        scope |= Q(category_id__in=category_ids)
+    if brand_ids:
+        scope |= Q(brand_id__in=brand_ids)
+    if listed:
+        scope |= Q(pk__in=Promotion.products.through.objects.filter(
+            promotion_id__in=listed,
+        ).values('product_id'))
+    return Product.objects.filter(scope).order_by('pk').values_list('pk', flat=True)
+
+
+def apply_due_promotions(now=None, batch_size=REPRICE_BATCH_SIZE):
+    """
+    Reprice the products affected by promotions that started, ended or
+    changed since the last run, then mark those promotions applied
+
+    Returns PromotionRun(promotions, repriced).
+    """
+    now = now or timezone.now()
+    due = list(Promotion.objects.due(now))
+    if not due:
+        return PromotionRun(0, 0)
+
+    # No transaction: prices are written (and pages purged) batch by batch,
+    # and a run that stops half way leaves its promotions due for the next
+    repriced = reprice_products(_scope_product_ids(due), now=now, batch_size=batch_size)
+    for promotion in due:
+        # A promotion edited while this ran stays due as well
+        Promotion.objects.filter(pk=promotion.pk, updated_at=promotion.updated_at).update(
+            is_applied=promotion.is_live(now),
+        )
+    return PromotionRun(len(due), repriced)
@@ -0,0 +1,327 @@
+"""
+Related products - precomputed top-K neighbours per product
+
+The product page used to show the first four products of its category, an
+unordered slice. rebuild_related() instead scores candidates for every
+active product from three signals and stores the best RELATED_LIMIT in
+RelatedProduct, so the page reads them in rank order with one indexed
+query:
+
+* co-purchase: cosine similarity of the two products' sets of paid
+  orders (see CoPurchaseMatrix);
+* fitment: shared ``compatible_car_models``, relative to how many models
+  the product fits. Car models fitting more than FITMENT_FANOUT_LIMIT
+  products are skipped, since "fits nearly everything" says nothing;
+* same category / same brand. The best sellers of each are always
+  candidates, which fills the list of products with little order or
+  fitment history.
+
+Products are processed in chunks of ids. A product's rows are only
+rewritten, and its cached page invalidated, when its list changed.
+"""
+from collections import defaultdict, namedtuple
+from itertools import islice
+
+import numpy as np
+from django.db import connections, transaction
+from django.db.models import Count, F, Sum
+
+from apps.orders.models import OrderItem
+from apps.store.models import Product, RelatedProduct
+from apps.store.page_cache import invalidate_products
+
+RELATED_LIMIT = 8
+CHUNK_SIZE = 500
+FITMENT_FANOUT_LIMIT = 200
+# Co-purchase neighbours kept per product as candidates for the blend
+CO_PURCHASE_CANDIDATES = 2 * RELATED_LIMIT
+# Expanded (product, order, other product) triples held per co-occurrence
+# chunk; each costs roughly 50 bytes across the temporary arrays
+MAX_CHUNK_PAIRS = 2_000_000
+FETCH_SIZE = 50_000
+
+# Blend of the normalised signals (each in 0..1)
+WEIGHTS = {
+    'co_purchase': 0.6,
+    'fitment': 0.25,
+    'category': 0.1,
+    'brand': 0.05,
+}
+
+Fitment = Product.compatible_car_models.through
+
+RelatedRun = namedtuple('RelatedRun', 'products changed rows')
+
+
+def _chunks(values, size):
+    iterator = iter(values)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _paid_items():
+    return OrderItem.objects.filter(order__payment_status='paid').order_by()
+
+
+def popularity():
+    """Units sold in paid orders, per product id"""
+    return dict(
+        _paid_items().values('product').annotate(units=Sum('quantity')).values_list('product', 'units')
+    )
+
+
+def _best_sellers(attributes, sold, position):
+    """The RELATED_LIMIT + 1 best sellers per category (or brand), newest first on ties"""
+    groups = defaultdict(list)
+    for product_id, values in attributes.items():
+        groups[values[position]].append(product_id)
+    return {
+        key: sorted(ids, key=lambda product_id: (-sold.get(product_id, 0), -product_id))[:RELATED_LIMIT + 1]
+        for key, ids in groups.items()
+    }
+
+
+def load_order_lines():
+    """(order_ids, product_ids) int64 arrays of the lines of paid orders"""
+    queryset = _paid_items().values_list('order_id', 'product_id')
+    sql, params = queryset.query.sql_with_params()
+    blocks = []
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        while rows := cursor.fetchmany(FETCH_SIZE):
+            blocks.append(np.array(rows, dtype=np.int64))
+    lines = np.concatenate(blocks) if blocks else np.empty((0, 2), dtype=np.int64)
+    return lines[:, 0], lines[:, 1]
+
+
+def _ptr(counts):
+    return np.concatenate(([0], np.cumsum(counts)))
+
+
+class CoPurchaseMatrix:
+    """
+    Sparse order x product incidence matrix of paid orders, with item-item
+    co-occurrence and cosine scores computed in vectorised chunks
+
+    The matrix is kept both ways round as compressed index arrays: for
+    every order the products it contains, for every product the orders
+    containing it. The co-occurrence row of product p (orders containing
+    both p and q, for every q) is the expansion "orders of p, then
+    products of those orders", counted with np.unique; its cosine is
+    ``both / sqrt(orders(p) * orders(q))``.
+
+    Rows are computed for consecutive products whose expansion stays under
+    ``max_pairs`` entries, so memory is bounded by that budget (plus the
+    kept top-K) instead of by products x products.
+    """
+
+    def __init__(self, order_ids, product_ids):
+        self.product_ids, product_index = np.unique(product_ids, return_inverse=True)
+        _, order_index = np.unique(order_ids, return_inverse=True)
+        product_count = len(self.product_ids)
+        order_count = int(order_index.max()) + 1 if len(order_index) else 0
+
+        # An order listing a product twice still counts once
+        cells = np.unique(order_index.astype(np.int64) * product_count + product_index)
+        order_index, product_index = np.divmod(cells, product_count)
+
+        # Cells are sorted by order: the by-order index comes for free
+        self.order_ptr = _ptr(np.bincount(order_index, minlength=order_count))
+        self.order_products = product_index
+        by_product = np.argsort(product_index, kind='stable')
+        self.product_ptr = _ptr(np.bincount(product_index, minlength=product_count))
+        self.product_orders = order_index[by_product]
+        self.order_totals = np.diff(self.product_ptr)
+
+        # Expansion size of every row, to cut memory-bounded chunks
+        order_sizes = np.diff(self.order_ptr)
+        self._expansion = _ptr(order_sizes[self.product_orders])[self.product_ptr]
+
+    @classmethod
+    def from_orders(cls):
+        return cls(*load_order_lines())
+
+    def __len__(self):
+        return len(self.product_ids)
+
+    def chunks(self, max_pairs=MAX_CHUNK_PAIRS):
+        """(start, stop) product index ranges whose expansion fits ``max_pairs``"""
+        start = 0
+        while start < len(self):
+            stop = int(np.searchsorted(self._expansion, self._expansion[start] + max_pairs, side='right')) - 1
+            stop = min(max(stop, start + 1), len(self))
+            yield start, stop
+            start = stop
+
+    def co_occurrence(self, start, stop):
+        """
+        (rows, others, both) for products ``start:stop``: every pair of
+        distinct products sharing at least one order, sorted by row
+        """
+        first, last = self.product_ptr[start], self.product_ptr[stop]
+        orders = self.product_orders[first:last]
+        rows = np.repeat(np.arange(start, stop), self.order_totals[start:stop])
+
+        sizes = self.order_ptr[orders + 1] - self.order_ptr[orders]
+        rows = np.repeat(rows, sizes)
+        # Position of every expanded entry inside its order's product list
+        offsets = np.arange(len(rows)) - np.repeat(_ptr(sizes)[:-1], sizes)
+        others = self.order_products[np.repeat(self.order_ptr[orders], sizes) + offsets]
+
+        distinct = others != rows
+        pairs, both = np.unique(rows[distinct] * len(self) + others[distinct], return_counts=True)
+        rows, others = np.divmod(pairs, len(self))
+        return rows, others, both
+
+    def top_neighbours(self, limit=CO_PURCHASE_CANDIDATES, max_pairs=MAX_CHUNK_PAIRS):
+        """CoPurchaseNeighbours keeping the ``limit`` best cosine scores per product"""
+        kept_rows, kept_others, kept_scores = [], [], []
+        for start, stop in self.chunks(max_pairs):
+            rows, others, both = self.co_occurrence(start, stop)
+            scores = both / np.sqrt(self.order_totals[rows] * self.order_totals[others])
+            # Per row: best score first, lower product id on ties
+            order = np.lexsort((others, -scores, rows))
+            rows, others, scores = rows[order], others[order], scores[order]
+            rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+            keep = rank < limit
+            kept_rows.append(rows[keep])
+            kept_others.append(others[keep])
+            kept_scores.append(scores[keep])
+
+        rows = np.concatenate(kept_rows) if kept_rows else np.empty(0, dtype=np.int64)
+        return CoPurchaseNeighbours(
+            self.product_ids,
+            _ptr(np.bincount(rows, minlength=len(self))),
+            self.product_ids[np.concatenate(kept_others)] if kept_others else np.empty(0, dtype=np.int64),
+            np.concatenate(kept_scores) if kept_scores else np.empty(0),
+        )
+
+
+class CoPurchaseNeighbours:
+    """Top co-purchased products per product, as compressed arrays"""
+
+    def __init__(self, product_ids, ptr, others, scores):
+        self.product_ids = product_ids
+        self.ptr = ptr
+        self.others = others
+        self.scores = scores
+
+    def __getitem__(self, product_id):
+        """{other_id: cosine} for ``product_id`` (empty if never bought)"""
+        index = int(np.searchsorted(self.product_ids, product_id))
+        if index == len(self.product_ids) or self.product_ids[index] != product_id:
+            return {}
+        first, last = self.ptr[index], self.ptr[index + 1]
+        return dict(zip(self.others[first:last].tolist(), self.scores[first:last].tolist()))
+
+
+def _crowded_car_models():
+    return list(
+        Fitment.objects.order_by().values('carmodel_id')
+        .annotate(products=Count('product_id'))
+        .filter(products__gt=FITMENT_FANOUT_LIMIT)
+        .values_list('carmodel_id', flat=True)
+    )
+
+
+def _shared_fitment(product_ids, crowded):
+    """
+    ({product_id: {other_id: shared car models}}, {product_id: car models})
+
+    The pair of a product with itself counts the models it fits.
+    """
+    shared, fits = defaultdict(dict), {}
+    rows = (
+        Fitment.objects.filter(product_id__in=product_ids)
+        .exclude(carmodel_id__in=crowded)
+        .order_by()
+        .values('product_id', other=F('carmodel__compatible_products__id'))
+        .annotate(models=Count('carmodel_id'))
+        .values_list('product_id', 'other', 'models')
+    )
+    for product_id, other_id, models in rows:
+        if other_id == product_id:
+            fits[product_id] = models
+        else:
+            shared[product_id][other_id] = models
+    return shared, fits
+
+
+def rank_related(product_id, attributes, bought_with, fitment, fits, category_pool, brand_pool, sold):
+    """[(score, related_id), ...] best first, at most RELATED_LIMIT"""
+    category_id, brand_id = attributes[product_id]
+    candidates = set(bought_with) | set(fitment) | set(category_pool[category_id]) | set(brand_pool[brand_id])
+    candidates.discard(product_id)
+
+    scored = []
+    for other_id in candidates:
+        other = attributes.get(other_id)
+        if other is None:  # inactive
+            continue
+        score = (
+            WEIGHTS['co_purchase'] * bought_with.get(other_id, 0)
+            + WEIGHTS['fitment'] * (fitment.get(other_id, 0) / fits[product_id] if fitment else 0)
+            + WEIGHTS['category'] * (other[0] == category_id)
+            + WEIGHTS['brand'] * (other[1] == brand_id)
+        )
+        scored.append((round(score, 6), other_id))
+    scored.sort(key=lambda item: (-item[0], -sold.get(item[1], 0), -item[1]))
+    return scored[:RELATED_LIMIT]
+
+
+def rebuild_related(chunk_size=CHUNK_SIZE, max_pairs=MAX_CHUNK_PAIRS):
+    """
+    Recompute every product's related list and store the ones that changed
+
+    Inactive products lose their rows and never appear in another list.
+    """
+    co_purchased = CoPurchaseMatrix.from_orders().top_neighbours(max_pairs=max_pairs)
+    attributes = {
+        product_id: (category_id, brand_id)
+        for product_id, category_id, brand_id in Product.objects.filter(is_active=True)
+        .order_by().values_list('pk', 'category_id', 'brand_id')
+    }
+    sold = popularity()
+    category_pool = _best_sellers(attributes, sold, 0)
+    brand_pool = _best_sellers(attributes, sold, 1)
+    crowded = _crowded_car_models()
+
+    changed_total = rows_total = 0
+    all_ids = list(Product.objects.order_by('pk').values_list('pk', flat=True))
+    for chunk in _chunks(all_ids, chunk_size):
+        active = [product_id for product_id in chunk if product_id in attributes]
+        shared, fits = _shared_fitment(active, crowded)
+        lists = {
+            product_id: rank_related(
+                product_id, attributes, co_purchased[product_id], shared[product_id], fits,
+                category_pool, brand_pool, sold,
+            )
+            for product_id in active
+        }
+
+        stored = defaultdict(list)
+        for product_id, related_id in (
+            RelatedProduct.objects.filter(product_id__in=chunk)
+            .order_by('product', 'rank').values_list('product_id', 'related_id')
+        ):
+            stored[product_id].append(related_id)
+        changed = [
+            product_id for product_id in chunk
+            if [related_id for _, related_id in lists.get(product_id, [])] != stored[product_id]
+        ]
+        if not changed:
+            continue
+
+        entries = [
+            RelatedProduct(product_id=product_id, related_id=related_id, rank=rank, score=score)
+            for product_id in changed
+            for rank, (score, related_id) in enumerate(lists.get(product_id, []), start=1)
+        ]
+        with transaction.atomic():
+            RelatedProduct.objects.filter(product_id__in=changed).delete()
+            RelatedProduct.objects.bulk_create(entries, batch_size=1000)
+        invalidate_products(changed)
+        changed_total += len(changed)
+        rows_total += len(entries)
+
+    return RelatedRun(products=len(attributes), changed=changed_total, rows=rows_total)
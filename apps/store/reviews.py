@@ -0,0 +1,218 @@
+"""
+Product reviews - rating summary maintenance and the keyset-paginated feed
+
+ProductRatingSummary keeps each product's approved-review count, rating
+sum and per-star histogram, so the product page reads one row instead of
+aggregating every review. store.signals applies the change of each saved
+or deleted review; queryset ``update()`` / ``bulk_create()`` bypass it, so
+run ``manage.py rebuild_rating_summaries`` after bulk edits.
+
+The feed pages with a cursor instead of OFFSET: the cursor carries the
+sort values of the last row shown, and the next page is the rows that
+come after it in the sort order, read in order off the matching partial
+``(product, <sort fields>) WHERE is_approved`` index on Review (so no
+sort step, however many reviews a product has).
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from apps.store.models import ProductRatingSummary, Review
+
+SUMMARY_FIELDS = (
+    'review_total',
+    'rating_sum',
+    'verified_total',
+    'stars_1',
+    'stars_2',
+    'stars_3',
+    'stars_4',
+    'stars_5',
+)
+
+# Sort name -> fields, all descending; ``id`` breaks ties so the order is total
+REVIEW_SORTS = {
+    'newest': ('created_at', 'id'),
+    'highest': ('rating', 'created_at', 'id'),
+    'verified': ('is_verified_purchase', 'created_at', 'id'),
+}
+DEFAULT_REVIEW_SORT = 'newest'
+REVIEW_FEED_PAGE_SIZE = 10
+
+
+def review_contribution(rating, is_approved, is_verified_purchase):
+    """
+    Return the amounts a single review adds to its product's summary row
+    """
+    contribution = dict.fromkeys(SUMMARY_FIELDS, 0)
+    if is_approved:
+        contribution.update({
+            'review_total': 1,
+            'rating_sum': rating,
+            'verified_total': 1 if is_verified_purchase else 0,
+            f'stars_{rating}': 1,
+        })
+    return contribution
+
+
+def apply_summary_delta(product_id, delta):
+    """
+    Add ``delta`` to the summary row of ``product_id`` using F() expressions
+
+    The row is created on first use; a concurrent creator is handled by
+    retrying the UPDATE once the primary key fires. Counts are floored at
+    zero so a summary that is behind (bulk edits) never blocks a save.
+    """
+    delta = {field: value for field, value in delta.items() if value}
+    if not delta:
+        return
+
+    updates = {field: Greatest(F(field) + value, 0) for field, value in delta.items()}
+    updates['updated_at'] = timezone.now()
+    if ProductRatingSummary.objects.filter(product_id=product_id).update(**updates):
+        return
+    if any(value < 0 for value in delta.values()):
+        # Nothing stored to subtract from
+        return
+
+    try:
+        with transaction.atomic():
+            ProductRatingSummary.objects.create(product_id=product_id, **delta)
+    except IntegrityError:
+        ProductRatingSummary.objects.filter(product_id=product_id).update(**updates)
+
+
+def record_review_change(previous, current):
+    """
+    Move a review's contribution from its previous state to its current one
+
+    ``previous`` and ``current`` are dicts with ``product_id``, ``rating``,
+    ``is_approved`` and ``is_verified_purchase`` (``None`` for a created
+    or deleted review).
+    """
+    deltas = {}
+
+    for state, sign in ((previous, -1), (current, 1)):
+        if state is None:
+            continue
+        amounts = review_contribution(state['rating'], state['is_approved'], state['is_verified_purchase'])
+        bucket = deltas.setdefault(state['product_id'], dict.fromkeys(SUMMARY_FIELDS, 0))
+        for field in SUMMARY_FIELDS:
+            bucket[field] += sign * amounts[field]
+
+    for product_id, delta in deltas.items():
+        apply_summary_delta(product_id, delta)
+
+
+def _summary_rows(reviews):
+    return reviews.filter(is_approved=True).values('product_id').annotate(
+        review_total=Count('id'),
+        rating_sum=Sum('rating'),
+        verified_total=Count('id', filter=Q(is_verified_purchase=True)),
+        **{f'stars_{stars}': Count('id', filter=Q(rating=stars)) for stars in range(1, 6)},
+    ).order_by()
+
+
+def rebuild_rating_summaries():
+    """
+    Recompute every summary row from the approved reviews
+
+    Returns the number of products that have a summary.
+    """
+    rows = _summary_rows(Review.objects.all())
+
+    with transaction.atomic():
+        ProductRatingSummary.objects.all().delete()
+        summaries = ProductRatingSummary.objects.bulk_create(
+            [ProductRatingSummary(**row) for row in rows],
+            batch_size=1000,
+        )
+    return len(summaries)
+
+
+def refresh_rating_summaries(product_ids):
+    """
+    Recompute the summary rows of ``product_ids`` in bulk
+
+    For code that changes reviews with queryset ``update()`` (moderation),
+    which the per-review signals never see.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return
+    rows = _summary_rows(Review.objects.filter(product_id__in=product_ids))
+
+    with transaction.atomic():
+        ProductRatingSummary.objects.filter(product_id__in=product_ids).delete()
+        ProductRatingSummary.objects.bulk_create(
+            [ProductRatingSummary(**row) for row in rows],
+            batch_size=1000,
+        )
+
+
+def encode_cursor(values):
+    """Opaque, URL-safe cursor for a row's sort values"""
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, fields):
+    """
+    Sort values from a cursor made by encode_cursor(), or None
+
+    Anything that does not decode to one valid value per field (a cursor
+    from another sort, a hand-edited URL) is treated as "start from the top".
+    """
+    if not cursor:
+        return None
+    try:
+        values = json.loads(urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (Base64Error, ValueError):
+        return None
+    if not isinstance(values, list) or len(values) != len(fields) or None in values:
+        return None
+    try:
+        return [Review._meta.get_field(field).to_python(value) for field, value in zip(fields, values)]
+    except (ValidationError, TypeError):
+        return None
+
+
+def rows_after(fields, values):
+    """Rows that come after ``values`` when sorting by ``fields`` descending"""
+    condition = Q()
+    for position, field in enumerate(fields):
+        condition |= Q(
+            **dict(zip(fields[:position], values[:position])),
+            **{f'{field}__lt': values[position]},
+        )
+    return condition
+
+
+def review_feed(product_id, sort=DEFAULT_REVIEW_SORT, cursor=None, limit=REVIEW_FEED_PAGE_SIZE):
+    """
+    One page of a product's approved reviews
+
+    Returns ``(reviews, next_cursor)``; ``next_cursor`` is None on the last page.
+    """
+    fields = REVIEW_SORTS[sort]
+    reviews = Review.objects.filter(
+        product_id=product_id,
+        is_approved=True,
+    ).select_related('user').order_by(*(f'-{field}' for field in fields))
+
+    position = decode_cursor(cursor, fields)
+    if position is not None:
+        reviews = reviews.filter(rows_after(fields, position))
+
+    reviews = list(reviews[:limit + 1])
+    if len(reviews) <= limit:
+        return reviews, None
+    last = reviews[limit - 1]
+    return reviews[:limit], encode_cursor([getattr(last, field) for field in fields])
@@ -0,0 +1,173 @@
+"""
+Purge anonymous page-cache entries when the catalogue rows they show change
+
+Product saves purge the pages tagged with that product; list pages are
+also purged when a save can change which products a list shows or their
+order (see LISTING_FIELDS). Queryset updates bypass these signals: code
+that updates products in bulk calls page_cache.invalidate_products()
+itself (e.g. inventory.sync).
+
+Review saves and deletes also keep ProductRatingSummary in step (see
+store.reviews); after bulk review edits run ``manage.py
+rebuild_rating_summaries``.
+
+Deleting a promotion, or changing its product list, reprices or flags
+the products it covered (see store.promotions).
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.store.models import Brand, CarModel, Category, Gallery, Product, ProductSpecification, Promotion, Review
+from apps.store.page_cache import (
+    GALLERY_TAG,
+    PRODUCT_LIST_TAG,
+    TAXONOMY_TAG,
+    invalidate_tags,
+    product_tag,
+)
+from apps.store.promotions import reprice_products
+from apps.store.reviews import record_review_change
+
+# Review fields the rating summary counts
+SUMMARY_STATE_FIELDS = ('product_id', 'rating', 'is_approved', 'is_verified_purchase')
+
+# Fields the product list filters or sorts on
+LISTING_FIELDS = (
+    'is_active', 'category_id', 'name', 'price', 'sale_price',
+    'is_featured', 'is_new_arrival', 'created_at', 'effective_price', 'discount_percent',
+)
+
+
+@receiver(pre_save, sender=Product)
+def remember_listing_fields(sender, instance, raw=False, **kwargs):
+    """Keep the stored listing fields so post_save can tell if lists changed"""
+    instance._listing_before = None
+    if raw or instance.pk is None:
+        return
+    instance._listing_before = Product.objects.filter(
+        pk=instance.pk
+    ).values_list(*LISTING_FIELDS).first()
+
+
+@receiver(post_save, sender=Product)
+def purge_product_pages(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    tags = [product_tag(instance.pk)]
+    listing = tuple(getattr(instance, field) for field in LISTING_FIELDS)
+    if created or getattr(instance, '_listing_before', None) != listing:
+        tags.append(PRODUCT_LIST_TAG)
+    invalidate_tags(*tags)
+
+
+@receiver(post_delete, sender=Product)
+def purge_deleted_product_pages(sender, instance, **kwargs):
+    invalidate_tags(product_tag(instance.pk), PRODUCT_LIST_TAG)
+
+
+@receiver(m2m_changed, sender=Product.compatible_brands.through)
+@receiver(m2m_changed, sender=Product.compatible_car_models.through)
+def purge_fitment_pages(sender, instance, action, reverse, pk_set, **kwargs):
+    """Brand / car model filters read the fitment tables"""
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        product_ids = pk_set or []
+    else:
+        product_ids = [instance.pk]
+    invalidate_tags(PRODUCT_LIST_TAG, *(product_tag(product_id) for product_id in product_ids))
+
+
+@receiver(pre_delete, sender=Promotion)
+def remember_promoted_products(sender, instance, **kwargs):
+    """The products' promotion is cleared by SET_NULL before post_delete runs"""
+    instance._priced_product_ids = list(instance.priced_products.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Promotion)
+def reprice_promoted_products(sender, instance, **kwargs):
+    """Drop the deleted promotion's discount from the prices it set"""
+    product_ids = getattr(instance, '_priced_product_ids', None)
+    if product_ids:
+        reprice_products(product_ids)
+
+
+@receiver(m2m_changed, sender=Promotion.products.through)
+def flag_promotion_products_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """A changed product list is re-applied by the next scheduler run"""
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        promotions = Promotion.objects.filter(pk=instance.pk)
+    elif pk_set is not None:
+        promotions = Promotion.objects.filter(pk__in=pk_set)
+    else:
+        # product.promotions.clear() does not say which lists it left
+        promotions = Promotion.objects.filter(scope='products')
+    # updated_at moves too, so a run already in progress leaves them due
+    promotions.update(is_applied=False, updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def purge_reviewed_product_pages(sender, instance, raw=False, **kwargs):
+    """Ratings show on product pages and feed the rating filter"""
+    if not raw:
+        invalidate_tags(product_tag(instance.product_id), PRODUCT_LIST_TAG)
+
+
+def _review_state(review):
+    return {field: getattr(review, field) for field in SUMMARY_STATE_FIELDS}
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_state(sender, instance, raw=False, **kwargs):
+    """Snapshot the stored row so post_save can compute the summary delta"""
+    instance._summary_previous = None
+    if raw or instance.pk is None:
+        return
+    instance._summary_previous = Review.objects.filter(
+        pk=instance.pk
+    ).values(*SUMMARY_STATE_FIELDS).first()
+
+
+@receiver(post_save, sender=Review)
+def update_rating_summary(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_summary_previous', None)
+    current = _review_state(instance)
+    if previous != current:
+        record_review_change(previous, current)
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_summary(sender, instance, **kwargs):
+    record_review_change(_review_state(instance), None)
+
+
+@receiver(post_save, sender=ProductSpecification)
+@receiver(post_delete, sender=ProductSpecification)
+def purge_specification_pages(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_tags(product_tag(instance.product_id))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+@receiver(post_save, sender=CarModel)
+@receiver(post_delete, sender=CarModel)
+def purge_taxonomy_pages(sender, raw=False, **kwargs):
+    """Menus and list filters show categories, brands and car models on every page"""
+    if not raw:
+        invalidate_tags(TAXONOMY_TAG)
+
+
+@receiver(post_save, sender=Gallery)
+@receiver(post_delete, sender=Gallery)
+def purge_gallery_pages(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate_tags(GALLERY_TAG)
@@ -0,0 +1,110 @@
+"""
+Unique slug allocation for catalogue models
+
+slugify() alone leaves collisions to the unique constraint, so two
+products called "فلتر زيت" fail on IntegrityError, and a bulk_create
+(which never calls save()) has no chance to retry. allocate_slugs() gives
+every text in a batch a free slug with one ``slug IN (...)`` query: for
+each base slug it checks the bare base plus the next few suffixed
+candidates (``-2``, ``-3`` ...) at once, and takes the lowest free ones
+in input order, so the result only depends on what is already stored.
+Only when every candidate in that window is taken is another query made.
+
+Allocation is not a lock: two transactions allocating at the same moment
+can still pick the same slug, and the unique constraint remains the final
+guard (on SQLite the IMMEDIATE write lock already serializes writers).
+"""
+from collections import Counter
+
+from django.utils.text import slugify
+
+# Suffixed candidates checked per base on top of the batch's own need
+SLUG_HEADROOM = 5
+
+
+def slug_base(text, max_length, fallback='item'):
+    """slugify() ``text`` (Unicode kept) and cut it to ``max_length``"""
+    return slugify(text, allow_unicode=True)[:max_length].strip('-') or fallback
+
+
+def _candidate(base, number, max_length):
+    if number == 1:
+        return base
+    suffix = f'-{number}'
+    return base[:max_length - len(suffix)].rstrip('-') + suffix
+
+
+def allocate_slugs(model, texts, exclude_pk=None, reserved=(), field_name='slug'):
+    """
+    Free, distinct slugs for ``texts`` (same order) on ``model.<field_name>``
+
+    ``exclude_pk`` ignores that row's current slug (re-slugging an
+    existing object); ``reserved`` are slugs the caller is about to use
+    that are not stored yet.
+    """
+    max_length = model._meta.get_field(field_name).max_length
+    fallback = model._meta.model_name
+    bases = [slug_base(text, max_length, fallback) for text in texts]
+    slugs = [None] * len(bases)
+    used = set(reserved)
+    next_number = dict.fromkeys(bases, 1)
+    pending = list(range(len(bases)))
+
+    while pending:
+        candidates = {}
+        for base, count in Counter(bases[index] for index in pending).items():
+            start = next_number[base]
+            candidates[base] = [
+                _candidate(base, number, max_length)
+                for number in range(start, start + count + SLUG_HEADROOM)
+            ]
+            next_number[base] = start + count + SLUG_HEADROOM
+
+        stored = model._base_manager.filter(**{
+            f'{field_name}__in': {slug for window in candidates.values() for slug in window}
+        })
+        if exclude_pk is not None:
+            stored = stored.exclude(pk=exclude_pk)
+        used.update(stored.values_list(field_name, flat=True))
+
+        free = {
+            base: iter([slug for slug in window if slug not in used])
+            for base, window in candidates.items()
+        }
+        still_pending = []
+        for index in pending:
+            slug = next(free[bases[index]], None)
+            # Another base's suffixed candidate may have claimed it this round
+            while slug is not None and slug in used:
+                slug = next(free[bases[index]], None)
+            if slug is None:
+                still_pending.append(index)
+                continue
+            used.add(slug)
+            slugs[index] = slug
+        pending = still_pending
+    return slugs
+
+
+def allocate_slug(instance, text, field_name='slug'):
+    """A free slug for one (possibly saved) instance"""
+    return allocate_slugs(type(instance), [text], exclude_pk=instance.pk, field_name=field_name)[0]
+
+
+def assign_slugs(instances, text, field_name='slug'):
+    """
+    Fill the slug of every instance that has none, before bulk_create
+
+    ``text`` maps an instance to the text its slug is made from. Slugs the
+    instances already carry are reserved so new ones do not clash with them.
+    """
+    missing = [instance for instance in instances if not getattr(instance, field_name)]
+    if not missing:
+        return
+    reserved = {getattr(instance, field_name) for instance in instances if getattr(instance, field_name)}
+    model = type(missing[0])
+    for instance, slug in zip(
+        missing,
+        allocate_slugs(model, [text(instance) for instance in missing], reserved=reserved, field_name=field_name),
+    ):
+        setattr(instance, field_name, slug)
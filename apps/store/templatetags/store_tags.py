@@ -1,15 +1,35 @@
 from django import template
 from django.db.models import Prefetch
+from django.template.loader import render_to_string
 from apps.store.models import Brand, CarModel
+from apps.store.page_cache import TAXONOMY_TAG, cached_fragment
 
 register = template.Library()
 
 
-@register.inclusion_tag('partials/brands_navbar.html')
-def brands_navbar():
+@register.simple_tag(takes_context=True)
+def shared_include(context, template_name, *tags):
+    """
+    {% include %} through the shared fragment cache, for markup that is the
+    same for every visitor; expires with the given page-cache ``tags``
+    """
+    def render():
+        with context.push():
+            html = context.template.engine.get_template(template_name).render(context)
+        return html, ()
+    return cached_fragment(context.get('request'), 'include', template_name, render, tags)
+
+
+@register.simple_tag(takes_context=True)
+def brands_navbar(context):
     """
     Template tag to display brands with their car models in navbar
+    (the same for every visitor: cached until a brand or car model changes)
     """
+    return cached_fragment(context.get('request'), 'brands-navbar', '', _render_brands_navbar, [TAXONOMY_TAG])
+
+
+def _render_brands_navbar():
     # Get brands that should show in navbar
     brands_with_models = Brand.objects.filter(
         is_active=True,
@@ -24,9 +44,10 @@ def brands_navbar():
         )
     ).order_by('name')
     
-    return {
+    html = render_to_string('partials/brands_navbar.html', {
         'brands_with_models': brands_with_models
-    }
+    })
+    return html, ()
 
 
 @register.simple_tag
@@ -1,3 +1,1072 @@
-﻿from django.test import TestCase
+﻿import gzip
+import json
+import re
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from itertools import product as combinations
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.inventory.models import InventoryItem
+from apps.dashboard.testing import QueryBudgetTestCase, seed_catalog
+from apps.inventory.sync import sync_product
+from apps.orders.models import Cart, CartItem, Order, OrderItem
+from apps.store.catalog_import import import_catalog, read_catalog_rows
+from apps.store.feeds import FEED_NAME, INDEX_NAME, MANIFEST_NAME, generate_feeds
+from apps.store.moderation import SPAM_HIDE_SCORE, score_reviews, spam_score
+from apps.store.models import (
+    Category, Product, ProductRatingSummary, ProductSpecification, Promotion, RelatedProduct, Review,
+)
+from apps.store.promotions import apply_due_promotions, reprice_products
+from apps.store.recommendations import CoPurchaseMatrix, rebuild_related
+from apps.store.reviews import REVIEW_SORTS, rebuild_rating_summaries, review_feed
+from apps.store.slugs import allocate_slugs, assign_slugs
+from apps.store.page_cache import CSRF_TOKEN_HOLE, cache, page_cache_stats
+from apps.users.models import User
+from config.db_router import PrimaryReplicaRouter, pin_to_primary
+
+
+class StorefrontQueryBudgetTests(QueryBudgetTestCase):
+    """
+    حدود الاستعلامات لصفحات المتجر
+    Query budgets for the storefront pages, anonymous and signed in
+    """
+
+    def test_home(self):
+        self.assertWithinBudget('get', reverse('store:home'))
+        self.client.force_login(self.catalog.shopper)
+        self.assertWithinBudget('get', reverse('store:home'))
+
+    def test_product_list_each_filter(self):
+        catalog = self.catalog
+        filters = [
+            {},
+            {'category': catalog.categories[0].slug},
+            {'category': catalog.categories[-1].slug},
+            {'brand': catalog.brands[0].slug},
+            {'car_model': catalog.car_models[0].slug},
+            {'search': 'SKU-0001'},
+            {'search': catalog.brands[1].name},
+            {'min_price': '50', 'max_price': '500'},
+            {'featured': 'true'},
+            {'new_arrival': 'true'},
+            {'on_sale': 'true'},
+            {'rating': '3'},
+            {'rating': 'x'},
+            {'page': '3'},
+            {'page': '9999'},
+        ]
+        for params in filters:
+            with self.subTest(params=params):
+                self.assertWithinBudget('get', reverse('store:product_list'), params)
+
+    def test_product_list_filter_and_search_combinations(self):
+        catalog = self.catalog
+        url = reverse('store:product_list')
+        for category, brand, car_model, search, sort in combinations(
+            [None, catalog.categories[0].slug],
+            [None, catalog.brands[0].slug],
+            [None, catalog.car_models[0].slug],
+            [None, 'a'],
+            ['newest', 'oldest', 'price_asc', 'price_desc', 'name_asc', 'name_desc'],
+        ):
+            params = {'category': category, 'brand': brand, 'car_model': car_model, 'search': search}
+            params = {key: value for key, value in params.items() if value}
+            params.update(sort=sort, rating='1', on_sale='true')
+            with self.subTest(params=params):
+                self.assertWithinBudget('get', url, params)
+
+    def test_product_list_htmx_page(self):
+        self.assertWithinBudget(
+            'get', reverse('store:product_list'), {'page': '2'}, HTTP_HX_REQUEST='true'
+        )
+
+    def test_product_detail(self):
+        url = reverse('store:product_detail', args=[self.catalog.reviewed_product.slug])
+        self.assertWithinBudget('get', url)
+        self.client.force_login(self.catalog.shopper)
+        self.assertWithinBudget('get', url)
+
+
+@mock.patch.dict(settings.DATABASES, {'replica': {}})
+class PrimaryReplicaRouterTests(TestCase):
+    """
+    Catalogue reads go to the replica; writes, other apps and pinned reads to the primary
+    """
+
+    router = PrimaryReplicaRouter()
+
+    def test_catalogue_reads_use_replica(self):
+        # TestCase wraps each test in a transaction; leave it for this check
+        with mock.patch('config.db_router.connections') as connections:
+            connections.__getitem__.return_value.in_atomic_block = False
+            self.assertEqual(self.router.db_for_read(Product), 'replica')
+            self.assertEqual(self.router.db_for_read(Order), 'default')
+            with pin_to_primary():
+                self.assertEqual(self.router.db_for_read(Product), 'default')
+
+    def test_reads_inside_a_transaction_use_primary(self):
+        with transaction.atomic():
+            self.assertEqual(self.router.db_for_read(Product), 'default')
+
+    def test_writes_and_migrations_use_primary(self):
+        self.assertEqual(self.router.db_for_write(Product), 'default')
+        self.assertFalse(self.router.allow_migrate('replica', 'store'))
+        self.assertTrue(self.router.allow_migrate('default', 'store'))
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class AnonymousPageCacheTests(TestCase):
+    """
+    ذاكرة الصفحات المؤقتة للزوار
+    Anonymous page cache: hole punching, keys and tag invalidation
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = seed_catalog(products=60, users=5, orders=5, reviews_per_product=1)
+        newest = Product.objects.filter(is_active=True).order_by('-created_at')
+        cls.first_page_product = newest[0]
+        cls.second_page_product = newest[25]
+
+    def setUp(self):
+        cache.clear()
+
+    def assertCache(self, url, expected, **extra):
+        response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get('X-Page-Cache'), expected, url)
+        return response
+
+    def detail_url(self, product):
+        return reverse('store:product_detail', args=[product.slug])
+
+    def test_second_visit_is_served_from_cache_without_holes(self):
+        url = self.detail_url(self.first_page_product)
+        miss = self.assertCache(url, 'MISS')
+        # Only the conditional-GET validator query runs
+        with self.assertNumQueries(1):
+            hit = self.assertCache(url, 'HIT')
+
+        self.assertEqual(hit.content, miss.content)
+        self.assertIn(f'name="csrfmiddlewaretoken" value="{CSRF_TOKEN_HOLE}"'.encode(), hit.content)
+        self.assertIn(reverse('store:page_holes').encode(), hit.content)
+        self.assertNotIn(settings.CSRF_COOKIE_NAME, miss.cookies)
+        self.assertEqual(page_cache_stats()['hits'], 1)
+        self.assertEqual(page_cache_stats()['misses'], 1)
+
+    def test_query_order_and_htmx_variants(self):
+        list_url = reverse('store:product_list')
+        self.assertCache(f'{list_url}?sort=price_asc&page=2', 'MISS')
+        self.assertCache(f'{list_url}?page=2&sort=price_asc', 'HIT')
+        self.assertCache(f'{list_url}?page=2&sort=price_asc', 'MISS', HTTP_HX_REQUEST='true')
+
+    def test_search_and_signed_in_requests_bypass_cache(self):
+        list_url = reverse('store:product_list')
+        self.assertCache(f'{list_url}?search=SKU', None)
+        self.assertCache(f'{list_url}?search=SKU', None)
+
+        self.client.force_login(self.catalog.shopper)
+        self.assertCache(self.detail_url(self.first_page_product), None)
+
+    def test_product_save_purges_only_its_pages(self):
+        list_url = reverse('store:product_list')
+        first, second = self.first_page_product, self.second_page_product
+        for url in (self.detail_url(first), self.detail_url(second), list_url, f'{list_url}?page=2'):
+            self.assertCache(url, 'MISS')
+
+        first.description = 'وصف محدث'
+        first.save()
+
+        self.assertCache(self.detail_url(first), 'MISS')
+        self.assertCache(list_url, 'MISS')
+        self.assertCache(self.detail_url(second), 'HIT')
+        self.assertCache(f'{list_url}?page=2', 'HIT')
+
+    def test_listing_change_purges_every_list_page(self):
+        list_url = reverse('store:product_list')
+        self.assertCache(f'{list_url}?page=2', 'MISS')
+        self.assertCache(self.detail_url(self.second_page_product), 'MISS')
+
+        self.first_page_product.price += 1
+        self.first_page_product.save()
+
+        self.assertCache(f'{list_url}?page=2', 'MISS')
+        self.assertCache(self.detail_url(self.second_page_product), 'HIT')
+
+    def test_stock_sync_purges_product_pages(self):
+        url = self.detail_url(self.first_page_product)
+        self.assertCache(url, 'MISS')
+        sync_product(self.first_page_product.pk, 0, 5)
+        self.assertCache(url, 'MISS')
+
+    def test_form_on_a_cached_page_posts_with_the_filled_in_token(self):
+        client = Client(enforce_csrf_checks=True)
+        url = reverse('store:contact')
+        client.get(url)
+        page = client.get(url)
+        self.assertEqual(page['X-Page-Cache'], 'HIT')
+        self.assertContains(page, f'name="csrfmiddlewaretoken" value="{CSRF_TOKEN_HOLE}"')
+        self.assertEqual(client.post(url, {'csrfmiddlewaretoken': CSRF_TOKEN_HOLE}).status_code, 403)
+
+        # What page_holes.html does in the browser
+        holes = client.get(reverse('store:page_holes')).content.decode()
+        token = re.search(r"window.csrfToken = '([^']+)'", holes).group(1)
+        self.assertEqual(client.post(url, {'csrfmiddlewaretoken': token}).status_code, 200)
+
+    def test_page_holes_fragment(self):
+        response = self.client.get(reverse('store:page_holes'))
+        self.assertContains(response, 'id="mini-cart" hx-swap-oob="true"')
+        self.assertContains(response, 'window.csrfToken')
+        self.assertIn(settings.CSRF_COOKIE_NAME, response.cookies)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class ConditionalGetTests(TestCase):
+    """
+    طلبات GET الشرطية
+    ETag / Last-Modified validators and 304s for anonymous catalogue pages
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = seed_catalog(products=30, users=5, orders=5, reviews_per_product=1)
+        cls.product = Product.objects.filter(is_active=True).first()
+        cls.detail_url = reverse('store:product_detail', args=[cls.product.slug])
+
+    def setUp(self):
+        cache.clear()
+
+    def assertNotModified(self, url, etag, **extra):
+        # The validator is one query; the view and templates never run
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **extra)
+        self.assertEqual(response.status_code, 304)
+
+    def test_repeat_visit_gets_304(self):
+        for url in (self.detail_url, reverse('store:product_list') + '?page=2', reverse('store:gallery')):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn('no-cache', response['Cache-Control'])
+                self.assertNotModified(url, response['ETag'])
+                since = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+                self.assertEqual(since.status_code, 304)
+
+    def test_changes_move_the_validator(self):
+        etag = self.client.get(self.detail_url)['ETag']
+
+        for change in (
+            lambda: self.product.save(),
+            lambda: Review.objects.filter(product=self.product).first().save(),
+            lambda: sync_product(self.product.pk, 3, 5),
+        ):
+            change()
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+            etag = response['ETag']
+
+    def test_htmx_partials_have_their_own_etag(self):
+        url = reverse('store:product_list')
+        page = self.client.get(url)
+        partial = self.client.get(url, HTTP_HX_REQUEST='true')
+        self.assertNotEqual(page['ETag'], partial['ETag'])
+        self.assertIn('HX-Request', partial['Vary'])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=partial['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_signed_in_and_search_requests_are_unconditional(self):
+        response = self.client.get(reverse('store:product_list') + '?search=SKU')
+        self.assertFalse(response.has_header('ETag'))
+
+        self.client.force_login(self.catalog.shopper)
+        self.assertFalse(self.client.get(self.detail_url).has_header('ETag'))
+
+
+class FeedGenerationTests(TestCase):
+    """
+    خريطة الموقع وخلاصة المنتجات
+    Chunked sitemaps, the product feed and incremental regeneration
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_catalog(products=45, users=5, orders=2, reviews_per_product=0)
+        # Older than the change overlap, so only what a test touches is "changed"
+        Product.objects.update(updated_at=timezone.now() - timedelta(days=1))
+        cls.active = Product.objects.filter(is_active=True)
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        override = override_settings(FEEDS_ROOT=str(self.root))
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def read(self, name):
+        with gzip.open(self.root / name, 'rt', encoding='utf-8') as handle:
+            return handle.read()
+
+    def manifest(self):
+        return json.loads((self.root / MANIFEST_NAME).read_text())
+
+    def test_full_run_splits_at_the_url_limit(self):
+        run = generate_feeds(max_urls=20)
+        total = self.active.count()
+        self.assertEqual(run.urls, total)
+        self.assertEqual(run.chunks, -(-total // 20))
+
+        index = self.read(INDEX_NAME)
+        product_urls = 0
+        for chunk in self.manifest()['chunks']:
+            name = f"sitemap-products-{chunk['first_id']}.xml.gz"
+            self.assertIn(name, index)
+            product_urls += self.read(name).count('<url>')
+        self.assertEqual(product_urls, total)
+        self.assertEqual(self.read(FEED_NAME).count('<item>'), total)
+
+    def test_incremental_run_rewrites_only_changed_chunks(self):
+        generate_feeds(max_urls=20)
+        self.assertEqual(generate_feeds(max_urls=20).rewritten, 0)
+
+        product = self.active.order_by('pk').last()
+        product.name = 'Filter & <Pump>'
+        product.save()
+        run = generate_feeds(max_urls=20)
+        self.assertEqual(run.rewritten, 1)
+        self.assertIn('Filter &amp; &lt;Pump&gt;', self.read(FEED_NAME))
+
+        # Queryset updates do not bump updated_at; the count check catches them
+        Product.objects.update(updated_at=timezone.now() - timedelta(days=1))
+        first = self.active.order_by('pk').first()
+        Product.objects.filter(pk=first.pk).update(is_active=False)
+        run = generate_feeds(max_urls=20)
+        self.assertEqual(run.rewritten, 1)
+        self.assertEqual(run.urls, self.active.count())
+        self.assertNotIn(f'/product/{first.slug}/', self.read('sitemap-products-0.xml.gz'))
+
+    def test_feed_sale_price_includes_promotions(self):
+        product = self.active.filter(sale_price__isnull=True).first()
+        promotion = Promotion.objects.create(
+            name='خصم', value=Decimal('10'), scope='products', starts_at=timezone.now() - timedelta(minutes=1),
+        )
+        promotion.products.add(product)
+        apply_due_promotions()
+        product.refresh_from_db()
+
+        generate_feeds(max_urls=20)
+        item = re.search(rf'<item>\n<g:id>{re.escape(product.sku)}</g:id>.*?</item>', self.read(FEED_NAME), re.S).group()
+        self.assertIn(f'<g:sale_price>{product.effective_price} SAR</g:sale_price>', item)
+        self.assertLess(product.effective_price, product.price)
+
+    def test_catalogue_is_streamed_with_only_the_needed_columns(self):
+        # Products (brand and category joined) and categories, nothing else
+        with self.assertNumQueries(2) as queries:
+            generate_feeds(full=True)
+        product_sql = next(q['sql'] for q in queries.captured_queries if 'store_product' in q['sql'])
+        self.assertNotIn('cost_price', product_sql)
+        self.assertNotIn('image_2', product_sql)
+
+    def test_views_serve_the_generated_files(self):
+        self.assertEqual(self.client.get(reverse('store:sitemap')).status_code, 404)
+        generate_feeds()
+
+        response = self.client.get(reverse('store:sitemap'))
+        self.assertEqual(response['Content-Type'], 'application/xml')
+        self.assertContains(response, '<sitemapindex')
+        feed = self.client.get(reverse('store:feed_file', args=[FEED_NAME]))
+        self.assertEqual(feed['Content-Type'], 'application/gzip')
+        self.assertIn(b'<rss', gzip.decompress(b''.join(feed.streaming_content)))
+        for name in (MANIFEST_NAME, INDEX_NAME, '..%2Fmanifest.json'):
+            with self.subTest(name=name):
+                self.assertEqual(self.client.get(reverse('store:feed_file', args=[name])).status_code, 404)
+
+
+class CatalogImportTests(TestCase):
+    """
+    استيراد الكتالوج
+    Batched CSV / JSONL catalogue import with a per-row error report
+    """
+
+    CSV = (
+        'sku,name,category,brand,price,sale_price,specifications,compatible_brands,'
+        'compatible_car_models,main_image,quantity,is_featured\n'
+        'NEW-1,فلتر زيت,category-1,brand-1,25.50,,المنشأ: اليابان | الضمان: سنة,brand-1|brand-2,model-1,img/a.png,12,yes\n'
+        'NEW-2,Brake Pad,category-2,brand-2,99,80,,,,,,no\n'
+        'NEW-3,Bad Price,category-1,brand-1,abc,,,,,,,\n'
+        'NEW-4,Unknown Category,no-such-category,brand-1,10,,,,,,,\n'
+        'NEW-1,Duplicate,category-1,brand-1,10,,,,,,,\n'
+        'NEW-5,Brake Pad,category-2,brand-2,15,,,,,,,\n'
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = seed_catalog(products=5, users=5, orders=1, reviews_per_product=0)
+
+    def setUp(self):
+        self.media = Path(tempfile.mkdtemp())
+        self.images = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.media)
+        self.addCleanup(shutil.rmtree, self.images)
+        override = override_settings(MEDIA_ROOT=str(self.media))
+        override.enable()
+        self.addCleanup(override.disable)
+        (self.images / 'img').mkdir()
+        from PIL import Image
+        Image.new('RGB', (8, 8), 'red').save(self.images / 'img' / 'a.png')
+
+    def run_import(self, content, name='catalog.csv', **options):
+        upload = SimpleUploadedFile(name, content.encode('utf-8'))
+        return import_catalog(read_catalog_rows(upload), image_root=self.images, **options)
+
+    def test_import_creates_products_and_reports_bad_rows(self):
+        report = self.run_import(self.CSV)
+
+        self.assertEqual((report.rows_total, report.created, report.rejected), (6, 3, 3))
+        self.assertEqual(
+            sorted((error['line'], error['sku']) for error in report.errors),
+            [(4, 'NEW-3'), (5, 'NEW-4'), (6, 'NEW-1')],
+        )
+        # Same name as NEW-2: the slug gets the next free suffix
+        self.assertEqual(Product.objects.get(sku='NEW-5').slug, 'brake-pad-2')
+
+        product = Product.objects.get(sku='NEW-1')
+        self.assertEqual(product.slug, 'فلتر-زيت')
+        self.assertTrue(product.is_featured)
+        self.assertEqual(product.stock_quantity, 12)
+        self.assertEqual(
+            list(product.specifications.values_list('name', 'value')),
+            [('المنشأ', 'اليابان'), ('الضمان', 'سنة')],
+        )
+        self.assertEqual(sorted(product.compatible_brands.values_list('slug', flat=True)), ['brand-1', 'brand-2'])
+        self.assertEqual(list(product.compatible_car_models.values_list('slug', flat=True)), ['model-1'])
+        self.assertTrue((self.media / product.main_image.name).is_file())
+        self.assertEqual(report.images_attached, 1)
+
+    def test_reimport_updates_in_place_and_keeps_blank_columns(self):
+        self.run_import(self.CSV)
+        product = Product.objects.get(sku='NEW-1')
+
+        report = self.run_import(
+            '{"sku": "NEW-1", "price": "30", "specifications": {"اللون": "أسود"}}\n'
+            'not json\n',
+            name='update.jsonl',
+        )
+        self.assertEqual((report.updated, report.rejected), (1, 1))
+        updated = Product.objects.get(sku='NEW-1')
+        self.assertEqual((updated.pk, updated.name, str(updated.price)), (product.pk, 'فلتر زيت', '30.00'))
+        self.assertEqual(updated.main_image.name, product.main_image.name)
+        self.assertEqual(list(updated.specifications.values_list('name', flat=True)), ['اللون'])
+        self.assertEqual(updated.compatible_brands.count(), 2)
+
+    def test_dry_run_writes_nothing(self):
+        products = Product.objects.count()
+        report = self.run_import(self.CSV, dry_run=True)
+        self.assertEqual(report.created, 3)
+        self.assertEqual(Product.objects.count(), products)
+        self.assertFalse(ProductSpecification.objects.filter(product__sku='NEW-1').exists())
+        self.assertFalse(InventoryItem.objects.filter(product__sku='NEW-1').exists())
+
+    def test_admin_import_page(self):
+        self.client.force_login(self.catalog.staff)
+        url = reverse('admin:store_product_import')
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        upload = SimpleUploadedFile('catalog.csv', self.CSV.encode('utf-8'))
+        response = self.client.post(url, {'file': upload, 'dry_run': ''})
+        self.assertContains(response, 'NEW-4')
+        self.assertTrue(Product.objects.filter(sku='NEW-2').exists())
+
+
+class SlugAllocationTests(TestCase):
+    """
+    توليد الروابط الفريدة
+    Batch slug allocation with deterministic suffixes
+    """
+
+    def test_batch_gets_free_suffixes_in_one_query(self):
+        Category.objects.bulk_create([Category(name='a', slug='oil-filter'), Category(name='b', slug='oil-filter-2')])
+        with self.assertNumQueries(1):
+            slugs = allocate_slugs(Category, ['Oil Filter', 'oil filter!', 'فلتر زيت', 'Oil Filter'])
+        self.assertEqual(slugs, ['oil-filter-3', 'oil-filter-4', 'فلتر-زيت', 'oil-filter-5'])
+
+    def test_full_window_queries_again(self):
+        Category.objects.bulk_create([
+            Category(name=str(number), slug='pump' if number == 1 else f'pump-{number}')
+            for number in range(1, 9)
+        ])
+        with self.assertNumQueries(2):
+            self.assertEqual(allocate_slugs(Category, ['Pump']), ['pump-9'])
+
+    def test_long_names_keep_the_suffix_within_max_length(self):
+        name = 'ف' * 250
+        first, second = allocate_slugs(Category, [name, name])
+        self.assertEqual(len(first), 200)
+        self.assertEqual(len(second), 200)
+        self.assertTrue(second.endswith('-2'))
+
+    def test_save_and_bulk_create_share_the_allocator(self):
+        first = Category.objects.create(name='Brake Pads')
+        second = Category.objects.create(name='brake pads')
+        self.assertEqual((first.slug, second.slug), ('brake-pads', 'brake-pads-2'))
+        second.save()
+        self.assertEqual(second.slug, 'brake-pads-2')
+
+        categories = [Category(name='Brake  Pads'), Category(name='Belts', slug='brake-pads-3'), Category(name='BRAKE PADS')]
+        assign_slugs(categories, lambda category: category.name)
+        Category.objects.bulk_create(categories)
+        self.assertEqual([category.slug for category in categories], ['brake-pads-4', 'brake-pads-3', 'brake-pads-5'])
+
+
+class RelatedProductsTests(TestCase):
+    """
+    المنتجات المرتبطة
+    Precomputed related products: scoring, incremental rewrite and the product page
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        # 40 categories and 25 brands: product 40 shares product 0's
+        # category, products 25/50/75 its brand, 1-3 neither
+        cls.catalog = seed_catalog(products=80, users=5, orders=0, reviews_per_product=0)
+        cls.products = list(Product.objects.order_by('pk'))
+        fitment = Product.compatible_car_models.through
+        fitment.objects.all().delete()
+        model = cls.catalog.car_models[0]
+        fitment.objects.bulk_create([
+            fitment(product_id=cls.products[0].pk, carmodel_id=model.pk),
+            fitment(product_id=cls.products[3].pk, carmodel_id=model.pk),
+        ])
+        for number, (status, others) in enumerate([
+            ('paid', [1, 2]), ('paid', [1]), ('pending', [4, 5]),
+        ]):
+            order = Order.objects.create(
+                user=cls.catalog.shopper, order_number=f'ORD-REL-{number}',
+                total_price=100, payment_status=status,
+            )
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=cls.products[index], product_name='-',
+                          product_sku=cls.products[index].sku, price=50)
+                for index in [0, *others]
+            ])
+
+    def related_ids(self, product):
+        return list(product.related_entries.order_by('rank').values_list('related_id', flat=True))
+
+    def test_blends_co_purchase_fitment_and_taxonomy(self):
+        run = rebuild_related(chunk_size=30)
+        self.assertEqual(run.products, 80)
+        p = self.products
+        self.assertEqual(
+            self.related_ids(p[0]),
+            [p[1].pk, p[2].pk, p[3].pk, p[40].pk, p[75].pk, p[50].pk, p[25].pk],
+        )
+        # Unpaid orders do not count
+        self.assertNotIn(p[0].pk, self.related_ids(p[4]))
+        self.assertTrue(all(0 < len(self.related_ids(product)) <= 8 for product in p[:10]))
+
+    def test_only_changed_lists_are_rewritten(self):
+        rebuild_related()
+        self.assertEqual(rebuild_related().changed, 0)
+
+        self.products[1].is_active = False
+        self.products[1].save()
+        run = rebuild_related()
+        self.assertGreater(run.changed, 0)
+        self.assertFalse(RelatedProduct.objects.filter(related=self.products[1]).exists())
+        self.assertFalse(RelatedProduct.objects.filter(product=self.products[1]).exists())
+        self.assertEqual(self.related_ids(self.products[0])[0], self.products[2].pk)
+
+    def test_product_page_reads_ranked_rows(self):
+        product, first, second = self.products[0], self.products[60], self.products[7]
+        RelatedProduct.objects.bulk_create([
+            RelatedProduct(product=product, related=first, rank=1, score=0.9),
+            RelatedProduct(product=product, related=second, rank=2, score=0.4),
+        ])
+        response = self.client.get(reverse('store:product_detail', args=[product.slug]))
+        self.assertEqual(list(response.context['related_products']), [first, second])
+
+        # Not scored yet: same category fallback
+        response = self.client.get(reverse('store:product_detail', args=[self.products[1].slug]))
+        self.assertEqual(list(response.context['related_products']), [self.products[41]])
+
+    def test_co_purchase_matrix_matches_dense_cosine_in_any_chunking(self):
+        rng = np.random.default_rng(7)
+        order_ids, product_ids = rng.integers(0, 200, 1500), rng.integers(0, 60, 1500) * 3 + 5
+        matrix = CoPurchaseMatrix(order_ids, product_ids)
+
+        dense = np.zeros((200, len(matrix)))
+        dense[order_ids, np.searchsorted(matrix.product_ids, product_ids)] = 1
+        both = dense.T @ dense
+        totals = np.diag(both).copy()
+        np.fill_diagonal(both, 0)
+        cosine = both / np.sqrt(np.outer(totals, totals))
+
+        for max_pairs in (10 ** 9, 40, 1):
+            neighbours = matrix.top_neighbours(limit=4, max_pairs=max_pairs)
+            for index, product_id in enumerate(matrix.product_ids.tolist()):
+                best = [other for other in np.lexsort((np.arange(len(matrix)), -cosine[index]))[:4] if both[index, other]]
+                scores = neighbours[product_id]
+                self.assertEqual(list(scores), matrix.product_ids[best].tolist())
+                np.testing.assert_allclose(list(scores.values()), cosine[index, best])
+        self.assertEqual(neighbours[4], {})
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class ProductDetailFragmentTests(TestCase):
+    """
+    أجزاء صفحة المنتج المخزنة
+    Shared product page fragments and the per-visitor parts loaded beside them
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = seed_catalog(products=10, users=5, orders=0, reviews_per_product=0)
+        cls.product = Product.objects.filter(is_active=True).first()
+        cls.url = reverse('store:product_detail', args=[cls.product.slug])
+        reviewers = User.objects.bulk_create([
+            User(username=f'reviewer{i}', email=f'reviewer{i}@example.com') for i in range(12)
+        ])
+        Review.objects.bulk_create([
+            Review(product=cls.product, user=user, rating=4, comment=f'تعليق {i}')
+            for i, user in enumerate(reviewers)
+        ])
+        rebuild_rating_summaries()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_warm_signed_in_view_only_loads_the_product(self):
+        self.client.force_login(self.catalog.shopper)
+        self.client.get(self.url)
+        # Signed-in user, the product row, the navbar avatar (profile) and
+        # the mini-cart, rendered in place: only cached pages punch holes
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+        self.assertContains(response, '(من 12 مراجعة)')
+        self.assertContains(response, reverse('store:product_review_form', args=[self.product.pk]))
+        self.assertNotContains(response, reverse('store:page_holes'))
+        self.assertContains(response, 'name="csrfmiddlewaretoken"')
+
+    def test_catalogue_changes_refresh_fragments(self):
+        self.client.get(self.url)
+        ProductSpecification.objects.create(product=self.product, name='المادة', value='سيراميك')
+        Review.objects.create(product=self.product, user=self.catalog.shopper, rating=5, comment='ممتاز')
+
+        response = self.client.get(self.url)
+        self.assertContains(response, 'سيراميك')
+        self.assertContains(response, '(من 13 مراجعة)')
+        self.assertContains(response, 'ممتاز')
+
+    def test_reviews_are_paged(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, 'عرض المزيد من المراجعات')
+        self.assertContains(response, 'تعليق 11')
+        self.assertNotContains(response, 'تعليق 1<')
+
+        more_url = re.search(r'hx-get="([^"]*cursor=[^"]*)"', response.content.decode()).group(1)
+        more = self.client.get(more_url)
+        self.assertContains(more, 'تعليق 1<')
+        self.assertContains(more, 'تعليق 0<')
+        self.assertNotContains(more, 'عرض المزيد من المراجعات')
+
+    def test_review_form_is_per_visitor(self):
+        url = reverse('store:product_review_form', args=[self.product.pk])
+        self.assertContains(self.client.get(url), 'يجب تسجيل الدخول')
+
+        self.client.force_login(self.catalog.shopper)
+        response = self.client.get(url)
+        self.assertContains(response, 'أضف مراجعتك')
+        self.assertContains(response, 'csrfmiddlewaretoken')
+
+        self.client.force_login(User.objects.get(username='reviewer0'))
+        self.assertContains(self.client.get(url), 'لقد قمت بمراجعة هذا المنتج')
+
+
+class ReviewFeedTests(TestCase):
+    """
+    ملخص التقييمات وتصفح المراجعات
+    Maintained rating summaries and the keyset-paginated review feed
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = seed_catalog(products=4, users=3, orders=0, reviews_per_product=0)
+        cls.product, cls.other = Product.objects.filter(is_active=True)[:2]
+        cls.reviewers = User.objects.bulk_create([
+            User(username=f'feed{i}', email=f'feed{i}@example.com') for i in range(25)
+        ])
+        Review.objects.bulk_create([
+            Review(
+                product=cls.product, user=user, rating=i % 5 + 1, comment=f'مراجعة {i}',
+                is_verified_purchase=i % 3 == 0, is_approved=i != 24,
+            )
+            for i, user in enumerate(cls.reviewers)
+        ])
+        rebuild_rating_summaries()
+
+    def setUp(self):
+        cache.clear()
+
+    def _summary(self, product):
+        return ProductRatingSummary.objects.filter(product=product).values(
+            'review_total', 'rating_sum', 'verified_total',
+            'stars_1', 'stars_2', 'stars_3', 'stars_4', 'stars_5',
+        ).first()
+
+    def test_rebuild_counts_approved_reviews_per_star(self):
+        summary = ProductRatingSummary.objects.get(product=self.product)
+        self.assertEqual(summary.review_total, 24)
+        self.assertEqual(summary.verified_total, 8)
+        self.assertEqual([count for _, count, _ in summary.histogram], [4, 5, 5, 5, 5])
+        self.assertEqual(summary.average_rating, 2.9)
+        self.assertFalse(ProductRatingSummary.objects.filter(product=self.other).exists())
+
+    def test_review_changes_keep_the_summary_in_step(self):
+        review = Review.objects.create(product=self.other, user=self.reviewers[0], rating=5, comment='ممتاز')
+        self.assertEqual(self._summary(self.other)['stars_5'], 1)
+
+        review.rating = 2
+        review.is_verified_purchase = True
+        review.save()
+        hidden = Review.objects.get(product=self.product, user=self.reviewers[0])
+        hidden.is_approved = False
+        hidden.save()
+        Review.objects.get(product=self.product, user=self.reviewers[24]).delete()
+        Review.objects.get(product=self.product, user=self.reviewers[1]).delete()
+
+        expected = {}
+        for product in (self.product, self.other):
+            expected[product.pk] = self._summary(product)
+        rebuild_rating_summaries()
+        for product in (self.product, self.other):
+            self.assertEqual(self._summary(product), expected[product.pk])
+        self.assertEqual(expected[self.other.pk]['stars_2'], 1)
+        self.assertEqual(expected[self.other.pk]['stars_5'], 0)
+        self.assertEqual(expected[self.product.pk]['review_total'], 22)
+
+    def test_every_sort_walks_all_reviews_once_in_order(self):
+        for sort, fields in REVIEW_SORTS.items():
+            expected = list(
+                Review.objects.filter(product=self.product, is_approved=True)
+                .order_by(*(f'-{field}' for field in fields)).values_list('pk', flat=True)
+            )
+            seen, cursor = [], None
+            while True:
+                with self.assertNumQueries(1):
+                    reviews, cursor = review_feed(self.product.pk, sort, cursor, limit=7)
+                seen.extend(review.pk for review in reviews)
+                if cursor is None:
+                    break
+            self.assertEqual(seen, expected, sort)
+
+    def test_feed_endpoint_sorts_and_ignores_bad_cursors(self):
+        url = reverse('store:product_reviews', args=[self.product.pk])
+        highest = self.client.get(url, {'sort': 'highest'})
+        self.assertContains(highest, '?sort=highest&cursor=')
+        self.assertNotContains(highest, 'مراجعة 24<')
+        self.assertEqual(highest.content.count(b"text-yellow-400"), 4 * 5 + 5 * 4 + 3)
+
+        first = self.client.get(url)
+        for cursor in ('not-a-cursor', 'WzFd', 'WyJ4IiwgIjEiXQ'):
+            self.assertEqual(self.client.get(url, {'cursor': cursor}).content, first.content)
+
+    def test_product_page_shows_the_histogram(self):
+        response = self.client.get(reverse('store:product_detail', args=[self.product.slug]))
+        self.assertContains(response, '(من 24 مراجعة)')
+        self.assertContains(response, 'style="width: 21%"')
+        self.assertContains(response, '8 من المراجعات من مشترين موثقين')
+        self.assertContains(response, 'value="verified"')
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class ReviewModerationTests(TestCase):
+    """
+    الإشراف على المراجعات وفحص الإزعاج
+    Background spam scoring and the bulk-moderation queue
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = seed_catalog(products=12, users=3, orders=0, reviews_per_product=0)
+        cls.products = list(Product.objects.filter(is_active=True).order_by('pk')[:6])
+        cls.spammer, cls.copycat, cls.honest = User.objects.bulk_create([
+            User(username=name, email=f'{name}@example.com') for name in ('spammer', 'copycat', 'honest')
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def review(self, user, product, comment, rating=5):
+        return Review.objects.create(product=product, user=user, rating=rating, comment=comment)
+
+    def test_rules(self):
+        self.assertEqual(spam_score('قطعة ممتازة وتركيبها سهل على السيارة'), 0)
+        self.assertGreaterEqual(spam_score('اشتر الآن http://a.example http://b.example'), SPAM_HIDE_SCORE)
+        self.assertEqual(spam_score('رائع', duplicates=1), 40)
+        self.assertEqual(spam_score('ممتاز ممتاز ممتاز ممتاز ممتاز ممتاز ممتاز'), 20)
+        self.assertEqual(spam_score('جيد', burst=5), 45)
+
+    def test_batch_scores_and_hides_spam_without_touching_the_request(self):
+        for product in self.products[:5]:
+            self.review(self.spammer, product, f'عروض www.deals.example/{product.pk}')
+        self.review(self.copycat, self.products[4], 'منتج رائع جداً!')
+        self.review(self.honest, self.products[4], 'منتج رائع جداً')
+        honest = self.review(self.honest, self.products[5], 'وصلت القطعة بسرعة ومطابقة للوصف')
+        self.assertEqual(Review.objects.filter(spam_checked_at__isnull=False).count(), 0)
+
+        run = score_reviews(batch_size=3)
+        self.assertEqual(run.scored, 8)
+        self.assertEqual(run.hidden, 5)
+        self.assertFalse(Review.objects.filter(user=self.spammer, is_approved=True).exists())
+        self.assertEqual(Review.objects.filter(user=self.spammer, moderation_status='pending').count(), 5)
+        # The copy is flagged, not the first post of the text
+        self.assertEqual(
+            list(Review.objects.filter(product=self.products[4]).exclude(user=self.spammer).order_by('pk').values_list(
+                'spam_score', flat=True,
+            )),
+            [0, 40],
+        )
+        honest.refresh_from_db()
+        self.assertEqual((honest.spam_score, honest.is_approved), (0, True))
+        self.assertFalse(ProductRatingSummary.objects.filter(product=self.products[0]).exists())
+        self.assertEqual(score_reviews().scored, 0)
+
+    def test_queue_pages_and_bulk_decisions(self):
+        reviews = [
+            self.review(user, product, f'تعليق {user.username} {product.pk}', rating=2)
+            for user in (self.spammer, self.copycat)
+            for product in self.products
+        ]
+        Review.objects.filter(pk__in=[review.pk for review in reviews[:6]]).update(spam_score=70)
+        self.client.force_login(self.catalog.staff)
+        url = reverse('dashboard:review_queue')
+
+        seen, cursor = [], None
+        while True:
+            response = self.client.get(url, {'cursor': cursor} if cursor else {})
+            seen.extend(review.pk for review in response.context['reviews'])
+            cursor = response.context['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen[:6], sorted((review.pk for review in reviews[:6]), reverse=True))
+        self.assertEqual(len(seen), 12)
+
+        self.client.get(reverse('store:product_detail', args=[self.products[0].slug]))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {
+                'decision': 'reject', 'review_ids': [review.pk for review in reviews[:6]],
+            })
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "store_review"')]
+        self.assertEqual(len(updates), 1)
+        self.assertRedirects(response, f'{url}?status=pending', fetch_redirect_response=False)
+        self.assertEqual(Review.objects.filter(moderation_status='rejected', is_approved=False).count(), 6)
+        self.assertEqual(ProductRatingSummary.objects.get(product=self.products[0]).review_total, 1)
+
+        self.client.post(url, {'decision': 'approve', 'review_ids': [review.pk for review in reviews[6:]]})
+        self.assertEqual(self.client.get(url).context['reviews'], [])
+        self.assertContains(
+            self.client.get(reverse('store:product_detail', args=[self.products[0].slug])),
+            '(من 1 مراجعة)',
+        )
+
+
+class ProductPricingTests(TestCase):
+    """
+    السعر الفعلي المخزّن وفرز القائمة حسب السعر والخصم
+    Stored effective price and the indexed price / discount listing
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = seed_catalog(products=30, users=2, orders=0, reviews_per_product=0)
+        cls.active = Product.objects.filter(is_active=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def listing(self, **params):
+        response = self.client.get(reverse('store:product_list'), params)
+        self.assertEqual(response.status_code, 200)
+        return list(response.context['products'])
+
+    def test_pricing_is_stored_on_save_and_seed(self):
+        self.assertFalse(Product.objects.filter(effective_price__isnull=True).exists())
+        product = self.active.filter(sale_price__isnull=True).first()
+        product.price, product.sale_price = Decimal('200.00'), Decimal('150.00')
+        product.save(update_fields=['price', 'sale_price'])
+        product.refresh_from_db()
+        self.assertEqual((product.effective_price, product.discount_percent), (Decimal('150.00'), 25))
+        self.assertEqual((product.final_price, product.discount_percentage), (Decimal('150.00'), 25))
+
+        product.sale_price = None
+        product.save()
+        product.refresh_from_db()
+        self.assertEqual((product.effective_price, product.discount_percent), (Decimal('200.00'), 0))
+
+    def test_price_filter_uses_the_price_shown(self):
+        on_sale = self.active.filter(sale_price=15, price__gt=20).first()
+        cheap = self.listing(max_price='20')
+        self.assertIn(on_sale, cheap)
+        self.assertTrue(all(product.final_price <= 20 for product in cheap))
+        self.assertNotIn(on_sale, self.listing(min_price='20'))
+
+    def test_price_and_discount_sorts(self):
+        prices = [product.final_price for product in self.listing(sort='price_asc')]
+        self.assertEqual(prices, sorted(prices))
+        prices = [product.final_price for product in self.listing(sort='price_desc')]
+        self.assertEqual(prices, sorted(prices, reverse=True))
+
+        discounts = [product.discount_percentage for product in self.listing(sort='discount')]
+        self.assertEqual(discounts, sorted(discounts, reverse=True))
+        sale = self.listing(on_sale='true')
+        self.assertEqual(len(sale), self.active.filter(discount_percent__gt=0).count())
+        self.assertTrue(all(product.discount_percentage > 0 for product in sale))
+
+    def test_a_discount_under_one_percent_is_still_on_sale(self):
+        product = self.active.filter(sale_price__isnull=True).first()
+        product.price, product.sale_price = Decimal('100.00'), Decimal('99.50')
+        product.save()
+        self.assertEqual((product.effective_price, product.discount_percent), (Decimal('99.50'), 1))
+        self.assertEqual(product.savings_amount, Decimal('0.50'))
+        self.assertIn(product, self.listing(on_sale='true'))
+
+    def test_price_sort_reads_the_index_in_order(self):
+        for sort, index in (('price_asc', 'store_product_active_price'), ('discount', 'store_product_active_discount')):
+            with CaptureQueriesContext(connection) as queries:
+                self.listing(sort=sort)
+            listing_sql = next(
+                query['sql'] for query in queries.captured_queries
+                if 'ORDER BY' in query['sql'] and 'LIMIT' in query['sql']
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {listing_sql}')
+                plan = ' '.join(row[-1] for row in cursor.fetchall())
+            self.assertIn(index, plan)
+            self.assertNotIn('TEMP B-TREE FOR ORDER BY', plan)
+
+
+class PromotionTests(TestCase):
+    """
+    العروض المجدولة وتطبيقها على الأسعار المخزّنة
+    Scheduled promotions materialised into the stored effective price
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = seed_catalog(products=30, users=2, orders=0, reviews_per_product=0)
+        cls.category = Product.objects.values_list('category', flat=True).first()
+        cls.in_category = Product.objects.filter(category=cls.category)
+        cls.now = timezone.now()
+
+    def setUp(self):
+        cache.clear()
+
+    def assertPricedBy(self, products, promotion):
+        for product in products:
+            product.refresh_from_db()
+            plain = Product.pricing_for(product.price, product.sale_price)[0]
+            expected = min(plain, promotion.price_for(product.price)) if promotion else plain
+            self.assertEqual(product.final_price, expected)
+
+    def test_scheduler_applies_and_removes_at_boundaries(self):
+        promotion = Promotion.objects.create(
+            name='خصم الفئة', discount_type='percent', value=Decimal('10'), scope='category',
+            category_id=self.category, starts_at=self.now + timedelta(hours=1),
+            ends_at=self.now + timedelta(hours=2),
+        )
+        self.assertEqual(apply_due_promotions(self.now), (0, 0))
+
+        run = apply_due_promotions(self.now + timedelta(hours=1, seconds=1))
+        self.assertEqual(run.promotions, 1)
+        self.assertGreater(run.repriced, 0)
+        self.assertPricedBy(self.in_category, promotion)
+        self.assertTrue(Product.objects.filter(promotion=promotion).exists())
+        self.assertFalse(Product.objects.exclude(category=self.category).filter(promotion=promotion).exists())
+        # Nothing is due until the next boundary
+        self.assertEqual(apply_due_promotions(self.now + timedelta(hours=1, minutes=30)), (0, 0))
+
+        apply_due_promotions(self.now + timedelta(hours=2, seconds=1))
+        self.assertPricedBy(self.in_category, None)
+        self.assertFalse(Product.objects.filter(promotion__isnull=False).exists())
+
+    def test_lowest_price_wins_and_cart_reads_the_column(self):
+        product = self.in_category.filter(sale_price__isnull=True).first()
+        Promotion.objects.create(
+            name='خصم الفئة', value=Decimal('10'), scope='category', category_id=self.category,
+            starts_at=self.now - timedelta(minutes=1),
+        )
+        listed = Promotion.objects.create(
+            name='خصم ثابت', discount_type='fixed', value=product.price / 2, scope='products',
+            starts_at=self.now - timedelta(minutes=1),
+        )
+        listed.products.add(product)
+        apply_due_promotions()
+
+        product.refresh_from_db()
+        self.assertEqual(product.promotion, listed)
+        self.assertEqual(product.final_price, listed.price_for(product.price))
+        self.assertEqual(product.discount_percentage, 50)
+        self.assertIn(product, self.client.get(
+            reverse('store:product_list'), {'max_price': product.final_price, 'on_sale': 'true'},
+        ).context['products'])
+
+        cart = Cart.objects.create(user=User.objects.create_user('shopper', 'shopper@example.com', 'x'))
+        item = CartItem.objects.create(cart=cart, product=product)
+        with self.assertNumQueries(1):
+            item = CartItem.objects.select_related('product').get(pk=item.pk)
+            self.assertEqual(item.unit_price, product.effective_price)
+
+    def test_edits_and_deletes_keep_prices_in_step(self):
+        promotion = Promotion.objects.create(
+            name='خصم الفئة', value=Decimal('20'), scope='category', category_id=self.category,
+            starts_at=self.now - timedelta(minutes=1),
+        )
+        apply_due_promotions()
+
+        # A product saved between runs keeps the promoted price
+        product = self.in_category.filter(sale_price__isnull=True).first()
+        product.price = Decimal('100.00')
+        product.save()
+        self.assertEqual(product.effective_price, Decimal('80.00'))
+
+        promotion.value = Decimal('30')
+        promotion.save()
+        self.assertIn(promotion, Promotion.objects.due())
+        apply_due_promotions()
+        self.assertPricedBy(self.in_category, promotion)
+
+        promotion.delete()
+        self.assertPricedBy(self.in_category, None)
+        self.assertEqual(reprice_products(), 0)
+
+    def test_promoted_price_shows_as_a_discount(self):
+        product = self.in_category.filter(sale_price__isnull=True).first()
+        product.price = Decimal('200.00')
+        product.save()
+        self.assertEqual(product.savings_amount, 0)
+        Promotion.objects.create(
+            name='خصم الفئة', value=Decimal('25'), scope='category', category_id=self.category,
+            starts_at=self.now - timedelta(minutes=1),
+        )
+        apply_due_promotions()
+
+        product.refresh_from_db()
+        self.assertEqual(product.savings_amount, Decimal('50.00'))
+        content = self.client.get(reverse('store:product_detail', args=[product.slug])).content.decode()
+        self.assertIn('line-through', content)
+        self.assertRegex(content, r'وفر 50[.,]00')
+        content = self.client.get(reverse('store:product_list'), {'on_sale': 'true'}).content.decode()
+        self.assertIn('-25%', content)
@@ -1,6 +1,9 @@
 from django.urls import path
-from apps.store.views import home, product_list, product_detail, add_review, gallery_list
-from apps.store.views.page_views import about_view, contact_view, gallery_view
+from apps.store.views import (
+    home, product_list, product_detail, product_reviews, product_review_form, add_review, gallery_list,
+)
+from apps.store.views.page_views import about_view, contact_view, gallery_view, page_holes
+from apps.store.views.feed_views import sitemap_index, feed_file
 
 app_name = 'store'
 
@@ -9,9 +12,18 @@ urlpatterns = [
     path('products/', product_list, name='product_list'),
     path('product/<slug:slug>/', product_detail, name='product_detail'),
     path('product/<int:product_id>/review/', add_review, name='add_review'),
+    path('product/<int:product_id>/reviews/', product_reviews, name='product_reviews'),
+    path('product/<int:product_id>/review-form/', product_review_form, name='product_review_form'),
     
     # Static Pages
     path('about/', about_view, name='about'),
     path('contact/', contact_view, name='contact'),
     path('gallery/', gallery_list, name='gallery'),
+    
+    # Per-visitor fragment for pages served from the page cache
+    path('page-holes/', page_holes, name='page_holes'),
+
+    # Sitemaps and product feed (files written by manage.py generate_feeds)
+    path('sitemap.xml', sitemap_index, name='sitemap'),
+    path('feeds/<str:filename>', feed_file, name='feed_file'),
 ]
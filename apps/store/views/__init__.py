@@ -1,11 +1,13 @@
 from .home_views import home
-from .product_views import product_list, product_detail, add_review
+from .product_views import product_list, product_detail, product_reviews, product_review_form, add_review
 from .gallery_views import gallery_list
 
 __all__ = [
     'home',
     'product_list',
     'product_detail',
+    'product_reviews',
+    'product_review_form',
     'add_review',
     'gallery_list',
 ]
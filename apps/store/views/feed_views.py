@@ -0,0 +1,60 @@
+"""
+Views serving the sitemaps and product feed written by apps.store.feeds
+"""
+import gzip
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.views.decorators.http import last_modified, require_http_methods
+
+from apps.dashboard.perf import query_budget
+from apps.store.feeds import INDEX_NAME, MANIFEST_NAME
+
+FEED_FILE_NAME = re.compile(r'^[\w-]+\.xml\.gz$')
+
+
+def _feed_path(name):
+    if not FEED_FILE_NAME.match(name) or name == INDEX_NAME:
+        raise Http404('Unknown feed file')
+    return Path(settings.FEEDS_ROOT) / name
+
+
+def _modified(path):
+    try:
+        return datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc)
+    except FileNotFoundError:
+        return None
+
+
+@query_budget(0)
+@require_http_methods(["GET"])
+@last_modified(lambda request: _modified(Path(settings.FEEDS_ROOT) / MANIFEST_NAME))
+def sitemap_index(request):
+    """
+    فهرس خريطة الموقع
+    Sitemap index, served uncompressed at /sitemap.xml (it lists one file per 50k products)
+    """
+    try:
+        with gzip.open(Path(settings.FEEDS_ROOT) / INDEX_NAME, 'rb') as index:
+            content = index.read()
+    except FileNotFoundError:
+        raise Http404('Sitemaps have not been generated yet')
+    return HttpResponse(content, content_type='application/xml')
+
+
+@query_budget(0)
+@require_http_methods(["GET"])
+@last_modified(lambda request, filename: _modified(_feed_path(filename)))
+def feed_file(request, filename):
+    """
+    ملفات خريطة الموقع وخلاصة المنتجات
+    Gzipped sitemap chunks and the Merchant Center product feed, streamed from disk
+    """
+    path = _feed_path(filename)
+    try:
+        return FileResponse(open(path, 'rb'), content_type='application/gzip')
+    except FileNotFoundError:
+        raise Http404('Feed file not found')
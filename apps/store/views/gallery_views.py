@@ -1,8 +1,17 @@
 from django.shortcuts import render
 from django.core.paginator import Paginator
-from apps.store.models import Gallery
+from apps.store.conditional import conditional_page, latest_updated_at
+from apps.store.models import Category, Gallery
+from apps.store.page_cache import GALLERY_TAG, cache_anonymous_page, tag_page
 
 
+def gallery_last_changed(request):
+    """Newest change to the gallery or the menu categories"""
+    return latest_updated_at(Gallery.objects.all(), Category.objects.all())
+
+
+@conditional_page(gallery_last_changed)
+@cache_anonymous_page
 def gallery_list(request):
     """
     معرض الصور
@@ -20,6 +29,7 @@ def gallery_list(request):
     paginator = Paginator(gallery_items, 12)  # 12 images per page
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    tag_page(request, GALLERY_TAG)
     
     # Get all categories for filter
     categories = Gallery.CATEGORY_CHOICES
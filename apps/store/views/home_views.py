@@ -2,8 +2,10 @@ from django.shortcuts import render
 from django.db.models import Count, Sum, Q
 from django.utils import timezone
 from apps.store.models import Product, Category, Brand, Advertisement, Gallery
+from apps.dashboard.perf import query_budget
 
 
+@query_budget(24)  # measured: 22
 def home(request):
     """
     الصفحة الرئيسية
@@ -13,7 +15,7 @@ def home(request):
     categories = Category.objects.filter(
         is_active=True,
         parent__isnull=True
-    ).order_by('name')[:8]
+    ).annotate(product_total=Count('products')).order_by('name')[:8]
     
     # Get active brands with logos
     brands = Brand.objects.filter(
@@ -25,43 +27,43 @@ def home(request):
     featured_products = Product.objects.filter(
         is_active=True,
         is_featured=True
-    ).select_related('category', 'brand').order_by('-created_at')[:8]
+    ).select_related('category', 'brand').with_review_stats().order_by('-created_at')[:8]
     
     # Get featured products WITH discount (مميز مع خصم)
     featured_sale_products = Product.objects.filter(
         is_active=True,
         is_featured=True,
-        sale_price__isnull=False
-    ).select_related('category', 'brand').order_by('-created_at')[:8]
+        discount_percent__gt=0
+    ).select_related('category', 'brand').with_review_stats().order_by('-created_at')[:8]
     
     # Get new arrivals (وصل حديثاً)
     new_arrivals = Product.objects.filter(
         is_active=True,
         is_new_arrival=True
-    ).select_related('category', 'brand').order_by('-created_at')[:8]
+    ).select_related('category', 'brand').with_review_stats().order_by('-created_at')[:8]
     
     # Get products on sale (العروض)
     sale_products = Product.objects.filter(
         is_active=True,
-        sale_price__isnull=False
-    ).select_related('category', 'brand').order_by('-created_at')[:8]
+        discount_percent__gt=0
+    ).select_related('category', 'brand').with_review_stats().order_by('-created_at')[:8]
     
     # Get most sold products (based on order items - will show all for now)
     # TODO: Update when order statistics are available
     most_sold_products = Product.objects.filter(
         is_active=True
-    ).select_related('category', 'brand').order_by('-created_at')[:8]
+    ).select_related('category', 'brand').with_review_stats().order_by('-created_at')[:8]
     
     # Get coming soon products (قريباً)
     coming_soon_products = Product.objects.filter(
         is_active=True,
         is_coming_soon=True
-    ).select_related('category', 'brand').order_by('-created_at')[:8]
+    ).select_related('category', 'brand').with_review_stats().order_by('-created_at')[:8]
     
     # Get all products for "Shop All" section
     all_products = Product.objects.filter(
         is_active=True
-    ).select_related('category', 'brand').order_by('-created_at')[:12]
+    ).select_related('category', 'brand').with_review_stats().order_by('-created_at')[:12]
     
     # Get active advertisements by placement
     now = timezone.now()
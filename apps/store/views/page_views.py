@@ -2,9 +2,14 @@
 Views for static pages (About, Contact, Gallery)
 """
 from django.shortcuts import render
+from django.views.decorators.cache import never_cache
 from django.views.decorators.http import require_http_methods
 
+from apps.dashboard.perf import query_budget
+from apps.store.page_cache import cache_anonymous_page
 
+
+@cache_anonymous_page
 @require_http_methods(["GET"])
 def about_view(request):
     """
@@ -17,6 +22,7 @@ def about_view(request):
     return render(request, 'store/about.html', context)
 
 
+@cache_anonymous_page
 @require_http_methods(["GET", "POST"])
 def contact_view(request):
     """
@@ -44,3 +50,15 @@ def gallery_view(request):
         'page_title': 'معرض الصور',
     }
     return render(request, 'store/gallery.html', context)
+
+
+@query_budget(6)
+@never_cache
+@require_http_methods(["GET"])
+def page_holes(request):
+    """
+    الأجزاء الخاصة بالزائر في الصفحات المخزنة
+    Per-visitor parts of pages served from the page cache: the mini-cart
+    (swapped out of band) and the CSRF token
+    """
+    return render(request, 'store/partials/page_holes.html')
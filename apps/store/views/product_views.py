@@ -1,10 +1,54 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Avg
+from django.db.models import Q, Avg, Subquery
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from apps.store.models import Product, Category, Brand, Review, CarModel
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_http_methods
+from apps.store.models import Product, Category, Brand, Review, CarModel, RelatedProduct, ProductRatingSummary
+from apps.dashboard.perf import query_budget
+from apps.orders.purchases import has_purchased
+from apps.store.conditional import conditional_page, latest_updated_at
+from apps.store.page_cache import (
+    PRODUCT_LIST_TAG,
+    cache_anonymous_page,
+    cached_fragment,
+    product_tag,
+    tag_page,
+)
+from apps.store.reviews import DEFAULT_REVIEW_SORT, REVIEW_SORTS, review_feed
+
+
+def catalog_last_changed(request):
+    """Newest change to any product, review or filter/menu row"""
+    return latest_updated_at(
+        Product.objects.all(),
+        Review.objects.all(),
+        Category.objects.all(),
+        Brand.objects.all(),
+        CarModel.objects.all(),
+    )
+
 
+def product_last_changed(request, slug):
+    """Newest change to the product, its reviews, related products or the menus"""
+    product = Product.objects.filter(slug=slug)
+    return latest_updated_at(
+        product,
+        Review.objects.filter(product__in=product.values('pk')),
+        RelatedProduct.objects.filter(product__in=product.values('pk')),
+        Product.objects.filter(related_to__product__in=product.values('pk')),
+        # Category fallback for products the related job has not reached yet
+        Product.objects.filter(category=Subquery(product.values('category')[:1])),
+        Category.objects.all(),
+        Brand.objects.all(),
+    )
 
+
+@query_budget(20)
+@conditional_page(catalog_last_changed, skip_params=('search',))
+@cache_anonymous_page(skip_params=('search',))
 def product_list(request):
     """
     عرض قائمة المنتجات
@@ -13,7 +57,7 @@ def product_list(request):
     # Get only active products with stock
     products = Product.objects.filter(
         is_active=True
-    ).select_related('category', 'brand').order_by('-created_at')
+    ).select_related('category', 'brand').with_review_stats().order_by('-created_at')
 
     # Filter by category
     category_slug = request.GET.get('category')
@@ -43,13 +87,13 @@ def product_list(request):
             Q(compatible_car_models__name__icontains=search_query)
         ).distinct()
 
-    # Filter by price range
+    # Filter by price range (the price shown on the cards, sale price included)
     min_price = request.GET.get('min_price')
     max_price = request.GET.get('max_price')
     if min_price:
-        products = products.filter(price__gte=min_price)
+        products = products.filter(effective_price__gte=min_price)
     if max_price:
-        products = products.filter(price__lte=max_price)
+        products = products.filter(effective_price__lte=max_price)
 
     # Filter by features
     if request.GET.get('featured') == 'true':
@@ -57,7 +101,7 @@ def product_list(request):
     if request.GET.get('new_arrival') == 'true':
         products = products.filter(is_new_arrival=True)
     if request.GET.get('on_sale') == 'true':
-        products = products.filter(sale_price__isnull=False)
+        products = products.filter(discount_percent__gt=0)
 
     # Filter by rating
     rating = request.GET.get('rating')
@@ -73,15 +117,17 @@ def product_list(request):
 
     # Sorting
     sort_by = request.GET.get('sort', '-created_at')
+    # Price and discount sorts read the partial (<field>, id) indexes in order
     valid_sorts = {
-        'price_asc': 'price',
-        'price_desc': '-price',
-        'name_asc': 'name',
-        'name_desc': '-name',
-        'newest': '-created_at',
-        'oldest': 'created_at',
+        'price_asc': ('effective_price', 'id'),
+        'price_desc': ('-effective_price', '-id'),
+        'discount': ('-discount_percent', '-id'),
+        'name_asc': ('name',),
+        'name_desc': ('-name',),
+        'newest': ('-created_at',),
+        'oldest': ('created_at',),
     }
-    products = products.order_by(valid_sorts.get(sort_by, '-created_at'))
+    products = products.order_by(*valid_sorts.get(sort_by, ('-created_at',)))
 
     # Pagination - 15 products per page (3 rows × 5 columns on large screens)
     paginator = Paginator(products, 20)
@@ -93,6 +139,7 @@ def product_list(request):
         products_page = paginator.page(1)
     except EmptyPage:
         products_page = paginator.page(paginator.num_pages)
+    tag_page(request, PRODUCT_LIST_TAG, *(product_tag(product.pk) for product in products_page))
 
     # Get all categories and brands for filter sidebar
     categories = Category.objects.filter(is_active=True, parent__isnull=True)
@@ -119,53 +166,142 @@ def product_list(request):
     return render(request, 'store/product_list.html', context)
 
 
+def _render_gallery(product):
+    product_images = [product.main_image]
+    for image in (product.image_2, product.image_3, product.image_4):
+        if image:
+            product_images.append(image)
+    html = render_to_string('store/partials/product_gallery.html', {
+        'product': product,
+        'product_images': product_images,
+    })
+    return html, ()
+
+
+def _render_specifications(product):
+    html = render_to_string('store/partials/product_specs.html', {
+        'specifications': list(product.specifications.all()),
+    })
+    return html, ()
+
+
+def _render_related(product):
+    # Precomputed by rebuild_related_products, best first
+    related_products = list(Product.objects.filter(
+        related_to__product=product,
+        is_active=True
+    ).select_related('category', 'brand').with_review_stats().order_by('related_to__rank')[:4])
+    if not related_products:
+        # Not scored yet: newest of the same category
+        related_products = list(Product.objects.filter(
+            category=product.category,
+            is_active=True
+        ).exclude(id=product.id).select_related('category', 'brand').with_review_stats().order_by('-created_at')[:4])
+    html = render_to_string('store/partials/related_products.html', {'related_products': related_products})
+    return html, [product_tag(related.pk) for related in related_products]
+
+
+def _render_review_summary(product_id):
+    # Maintained by store.signals; no row until the first approved review
+    summary = ProductRatingSummary.objects.filter(product_id=product_id).first()
+    html = render_to_string('store/partials/review_summary.html', {'summary': summary})
+    return html, ()
+
+
+def _render_review_page(product_id, sort, cursor):
+    reviews, next_cursor = review_feed(product_id, sort, cursor)
+    html = render_to_string('store/partials/review_page.html', {
+        'reviews': reviews,
+        'first_page': not cursor,
+        'next_cursor': next_cursor,
+        'sort': sort,
+        'product_id': product_id,
+    })
+    return html, ()
+
+
+def _review_page_fragment(request, product_id, sort=DEFAULT_REVIEW_SORT, cursor=''):
+    return cached_fragment(
+        request, 'product-reviews', f'{product_id}|{sort}|{cursor}',
+        lambda: _render_review_page(product_id, sort, cursor), [product_tag(product_id)],
+    )
+
+
+@query_budget(16)  # measured: 14
+@conditional_page(product_last_changed)
+@cache_anonymous_page
 def product_detail(request, slug):
     """
     عرض تفاصيل المنتج
     Display single product details
+
+    Everything below the product row is a shared fragment (gallery and
+    specs per product version, the rating summary and first review page
+    per product, the related
+    strip) purged with the product's page-cache tag, so a warm view runs
+    one query of its own. The per-visitor parts are loaded separately:
+    the mini-cart and CSRF token from page_holes, the review form from
+    product_review_form.
     """
     product = get_object_or_404(
-        Product.objects.select_related('category', 'brand').prefetch_related('specifications'),
+        Product.objects.select_related('category', 'brand'),
         slug=slug,
         is_active=True
     )
+    tags = [product_tag(product.pk)]
+    tag_page(request, *tags)
+    version = f'{product.pk}|{product.updated_at.isoformat()}'
 
-    # Get related products (same category, excluding current product)
-    related_products = Product.objects.filter(
-        category=product.category,
-        is_active=True
-    ).exclude(id=product.id).select_related('category', 'brand')[:4]
-
-    # Collect all product images
-    product_images = [product.main_image]
-    if product.image_2:
-        product_images.append(product.image_2)
-    if product.image_3:
-        product_images.append(product.image_3)
-    if product.image_4:
-        product_images.append(product.image_4)
-
-    # Get approved reviews
-    reviews = product.reviews.filter(is_approved=True).select_related('user').order_by('-created_at')
+    context = {
+        'product': product,
+        'gallery': cached_fragment(request, 'product-gallery', version, lambda: _render_gallery(product), tags),
+        'specifications': cached_fragment(
+            request, 'product-specs', version, lambda: _render_specifications(product), tags
+        ),
+        'review_summary': cached_fragment(
+            request, 'product-review-summary', product.pk, lambda: _render_review_summary(product.pk), tags
+        ),
+        'review_page': _review_page_fragment(request, product.pk),
+        'related': cached_fragment(request, 'product-related', product.pk, lambda: _render_related(product), tags),
+    }
+    return render(request, 'store/product_detail.html', context)
 
-    # Calculate average rating
-    avg_rating = reviews.aggregate(Avg('rating'))['rating__avg'] or 0
 
-    # Check if current user has already reviewed this product
-    user_has_reviewed = False
-    if request.user.is_authenticated:
-        user_has_reviewed = product.reviews.filter(user=request.user).exists()
+@query_budget(4)
+@require_http_methods(["GET"])
+def product_reviews(request, product_id):
+    """
+    صفحة من مراجعات المنتج
+    One page of a product's approved reviews, loaded over HTMX
 
-    context = {
+    ``sort`` is one of REVIEW_SORTS; ``cursor`` is the opaque position
+    handed out by the previous page's "more reviews" link.
+    """
+    get_object_or_404(Product.objects.only('pk'), pk=product_id, is_active=True)
+    sort = request.GET.get('sort')
+    if sort not in REVIEW_SORTS:
+        sort = DEFAULT_REVIEW_SORT
+    cursor = request.GET.get('cursor', '')[:200]
+    return HttpResponse(_review_page_fragment(request, product_id, sort, cursor))
+
+
+@query_budget(6)
+@never_cache
+@require_http_methods(["GET"])
+def product_review_form(request, product_id):
+    """
+    نموذج إضافة المراجعة
+    The visitor's review form, or a thank-you once they have reviewed
+    """
+    product = get_object_or_404(Product.objects.only('pk', 'slug'), pk=product_id, is_active=True)
+    user_has_reviewed = (
+        request.user.is_authenticated
+        and Review.objects.filter(product=product, user=request.user).exists()
+    )
+    return render(request, 'store/partials/product_review_form.html', {
         'product': product,
-        'related_products': related_products,
-        'product_images': product_images,
-        'reviews': reviews,
-        'avg_rating': avg_rating,
         'user_has_reviewed': user_has_reviewed,
-    }
-
-    return render(request, 'store/product_detail.html', context)
+    })
 
 
 @login_required
@@ -198,12 +334,13 @@ def add_review(request, product_id):
     except (ValueError, TypeError):
         return redirect('store:product_detail', slug=product.slug)
 
-    # Create review
+    # Create review (verified from the purchase index, one indexed lookup)
     review = Review.objects.create(
         product=product,
         user=request.user,
         rating=rating,
-        comment=comment
+        comment=comment,
+        is_verified_purchase=has_purchased(request.user, product),
     )
 
     # If HTMX request, return partial
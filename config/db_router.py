@@ -0,0 +1,77 @@
+"""
+Primary/replica database routing
+
+Catalogue models are read from the ``replica`` alias when one is configured
+(see DB_REPLICA_HOST in settings); every write, and every read of orders,
+payments, inventory, users and sessions, goes to the primary. Reads fall
+back to the primary inside a transaction and for requests pinned by
+PrimaryPinMiddleware, so code never reads its own write from a lagging
+replica.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = 'replica'
+
+# Apps whose models are read-mostly and safe to serve slightly stale
+REPLICA_READ_APPS = frozenset({'store'})
+
+# Staff pages always read from the primary
+PRIMARY_PATH_PREFIXES = ('/admin/', '/dashboard/')
+
+_pinned_to_primary = ContextVar('pinned_to_primary', default=False)
+
+
+@contextmanager
+def pin_to_primary():
+    """
+    Route every read inside the block to the primary
+    """
+    token = _pinned_to_primary.set(True)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Catalogue reads to the replica, everything else to the primary
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in REPLICA_READ_APPS:
+            return DEFAULT_DB_ALIAS
+        if REPLICA_DB_ALIAS not in settings.DATABASES or _pinned_to_primary.get():
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_DB_ALIAS
+
+
+class PrimaryPinMiddleware:
+    """
+    Pin unsafe-method requests and staff pages to the primary database
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD', 'OPTIONS') and not request.path.startswith(PRIMARY_PATH_PREFIXES):
+            return self.get_response(request)
+        with pin_to_primary():
+            return self.get_response(request)
@@ -0,0 +1,88 @@
+"""
+Hybrid session engine (SESSION_ENGINE = 'config.sessions')
+
+Anonymous sessions live entirely in a signed cookie, like
+``django.contrib.sessions.backends.signed_cookies``: browsing the shop never
+writes a ``django_session`` row. Once a user logs in the session moves to
+``cached_db`` (a database row fronted by the cache), so it can be revoked
+server-side and is not limited by cookie size.
+
+The cookie value tells the two apart: database keys are 32 random
+characters, signed payloads always contain ``:`` separators. Signed
+cookies are tamper-proof but readable by the visitor, so anonymous
+sessions must only hold non-secret values (e.g. the guest cart key).
+"""
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.core import signing
+
+SIGNED_COOKIE_SALT = 'django.contrib.sessions.backends.signed_cookies'
+
+
+def is_signed_key(session_key):
+    """True for a signed-cookie payload, False for a database session key"""
+    return bool(session_key) and ':' in session_key
+
+
+class SessionStore(CachedDBStore):
+    """
+    Signed-cookie storage while anonymous, cached_db once authenticated
+    """
+
+    @property
+    def is_authenticated(self):
+        return SESSION_KEY in self._session
+
+    def load(self):
+        if not is_signed_key(self.session_key):
+            return super().load()
+        try:
+            return signing.loads(
+                self.session_key,
+                serializer=self.serializer,
+                max_age=self.get_session_cookie_age(),
+                salt=SIGNED_COOKIE_SALT,
+            )
+        except Exception:
+            # Bad signature, expired or undecodable: start a fresh session
+            self.create()
+        return {}
+
+    def create(self):
+        # No row yet: anonymous data is written to the cookie by save(), and
+        # a database key is allocated by the first authenticated save()
+        self._session_key = None
+        self.modified = True
+
+    def save(self, must_create=False):
+        if not self.is_authenticated:
+            self._session_key = signing.dumps(
+                self._session,
+                compress=True,
+                salt=SIGNED_COOKIE_SALT,
+                serializer=self.serializer,
+            )
+            self.modified = True
+            return
+        if self.session_key is None or is_signed_key(self.session_key):
+            # Just logged in: allocate a database key, keeping the data
+            return super().create()
+        return super().save(must_create=must_create)
+
+    def exists(self, session_key):
+        if is_signed_key(session_key):
+            return False
+        return super().exists(session_key)
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            session_key = self.session_key
+            if is_signed_key(session_key):
+                # The cookie is the only copy; clearing it is enough
+                self._session_key = ''
+                self._session_cache = {}
+                self.modified = True
+                return
+        if is_signed_key(session_key) or not session_key:
+            return
+        super().delete(session_key)
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 import os
+
+from django.core.exceptions import ImproperlyConfigured
 # Import dotenv here, but don't call it yet
 from dotenv import load_dotenv
 
@@ -79,6 +82,8 @@ LOGIN_REDIRECT_URL = 'store:product_list'
 LOGOUT_REDIRECT_URL = 'store:product_list'
 
 MIDDLEWARE = [
+    'apps.dashboard.middleware.RequestMetricsMiddleware',  # Keep first: measures the whole request
+    'config.db_router.PrimaryPinMiddleware',  # Writes and staff pages read from the primary DB
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -94,7 +99,8 @@ ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to the request metrics
+        'BACKEND': 'apps.dashboard.perf.InstrumentedDjangoTemplates',
         
         # This tells Django to look in the root 'templates/' folder
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
@@ -110,6 +116,7 @@ TEMPLATES = [
                 'django.contrib.messages.context_processors.messages',
                 'apps.orders.context_processors.cart_context',
                 'apps.store.context_processors.menu_categories',
+                'apps.store.context_processors.page_cache_holes',
             ],
         },
     },
@@ -117,17 +124,174 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# Local-memory cache that counts hits/misses for the request metrics
+# (the anonymous page cache has its own 'pages' alias, set up below)
+CACHES = {
+    'default': {
+        'BACKEND': 'apps.dashboard.perf.InstrumentedLocMemCache',
+    }
+}
+
+# ============================================================================
+# Sessions (config.sessions)
+# ============================================================================
+# Anonymous visitors get signed-cookie sessions (no django_session writes),
+# logged-in users get cached_db. Any Django engine can be set instead,
+# e.g. SESSION_ENGINE=django.contrib.sessions.backends.db
+SESSION_ENGINE = os.environ.get('SESSION_ENGINE', 'config.sessions')
+SESSION_COOKIE_AGE = int(os.environ.get('SESSION_COOKIE_AGE', str(60 * 60 * 24 * 14)))
+# Guest carts untouched for longer are deleted by cleanup_sessions
+GUEST_CART_MAX_AGE_DAYS = int(os.environ.get('GUEST_CART_MAX_AGE_DAYS', '30'))
+
+# Anonymous full-page cache for catalogue pages (apps.store.page_cache).
+# Pages are purged by tag when what they show changes; the timeout bounds
+# anything the tags miss. Shared product page fragments (cached_fragment)
+# follow the same switch and timeout.
+# Purges come from whichever worker saved the row and from management
+# commands, so pages live in the 'pages' cache, which must be shared by
+# every process: Redis (PAGE_CACHE_REDIS_URL) or a database table
+# (PAGE_CACHE_DB_TABLE, created with ``manage.py createcachetable``).
+# Without one the page cache stays off: a per-process cache would keep
+# serving pages other processes purged.
+# Query budgets are sized for Redis; with the table every cache read and
+# write is a query too
+PAGE_CACHE_REDIS_URL = os.environ.get('PAGE_CACHE_REDIS_URL', '')
+PAGE_CACHE_DB_TABLE = os.environ.get('PAGE_CACHE_DB_TABLE', '')
+if PAGE_CACHE_REDIS_URL:
+    CACHES['pages'] = {
+        'BACKEND': 'apps.dashboard.perf.InstrumentedRedisCache',
+        'LOCATION': PAGE_CACHE_REDIS_URL,
+    }
+elif PAGE_CACHE_DB_TABLE:
+    CACHES['pages'] = {
+        'BACKEND': 'apps.dashboard.perf.InstrumentedDatabaseCache',
+        'LOCATION': PAGE_CACHE_DB_TABLE,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '2000')),
+        },
+    }
+else:
+    # Local stand-in so tag purges have somewhere to go; never serves pages
+    # outside tests
+    CACHES['pages'] = {
+        'BACKEND': 'apps.dashboard.perf.InstrumentedLocMemCache',
+        'LOCATION': 'pages',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '2000')),
+        },
+    }
+PAGE_CACHE_ENABLED = (
+    bool(PAGE_CACHE_REDIS_URL or PAGE_CACHE_DB_TABLE)
+    and os.environ.get('PAGE_CACHE_ENABLED', 'True') == 'True'
+)
+PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT', '600'))
+# Part of every catalogue ETag (apps.store.conditional): change it when a
+# deploy changes page templates, so browsers stop revalidating old HTML
+PAGE_VERSION = os.environ.get('PAGE_VERSION', '1')
+
+# ============================================================================
+# Performance Instrumentation (apps.dashboard.middleware)
+# ============================================================================
+PERF_METRICS_ENABLED = os.environ.get('PERF_METRICS_ENABLED', 'True') == 'True'
+# Fraction of requests persisted to RequestMetric (1.0 = all)
+PERF_METRICS_SAMPLE_RATE = float(os.environ.get('PERF_METRICS_SAMPLE_RATE', '1.0'))
+PERF_METRICS_FLUSH_SIZE = 50
+PERF_METRICS_FLUSH_SECONDS = 30
+# Send Server-Timing to everyone (otherwise only in DEBUG or to staff)
+PERF_SERVER_TIMING = os.environ.get('PERF_SERVER_TIMING', 'False') == 'True'
+# Raise instead of logging when a view exceeds its @query_budget
+# (PerfTestRunner switches this on for manage.py test)
+PERF_ENFORCE_QUERY_BUDGETS = False
+TEST_RUNNER = 'apps.dashboard.testing.PerfTestRunner'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+# SQLite connection tuning, run on every new connection via init_command.
+# WAL lets readers work alongside the single writer; synchronous=NORMAL is
+# safe in WAL mode (a power cut can lose the last commits, never corrupt);
+# writers wait up to the busy timeout for the lock instead of failing with
+# "database is locked", and IMMEDIATE transactions take the write lock at
+# BEGIN so two readers never deadlock upgrading to writers.
+# The journal mode is stored in the database file itself, so it is not
+# set per connection (every manage.py run would rewrite whatever file it
+# opens): ``manage.py optimize_sqlite`` switches the file on deploy
+SQLITE_JOURNAL_MODE = 'WAL'
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '20000'))
+SQLITE_PRAGMAS = {
+    'synchronous': 'NORMAL',
+    'busy_timeout': SQLITE_BUSY_TIMEOUT_MS,
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', str(128 * 1024 * 1024))),
+    # Negative cache_size is in KiB (default 32 MiB per connection)
+    'cache_size': -int(os.environ.get('SQLITE_CACHE_SIZE_KB', '32768')),
+    'temp_store': 'MEMORY',
 }
 
+def postgres_database(prefix='DB_'):
+    """
+    PostgreSQL settings from ``<prefix>NAME/USER/PASSWORD/HOST/PORT``,
+    falling back to the DB_* value for anything the prefix leaves unset
+    """
+    def env(name, default=''):
+        return os.environ.get(f'{prefix}{name}', os.environ.get(f'DB_{name}', default))
+
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': env('NAME', 'gulf_empire'),
+        'USER': env('USER'),
+        'PASSWORD': env('PASSWORD'),
+        'HOST': env('HOST', 'localhost'),
+        'PORT': env('PORT', '5432'),
+        # Persistent connections, verified before reuse after an idle period
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'connect_timeout': 5},
+    }
+    if os.environ.get('DB_PGBOUNCER', 'False') == 'True':
+        # Transaction pooling: a server-side cursor would not survive between transactions
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+    pool_max_size = int(os.environ.get('DB_POOL_MAX_SIZE', '0'))
+    if pool_max_size:
+        # In-process pool; replaces persistent connections. requirements.txt
+        # only has psycopg2, which Django cannot pool
+        if find_spec('psycopg') is None or find_spec('psycopg_pool') is None:
+            raise ImproperlyConfigured(
+                'DB_POOL_MAX_SIZE needs psycopg 3 with its pool: pip install "psycopg[binary,pool]"'
+            )
+        database['CONN_MAX_AGE'] = 0
+        database['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+            'max_size': pool_max_size,
+            'timeout': 10,
+        }
+    return database
+
+
+# DB_ENGINE=postgresql switches from the SQLite file to PostgreSQL
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {'default': postgres_database()}
+    if os.environ.get('DB_REPLICA_HOST'):
+        # Catalogue reads go here (config.db_router); tests use the primary
+        DATABASES['replica'] = postgres_database('DB_REPLICA_')
+        DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+            },
+        }
+    }
+
+DATABASE_ROUTERS = ['config.db_router.PrimaryReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -178,6 +342,17 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Sitemaps and the product feed (manage.py generate_feeds, apps.store.feeds).
+# SITE_URL is the public origin written into every <loc> and feed link
+SITE_URL = os.environ.get('SITE_URL', 'https://empire776.pythonanywhere.com').rstrip('/')
+FEEDS_ROOT = os.environ.get('FEEDS_ROOT', os.path.join(BASE_DIR, 'feeds'))
+
+# Bulk catalogue import (manage.py import_catalog, product admin). Image
+# cells may name files under CATALOG_IMPORT_IMAGE_ROOT; without it the admin
+# import only accepts image URLs
+CATALOG_IMPORT_IMAGE_ROOT = os.environ.get('CATALOG_IMPORT_IMAGE_ROOT') or None
+CATALOG_IMPORT_IMAGE_WORKERS = int(os.environ.get('CATALOG_IMPORT_IMAGE_WORKERS', '8'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -210,6 +385,15 @@ EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')  # IMPORTANT: Us
 # Default From Email
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'Gulf Emperor <noreply@gulfemperor.com>')
 
+# Low-stock digest (manage.py scan_low_stock): comma-separated purchasing
+# addresses and/or a webhook that receives the digest as JSON
+LOW_STOCK_ALERT_EMAILS = [
+    email.strip()
+    for email in os.environ.get('LOW_STOCK_ALERT_EMAILS', '').split(',')
+    if email.strip()
+]
+LOW_STOCK_ALERT_WEBHOOK_URL = os.environ.get('LOW_STOCK_ALERT_WEBHOOK_URL', '')
+
 # ============================================================================
 # Django Daisy (Admin Panel) Configuration
 # ============================================================================